@@ -185,19 +185,27 @@ class RealAIAnalysisAgent:
             token_estimate = len(prompt.split()) # Rough estimate
             logger.info(f"Prompt length estimate: {token_estimate} tokens")
             
-            # Try to use a more detailed error handler
-            # Create a future to run the LLM call in a separate thread
-            response = await asyncio.wait_for(
-                loop.run_in_executor(
-                    None, 
-                    lambda: self.llm_agent.generate_response(
-                        prompt=prompt,
-                        temperature=0.1,
-                        max_tokens=1024
-                    )
-                ),
-                timeout=300.0  # Increased timeout to 300 seconds (5 minutes)
-            )
+            if hasattr(self.llm_agent, 'agenerate_response'):
+                # Native async path: pooled connections, no executor thread
+                response = await self.llm_agent.agenerate_response(
+                    prompt=prompt,
+                    temperature=0.1,
+                    max_tokens=1024,
+                    timeout=300.0
+                )
+            else:
+                # Create a future to run the LLM call in a separate thread
+                response = await asyncio.wait_for(
+                    loop.run_in_executor(
+                        None, 
+                        lambda: self.llm_agent.generate_response(
+                            prompt=prompt,
+                            temperature=0.1,
+                            max_tokens=1024
+                        )
+                    ),
+                    timeout=300.0  # Increased timeout to 300 seconds (5 minutes)
+                )
             
             logger.info("LLM generation completed successfully")
             return response
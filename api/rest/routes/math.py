@@ -8,11 +8,14 @@ import logging
 from typing import Dict, Any, Optional, List
 
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import uuid
 import os
+import json
 from datetime import datetime
-import requests
+
+from api.websocket.multimodal_handler import stream_to_session
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +28,7 @@ class MathQueryRequest(BaseModel):
     query: str
     conversation_id: Optional[str] = None
     user_id: Optional[str] = None
+    stream: bool = False
 
 class MathResponse(BaseModel):
     """Response model for mathematical operations."""
@@ -47,25 +51,106 @@ async def get_conversation_repository():
         "add_interaction": lambda *args, **kwargs: str(uuid.uuid4())
     }
 
+async def get_llm_agent():
+    """Get the core LLM agent instance, if one was initialized."""
+    from api.rest.server import get_core_llm_agent
+    return get_core_llm_agent()
+
+def _stream_llm_answer(llm_agent, conversation_repo, query: str, conversation_id: str) -> StreamingResponse:
+    """
+    Stream the LLM answer for a query as server-sent events.
+    
+    Chunks are also forwarded to WebSocket clients subscribed to the
+    conversation, so both channels see tokens as soon as they are generated.
+    The interaction is recorded with the text streamed so far once the
+    stream ends, fails or is abandoned by the client.
+    
+    Args:
+        llm_agent: Core LLM agent instance
+        conversation_repo: Conversation repository instance
+        query: Mathematical query
+        conversation_id: Conversation identifier used as the WebSocket session
+        
+    Returns:
+        Streaming response emitting ``chunk`` events followed by ``done``
+    """
+    stream_id = str(uuid.uuid4())
+    
+    async def event_stream():
+        chunks = stream_to_session(
+            conversation_id,
+            llm_agent.generate_response_stream(query),
+            stream_id=stream_id
+        )
+        answer = []
+        status = "interrupted"
+        try:
+            async for chunk in chunks:
+                answer.append(chunk)
+                yield f"data: {json.dumps({'type': 'chunk', 'chunk': chunk})}\n\n"
+            status = "completed"
+        except Exception as e:
+            status = "error"
+            logger.error(f"Error streaming math query: {e}")
+            yield f"data: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"
+            return
+        finally:
+            _record_streamed_interaction(conversation_repo, conversation_id, query, "".join(answer), status)
+        
+        yield f"data: {json.dumps({'type': 'done', 'stream_id': stream_id, 'conversation_id': conversation_id})}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Stream-Id": stream_id}
+    )
+
+def _record_streamed_interaction(conversation_repo, conversation_id: str, query: str,
+                                 answer: str, status: str) -> None:
+    """
+    Record a streamed query and its answer in the conversation.
+    
+    Args:
+        conversation_repo: Conversation repository instance
+        conversation_id: Conversation identifier
+        query: Mathematical query
+        answer: Text streamed to the client
+        status: "completed", "error" or "interrupted"
+    """
+    try:
+        conversation_repo["add_interaction"](
+            conversation_id=conversation_id,
+            user_input={"text": query, "type": "text"},
+            system_response={"text": answer, "type": "text", "status": status}
+        )
+    except Exception as e:
+        logger.error(f"Error recording streamed interaction for conversation {conversation_id}: {e}")
+
 # Routes
 @router.post("/query", response_model=MathResponse)
 async def math_query(
     request: MathQueryRequest,
     background_tasks: BackgroundTasks,
     orchestration_manager=Depends(get_orchestration_manager),
-    conversation_repo=Depends(get_conversation_repository)
+    conversation_repo=Depends(get_conversation_repository),
+    llm_agent=Depends(get_llm_agent)
 ):
     """
     Process a mathematical query.
     
+    When ``request.stream`` is set, the answer is generated directly by the
+    core LLM agent and streamed back as server-sent events instead of
+    starting a workflow.
+    
     Args:
         request: Mathematical query request
         background_tasks: Background task manager
         orchestration_manager: Orchestration manager instance
         conversation_repo: Conversation repository instance
+        llm_agent: Core LLM agent instance
         
     Returns:
-        Response with workflow ID for tracking
+        Response with workflow ID for tracking, or a streaming response
     """
     try:
         # Create conversation if needed
@@ -76,6 +161,11 @@ async def math_query(
                 title=f"Conversation {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
             )
         
+        if request.stream:
+            if llm_agent is None:
+                raise HTTPException(status_code=503, detail="LLM agent is not available")
+            return _stream_llm_answer(llm_agent, conversation_repo, request.query, conversation_id)
+        
         # Add user interaction
         interaction_id = conversation_repo["add_interaction"](
             conversation_id=conversation_id,
@@ -83,30 +173,7 @@ async def math_query(
             system_response={"status": "processing"}
         )
         
-        # Register the workflow with our new workflow system
-        try:
-            # Try to use the workflow API directly
-            workflow_response = requests.post(
-                "http://localhost:8000/workflow/register",
-                params={"query": request.query}
-            )
-            
-            if workflow_response.status_code == 200:
-                workflow_id = workflow_response.json()["workflow_id"]
-            else:
-                # Fallback to traditional workflow creation
-                workflow_id = orchestration_manager["start_workflow"](
-                    workflow_type="math_problem_solving",
-                    initial_data={
-                        "query": request.query,
-                        "conversation_id": conversation_id,
-                        "interaction_id": interaction_id,
-                        "user_id": request.user_id
-                    }
-                )
-        except Exception as e:
-            logger.warning(f"Could not register with workflow API: {e}")
-            # Fallback to traditional workflow creation
+        # Start the workflow on the orchestration manager's engine
         workflow_id = orchestration_manager["start_workflow"](
             workflow_type="math_problem_solving",
             initial_data={
@@ -124,6 +191,8 @@ async def math_query(
             message="Your mathematical query is being processed"
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing math query: {e}")
         raise HTTPException(status_code=500, detail=str(e))
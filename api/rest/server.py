@@ -21,6 +21,7 @@ from orchestration.workflow.workflow_engine import WorkflowEngine
 from orchestration.manager.orchestration_manager import OrchestrationManager, get_orchestration_manager
 from core.agent.llm_agent import CoreLLMAgent, initialize_llm_agent
 from orchestration.agents.registry import get_agent_registry, register_core_agents
+from orchestration.context.context_manager import get_context_manager
 
 # Configure logging
 logging.basicConfig(
@@ -90,6 +91,9 @@ async def startup_event():
         await orchestration_manager.initialize()
         logger.info("Orchestration manager initialized")
         
+        # Write conversation context changes behind in the background
+        get_context_manager().start_background_flush()
+        
         # Initialize Core LLM Agent
         logger.info("Initializing Core LLM Agent...")
         try:
@@ -185,9 +189,12 @@ async def shutdown_event():
         if orchestration_manager and hasattr(orchestration_manager, 'shutdown'):
             await orchestration_manager.shutdown()
         
-        if core_llm_agent:
-            # Add any cleanup needed for Core LLM Agent
-            pass
+        if core_llm_agent and hasattr(core_llm_agent, 'close'):
+            # Release pooled connections to the LLM server
+            await core_llm_agent.close()
+        
+        # Persist the last conversation context changes
+        get_context_manager().close()
         
         logger.info("Server shutdown complete")
     except Exception as e:
@@ -7,7 +7,8 @@ updates on multimodal processing.
 import logging
 import json
 import asyncio
-from typing import Dict, Any, List, Set, Optional
+import datetime
+from typing import AsyncIterator, Dict, Any, List, Set, Optional
 from fastapi import WebSocket, WebSocketDisconnect
 
 logger = logging.getLogger(__name__)
@@ -179,3 +180,50 @@ async def send_processing_update(session_id: str, update_type: str, data: Dict[s
     }
     
     await notification_manager.broadcast_to_session(session_id, message)
+
+async def stream_to_session(
+    session_id: str,
+    chunks: AsyncIterator[str],
+    stream_id: Optional[str] = None
+) -> AsyncIterator[str]:
+    """
+    Forward generated text chunks to session subscribers as they arrive.
+    
+    Each chunk is broadcast as a ``stream_chunk`` message and yielded back
+    to the caller unchanged, so the same upstream stream can also feed an
+    HTTP response. A single ``stream_end`` message carrying the complete
+    text (and the error, if any) is broadcast once the stream finishes.
+    
+    Args:
+        session_id: Session identifier
+        chunks: Async iterator of text chunks
+        stream_id: Optional identifier used to correlate chunks on the client
+        
+    Yields:
+        The chunks from ``chunks``
+    """
+    parts: List[str] = []
+    end_message = {
+        "type": "stream_end",
+        "session_id": session_id,
+        "stream_id": stream_id
+    }
+    
+    try:
+        async for chunk in chunks:
+            await notification_manager.broadcast_to_session(session_id, {
+                "type": "stream_chunk",
+                "session_id": session_id,
+                "stream_id": stream_id,
+                "index": len(parts),
+                "chunk": chunk
+            })
+            parts.append(chunk)
+            yield chunk
+    except Exception as e:
+        logger.error(f"Error streaming to session {session_id}: {str(e)}")
+        end_message["error"] = str(e)
+        raise
+    finally:
+        end_message["text"] = "".join(parts)
+        await notification_manager.broadcast_to_session(session_id, end_message)
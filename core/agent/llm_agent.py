@@ -6,13 +6,16 @@ which is responsible for natural language understanding, reasoning,
 and response generation.
 """
 import logging
-from typing import Dict, Any, List, Optional, Union
+from typing import AsyncIterator, Dict, Any, List, Optional, Union
 import os
 import time
 
 from ..mistral.inference import MistralInference
+from ..mistral.config import get_model_config
+from ..mistral.response_cache import ResponseCache
 from ..prompting.system_prompts import BASE_MATH_SYSTEM_PROMPT
 from ..prompting.chain_of_thought import format_cot_prompt
+from ..prompting.tiered_classifier import get_tiered_classifier
 
 logger = logging.getLogger(__name__)
 
@@ -32,12 +35,30 @@ class CoreLLMAgent:
         lmstudio_url = os.environ.get("LMSTUDIO_URL", "http://127.0.0.1:1234")
         logger.info(f"Using LMStudio server at: {lmstudio_url}")
         
+        # Connection pool and concurrency limits for the LLM server
+        model_config = get_model_config()
+        
         # Initialize the inference engine with LMStudio server
         self.inference = MistralInference(
             api_url=lmstudio_url,
-            n_ctx=2048  # Context window size
+            n_ctx=2048,  # Context window size
+            max_connections=self.config.get("max_connections", model_config["max_connections"]),
+            max_in_flight=self.config.get("max_in_flight", model_config["max_in_flight"]),
+            request_timeout=self.config.get("request_timeout", model_config["request_timeout"]),
+            batch_window=self.config.get("batch_window", model_config["batch_window"]),
+            max_batch_size=self.config.get("max_batch_size", model_config["max_batch_size"])
         )
         
+        # Cache for deterministic (low temperature) generations
+        self.response_cache = None
+        if self.config.get("cache_enabled", model_config["cache_enabled"]):
+            self.response_cache = ResponseCache(
+                max_entries=self.config.get("cache_max_entries", model_config["cache_max_entries"]),
+                ttl=self.config.get("cache_ttl", model_config["cache_ttl"]),
+                max_temperature=self.config.get("cache_max_temperature", model_config["cache_max_temperature"]),
+                disk_path=self.config.get("cache_path", model_config["cache_path"])
+            )
+        
         logger.info(f"Initialized Core LLM Agent with LMStudio server")
     
     def generate_response(
@@ -47,7 +68,8 @@ class CoreLLMAgent:
         temperature: float = 0.1,
         max_tokens: int = 1024,
         stop_sequences: Optional[List[str]] = None,
-        use_cot: bool = True
+        use_cot: bool = True,
+        use_cache: Optional[bool] = None
     ) -> Dict[str, Any]:
         """
         Generate a response to a prompt.
@@ -59,17 +81,22 @@ class CoreLLMAgent:
             max_tokens: Maximum tokens to generate
             stop_sequences: Optional sequences to stop generation
             use_cot: Whether to use chain of thought (not implemented)
+            use_cache: Whether to use the response cache; by default only
+                deterministic (low temperature) requests are cached
             
         Returns:
             Dictionary containing the response and success status
         """
         try:
-            # Prepare full prompt
-            if system_prompt is None:
-                system_prompt = BASE_MATH_SYSTEM_PROMPT
+            full_prompt = self._format_prompt(prompt, system_prompt)
             
-            # Format full prompt for Mistral Instruct format
-            full_prompt = f"<s>[INST] {system_prompt}\n\nQuestion: {prompt} [/INST]"
+            cache_key = self._get_cache_key(
+                full_prompt, temperature, max_tokens, stop_sequences, use_cache
+            )
+            if cache_key:
+                cached = self.response_cache.get(cache_key)
+                if cached is not None:
+                    return {"success": True, "response": cached, "cached": True}
             
             # Generate response
             response = self.inference.generate(
@@ -79,6 +106,72 @@ class CoreLLMAgent:
                 stop_sequences=stop_sequences,
             )
             
+            # The sync engine reports failures in-band; never cache those
+            if cache_key and not response.startswith("Error:"):
+                self.response_cache.set(cache_key, response.strip())
+            
+            return {
+                "success": True,
+                "response": response.strip()
+            }
+        except Exception as e:
+            logger.error(f"Error generating response: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    async def agenerate_response(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.1,
+        max_tokens: int = 1024,
+        stop_sequences: Optional[List[str]] = None,
+        timeout: Optional[float] = None,
+        use_cache: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate a response to a prompt from async code.
+        
+        Same contract as ``generate_response`` but awaits the pooled async
+        client instead of blocking the event loop.
+        
+        Args:
+            prompt: The prompt to respond to
+            system_prompt: Optional system prompt to prepend
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            stop_sequences: Optional sequences to stop generation
+            timeout: Optional per-call timeout in seconds
+            use_cache: Whether to use the response cache; by default only
+                deterministic (low temperature) requests are cached
+            
+        Returns:
+            Dictionary containing the response and success status
+        """
+        try:
+            full_prompt = self._format_prompt(prompt, system_prompt)
+            
+            cache_key = self._get_cache_key(
+                full_prompt, temperature, max_tokens, stop_sequences, use_cache
+            )
+            if cache_key:
+                cached = await self.response_cache.aget(cache_key)
+                if cached is not None:
+                    return {"success": True, "response": cached, "cached": True}
+            
+            response = await self.inference.agenerate(
+                prompt=full_prompt,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stop_sequences=stop_sequences,
+                timeout=timeout
+            )
+            
+            if cache_key:
+                await self.response_cache.aset(cache_key, response.strip())
+            
             return {
                 "success": True,
                 "response": response.strip()
@@ -90,6 +183,87 @@ class CoreLLMAgent:
                 "error": str(e)
             }
     
+    async def generate_response_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.1,
+        max_tokens: int = 1024,
+        stop_sequences: Optional[List[str]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Generate a response to a prompt, yielding chunks as they are produced.
+        
+        Args:
+            prompt: The prompt to respond to
+            system_prompt: Optional system prompt to prepend
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            stop_sequences: Optional sequences to stop generation
+            
+        Yields:
+            Chunks of the response text
+        """
+        full_prompt = self._format_prompt(prompt, system_prompt)
+        
+        async for chunk in self.inference.generate_stream(
+            prompt=full_prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stop_sequences=stop_sequences,
+        ):
+            yield chunk
+    
+    def _get_cache_key(
+        self,
+        full_prompt: str,
+        temperature: float,
+        max_tokens: int,
+        stop_sequences: Optional[List[str]],
+        use_cache: Optional[bool]
+    ) -> Optional[str]:
+        """
+        Get the response cache key for a request, or None if it should not be cached.
+        
+        Args:
+            full_prompt: Formatted prompt sent to the model
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            stop_sequences: Optional stop sequences
+            use_cache: Explicit opt-in/opt-out, or None to decide by temperature
+            
+        Returns:
+            Cache key or None
+        """
+        if self.response_cache is None or use_cache is False:
+            return None
+        if use_cache is None and not self.response_cache.is_cacheable(temperature):
+            return None
+        
+        return self.response_cache.make_key(
+            full_prompt,
+            self.inference.model_name,
+            max_tokens,
+            stop_sequences,
+            temperature
+        )
+    
+    def _format_prompt(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        """
+        Wrap a prompt in the Mistral Instruct format.
+        
+        Args:
+            prompt: The user prompt
+            system_prompt: Optional system prompt, defaults to the base math prompt
+            
+        Returns:
+            Formatted prompt
+        """
+        if system_prompt is None:
+            system_prompt = BASE_MATH_SYSTEM_PROMPT
+        
+        return f"<s>[INST] {system_prompt}\n\nQuestion: {prompt} [/INST]"
+    
     def generate_math_explanation(
         self,
         query: str,
@@ -204,6 +378,46 @@ class CoreLLMAgent:
         """
         Classify the mathematical domain of a text.
         
+        The local tiered classifier answers first; the LLM is only asked
+        when its confidence is below ``classifier_confidence_threshold``.
+        
+        Args:
+            text: Text to classify
+            
+        Returns:
+            Dictionary containing the classification result
+        """
+        local = get_tiered_classifier().classify(text)
+        threshold = self.config.get("classifier_confidence_threshold")
+        needs_llm = local["needs_llm"] if threshold is None else local["confidence"] < threshold
+        
+        if not needs_llm:
+            return {
+                "success": True,
+                "domain": local["domain"],
+                "confidence": local["confidence"],
+                "source": local["tier"]
+            }
+        
+        result = self._classify_domain_with_llm(text)
+        if result.get("success", False):
+            result["source"] = "llm"
+            return result
+        
+        # Prefer a low-confidence local answer over no answer
+        logger.warning(f"LLM domain classification failed, using local estimate: {result.get('error')}")
+        return {
+            "success": True,
+            "domain": local["domain"],
+            "confidence": local["confidence"],
+            "source": local["tier"],
+            "note": "LLM classification failed; using local estimate"
+        }
+    
+    def _classify_domain_with_llm(self, text: str) -> Dict[str, Any]:
+        """
+        Classify the mathematical domain of a text with the LLM.
+        
         Args:
             text: Text to classify
             
@@ -338,6 +552,10 @@ And so on. If no mathematical expressions are found, respond with "No expression
             "expression_count": len(expressions)
         }
 
+    async def close(self):
+        """Release the inference engine's pooled connections."""
+        await self.inference.aclose()
+
 def initialize_llm_agent(config: Optional[Dict[str, Any]] = None) -> CoreLLMAgent:
     """
     Initialize and return a CoreLLMAgent instance.
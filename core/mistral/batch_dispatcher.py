@@ -0,0 +1,253 @@
+"""
+Micro-batching dispatcher for LLM completion requests.
+
+This module collects completion requests issued at nearly the same moment and
+submits them to the server as a single multi-prompt completion call. Backends
+that do not accept a prompt list are detected automatically, once batched
+calls have failed several times in a row while single prompts succeed, after
+which the dispatcher falls back to parallel single-prompt calls bounded by the
+client's in-flight limit.
+"""
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from orchestration.monitoring.metrics import get_registry
+
+from .client import AsyncLLMClient, LLMClientError
+from .config import DEFAULT_BATCH_WINDOW, DEFAULT_MAX_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64]
+
+# Consecutive failed batched calls, with working single calls, before batching is disabled
+PROMPT_LIST_FAILURE_LIMIT = 3
+
+
+class BatchDispatcher:
+    """Groups concurrent completion requests into batched upstream calls."""
+
+    def __init__(
+        self,
+        client: AsyncLLMClient,
+        batch_window: float = DEFAULT_BATCH_WINDOW,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        supports_prompt_list: Optional[bool] = None,
+        prompt_list_failure_limit: int = PROMPT_LIST_FAILURE_LIMIT
+    ):
+        """
+        Initialize the dispatcher.
+
+        Args:
+            client: Pooled client used for upstream calls
+            batch_window: Time to wait for more requests before dispatching (seconds)
+            max_batch_size: Maximum number of prompts in one batch
+            supports_prompt_list: Whether the backend accepts a list of prompts;
+                None means detect it from batched calls
+            prompt_list_failure_limit: Consecutive failed batched calls, while
+                single prompts succeed, after which batching is disabled
+        """
+        self.client = client
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.supports_prompt_list = supports_prompt_list
+        self.prompt_list_failure_limit = prompt_list_failure_limit
+        self._prompt_list_failures = 0
+
+        self._batches: Dict[str, Dict[str, Any]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.stats = {
+            "requests": 0,
+            "batches": 0,
+            "batched_calls": 0,
+            "fallback_batches": 0,
+            "max_batch_size_seen": 0
+        }
+
+        logger.info(f"LLM batch dispatcher initialized with window={batch_window}s, "
+                    f"max_size={max_batch_size}")
+
+    @property
+    def average_batch_size(self) -> float:
+        """Average number of requests per dispatched batch."""
+        if not self.stats["batches"]:
+            return 0.0
+        return self.stats["requests"] / self.stats["batches"]
+
+    async def submit(self, payload: Dict[str, Any], timeout: Optional[float] = None) -> str:
+        """
+        Submit a completion request and wait for its text.
+
+        Requests are grouped with others that share every sampling parameter,
+        since one batched call can only carry one set of parameters.
+
+        Args:
+            payload: Request body for ``/v1/completions`` with a single prompt
+            timeout: Optional per-call timeout in seconds
+
+        Returns:
+            Generated text
+
+        Raises:
+            LLMClientError: If the request fails or times out
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._batches = {}
+            self._loop = loop
+
+        future = loop.create_future()
+        base = {k: v for k, v in payload.items() if k != "prompt"}
+        group = json.dumps(base, sort_keys=True)
+
+        batch = self._batches.get(group)
+        if batch is None:
+            batch = {"payload": base, "items": []}
+            batch["timer"] = loop.call_later(self.batch_window, self._flush, group)
+            self._batches[group] = batch
+
+        batch["items"].append((payload["prompt"], future))
+        self.stats["requests"] += 1
+
+        # Dispatch immediately once the batch is full
+        if len(batch["items"]) >= self.max_batch_size:
+            batch["timer"].cancel()
+            self._flush(group)
+
+        timeout = timeout or self.client.timeout
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+        except asyncio.TimeoutError:
+            raise LLMClientError(f"LLM request timed out after {timeout}s")
+
+    def _flush(self, group: str):
+        """Hand the pending batch for a parameter group to a dispatch task."""
+        batch = self._batches.pop(group, None)
+        if batch is None or not batch["items"]:
+            return
+
+        task = asyncio.ensure_future(self._dispatch(batch["payload"], batch["items"]))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, base: Dict[str, Any], items: List[Tuple[str, asyncio.Future]]):
+        """Run one batch and resolve each caller's future."""
+        try:
+            results = await self._run_batch(base, items)
+        except BaseException as e:
+            # Never leave callers waiting on a batch that broke
+            error = e if isinstance(e, LLMClientError) else LLMClientError(f"Batched completion failed: {e}")
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(error)
+            if not isinstance(e, Exception):
+                raise
+            logger.error(f"Error dispatching LLM batch: {e}")
+            return
+
+        for prompt, future in items:
+            if future.done():
+                continue
+            result = results[prompt]
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def _run_batch(self, base: Dict[str, Any], items: List[Tuple[str, asyncio.Future]]) -> Dict[str, Any]:
+        """
+        Complete the prompts of one batch.
+
+        Args:
+            base: Request body shared by the batch, without the prompt
+            items: Prompts and the futures of their callers
+
+        Returns:
+            Text or exception for each distinct prompt
+        """
+        self._record_batch(len(items))
+
+        # Duplicate prompts within a batch are sent once
+        prompts = list(dict.fromkeys(prompt for prompt, _ in items))
+        results: Dict[str, Any] = {}
+
+        batched = len(prompts) > 1 and self.supports_prompt_list is not False
+        if batched:
+            try:
+                texts = await self._complete_batch(base, prompts)
+                results = dict(zip(prompts, texts))
+                self._prompt_list_failures = 0
+            except LLMClientError as e:
+                logger.warning(f"Batched completion failed, falling back to parallel calls: {e}")
+
+        if not results:
+            if len(prompts) > 1:
+                self.stats["fallback_batches"] += 1
+                get_registry().counter("llm.batch.fallbacks").increment()
+
+            # Parallelism is bounded by the client's in-flight limit
+            outcomes = await asyncio.gather(
+                *[self._complete_one(base, prompt) for prompt in prompts],
+                return_exceptions=True
+            )
+            results = dict(zip(prompts, outcomes))
+
+            if (batched and self.supports_prompt_list is None
+                    and any(not isinstance(o, BaseException) for o in outcomes)):
+                # Single prompts work but the list did not; after repeated
+                # failures conclude the backend lacks batching
+                self._prompt_list_failures += 1
+                if self._prompt_list_failures >= self.prompt_list_failure_limit:
+                    self.supports_prompt_list = False
+                    logger.info("LLM backend does not accept prompt lists; using parallel calls")
+
+        return results
+
+    async def _complete_batch(self, base: Dict[str, Any], prompts: List[str]) -> List[str]:
+        """Send several prompts in one completion call."""
+        self.stats["batched_calls"] += 1
+        output = await self.client.complete(dict(base, prompt=prompts))
+
+        choices = output.get("choices") or []
+        if len(choices) != len(prompts):
+            raise LLMClientError(
+                f"Backend returned {len(choices)} choices for {len(prompts)} prompts"
+            )
+
+        texts: List[Optional[str]] = [None] * len(prompts)
+        for position, choice in enumerate(choices):
+            index = choice.get("index", position)
+            if not isinstance(index, int) or not 0 <= index < len(prompts) or texts[index] is not None:
+                raise LLMClientError(f"Backend returned an invalid choice index {index!r}")
+            texts[index] = (choice.get("text") or "").strip()
+
+        if self.supports_prompt_list is None:
+            self.supports_prompt_list = True
+            logger.info("LLM backend accepts prompt lists; batching enabled")
+
+        return texts
+
+    async def _complete_one(self, base: Dict[str, Any], prompt: str) -> str:
+        """Send a single prompt."""
+        output = await self.client.complete(dict(base, prompt=prompt))
+        try:
+            return output["choices"][0]["text"].strip()
+        except (KeyError, IndexError, TypeError) as e:
+            raise LLMClientError(f"Unexpected response format: {str(e)}") from e
+
+    def _record_batch(self, size: int):
+        """Record the achieved size of a dispatched batch."""
+        self.stats["batches"] += 1
+        self.stats["max_batch_size_seen"] = max(self.stats["max_batch_size_seen"], size)
+
+        registry = get_registry()
+        registry.histogram(
+            "llm.batch.size",
+            "Number of requests per dispatched LLM batch",
+            buckets=BATCH_SIZE_BUCKETS
+        ).observe(size)
+        registry.gauge("llm.batch.average_size").set(self.average_batch_size)
@@ -0,0 +1,311 @@
+"""
+Asynchronous HTTP client for the LMStudio/OpenAI-compatible completions API.
+
+This module provides a connection-pooled client that limits the number of
+requests in flight and coalesces identical concurrent requests into a single
+upstream call.
+"""
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Awaitable, Dict, Optional
+
+import aiohttp
+
+from .config import (
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_REQUEST_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class LLMClientError(RuntimeError):
+    """Raised when the LLM server cannot complete a request."""
+
+
+class _SharedRequest:
+    """An upstream call shared by the callers of identical requests."""
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+class AsyncLLMClient:
+    """Pooled asyncio client for an OpenAI-compatible completions server."""
+
+    def __init__(
+        self,
+        api_url: str = "http://127.0.0.1:1234",
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        timeout: float = DEFAULT_REQUEST_TIMEOUT,
+        coalesce: bool = True
+    ):
+        """
+        Initialize the client.
+
+        Args:
+            api_url: Base URL of the LLM server
+            max_connections: Size of the keep-alive connection pool
+            max_in_flight: Maximum number of requests sent concurrently
+            timeout: Default per-call timeout in seconds
+            coalesce: Whether identical concurrent completions share one call
+        """
+        self.api_url = api_url.rstrip("/")
+        self.max_connections = max_connections
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.coalesce = coalesce
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Dict[str, _SharedRequest] = {}
+
+        self.stats = {
+            "requests": 0,
+            "upstream_calls": 0,
+            "coalesced": 0,
+            "timeouts": 0,
+            "errors": 0
+        }
+
+    async def _ensure_session(self) -> aiohttp.ClientSession:
+        """Create the pooled session for the running event loop if needed."""
+        loop = asyncio.get_running_loop()
+
+        if self._session is None or self._session.closed or self._loop is not loop:
+            stale_session, stale_loop = self._session, self._loop
+
+            # Sessions and semaphores are bound to the loop that created them
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                keepalive_timeout=60
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={"Content-Type": "application/json"}
+            )
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._loop = loop
+            self._pending = {}
+
+            if stale_session is not None and not stale_session.closed:
+                await self._close_stale_session(stale_session, stale_loop)
+
+        return self._session
+
+    async def _close_stale_session(
+        self,
+        session: aiohttp.ClientSession,
+        loop: Optional[asyncio.AbstractEventLoop]
+    ):
+        """
+        Close a session left behind by a previous event loop.
+
+        Args:
+            session: Session created on the previous loop
+            loop: Loop the session was created on
+        """
+        if loop is not None and loop.is_running():
+            # The loop still runs in another thread; close the session there
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+            return
+
+        try:
+            # Connections of a closed loop are dropped without touching it
+            await session.close()
+        except Exception as e:
+            logger.warning(f"Error closing the session of a previous event loop: {str(e)}")
+            session.detach()
+
+    async def complete(
+        self,
+        payload: Dict[str, Any],
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Send a completion request and return the decoded JSON response.
+
+        Identical payloads issued while a matching request is still in
+        flight wait for that request instead of calling the server again.
+        Each caller waits for at most its own timeout; the shared call is
+        cancelled once no caller is waiting for it.
+
+        Args:
+            payload: Request body for ``/v1/completions``
+            timeout: Per-call timeout in seconds, defaults to the client timeout
+
+        Returns:
+            Decoded response body
+
+        Raises:
+            LLMClientError: If the server fails or the call times out
+        """
+        await self._ensure_session()
+        self.stats["requests"] += 1
+
+        if not self.coalesce:
+            return await self._with_timeout(self._post(payload), timeout)
+
+        key = json.dumps(payload, sort_keys=True)
+        shared = self._pending.get(key)
+
+        if shared is not None:
+            self.stats["coalesced"] += 1
+        else:
+            shared = _SharedRequest(asyncio.ensure_future(self._post(payload)))
+            self._pending[key] = shared
+            shared.task.add_done_callback(lambda _: self._forget_shared(key, shared))
+
+        shared.waiters += 1
+        try:
+            # Shield so one waiter's timeout or cancellation does not cancel the shared call
+            return await self._with_timeout(asyncio.shield(shared.task), timeout)
+        finally:
+            shared.waiters -= 1
+            if shared.waiters == 0 and not shared.task.done():
+                self._forget_shared(key, shared)
+                shared.task.cancel()
+
+    def _forget_shared(self, key: str, shared: _SharedRequest):
+        """Stop offering a shared call to new identical requests."""
+        if self._pending.get(key) is shared:
+            del self._pending[key]
+
+    async def stream(
+        self,
+        payload: Dict[str, Any],
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """
+        Send a streaming completion request and yield text deltas.
+
+        Streams are never coalesced, but they count against the in-flight
+        limit for as long as they are open.
+
+        Args:
+            payload: Request body for ``/v1/completions``
+            timeout: Per-call timeout in seconds, defaults to the client timeout
+
+        Yields:
+            Chunks of generated text
+        """
+        session = await self._ensure_session()
+        self.stats["requests"] += 1
+        payload = dict(payload, stream=True)
+        timeout = self.timeout if timeout is None else timeout
+        if timeout <= 0:
+            # aiohttp reads a zero total timeout as no timeout at all
+            raise self._timed_out(timeout)
+
+        async with self._semaphore:
+            self.stats["upstream_calls"] += 1
+            try:
+                async with session.post(
+                    f"{self.api_url}/v1/completions",
+                    json=payload,
+                    headers={"Accept": "text/event-stream"},
+                    timeout=aiohttp.ClientTimeout(total=timeout)
+                ) as response:
+                    if response.status != 200:
+                        body = await response.text()
+                        self.stats["errors"] += 1
+                        logger.error(f"Error streaming response: HTTP {response.status}")
+                        logger.error(body)
+                        raise LLMClientError(f"Server returned status code {response.status}")
+
+                    async for chunk in iter_sse_text(response.content):
+                        yield chunk
+            except asyncio.TimeoutError as e:
+                raise self._timed_out(timeout) from e
+            except aiohttp.ClientError as e:
+                self.stats["errors"] += 1
+                raise LLMClientError(str(e)) from e
+
+    async def _with_timeout(
+        self,
+        request: Awaitable[Dict[str, Any]],
+        timeout: Optional[float]
+    ) -> Dict[str, Any]:
+        """Wait for a request, bounding queueing and transfer by one deadline."""
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(request, timeout=timeout)
+        except asyncio.TimeoutError:
+            raise self._timed_out(timeout)
+
+    def _timed_out(self, timeout: float) -> LLMClientError:
+        """Count a timed out request and build the error to raise for it."""
+        self.stats["timeouts"] += 1
+        return LLMClientError(f"LLM request timed out after {timeout}s")
+
+    async def _post(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Post a request once a slot in the in-flight limit is free."""
+        session = await self._ensure_session()
+
+        async with self._semaphore:
+            self.stats["upstream_calls"] += 1
+            try:
+                async with session.post(
+                    f"{self.api_url}/v1/completions",
+                    json=payload
+                ) as response:
+                    if response.status != 200:
+                        body = await response.text()
+                        logger.error(f"Error generating response: HTTP {response.status}")
+                        logger.error(body)
+                        raise LLMClientError(f"Server returned status code {response.status}")
+                    return await response.json()
+            except aiohttp.ClientError as e:
+                self.stats["errors"] += 1
+                raise LLMClientError(str(e)) from e
+            except LLMClientError:
+                self.stats["errors"] += 1
+                raise
+
+    async def close(self):
+        """Close the pooled session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+async def iter_sse_text(lines: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Extract completion text from an OpenAI-compatible server-sent event stream.
+
+    Args:
+        lines: Raw lines of the event stream
+
+    Yields:
+        Non-empty text deltas from ``choices[0]``
+    """
+    async for raw_line in lines:
+        line = raw_line.decode("utf-8").strip()
+        if not line.startswith("data:"):
+            continue
+
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            break
+
+        try:
+            event = json.loads(data)
+        except json.JSONDecodeError:
+            logger.warning(f"Skipping malformed stream event: {data[:100]}")
+            continue
+
+        choices = event.get("choices") or []
+        if not choices:
+            continue
+
+        # Completions stream "text"; chat completions stream "delta.content"
+        text = choices[0].get("text")
+        if text is None:
+            text = (choices[0].get("delta") or {}).get("content")
+        if text:
+            yield text
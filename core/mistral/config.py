@@ -16,6 +16,21 @@ DEFAULT_TOP_P = 0.95
 DEFAULT_TOP_K = 50
 DEFAULT_REPETITION_PENALTY = 1.1
 
+# HTTP client settings
+DEFAULT_MAX_CONNECTIONS = 16
+DEFAULT_MAX_IN_FLIGHT = 8
+DEFAULT_REQUEST_TIMEOUT = 120.0
+
+# Micro-batching settings (a batch size of 1 disables batching)
+DEFAULT_BATCH_WINDOW = 0.005
+DEFAULT_MAX_BATCH_SIZE = 8
+
+# Response cache settings
+DEFAULT_CACHE_MAX_ENTRIES = 1024
+DEFAULT_CACHE_TTL = 3600.0
+DEFAULT_CACHE_MAX_TEMPERATURE = 0.1
+DEFAULT_CACHE_PURGE_INTERVAL = 600.0
+
 # System prompt template for mathematical reasoning
 MATH_SYSTEM_PROMPT = """
 You are a mathematical reasoning assistant with expertise in algebra, calculus, 
@@ -45,6 +60,16 @@ def get_model_config() -> Dict[str, Any]:
         "top_k": int(os.environ.get("TOP_K", DEFAULT_TOP_K)),
         "repetition_penalty": float(os.environ.get("REPETITION_PENALTY", DEFAULT_REPETITION_PENALTY)),
         "system_prompt": os.environ.get("MATH_SYSTEM_PROMPT", MATH_SYSTEM_PROMPT),
+        "max_connections": int(os.environ.get("LLM_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)),
+        "max_in_flight": int(os.environ.get("LLM_MAX_IN_FLIGHT", DEFAULT_MAX_IN_FLIGHT)),
+        "request_timeout": float(os.environ.get("LLM_REQUEST_TIMEOUT", DEFAULT_REQUEST_TIMEOUT)),
+        "batch_window": float(os.environ.get("LLM_BATCH_WINDOW", DEFAULT_BATCH_WINDOW)),
+        "max_batch_size": int(os.environ.get("LLM_MAX_BATCH_SIZE", DEFAULT_MAX_BATCH_SIZE)),
+        "cache_enabled": os.environ.get("LLM_CACHE_ENABLED", "true").lower() == "true",
+        "cache_max_entries": int(os.environ.get("LLM_CACHE_MAX_ENTRIES", DEFAULT_CACHE_MAX_ENTRIES)),
+        "cache_ttl": float(os.environ.get("LLM_CACHE_TTL", DEFAULT_CACHE_TTL)),
+        "cache_max_temperature": float(os.environ.get("LLM_CACHE_MAX_TEMPERATURE", DEFAULT_CACHE_MAX_TEMPERATURE)),
+        "cache_path": os.environ.get("LLM_CACHE_PATH"),
     }
 
 def update_lmstudio_url(url: str) -> None:
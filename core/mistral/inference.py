@@ -7,7 +7,18 @@ import os
 import logging
 import requests
 import json
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
+
+from .batch_dispatcher import BatchDispatcher
+from .client import AsyncLLMClient, LLMClientError, iter_sse_text
+from .config import (
+    DEFAULT_BATCH_WINDOW,
+    DEFAULT_MAX_BATCH_SIZE,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_REQUEST_TIMEOUT,
+    MODEL_NAME,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +31,12 @@ class MistralInference:
         n_ctx: int = 2048,
         n_threads: Optional[int] = None,
         n_gpu_layers: int = 0,
-        api_url: str = "http://127.0.0.1:1234"
+        api_url: str = "http://127.0.0.1:1234",
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+        batch_window: float = DEFAULT_BATCH_WINDOW,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE
     ):
         """
         Initialize the inference engine.
@@ -31,13 +47,36 @@ class MistralInference:
             n_threads: Number of threads to use (not used with external server)
             n_gpu_layers: Number of layers to offload to GPU (not used with external server)
             api_url: URL of the LMStudio API server
+            max_connections: Size of the keep-alive connection pool
+            max_in_flight: Maximum number of concurrent requests to the server
+            request_timeout: Default per-call timeout in seconds
+            batch_window: Time to collect concurrent requests into one batch (seconds)
+            max_batch_size: Maximum prompts per batched call, 1 disables batching
         """
         self.api_url = api_url
+        self.model_name = MODEL_NAME
+        self.request_timeout = request_timeout
         logger.info(f"Using external LLM server at {api_url}")
         
+        # Reuse connections for synchronous callers as well
+        self.session = requests.Session()
+        self.client = AsyncLLMClient(
+            api_url=api_url,
+            max_connections=max_connections,
+            max_in_flight=max_in_flight,
+            timeout=request_timeout
+        )
+        self.dispatcher = None
+        if max_batch_size > 1:
+            self.dispatcher = BatchDispatcher(
+                self.client,
+                batch_window=batch_window,
+                max_batch_size=max_batch_size
+            )
+        
         # Check if the server is available
         try:
-            response = requests.get(f"{api_url}/v1/models")
+            response = self.session.get(f"{api_url}/v1/models")
             if response.status_code == 200:
                 logger.info("Connected to LMStudio server successfully")
                 models = response.json()
@@ -47,6 +86,26 @@ class MistralInference:
         except Exception as e:
             logger.error(f"Failed to connect to LMStudio server: {str(e)}")
     
+    def _build_payload(
+        self,
+        prompt: str,
+        max_tokens: Optional[int],
+        temperature: float,
+        stop_sequences: Optional[List[str]],
+        stream: bool = False
+    ) -> dict:
+        """Build the request body for the completions endpoint."""
+        payload = {
+            "model": self.model_name,
+            "prompt": prompt,
+            "max_tokens": max_tokens if max_tokens is not None else 2048,
+            "temperature": temperature,
+            "stop": stop_sequences if stop_sequences else None
+        }
+        if stream:
+            payload["stream"] = True
+        return payload
+    
     def generate(
         self,
         prompt: str,
@@ -66,20 +125,14 @@ class MistralInference:
         Returns:
             Generated text
         """
-        # Set up generation parameters
-        payload = {
-            "model": "mistral-7b-instruct-v0.3",
-            "prompt": prompt,
-            "max_tokens": max_tokens if max_tokens is not None else 2048,
-            "temperature": temperature,
-            "stop": stop_sequences if stop_sequences else None
-        }
+        payload = self._build_payload(prompt, max_tokens, temperature, stop_sequences)
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.api_url}/v1/completions",
                 headers={"Content-Type": "application/json"},
-                data=json.dumps(payload)
+                data=json.dumps(payload),
+                timeout=self.request_timeout
             )
             
             if response.status_code == 200:
@@ -93,3 +146,81 @@ class MistralInference:
         except Exception as e:
             logger.error(f"Error generating response: {str(e)}")
             return f"Error: {str(e)}"
+    
+    async def agenerate(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.1,
+        stop_sequences: Optional[List[str]] = None,
+        timeout: Optional[float] = None
+    ) -> str:
+        """
+        Generate text from a prompt without blocking the event loop.
+        
+        Requests go through the pooled async client, so they share keep-alive
+        connections, respect the in-flight limit and are coalesced with
+        identical requests already in progress. When batching is enabled,
+        concurrent requests are first grouped into multi-prompt calls.
+        
+        Args:
+            prompt: The prompt to generate from
+            max_tokens: Maximum number of tokens to generate
+            temperature: Sampling temperature
+            stop_sequences: Sequences to stop generation at
+            timeout: Optional per-call timeout in seconds
+            
+        Returns:
+            Generated text
+            
+        Raises:
+            LLMClientError: If the server fails or the call times out
+        """
+        payload = self._build_payload(prompt, max_tokens, temperature, stop_sequences)
+        
+        if self.dispatcher is not None:
+            return await self.dispatcher.submit(payload, timeout=timeout)
+        
+        output = await self.client.complete(payload, timeout=timeout)
+        
+        try:
+            return output["choices"][0]["text"].strip()
+        except (KeyError, IndexError, TypeError) as e:
+            raise LLMClientError(f"Unexpected response format: {str(e)}") from e
+    
+    async def generate_stream(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.1,
+        stop_sequences: Optional[List[str]] = None,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream generated text from a prompt using the LMStudio API.
+        
+        The server is asked for a server-sent event stream and each text
+        delta is yielded as soon as it arrives, so callers can forward the
+        first tokens long before the full completion is available.
+        
+        Args:
+            prompt: The prompt to generate from
+            max_tokens: Maximum number of tokens to generate
+            temperature: Sampling temperature
+            stop_sequences: Sequences to stop generation at
+            timeout: Optional timeout in seconds for the whole stream
+            
+        Yields:
+            Chunks of generated text in the order they were produced
+        """
+        payload = self._build_payload(
+            prompt, max_tokens, temperature, stop_sequences, stream=True
+        )
+        
+        async for chunk in self.client.stream(payload, timeout=timeout):
+            yield chunk
+    
+    async def aclose(self):
+        """Release pooled HTTP connections."""
+        await self.client.close()
+        self.session.close()
@@ -0,0 +1,287 @@
+"""
+Response cache for deterministic LLM generations.
+
+This module caches completions for low-temperature requests, keyed on the
+normalized prompt and the sampling parameters that affect the output. Entries
+live in an in-process LRU tier and, optionally, in an on-disk SQLite tier that
+survives restarts and can be shared between server processes. Async callers
+use ``aget``/``aset``, which keep disk I/O off the event loop.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from orchestration.monitoring.metrics import record_cache_access, record_cache_eviction
+
+from .config import (
+    DEFAULT_CACHE_MAX_ENTRIES,
+    DEFAULT_CACHE_MAX_TEMPERATURE,
+    DEFAULT_CACHE_PURGE_INTERVAL,
+    DEFAULT_CACHE_TTL,
+)
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Normalize a prompt for cache lookups.
+
+    Only whitespace is collapsed; case and punctuation are significant in
+    mathematical text and are left untouched.
+
+    Args:
+        prompt: Prompt text
+
+    Returns:
+        Normalized prompt
+    """
+    return _WHITESPACE.sub(" ", prompt).strip()
+
+
+class ResponseCache:
+    """Two-tier LRU/SQLite cache for deterministic LLM responses."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        ttl: float = DEFAULT_CACHE_TTL,
+        max_temperature: float = DEFAULT_CACHE_MAX_TEMPERATURE,
+        disk_path: Optional[str] = None,
+        name: str = "llm_response",
+        purge_interval: float = DEFAULT_CACHE_PURGE_INTERVAL
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries kept in memory
+            ttl: Default time-to-live in seconds
+            max_temperature: Highest temperature considered deterministic
+            disk_path: Optional SQLite file for the persistent tier
+            name: Cache name used in metrics
+            purge_interval: Seconds between removals of expired disk rows,
+                done as part of a write
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_temperature = max_temperature
+        self.name = name
+        self.purge_interval = purge_interval
+
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # The disk tier has its own lock so that loop-side memory lookups
+        # never wait for disk I/O running on a worker thread
+        self._disk: Optional[sqlite3.Connection] = None
+        self._disk_lock = threading.Lock()
+        self._next_purge = time.time() + purge_interval
+        if disk_path:
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._disk.commit()
+
+    def is_cacheable(self, temperature: float) -> bool:
+        """Check whether a request at this temperature is deterministic enough."""
+        return temperature <= self.max_temperature
+
+    def make_key(
+        self,
+        prompt: str,
+        model: str,
+        max_tokens: Optional[int],
+        stop_sequences: Optional[List[str]] = None,
+        temperature: float = 0.0
+    ) -> str:
+        """
+        Derive a cache key from a request.
+
+        Args:
+            prompt: Full prompt sent to the model
+            model: Model name
+            max_tokens: Maximum tokens to generate
+            stop_sequences: Stop sequences
+            temperature: Sampling temperature
+
+        Returns:
+            Hex digest identifying the request
+        """
+        material = json.dumps(
+            [normalize_prompt(prompt), model, max_tokens, list(stop_sequences or []), temperature],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        One outcome is recorded per lookup, labelled with the tier that
+        answered it, or the last tier checked on a miss.
+
+        Args:
+            key: Cache key from ``make_key``
+
+        Returns:
+            Cached response, or None on a miss
+        """
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is not None or self._disk is None:
+            return value
+        return self._get_disk(key, now)
+
+    async def aget(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response without blocking the event loop.
+
+        The memory tier is checked on the loop; the disk tier is read on a
+        worker thread.
+
+        Args:
+            key: Cache key from ``make_key``
+
+        Returns:
+            Cached response, or None on a miss
+        """
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is not None or self._disk is None:
+            return value
+        return await asyncio.to_thread(self._get_disk, key, now)
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        """
+        Store a response.
+
+        Args:
+            key: Cache key from ``make_key``
+            value: Response text
+            ttl: Optional time-to-live overriding the default
+        """
+        expires_at = time.time() + (ttl if ttl is not None else self.ttl)
+        with self._lock:
+            self._store_memory(key, value, expires_at)
+        if self._disk is not None:
+            self._set_disk(key, value, expires_at)
+
+    async def aset(self, key: str, value: str, ttl: Optional[float] = None):
+        """
+        Store a response without blocking the event loop.
+
+        The memory tier is updated on the loop; the disk tier is written on
+        a worker thread.
+
+        Args:
+            key: Cache key from ``make_key``
+            value: Response text
+            ttl: Optional time-to-live overriding the default
+        """
+        expires_at = time.time() + (ttl if ttl is not None else self.ttl)
+        with self._lock:
+            self._store_memory(key, value, expires_at)
+        if self._disk is not None:
+            await asyncio.to_thread(self._set_disk, key, value, expires_at)
+
+    def clear(self):
+        """Remove every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+        if self._disk is not None:
+            with self._disk_lock:
+                self._disk.execute("DELETE FROM responses")
+                self._disk.commit()
+
+    def purge_expired(self) -> int:
+        """
+        Drop expired entries from both tiers.
+
+        Returns:
+            Number of entries removed
+        """
+        now = time.time()
+        removed = 0
+
+        with self._lock:
+            for key in [k for k, (_, expires_at) in self._memory.items() if expires_at <= now]:
+                del self._memory[key]
+                removed += 1
+        if self._disk is not None:
+            with self._disk_lock:
+                removed += self._purge_disk(now)
+                self._disk.commit()
+
+        return removed
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def _get_memory(self, key: str, now: float) -> Optional[str]:
+        """Look up the memory tier, recording a miss only if there is no disk tier."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    record_cache_access(self.name, True, "memory")
+                    return value
+                del self._memory[key]
+                record_cache_eviction(self.name, "expired")
+
+        if self._disk is None:
+            record_cache_access(self.name, False, "memory")
+        return None
+
+    def _get_disk(self, key: str, now: float) -> Optional[str]:
+        """Look up the disk tier and promote a hit to the memory tier."""
+        with self._disk_lock:
+            row = self._disk.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] <= now:
+            record_cache_access(self.name, False, "disk")
+            return None
+
+        record_cache_access(self.name, True, "disk")
+        with self._lock:
+            self._store_memory(key, row[0], row[1])
+        return row[0]
+
+    def _set_disk(self, key: str, value: str, expires_at: float):
+        """Write an entry to the disk tier, dropping expired rows every purge interval."""
+        with self._disk_lock:
+            self._disk.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at)
+            )
+            now = time.time()
+            if now >= self._next_purge:
+                self._purge_disk(now)
+            self._disk.commit()
+
+    def _purge_disk(self, now: float) -> int:
+        """Delete expired disk rows. Caller holds the disk lock and commits."""
+        self._next_purge = now + self.purge_interval
+        return self._disk.execute("DELETE FROM responses WHERE expires_at <= ?", (now,)).rowcount
+
+    def _store_memory(self, key: str, value: str, expires_at: float):
+        """Insert into the LRU tier, evicting the least recently used entry. Caller holds the lock."""
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            record_cache_eviction(self.name, "capacity")
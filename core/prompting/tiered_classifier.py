@@ -0,0 +1,414 @@
+"""
+Tiered mathematical domain classification.
+
+This module classifies queries into the same labels the Core LLM Agent uses,
+without an LLM call whenever possible:
+
+1. A keyword trie compiled from the rule-based classifiers' keyword tables
+   scores every domain in one pass over the query and answers directly when
+   the keyword evidence is unambiguous.
+2. A small multinomial logistic regression over hashed word and character
+   n-grams, trained with NumPy on the few-shot examples and a seed corpus,
+   handles the rest.
+
+Callers escalate to the LLM only when the resulting confidence is below a
+threshold.
+"""
+import logging
+import re
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from math_processing.classification.domain_classifier import (
+    DOMAIN_KEYWORDS as MATH_DOMAIN_KEYWORDS,
+    KeywordTrie,
+    normalize_text,
+)
+
+from .domain_classifier import DOMAIN_KEYWORDS as PROMPT_DOMAIN_KEYWORDS
+from .few_shot_examples import DOMAIN_EXAMPLES
+
+logger = logging.getLogger(__name__)
+
+# Labels produced by CoreLLMAgent.classify_mathematical_domain
+DOMAIN_LABELS = [
+    "algebra",
+    "calculus",
+    "geometry",
+    "statistics",
+    "probability",
+    "linear_algebra",
+    "number_theory",
+    "discrete_mathematics",
+    "other",
+]
+
+# Domains of the rule-based classifiers' keyword tables that have a
+# different name, or no label of their own, among DOMAIN_LABELS
+KEYWORD_DOMAIN_LABELS = {
+    "trigonometry": "geometry",
+    "discrete_math": "discrete_mathematics",
+}
+
+# Keywords of the statistics tables that the labels file under "probability"
+PROBABILITY_KEYWORDS = {
+    "probability", "random", "random variable", "expected value", "bayes",
+    "conditional probability", "joint probability", "independent events",
+    "poisson", "dice", "die", "coin", "cards", "odds", "chance",
+}
+
+
+def build_label_keywords() -> Dict[str, List[str]]:
+    """
+    Merge the rule-based classifiers' keyword tables under DOMAIN_LABELS.
+
+    The tables of MathDomainClassifier and of the prompting domain
+    classifier are the single source of keywords. Their statistics domains
+    also cover probability, so PROBABILITY_KEYWORDS are moved to that label;
+    "other" has no keywords and is left to the n-gram model.
+
+    Returns:
+        Mapping of every label to its keywords
+    """
+    label_keywords: Dict[str, List[str]] = {label: [] for label in DOMAIN_LABELS}
+    for table in (MATH_DOMAIN_KEYWORDS, PROMPT_DOMAIN_KEYWORDS):
+        for domain, keywords in table.items():
+            for keyword in keywords:
+                label = KEYWORD_DOMAIN_LABELS.get(domain, domain)
+                if label == "statistics" and keyword in PROBABILITY_KEYWORDS:
+                    label = "probability"
+                if keyword not in label_keywords[label]:
+                    label_keywords[label].append(keyword)
+    return label_keywords
+
+
+# Seed queries for labels that have no few-shot examples, plus non-math text
+SEED_QUERIES = {
+    "algebra": [
+        "Solve for x: 3x + 7 = 22",
+        "Factor x^2 - 9",
+        "Expand (x + 2)^3",
+        "Simplify (x^2 - 4)/(x - 2)",
+        "Find the roots of x^2 + 5x + 6 = 0",
+        "Solve the inequality 2x - 3 > 5",
+    ],
+    "calculus": [
+        "Find the derivative of x^3 sin(x)",
+        "Evaluate the integral of x^2 from 0 to 3",
+        "Compute the limit of sin(x)/x as x approaches 0",
+        "Differentiate e^(2x) cos(x)",
+        "Find the Taylor series of e^x around 0",
+        "Where is f(x) = x^3 - 3x increasing?",
+    ],
+    "geometry": [
+        "Find the area of a circle with radius 4",
+        "What is the hypotenuse of a right triangle with legs 3 and 4?",
+        "Compute the volume of a sphere of radius 2",
+        "Find the perimeter of a rectangle 5 by 8",
+        "What is sin(30 degrees)?",
+        "Find the angle between the two sides of the triangle",
+    ],
+    "statistics": [
+        "Find the mean and median of 3, 7, 8, 12, 15",
+        "Compute the standard deviation of the data 2, 4, 4, 4, 5, 5, 7, 9",
+        "Perform a t-test on these two samples",
+        "Construct a 95% confidence interval for the population mean",
+        "Fit a linear regression to the points",
+        "What is the correlation between height and weight?",
+    ],
+    "probability": [
+        "What is the probability of rolling a 6 on a fair die?",
+        "A coin is flipped 3 times, what is the chance of two heads?",
+        "Find the expected value of a random variable uniform on 1 to 6",
+        "Use Bayes theorem to find P(A|B)",
+        "Two cards are drawn from a deck, what is the probability both are aces?",
+        "X follows a Poisson distribution with rate 3, find P(X = 2)",
+    ],
+    "linear_algebra": [
+        "Find the determinant of [[1, 2], [3, 4]]",
+        "Compute the eigenvalues of [[2, 0], [0, 3]]",
+        "Find the inverse of the matrix [[2, 1], [1, 1]]",
+        "Are the vectors (1, 0, 1) and (0, 1, 0) orthogonal?",
+        "Find a basis for the null space of A",
+        "Multiply the matrices A and B",
+    ],
+    "number_theory": [
+        "Is 97 prime?",
+        "Find the gcd of 84 and 36",
+        "What is 17^43 mod 7?",
+        "Find the prime factorization of 360",
+        "Find the least common multiple of 12 and 18",
+        "Solve 3x ≡ 4 (mod 7)",
+    ],
+    "discrete_mathematics": [
+        "How many ways can 5 books be arranged on a shelf?",
+        "How many subsets does a set with 6 elements have?",
+        "Prove by induction that 1 + 2 + ... + n = n(n+1)/2",
+        "Solve the recurrence a_n = 2a_{n-1} + 1 with a_0 = 0",
+        "Is this graph with 4 vertices and 4 edges connected?",
+        "Build the truth table for p and not q",
+    ],
+    "other": [
+        "Write a poem about the ocean",
+        "What is the capital of France?",
+        "Tell me a joke",
+        "Who won the world cup in 2018?",
+        "Translate hello into Spanish",
+        "What's the weather like today?",
+        "Summarize the history of the Roman empire",
+        "Recommend a good book to read",
+    ],
+}
+
+_TOKEN_PATTERN = re.compile(r"[a-z]+|\d+|[^\sa-z\d]")
+
+
+class HashedNgramVectorizer:
+    """Maps text to L2-normalized hashed word and character n-gram counts."""
+
+    def __init__(self, n_features: int = 2 ** 12, char_ngrams: Tuple[int, ...] = (3, 4)):
+        """
+        Initialize the vectorizer.
+
+        Args:
+            n_features: Number of hash buckets (a power of two)
+            char_ngrams: Character n-gram sizes taken inside each word
+        """
+        self.n_features = n_features
+        self.char_ngrams = char_ngrams
+
+    def _features(self, text: str) -> Iterable[str]:
+        """Yield string features for a text."""
+        tokens = _TOKEN_PATTERN.findall(re.sub(r"\d", "0", text.lower()))
+        for i, token in enumerate(tokens):
+            yield f"w:{token}"
+            if i + 1 < len(tokens):
+                yield f"b:{token} {tokens[i + 1]}"
+            padded = f"<{token}>"
+            for n in self.char_ngrams:
+                for j in range(len(padded) - n + 1):
+                    yield f"c:{padded[j:j + n]}"
+
+    def transform(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Vectorize a batch of texts.
+
+        Args:
+            texts: Texts to vectorize
+
+        Returns:
+            Array of shape (len(texts), n_features)
+        """
+        matrix = np.zeros((len(texts), self.n_features), dtype=np.float32)
+        mask = self.n_features - 1
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                # crc32 is stable across processes, unlike hash()
+                matrix[row, zlib.crc32(feature.encode("utf-8")) & mask] += 1.0
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+
+class SoftmaxRegression:
+    """Multinomial logistic regression trained with full-batch gradient descent."""
+
+    def __init__(self, learning_rate: float = 2.0, epochs: int = 300, l2: float = 1e-4):
+        """
+        Initialize the model.
+
+        Args:
+            learning_rate: Gradient descent step size
+            epochs: Number of full passes over the training data
+            l2: L2 regularization strength
+        """
+        self.learning_rate = learning_rate
+        self.epochs = epochs
+        self.l2 = l2
+        self.weights: Optional[np.ndarray] = None
+        self.bias: Optional[np.ndarray] = None
+
+    def fit(self, X: np.ndarray, y: np.ndarray, n_classes: int) -> "SoftmaxRegression":
+        """
+        Fit the model.
+
+        Args:
+            X: Feature matrix of shape (n_samples, n_features)
+            y: Integer labels of shape (n_samples,)
+            n_classes: Number of classes
+
+        Returns:
+            The fitted model
+        """
+        n_samples, n_features = X.shape
+        self.weights = np.zeros((n_features, n_classes), dtype=np.float32)
+        self.bias = np.zeros(n_classes, dtype=np.float32)
+        targets = np.eye(n_classes, dtype=np.float32)[y]
+
+        for _ in range(self.epochs):
+            error = (self.predict_proba(X) - targets) / n_samples
+            self.weights -= self.learning_rate * (X.T @ error + self.l2 * self.weights)
+            self.bias -= self.learning_rate * error.sum(axis=0)
+
+        return self
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """
+        Predict class probabilities.
+
+        Args:
+            X: Feature matrix of shape (n_samples, n_features)
+
+        Returns:
+            Probabilities of shape (n_samples, n_classes)
+        """
+        logits = X @ self.weights + self.bias
+        logits -= logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+
+def build_training_corpus() -> Tuple[List[str], List[str]]:
+    """
+    Assemble labeled training texts.
+
+    Combines the few-shot example questions, the seed queries and the
+    keyword tables (each keyword as a short document).
+
+    Returns:
+        Tuple of (texts, labels)
+    """
+    texts: List[str] = []
+    labels: List[str] = []
+
+    for domain, examples in DOMAIN_EXAMPLES.items():
+        for example in examples:
+            texts.append(example["question"])
+            labels.append(domain)
+
+    for domain, queries in SEED_QUERIES.items():
+        texts.extend(queries)
+        labels.extend([domain] * len(queries))
+
+    for domain, keywords in build_label_keywords().items():
+        texts.extend(keywords)
+        labels.extend([domain] * len(keywords))
+
+    return texts, labels
+
+
+class TieredDomainClassifier:
+    """Keyword trie and n-gram model with an LLM escalation signal."""
+
+    def __init__(
+        self,
+        confidence_threshold: float = 0.5,
+        keyword_min_hits: int = 2,
+        keyword_min_share: float = 0.75
+    ):
+        """
+        Initialize and train the classifier.
+
+        Args:
+            confidence_threshold: Minimum confidence to answer without the LLM
+            keyword_min_hits: Keyword matches needed to answer from keywords alone
+            keyword_min_share: Share of all keyword matches the top domain must hold
+        """
+        self.confidence_threshold = confidence_threshold
+        self.keyword_min_hits = keyword_min_hits
+        self.keyword_min_share = keyword_min_share
+
+        self.labels = list(DOMAIN_LABELS)
+        self.matcher = KeywordTrie(build_label_keywords())
+        self.vectorizer = HashedNgramVectorizer()
+
+        texts, labels = build_training_corpus()
+        label_index = {label: i for i, label in enumerate(self.labels)}
+        self.model = SoftmaxRegression().fit(
+            self.vectorizer.transform(texts),
+            np.array([label_index[label] for label in labels]),
+            len(self.labels)
+        )
+        logger.info(f"Trained local domain classifier on {len(texts)} examples")
+
+    def classify(self, text: str) -> Dict[str, Any]:
+        """
+        Classify a single query.
+
+        Args:
+            text: Query text
+
+        Returns:
+            Dictionary with ``domain``, ``confidence``, ``tier`` ("keyword" or
+            "model") and ``needs_llm``
+        """
+        return self.classify_many([text])[0]
+
+    def classify_many(self, texts: Sequence[str]) -> List[Dict[str, Any]]:
+        """
+        Classify a batch of queries with one vectorized model evaluation.
+
+        Args:
+            texts: Query texts
+
+        Returns:
+            One result dictionary per text, as returned by ``classify``
+        """
+        if not texts:
+            return []
+
+        probabilities = self.model.predict_proba(self.vectorizer.transform(texts))
+        return [
+            self._decide(text, probabilities[i]) for i, text in enumerate(texts)
+        ]
+
+    def _decide(self, text: str, probabilities: np.ndarray) -> Dict[str, Any]:
+        """Combine keyword evidence and model probabilities for one text."""
+        keyword_scores = self.matcher.score(normalize_text(text))
+        total_hits = sum(keyword_scores.values())
+
+        if total_hits:
+            top_domain = max(keyword_scores, key=keyword_scores.get)
+            top_hits = keyword_scores[top_domain]
+            share = top_hits / total_hits
+            if top_hits >= self.keyword_min_hits and share >= self.keyword_min_share:
+                return {
+                    "domain": top_domain,
+                    "confidence": round(min(0.99, 0.5 + share / 2), 4),
+                    "tier": "keyword",
+                    "needs_llm": False
+                }
+
+            # Weak keyword evidence still sharpens the model's distribution
+            keyword_distribution = np.array(
+                [keyword_scores.get(label, 0) for label in self.labels], dtype=np.float64
+            ) / total_hits
+            probabilities = (probabilities + keyword_distribution) / 2
+
+        best = int(np.argmax(probabilities))
+        confidence = float(probabilities[best])
+        return {
+            "domain": self.labels[best],
+            "confidence": round(confidence, 4),
+            "tier": "model",
+            "needs_llm": confidence < self.confidence_threshold
+        }
+
+
+_default_classifier: Optional[TieredDomainClassifier] = None
+
+
+def get_tiered_classifier() -> TieredDomainClassifier:
+    """
+    Get the shared classifier, training it on first use.
+
+    Returns:
+        TieredDomainClassifier instance
+    """
+    global _default_classifier
+    if _default_classifier is None:
+        _default_classifier = TieredDomainClassifier()
+    return _default_classifier
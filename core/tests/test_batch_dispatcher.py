@@ -0,0 +1,158 @@
+"""
+Tests for the micro-batching LLM dispatcher.
+"""
+
+import asyncio
+import unittest
+
+from core.mistral.batch_dispatcher import BatchDispatcher
+from core.mistral.client import LLMClientError
+
+
+class FakeClient:
+    """Stand-in for AsyncLLMClient that records upstream payloads."""
+
+    def __init__(self, accepts_lists: bool = True, list_indices=None):
+        self.accepts_lists = accepts_lists
+        self.list_indices = list_indices
+        self.timeout = 5.0
+        self.payloads = []
+
+    async def complete(self, payload, timeout=None):
+        self.payloads.append(payload)
+        await asyncio.sleep(0)
+        prompt = payload["prompt"]
+        if isinstance(prompt, list):
+            if not self.accepts_lists:
+                raise LLMClientError("Server returned status code 400")
+            # Return choices out of order to exercise index mapping
+            indices = self.list_indices or range(len(prompt))
+            choices = [{"index": i, "text": f" out:{p} "} for i, p in zip(indices, prompt)]
+            return {"choices": list(reversed(choices))}
+        return {"choices": [{"text": f"out:{prompt}"}]}
+
+
+class TestBatchDispatcher(unittest.IsolatedAsyncioTestCase):
+    """Test cases for BatchDispatcher."""
+
+    async def test_concurrent_prompts_share_one_call(self):
+        """Prompts submitted within the window go out as one prompt list."""
+        client = FakeClient()
+        dispatcher = BatchDispatcher(client, batch_window=0.01, max_batch_size=16)
+        base = {"model": "m", "temperature": 0}
+
+        results = await asyncio.gather(
+            *[dispatcher.submit(dict(base, prompt=f"q{i}")) for i in range(5)]
+        )
+
+        self.assertEqual(results, [f"out:q{i}" for i in range(5)])
+        self.assertEqual(len(client.payloads), 1)
+        self.assertEqual(client.payloads[0]["prompt"], [f"q{i}" for i in range(5)])
+        self.assertTrue(dispatcher.supports_prompt_list)
+        self.assertEqual(dispatcher.stats["max_batch_size_seen"], 5)
+
+    async def test_full_batch_dispatches_without_waiting(self):
+        """Reaching max_batch_size flushes before the window elapses."""
+        client = FakeClient()
+        dispatcher = BatchDispatcher(client, batch_window=10.0, max_batch_size=4)
+
+        results = await asyncio.wait_for(
+            asyncio.gather(*[dispatcher.submit({"prompt": f"q{i}"}) for i in range(4)]),
+            timeout=1.0
+        )
+
+        self.assertEqual(len(results), 4)
+        self.assertEqual(len(client.payloads), 1)
+
+    async def test_different_parameters_are_not_mixed(self):
+        """Requests with different sampling parameters go in separate batches."""
+        client = FakeClient()
+        dispatcher = BatchDispatcher(client, batch_window=0.01)
+
+        await asyncio.gather(
+            dispatcher.submit({"prompt": "a", "max_tokens": 10}),
+            dispatcher.submit({"prompt": "b", "max_tokens": 20}),
+        )
+
+        self.assertEqual(len(client.payloads), 2)
+        self.assertTrue(all(isinstance(p["prompt"], str) for p in client.payloads))
+
+    async def test_falls_back_to_parallel_calls(self):
+        """Backends repeatedly rejecting prompt lists get one call per prompt thereafter."""
+        client = FakeClient(accepts_lists=False)
+        dispatcher = BatchDispatcher(client, batch_window=0.01, prompt_list_failure_limit=2)
+
+        results = await asyncio.gather(*[dispatcher.submit({"prompt": f"q{i}"}) for i in range(3)])
+
+        self.assertEqual(results, ["out:q0", "out:q1", "out:q2"])
+        self.assertIsNone(dispatcher.supports_prompt_list)
+
+        await asyncio.gather(*[dispatcher.submit({"prompt": f"p{i}"}) for i in range(3)])
+        self.assertFalse(dispatcher.supports_prompt_list)
+        self.assertEqual(dispatcher.stats["fallback_batches"], 2)
+
+        client.payloads.clear()
+        await asyncio.gather(*[dispatcher.submit({"prompt": f"r{i}"}) for i in range(3)])
+        self.assertEqual(len(client.payloads), 3)
+
+    async def test_duplicate_prompts_are_sent_once(self):
+        """Identical prompts in one batch share a slot in the upstream call."""
+        client = FakeClient()
+        dispatcher = BatchDispatcher(client, batch_window=0.01)
+
+        results = await asyncio.gather(
+            dispatcher.submit({"prompt": "same"}),
+            dispatcher.submit({"prompt": "same"}),
+            dispatcher.submit({"prompt": "other"}),
+        )
+
+        self.assertEqual(results, ["out:same", "out:same", "out:other"])
+        self.assertEqual(client.payloads[0]["prompt"], ["same", "other"])
+
+
+    async def test_one_failed_batch_keeps_batching(self):
+        """A transient batched failure does not disable batching."""
+        client = FakeClient(accepts_lists=False)
+        dispatcher = BatchDispatcher(client, batch_window=0.01)
+
+        await asyncio.gather(*[dispatcher.submit({"prompt": f"q{i}"}) for i in range(3)])
+        client.accepts_lists = True
+        client.payloads.clear()
+        await asyncio.gather(*[dispatcher.submit({"prompt": f"r{i}"}) for i in range(3)])
+
+        self.assertEqual(len(client.payloads), 1)
+        self.assertTrue(dispatcher.supports_prompt_list)
+
+    async def test_invalid_choice_indices_resolve_every_caller(self):
+        """Out-of-range or repeated indices fall back instead of leaving callers waiting."""
+        for indices in ([0, 5], [1, 1]):
+            client = FakeClient(list_indices=indices)
+            dispatcher = BatchDispatcher(client, batch_window=0.01)
+
+            results = await asyncio.wait_for(
+                asyncio.gather(dispatcher.submit({"prompt": "a"}), dispatcher.submit({"prompt": "b"})),
+                timeout=1.0
+            )
+
+            self.assertEqual(results, ["out:a", "out:b"])
+
+    async def test_unexpected_errors_resolve_every_caller(self):
+        """Callers get an error if dispatching a batch breaks."""
+        client = FakeClient()
+        dispatcher = BatchDispatcher(client, batch_window=0.01)
+
+        async def broken(base, prompts):
+            raise RuntimeError("bad response")
+        dispatcher._complete_batch = broken
+
+        results = await asyncio.wait_for(
+            asyncio.gather(dispatcher.submit({"prompt": "a"}), dispatcher.submit({"prompt": "b"}),
+                           return_exceptions=True),
+            timeout=1.0
+        )
+
+        self.assertTrue(all(isinstance(result, LLMClientError) for result in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Tests for streaming generation in the Mistral inference engine.
+"""
+
+import asyncio
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+
+from core.mistral.inference import MistralInference, iter_sse_text
+from core.agent.llm_agent import CoreLLMAgent
+
+
+async def _lines(events):
+    """Yield raw SSE lines the way aiohttp's StreamReader does."""
+    for event in events:
+        yield event.encode("utf-8")
+
+
+async def _collect(iterator):
+    """Collect every item of an async iterator into a list."""
+    return [item async for item in iterator]
+
+
+def _event(payload):
+    """Format a payload as an SSE data line."""
+    return f"data: {json.dumps(payload)}\n"
+
+
+class TestSSEParsing(unittest.TestCase):
+    """Test cases for server-sent event parsing."""
+
+    def test_yields_completion_text_until_done(self):
+        """Text deltas are yielded in order and [DONE] ends the stream."""
+        events = [
+            _event({"choices": [{"text": "The "}]}),
+            "\n",
+            _event({"choices": [{"text": "derivative"}]}),
+            ": keep-alive comment\n",
+            _event({"choices": [{"text": ""}]}),
+            "data: [DONE]\n",
+            _event({"choices": [{"text": "ignored"}]}),
+        ]
+
+        chunks = asyncio.run(_collect(iter_sse_text(_lines(events))))
+
+        self.assertEqual(chunks, ["The ", "derivative"])
+
+    def test_supports_chat_deltas_and_skips_malformed_events(self):
+        """Chat-style deltas are understood and malformed JSON is skipped."""
+        events = [
+            "data: {not json\n",
+            _event({"choices": [{"delta": {"content": "2x"}}]}),
+            _event({"choices": []}),
+        ]
+
+        chunks = asyncio.run(_collect(iter_sse_text(_lines(events))))
+
+        self.assertEqual(chunks, ["2x"])
+
+
+class TestAgentStreaming(unittest.TestCase):
+    """Test cases for CoreLLMAgent.generate_response_stream."""
+
+    @patch("core.agent.llm_agent.MistralInference")
+    def test_forwards_chunks_with_formatted_prompt(self, mock_inference_cls):
+        """The agent wraps the prompt and forwards inference chunks as-is."""
+        async def fake_stream(**kwargs):
+            for chunk in ["a", "b", "c"]:
+                yield chunk
+
+        inference = MagicMock(spec=MistralInference)
+        inference.generate_stream.side_effect = fake_stream
+        mock_inference_cls.return_value = inference
+
+        agent = CoreLLMAgent()
+        chunks = asyncio.run(_collect(
+            agent.generate_response_stream("What is 2+2?", system_prompt="SYS")
+        ))
+
+        self.assertEqual(chunks, ["a", "b", "c"])
+        prompt = inference.generate_stream.call_args.kwargs["prompt"]
+        self.assertEqual(prompt, "<s>[INST] SYS\n\nQuestion: What is 2+2? [/INST]")
+
+
+if __name__ == "__main__":
+    unittest.main()
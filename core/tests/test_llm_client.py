@@ -0,0 +1,199 @@
+"""
+Tests for the pooled asynchronous LLM client.
+
+The client is exercised against a local stub of the completions endpoint.
+"""
+
+import asyncio
+import json
+import unittest
+
+from aiohttp import web
+
+from core.mistral.client import AsyncLLMClient, LLMClientError
+
+
+class StubCompletionServer:
+    """Minimal OpenAI-compatible completions server for tests."""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.runner = None
+        self.url = None
+
+    async def handle_completion(self, request):
+        payload = await request.json()
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+
+        if payload.get("stream"):
+            response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+            await response.prepare(request)
+            for token in ["x", "^", "2"]:
+                event = {"choices": [{"text": token}]}
+                await response.write(f"data: {json.dumps(event)}\n\n".encode())
+            await response.write(b"data: [DONE]\n\n")
+            return response
+
+        return web.json_response({"choices": [{"text": f"echo {payload['prompt']}"}]})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/v1/completions", self.handle_completion)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+class TestAsyncLLMClient(unittest.IsolatedAsyncioTestCase):
+    """Test cases for AsyncLLMClient."""
+
+    async def asyncSetUp(self):
+        self.server = StubCompletionServer()
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.stop()
+
+    async def test_identical_concurrent_requests_are_coalesced(self):
+        """Identical in-flight prompts trigger a single upstream call."""
+        client = AsyncLLMClient(api_url=self.server.url)
+        payload = {"prompt": "classify x^2", "temperature": 0}
+
+        results = await asyncio.gather(*[client.complete(dict(payload)) for _ in range(10)])
+        await client.close()
+
+        self.assertEqual(self.server.calls, 1)
+        self.assertEqual(client.stats["coalesced"], 9)
+        self.assertTrue(all(r["choices"][0]["text"] == "echo classify x^2" for r in results))
+
+    async def test_in_flight_limit_is_respected(self):
+        """Distinct prompts never exceed the configured in-flight limit."""
+        client = AsyncLLMClient(api_url=self.server.url, max_in_flight=3)
+
+        await asyncio.gather(*[client.complete({"prompt": f"p{i}"}) for i in range(12)])
+        await client.close()
+
+        self.assertEqual(self.server.calls, 12)
+        self.assertLessEqual(self.server.max_in_flight, 3)
+
+    async def test_per_call_timeout(self):
+        """A call slower than its timeout raises LLMClientError."""
+        self.server.delay = 0.5
+        client = AsyncLLMClient(api_url=self.server.url)
+
+        with self.assertRaises(LLMClientError):
+            await client.complete({"prompt": "slow"}, timeout=0.05)
+        await client.close()
+
+        self.assertEqual(client.stats["timeouts"], 1)
+
+    async def test_coalesced_callers_keep_their_own_timeouts(self):
+        """A caller joining a shared call is bounded by its own timeout, not the first caller's."""
+        self.server.delay = 0.2
+        client = AsyncLLMClient(api_url=self.server.url)
+        payload = {"prompt": "shared"}
+
+        patient = asyncio.ensure_future(client.complete(dict(payload), timeout=2))
+        await asyncio.sleep(0.01)
+        with self.assertRaises(LLMClientError):
+            await client.complete(dict(payload), timeout=0.05)
+        result = await patient
+        await client.close()
+
+        self.assertEqual(result["choices"][0]["text"], "echo shared")
+        self.assertEqual(self.server.calls, 1)
+        self.assertEqual(client.stats["coalesced"], 1)
+
+    async def test_abandoned_shared_call_is_cancelled(self):
+        """Once every caller has timed out the shared call is dropped."""
+        self.server.delay = 0.5
+        client = AsyncLLMClient(api_url=self.server.url)
+
+        with self.assertRaises(LLMClientError):
+            await client.complete({"prompt": "slow"}, timeout=0.05)
+        await asyncio.sleep(0)
+
+        self.assertEqual(client._pending, {})
+        self.assertEqual(client.stats["upstream_calls"], 1)
+        await client.close()
+
+    async def test_stream_yields_chunks(self):
+        """Streaming requests yield each SSE text delta."""
+        client = AsyncLLMClient(api_url=self.server.url)
+
+        chunks = [chunk async for chunk in client.stream({"prompt": "d/dx"})]
+        await client.close()
+
+        self.assertEqual(chunks, ["x", "^", "2"])
+
+    async def test_zero_timeout_is_not_the_default(self):
+        """An explicit timeout of 0 times out instead of falling back to the client timeout."""
+        client = AsyncLLMClient(api_url=self.server.url)
+
+        with self.assertRaises(LLMClientError):
+            await client.complete({"prompt": "now"}, timeout=0)
+        with self.assertRaises(LLMClientError):
+            [chunk async for chunk in client.stream({"prompt": "now"}, timeout=0)]
+        await client.close()
+
+        self.assertEqual(client.stats["timeouts"], 2)
+
+    async def test_stream_timeout_raises_client_error(self):
+        """A stream slower than its timeout raises LLMClientError."""
+        self.server.delay = 0.5
+        client = AsyncLLMClient(api_url=self.server.url)
+
+        with self.assertRaises(LLMClientError):
+            [chunk async for chunk in client.stream({"prompt": "slow"}, timeout=0.05)]
+        await client.close()
+
+        self.assertEqual(client.stats["timeouts"], 1)
+
+    async def test_stream_connection_error_raises_client_error(self):
+        """Connection failures while streaming raise LLMClientError."""
+        url = self.server.url
+        await self.server.stop()
+        self.server = StubCompletionServer()
+        await self.server.start()
+        client = AsyncLLMClient(api_url=url)
+
+        with self.assertRaises(LLMClientError):
+            [chunk async for chunk in client.stream({"prompt": "d/dx"})]
+        await client.close()
+
+        self.assertEqual(client.stats["errors"], 1)
+
+
+class TestSessionLifecycle(unittest.TestCase):
+    """Test cases for sessions across event loops."""
+
+    def test_session_of_previous_loop_is_closed(self):
+        """Moving to a new event loop closes the session of the old one."""
+        client = AsyncLLMClient()
+
+        first = asyncio.run(client._ensure_session())
+        second = asyncio.run(client._ensure_session())
+
+        self.assertIsNot(first, second)
+        self.assertTrue(first.closed)
+        self.assertFalse(second.closed)
+        asyncio.run(client.close())
+
+
+if __name__ == "__main__":
+    unittest.main()
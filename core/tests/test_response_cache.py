@@ -0,0 +1,181 @@
+"""
+Tests for the LLM response cache.
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from core.mistral.inference import MistralInference
+from core.mistral.response_cache import ResponseCache, normalize_prompt
+from core.agent.llm_agent import CoreLLMAgent
+from orchestration.monitoring.metrics import get_cache_stats
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test cases for ResponseCache."""
+
+    def test_key_normalizes_whitespace_but_not_parameters(self):
+        """Whitespace differences collide; sampling parameters do not."""
+        cache = ResponseCache()
+        key = cache.make_key("Solve  x + 1 = 2\n", "m", 64, ["\n"], 0.0)
+
+        self.assertEqual(key, cache.make_key(" Solve x + 1 = 2", "m", 64, ["\n"], 0.0))
+        self.assertNotEqual(key, cache.make_key("Solve x + 1 = 2", "m", 128, ["\n"], 0.0))
+        self.assertNotEqual(key, cache.make_key("Solve x + 1 = 2", "other", 64, ["\n"], 0.0))
+        self.assertNotEqual(key, cache.make_key("Solve x + 1 = 2", "m", 64, None, 0.0))
+        self.assertEqual(normalize_prompt("A\t\tB "), "A B")
+
+    def test_lru_eviction(self):
+        """The least recently used entry is evicted at capacity."""
+        cache = ResponseCache(max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+
+        self.assertEqual(cache.get("a"), "1")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), "3")
+
+    def test_ttl_expiry(self):
+        """Entries are not returned after their TTL."""
+        cache = ResponseCache(ttl=10)
+        with patch("core.mistral.response_cache.time.time", return_value=1000.0):
+            cache.set("k", "v")
+        with patch("core.mistral.response_cache.time.time", return_value=1005.0):
+            self.assertEqual(cache.get("k"), "v")
+        with patch("core.mistral.response_cache.time.time", return_value=1011.0):
+            self.assertIsNone(cache.get("k"))
+
+    def test_disk_tier_survives_new_instance(self):
+        """Entries written to the disk tier are visible to a fresh cache."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "responses.db")
+            ResponseCache(disk_path=path).set("k", "persisted")
+
+            cache = ResponseCache(disk_path=path)
+            self.assertEqual(cache.get("k"), "persisted")
+            self.assertEqual(len(cache), 1)
+
+    def test_one_outcome_per_lookup(self):
+        """A lookup answered by the disk tier counts once, as a disk hit."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "responses.db")
+            ResponseCache(disk_path=path, name="tiered").set("k", "persisted")
+            cache = ResponseCache(disk_path=path, name="tiered")
+
+            cache.get("k")
+            cache.get("k")
+            cache.get("missing")
+            stats = get_cache_stats("tiered")
+
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 1))
+        self.assertEqual(stats["tiers"], {"disk": {"hits": 1, "misses": 1}, "memory": {"hits": 1, "misses": 0}})
+
+    def test_writes_purge_expired_disk_rows(self):
+        """Expired disk rows are dropped by a write once the purge interval has passed."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "responses.db")
+            with patch("core.mistral.response_cache.time.time", return_value=1000.0):
+                cache = ResponseCache(disk_path=path, ttl=10, purge_interval=60)
+                cache.set("old", "1")
+            with patch("core.mistral.response_cache.time.time", return_value=1030.0):
+                cache.set("early", "2")
+                rows = cache._disk.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+                self.assertEqual(rows, 2)
+            with patch("core.mistral.response_cache.time.time", return_value=1065.0):
+                cache.set("late", "3")
+                keys = [row[0] for row in cache._disk.execute("SELECT key FROM responses ORDER BY key")]
+
+        self.assertEqual(keys, ["late"])
+
+
+class TestAsyncResponseCache(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the non-blocking cache methods."""
+
+    async def test_disk_tier_runs_off_the_loop(self):
+        """aget and aset read and write the disk tier on worker threads."""
+        loop_thread = threading.get_ident()
+        disk_threads = []
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "responses.db")
+            writer = ResponseCache(disk_path=path)
+            reader = ResponseCache(disk_path=path)
+            for cache in (writer, reader):
+                for method in ("_get_disk", "_set_disk"):
+                    original = getattr(cache, method)
+
+                    def recorded(*args, original=original):
+                        disk_threads.append(threading.get_ident())
+                        return original(*args)
+
+                    setattr(cache, method, recorded)
+
+            await writer.aset("k", "persisted")
+            self.assertEqual(await reader.aget("k"), "persisted")
+            self.assertEqual(await reader.aget("k"), "persisted")
+            self.assertIsNone(await reader.aget("missing"))
+
+        self.assertEqual(len(disk_threads), 3)
+        self.assertNotIn(loop_thread, disk_threads)
+
+
+class TestAgentResponseCaching(unittest.TestCase):
+    """Test cases for response caching in CoreLLMAgent."""
+
+    @patch("core.agent.llm_agent.MistralInference")
+    def test_deterministic_calls_hit_cache(self, mock_inference_cls):
+        """Repeated low-temperature prompts reach the model only once."""
+        inference = MagicMock(spec=MistralInference)
+        inference.model_name = "test-model"
+        inference.generate.return_value = "Expression 1:\nRaw: x^2\nLaTeX: x^{2}"
+        mock_inference_cls.return_value = inference
+
+        agent = CoreLLMAgent({"cache_path": None})
+        before = get_cache_stats("llm_response")
+
+        first = agent.extract_mathematical_expressions("Find the derivative of x^2")
+        second = agent.extract_mathematical_expressions("Find the derivative of  x^2")
+
+        self.assertEqual(first["expression_count"], 1)
+        self.assertEqual(second["expressions"], first["expressions"])
+        self.assertEqual(inference.generate.call_count, 1)
+        self.assertEqual(get_cache_stats("llm_response")["hits"], before["hits"] + 1)
+
+    @patch("core.agent.llm_agent.MistralInference")
+    def test_sampled_calls_and_errors_are_not_cached(self, mock_inference_cls):
+        """High-temperature requests and in-band errors bypass the cache."""
+        inference = MagicMock(spec=MistralInference)
+        inference.model_name = "test-model"
+        inference.generate.return_value = "Error: Server returned status code 500"
+        mock_inference_cls.return_value = inference
+
+        agent = CoreLLMAgent({"cache_path": None})
+        agent.generate_response("Tell me a story", temperature=0.1)
+        agent.generate_response("Tell me a story", temperature=0.1)
+        agent.generate_response("Tell me a story", temperature=0.9)
+        agent.generate_response("Tell me a story", temperature=0.9)
+
+        self.assertEqual(inference.generate.call_count, 4)
+
+    @patch("core.agent.llm_agent.MistralInference")
+    def test_explanations_follow_temperature_threshold(self, mock_inference_cls):
+        """Explanations are sampled above the cache threshold, so they are not cached."""
+        inference = MagicMock(spec=MistralInference)
+        inference.model_name = "test-model"
+        inference.generate.return_value = "Differentiate term by term."
+        mock_inference_cls.return_value = inference
+
+        agent = CoreLLMAgent({"cache_path": None})
+        agent.generate_math_explanation("Find the derivative of x^2", {"domain": "calculus"})
+        agent.generate_math_explanation("Find the derivative of x^2", {"domain": "calculus"})
+
+        self.assertEqual(inference.generate.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
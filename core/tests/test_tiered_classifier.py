@@ -0,0 +1,113 @@
+"""
+Tests for the tiered domain classifier.
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from core.mistral.inference import MistralInference
+from core.prompting.domain_classifier import DOMAIN_KEYWORDS as PROMPT_DOMAIN_KEYWORDS
+from core.prompting.tiered_classifier import (
+    DOMAIN_LABELS,
+    build_label_keywords,
+    get_tiered_classifier,
+)
+from core.agent.llm_agent import CoreLLMAgent
+from math_processing.classification.domain_classifier import (
+    DOMAIN_KEYWORDS as MATH_DOMAIN_KEYWORDS,
+    MathDomainClassifier,
+)
+
+
+class TestLabelKeywords(unittest.TestCase):
+    """Test cases for the keywords derived from the rule-based classifiers."""
+
+    def test_keywords_come_from_shared_tables(self):
+        """Every keyword comes from a rule-based table, under a known label."""
+        label_keywords = build_label_keywords()
+        shared = {
+            keyword
+            for table in (MATH_DOMAIN_KEYWORDS, PROMPT_DOMAIN_KEYWORDS)
+            for keywords in table.values()
+            for keyword in keywords
+        }
+
+        self.assertEqual(set(label_keywords), set(DOMAIN_LABELS))
+        self.assertEqual({k for keywords in label_keywords.values() for k in keywords}, shared)
+        self.assertIn("sin", label_keywords["geometry"])
+        self.assertIn("pigeonhole", label_keywords["discrete_mathematics"])
+        self.assertIn("bayes", label_keywords["probability"])
+        self.assertNotIn("bayes", label_keywords["statistics"])
+
+    def test_custom_keywords_do_not_leak(self):
+        """Custom keywords of one MathDomainClassifier stay out of the shared table."""
+        classifier = MathDomainClassifier()
+        classifier.domain_keywords["algebra"].append("zzz custom")
+
+        self.assertNotIn("zzz custom", build_label_keywords()["algebra"])
+
+
+class TestTieredDomainClassifier(unittest.TestCase):
+    """Test cases for TieredDomainClassifier."""
+
+    def setUp(self):
+        self.classifier = get_tiered_classifier()
+
+    def test_clear_keyword_queries_use_keyword_tier(self):
+        """Unambiguous keyword evidence is answered without the model."""
+        result = self.classifier.classify("Find the eigenvalue and eigenvector of the matrix")
+
+        self.assertEqual(result["domain"], "linear_algebra")
+        self.assertEqual(result["tier"], "keyword")
+        self.assertFalse(result["needs_llm"])
+
+    def test_model_tier_handles_queries_without_keywords(self):
+        """The n-gram model classifies queries the keywords miss."""
+        result = self.classifier.classify("Expand (2x - 1)^2")
+
+        self.assertEqual(result["tier"], "model")
+        self.assertIn(result["domain"], DOMAIN_LABELS)
+
+    def test_batch_matches_single(self):
+        """classify_many agrees with classify."""
+        queries = ["Is 91 prime?", "Integrate cos(x)", "Tell me about Paris"]
+
+        batch = self.classifier.classify_many(queries)
+
+        self.assertEqual(batch, [self.classifier.classify(q) for q in queries])
+
+
+class TestAgentDomainClassification(unittest.TestCase):
+    """Test cases for LLM escalation in CoreLLMAgent."""
+
+    @patch("core.agent.llm_agent.MistralInference")
+    def test_confident_local_result_skips_llm(self, mock_inference_cls):
+        """Confident local classifications never reach the LLM."""
+        inference = MagicMock(spec=MistralInference)
+        inference.model_name = "test-model"
+        mock_inference_cls.return_value = inference
+
+        agent = CoreLLMAgent({"cache_enabled": False})
+        result = agent.classify_mathematical_domain("Find the derivative and the limit of x^2")
+
+        self.assertEqual(result["domain"], "calculus")
+        self.assertNotEqual(result["source"], "llm")
+        inference.generate.assert_not_called()
+
+    @patch("core.agent.llm_agent.MistralInference")
+    def test_low_confidence_escalates_to_llm(self, mock_inference_cls):
+        """Queries below the threshold are classified by the LLM."""
+        inference = MagicMock(spec=MistralInference)
+        inference.model_name = "test-model"
+        inference.generate.return_value = "other|0.95"
+        mock_inference_cls.return_value = inference
+
+        agent = CoreLLMAgent({"cache_enabled": False, "classifier_confidence_threshold": 1.0})
+        result = agent.classify_mathematical_domain("Write a poem about autumn")
+
+        self.assertEqual(result, {"success": True, "domain": "other", "confidence": 0.95, "source": "llm"})
+        inference.generate.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Request-path latency benchmark for summary pruning.
+
+Runs long conversations through a ContextManager with a slow summarizer and
+times each message, comparing summarization on the request path with
+summaries produced ahead of the limit by the background summarizer.
+"""
+import argparse
+import json
+import statistics
+import time
+from typing import Any, Dict, List
+
+from orchestration.context.background_summarizer import BackgroundSummarizer
+from orchestration.context.context_manager import ContextManager
+from orchestration.context.conversation_store import InMemoryConversationStore
+from orchestration.context.pruning_strategy import SummaryPruningStrategy
+from orchestration.context.tokenizer import CharHeuristicTokenizer
+
+
+def _slow_summarizer(latency: float):
+    """Create a summarizer that takes as long as an LLM call."""
+    def summarize(text: str) -> str:
+        time.sleep(latency)
+        return f"{len(text)} characters of earlier discussion"
+    return summarize
+
+
+def _run(strategy: SummaryPruningStrategy, conversations: int, turns: int, max_tokens: int) -> List[float]:
+    """Add turns to conversations and return the per-message latencies in milliseconds."""
+    manager = ContextManager(
+        max_context_tokens=max_tokens,
+        entity_tracking_enabled=False,
+        pruning_strategy=strategy,
+        tokenizer=CharHeuristicTokenizer(),
+        conversation_store=InMemoryConversationStore()
+    )
+    conversation_ids = [manager.create_conversation(f"user{i}") for i in range(conversations)]
+
+    latencies = []
+    for turn in range(turns):
+        for conversation_id in conversation_ids:
+            for add in (manager.add_user_message, manager.add_system_message):
+                start = time.perf_counter()
+                add(conversation_id, f"Step {turn}: differentiate x^{turn} sin(x) and simplify " * 4)
+                latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def _summarize_latencies(latencies: List[float]) -> Dict[str, float]:
+    """Summarize per-message latencies."""
+    ordered = sorted(latencies)
+    return {
+        "mean_ms": round(statistics.mean(ordered), 3),
+        "p99_ms": round(ordered[int(len(ordered) * 0.99) - 1], 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def run_benchmark(conversations: int = 20, turns: int = 40, max_tokens: int = 1024,
+                  latency: float = 0.05, queue_size: int = 64) -> Dict[str, Any]:
+    """
+    Run the benchmark.
+
+    Args:
+        conversations: Number of concurrent conversations
+        turns: Turns added to each conversation
+        max_tokens: Context limit of each conversation
+        latency: Seconds each summarization takes
+        queue_size: Maximum number of queued background summaries
+
+    Returns:
+        Benchmark results
+    """
+    inline = SummaryPruningStrategy(max_tokens, llm_summarizer=_slow_summarizer(latency))
+    summarizer = BackgroundSummarizer(_slow_summarizer(latency), max_queue_size=queue_size)
+    background = SummaryPruningStrategy(max_tokens, summarizer=summarizer)
+
+    try:
+        results = {
+            "request_path": _summarize_latencies(_run(inline, conversations, turns, max_tokens)),
+            "background": _summarize_latencies(_run(background, conversations, turns, max_tokens)),
+        }
+    finally:
+        summarizer.close()
+
+    return {
+        "conversations": conversations,
+        "turns": turns,
+        "max_tokens": max_tokens,
+        "summarizer_latency_ms": latency * 1000,
+        "configurations": results,
+        "p99_speedup": round(results["request_path"]["p99_ms"] / max(results["background"]["p99_ms"], 0.001), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark request-path latency of summary pruning")
+    parser.add_argument("--conversations", type=int, default=20,
+                        help="Concurrent conversations")
+    parser.add_argument("--turns", type=int, default=40,
+                        help="Turns per conversation")
+    parser.add_argument("--max-tokens", type=int, default=1024,
+                        help="Context limit per conversation")
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="Seconds per summarization")
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.conversations, args.turns, args.max_tokens, args.latency), indent=2))
+
+
+if __name__ == "__main__":
+    main()
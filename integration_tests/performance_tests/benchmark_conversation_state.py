@@ -0,0 +1,128 @@
+"""
+Long-conversation benchmark for ConversationState.
+
+Builds conversations of many messages and times budgeted context selection
+(a model-sized window and the whole conversation) and bulk removal, comparing the indexed message store with the previous
+list-based implementation (linear removal, head insertion while selecting).
+"""
+import argparse
+import json
+import random
+import time
+from typing import Any, Dict, List
+
+from orchestration.context.conversation_state import ConversationState, Message
+from orchestration.context.tokenizer import CharHeuristicTokenizer
+
+
+class ListConversation:
+    """The previous list-based message handling, kept for comparison."""
+
+    def __init__(self):
+        self.messages: List[Message] = []
+        self.message_map: Dict[str, Message] = {}
+
+    def add(self, message: Message):
+        self.messages.append(message)
+        self.message_map[message.message_id] = message
+
+    def select(self, max_tokens: int) -> List[Message]:
+        selected = []
+        used = 0
+        for message in reversed(self.messages):
+            tokens = message.estimate_token_count()
+            if used + tokens > max_tokens:
+                break
+            selected.insert(0, message)
+            used += tokens
+        return selected
+
+    def remove_messages(self, message_ids: List[str]) -> int:
+        for message_id in message_ids:
+            self.messages.remove(self.message_map.pop(message_id))
+        return len(message_ids)
+
+
+def _timed(function, *args) -> float:
+    """Run a function and return the elapsed milliseconds."""
+    start = time.perf_counter()
+    function(*args)
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+def _contents(messages: int, seed: int) -> List[str]:
+    """Generate tutoring messages of varied length."""
+    rng = random.Random(seed)
+    return [
+        f"Step {i}: differentiate x^{rng.randint(2, 9)} sin(x) " + "and simplify " * rng.randint(1, 40)
+        for i in range(messages)
+    ]
+
+
+def run_benchmark(messages: int = 10000, selections: int = 20, budget: int = 4096,
+                  seed: int = 0) -> Dict[str, Any]:
+    """
+    Run the benchmark.
+
+    Args:
+        messages: Number of messages in the conversation
+        selections: Number of budgeted context selections
+        budget: Token budget for each selection
+        seed: Random seed for message contents and removals
+
+    Returns:
+        Benchmark results
+    """
+    contents = _contents(messages, seed)
+    state = ConversationState("benchmark", "user", tokenizer=CharHeuristicTokenizer())
+    baseline = ListConversation()
+
+    add_ms = _timed(lambda: [state.add_user_message(content) for content in contents])
+    for message in state.messages:
+        baseline.add(message)
+
+    removals = random.Random(seed).sample([message.message_id for message in state.messages], messages // 2)
+    select = lambda conversation_select, tokens: [conversation_select(tokens) for _ in range(selections)]
+    full_budget = state.estimate_token_count()
+
+    results = {
+        "indexed": {
+            "select_ms": _timed(select, state._get_messages_within_token_budget, budget),
+            "select_all_ms": _timed(select, state._get_messages_within_token_budget, full_budget),
+            "remove_half_ms": _timed(state.remove_messages, removals),
+        },
+        "list": {
+            "select_ms": _timed(select, baseline.select, budget),
+            "select_all_ms": _timed(select, baseline.select, full_budget),
+            "remove_half_ms": _timed(baseline.remove_messages, removals),
+        },
+    }
+
+    return {
+        "messages": messages,
+        "selections": selections,
+        "budget_tokens": budget,
+        "add_ms": add_ms,
+        "configurations": results,
+        "speedup": {
+            operation: round(results["list"][operation] / max(results["indexed"][operation], 0.01), 1)
+            for operation in ("select_ms", "select_all_ms", "remove_half_ms")
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark long-conversation context operations")
+    parser.add_argument("--messages", type=int, default=10000,
+                        help="Messages in the conversation")
+    parser.add_argument("--selections", type=int, default=20,
+                        help="Budgeted context selections")
+    parser.add_argument("--budget", type=int, default=4096,
+                        help="Token budget per selection")
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.messages, args.selections, args.budget), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark for the tiered mathematical domain classifier.
+
+Reports accuracy on a held-out labeled query set, the share of
+classifications answered locally (LLM calls avoided) and the per-query cost.
+"""
+import argparse
+import json
+import time
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+from core.prompting.tiered_classifier import TieredDomainClassifier
+
+# Held-out queries; none of these appear in the training corpus
+EVALUATION_QUERIES: List[Tuple[str, str]] = [
+    ("Solve 5x - 2 = 3x + 8", "algebra"),
+    ("Factor the quadratic 2x^2 + 7x + 3", "algebra"),
+    ("Simplify the expression 3(x + 4) - 2(x - 1)", "algebra"),
+    ("Find x if log2(x) = 5", "algebra"),
+    ("Solve the system of equations x + y = 10 and x - y = 2", "algebra"),
+    ("Find the derivative of ln(x^2 + 1)", "calculus"),
+    ("Integrate x e^x dx", "calculus"),
+    ("What is the limit of (1 + 1/n)^n as n goes to infinity?", "calculus"),
+    ("Find the critical points of f(x) = x^4 - 2x^2", "calculus"),
+    ("Use the chain rule to differentiate sin(x^2)", "calculus"),
+    ("Does the series sum 1/n^2 converge?", "calculus"),
+    ("Find the area of a triangle with base 10 and height 6", "geometry"),
+    ("What is the circumference of a circle of diameter 7?", "geometry"),
+    ("Find the volume of a cylinder with radius 3 and height 5", "geometry"),
+    ("Two angles of a triangle are 40 and 75 degrees, find the third angle", "geometry"),
+    ("Find cos(60 degrees)", "geometry"),
+    ("Compute the median of 4, 9, 1, 7, 3", "statistics"),
+    ("Find the variance of the sample 2, 5, 7, 10", "statistics"),
+    ("Test the hypothesis that the mean is 50 with p-value 0.05", "statistics"),
+    ("Calculate the correlation coefficient of the data set", "statistics"),
+    ("Find the interquartile range of the data", "statistics"),
+    ("What is the probability of drawing a red card from a deck?", "probability"),
+    ("Two dice are rolled, find the probability the sum is 8", "probability"),
+    ("Find the expected value of the number of heads in 10 coin flips", "probability"),
+    ("A test is 99% accurate, use Bayes rule to find the chance of disease", "probability"),
+    ("What are the odds of winning if there is a 1 in 5 chance?", "probability"),
+    ("Find the determinant of the 3x3 matrix [[1,0,2],[0,1,0],[2,0,1]]", "linear_algebra"),
+    ("Find the eigenvectors of [[3, 1], [0, 2]]", "linear_algebra"),
+    ("Compute the dot product of (1, 2, 3) and (4, 5, 6)", "linear_algebra"),
+    ("What is the rank of the matrix A?", "linear_algebra"),
+    ("Transpose the matrix [[1, 2, 3], [4, 5, 6]]", "linear_algebra"),
+    ("Is 221 a prime number?", "number_theory"),
+    ("Find the greatest common divisor of 270 and 192", "number_theory"),
+    ("What is the remainder when 2^100 is divided by 3?", "number_theory"),
+    ("Find all integers x with x ≡ 2 mod 5", "number_theory"),
+    ("Which numbers below 30 are coprime to 30?", "number_theory"),
+    ("How many ways can a committee of 3 be chosen from 10 people?", "discrete_mathematics"),
+    ("How many permutations of the letters ABCDE are there?", "discrete_mathematics"),
+    ("Prove by induction that 2^n > n for all n", "discrete_mathematics"),
+    ("Find a spanning tree of the graph", "discrete_mathematics"),
+    ("Use the pigeonhole principle to show two people share a birthday month", "discrete_mathematics"),
+    ("What time is it in Tokyo?", "other"),
+    ("Write a short story about a dragon", "other"),
+    ("Who painted the Mona Lisa?", "other"),
+    ("Give me a recipe for pancakes", "other"),
+]
+
+
+def run_benchmark(confidence_threshold: float = 0.5, repeats: int = 20) -> Dict[str, Any]:
+    """
+    Run the classifier benchmark.
+
+    Args:
+        confidence_threshold: Confidence below which the LLM would be called
+        repeats: Number of timing passes over the evaluation set
+
+    Returns:
+        Benchmark results
+    """
+    start = time.perf_counter()
+    classifier = TieredDomainClassifier(confidence_threshold=confidence_threshold)
+    training_seconds = time.perf_counter() - start
+
+    queries = [query for query, _ in EVALUATION_QUERIES]
+    expected = [label for _, label in EVALUATION_QUERIES]
+    results = [classifier.classify(query) for query in queries]
+
+    correct = [r["domain"] == label for r, label in zip(results, expected)]
+    local = [not r["needs_llm"] for r in results]
+    local_correct = [c for c, is_local in zip(correct, local) if is_local]
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for query in queries:
+            classifier.classify(query)
+    single_us = (time.perf_counter() - start) / (repeats * len(queries)) * 1e6
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        classifier.classify_many(queries)
+    batch_us = (time.perf_counter() - start) / (repeats * len(queries)) * 1e6
+
+    return {
+        "queries": len(queries),
+        "confidence_threshold": confidence_threshold,
+        "accuracy_all": sum(correct) / len(correct),
+        "accuracy_answered_locally": (
+            sum(local_correct) / len(local_correct) if local_correct else 0.0
+        ),
+        "llm_calls_avoided": sum(local) / len(local),
+        "tiers": dict(Counter(r["tier"] for r in results)),
+        "training_seconds": round(training_seconds, 3),
+        "per_query_us": round(single_us, 1),
+        "per_query_us_batched": round(batch_us, 1),
+        "misclassified": [
+            {"query": q, "expected": label, "predicted": r["domain"], "confidence": r["confidence"]}
+            for q, label, r, ok in zip(queries, expected, results, correct) if not ok
+        ]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the tiered domain classifier")
+    parser.add_argument("--threshold", type=float, default=0.5,
+                        help="Confidence threshold for LLM escalation")
+    parser.add_argument("--repeats", type=int, default=20,
+                        help="Timing passes over the evaluation set")
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.threshold, args.repeats), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
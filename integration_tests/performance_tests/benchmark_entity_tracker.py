@@ -0,0 +1,144 @@
+"""
+Large-conversation benchmark for EntityTracker relevance lookups.
+
+Builds a tracker holding thousands of entities and times relevance queries
+and reference resolution, comparing the indexed lookups with the previous
+full scans (scoring every entity, checking every name against the query).
+"""
+import argparse
+import json
+import random
+import time
+from typing import Any, Dict, List
+
+from orchestration.context.entity_tracker import EntityTracker
+
+TYPES = ["expression", "variable", "function", "equation", "theorem"]
+WORDS = ["derivative", "integral", "limit", "sin", "cos", "log", "sum", "product",
+         "matrix", "vector", "series", "root", "x", "y", "z", "+", "-", "^2", "dx", "n"]
+
+
+def _timed(function, *args) -> float:
+    """Run a function and return the elapsed milliseconds."""
+    start = time.perf_counter()
+    function(*args)
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+def _build_tracker(entities: int, seed: int) -> EntityTracker:
+    """Build a tracker of entities spread over a day of references."""
+    rng = random.Random(seed)
+    now = time.time()
+    records = []
+    named = {}
+    for i in range(entities):
+        value = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 8)))
+        records.append({
+            "entity_id": f"e{i}",
+            "entity_type": rng.choice(TYPES),
+            "value": value,
+            "display_form": f"{rng.choice('fghpq')}{i}" if i % 3 == 0 else value,
+            "created_at": now - 86400 + i,
+            "last_referenced_at": now - rng.uniform(0, 86400),
+            "reference_count": rng.randint(0, 10),
+        })
+        if i % 4 == 0:
+            named[f"v{i}"] = f"e{i}"
+    return EntityTracker.from_dict({"entities": records, "named_entities": named})
+
+
+def _queries(count: int, seed: int) -> List[str]:
+    """Generate follow-up questions mentioning types, words and names."""
+    rng = random.Random(seed + 1)
+    return [
+        f"what is the {rng.choice(TYPES)} of {rng.choice(WORDS)} {rng.choice(WORDS)} with v{rng.randrange(0, 4000, 4)}"
+        for _ in range(count)
+    ]
+
+
+def _scan_relevant(tracker: EntityTracker, query: str, max_entities: int) -> List[Dict[str, Any]]:
+    """Score every entity and sort, as relevance lookups did before indexing."""
+    scored = [(entity, tracker._calculate_relevance_score(entity, query)) for entity in tracker.entities.values()]
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return [entity.to_dict() for entity, _ in scored[:max_entities]]
+
+
+def _scan_names(tracker: EntityTracker, query: str) -> List[str]:
+    """Check every named entity against the query, as reference resolution did before indexing."""
+    return [entity_id for name, entity_id in tracker.named_entities.items() if name in query]
+
+
+def run_benchmark(entities: int = 5000, queries: int = 200, max_entities: int = 5,
+                  seed: int = 0) -> Dict[str, Any]:
+    """
+    Run the benchmark.
+
+    Args:
+        entities: Number of tracked entities
+        queries: Number of queries
+        max_entities: Entities returned per relevance query
+        seed: Random seed for entities and queries
+
+    Returns:
+        Benchmark results
+    """
+    build_start = time.perf_counter()
+    tracker = _build_tracker(entities, seed)
+    build_ms = round((time.perf_counter() - build_start) * 1000, 2)
+    query_texts = _queries(queries, seed)
+
+    def indexed_relevant():
+        for query in query_texts:
+            tracker.get_relevant_entities(query, max_entities)
+
+    def scan_relevant():
+        for query in query_texts:
+            _scan_relevant(tracker, query, max_entities)
+
+    def indexed_names():
+        for query in query_texts:
+            tracker.name_index.find_in(query)
+
+    def scan_names():
+        for query in query_texts:
+            _scan_names(tracker, query)
+
+    results = {
+        "indexed": {
+            "relevant_ms": _timed(indexed_relevant),
+            "named_references_ms": _timed(indexed_names),
+        },
+        "full_scan": {
+            "relevant_ms": _timed(scan_relevant),
+            "named_references_ms": _timed(scan_names),
+        },
+    }
+
+    return {
+        "entities": entities,
+        "queries": queries,
+        "max_entities": max_entities,
+        "build_ms": build_ms,
+        "configurations": results,
+        "speedup": {
+            operation: round(results["full_scan"][operation] / max(results["indexed"][operation], 0.01), 1)
+            for operation in ("relevant_ms", "named_references_ms")
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark entity tracker relevance lookups")
+    parser.add_argument("--entities", type=int, default=5000,
+                        help="Tracked entities")
+    parser.add_argument("--queries", type=int, default=200,
+                        help="Relevance queries")
+    parser.add_argument("--max-entities", type=int, default=5,
+                        help="Entities returned per query")
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.entities, args.queries, args.max_entities), indent=2))
+
+
+if __name__ == "__main__":
+    main()
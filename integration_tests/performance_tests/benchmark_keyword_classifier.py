@@ -0,0 +1,105 @@
+"""
+Microbenchmark for MathDomainClassifier keyword matching.
+
+Compares the compiled single-pass matcher with the previous approach of
+compiling and scanning one regex per keyword, checks that both produce the
+same domain scores, and reports per-query cost.
+"""
+import argparse
+import json
+import re
+import time
+from typing import Any, Dict, List
+
+from math_processing.classification.domain_classifier import MathDomainClassifier
+
+QUERIES: List[str] = [
+    "Find the derivative of f(x) = x^3 sin(x)",
+    "Solve the quadratic equation 3x^2 - 6x + 2 = 0 by completing the square",
+    "Calculate the eigenvalues of the matrix [[4, 2], [1, 3]]",
+    "Find the probability of rolling a sum of 7 with two dice",
+    "Find the area of a triangle with sides 3, 4, and 5",
+    "Calculate the greatest common divisor of 48 and 36",
+    "Verify the identity sin^2(x) + cos^2(x) = 1",
+    "How many subsets does a set with 6 elements have? Use induction",
+    "Solve the system of linear equations 2x + 3y = 7, 4x - y = 5 using Gaussian elimination",
+    "∫ x^2 dx from 0 to 3, then find the limit as x → ∞",
+    "Compute the standard deviation and the confidence interval of the sample mean",
+    "What is the remainder when 17^43 is divided by 7 modulo arithmetic",
+]
+
+
+def legacy_domain_matches(classifier: MathDomainClassifier, query: str) -> Dict[str, int]:
+    """Score domains the way classify_query did before keyword compilation."""
+    normalized_query = classifier._preprocess_query(query)
+    matches = {}
+    for domain, keywords in classifier.domain_keywords.items():
+        domain_matches = []
+        for keyword in keywords:
+            pattern = r'\b' + re.escape(keyword) + r'\b'
+            matches_found = re.findall(pattern, normalized_query, re.IGNORECASE)
+            if matches_found:
+                domain_matches.extend(matches_found)
+        matches[domain] = len(set(domain_matches))
+    return matches
+
+
+def _per_query_us(func, queries: List[str], repeats: int) -> float:
+    """Average wall time per query in microseconds."""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func(queries)
+    return (time.perf_counter() - start) / (repeats * len(queries)) * 1e6
+
+
+def run_benchmark(repeats: int = 200) -> Dict[str, Any]:
+    """
+    Run the microbenchmark.
+
+    Args:
+        repeats: Number of passes over the query set
+
+    Returns:
+        Benchmark results
+    """
+    classifier = MathDomainClassifier()
+
+    # Scores must agree wherever the old per-keyword scan could match at all
+    disagreements = []
+    for query in QUERIES:
+        legacy = legacy_domain_matches(classifier, query)
+        compiled = classifier._match_keywords(classifier._preprocess_query(query))
+        if legacy != compiled:
+            disagreements.append({"query": query, "legacy": legacy, "compiled": compiled})
+
+    re.purge()
+    legacy_us = _per_query_us(
+        lambda qs: [legacy_domain_matches(classifier, q) for q in qs], QUERIES, repeats
+    )
+    single_us = _per_query_us(
+        lambda qs: [classifier.classify_query(q) for q in qs], QUERIES, repeats
+    )
+    batch_us = _per_query_us(classifier.classify_queries, QUERIES, repeats)
+
+    return {
+        "queries": len(QUERIES),
+        "repeats": repeats,
+        "legacy_scoring_us_per_query": round(legacy_us, 1),
+        "classify_query_us_per_query": round(single_us, 1),
+        "classify_queries_us_per_query": round(batch_us, 1),
+        "speedup": round(legacy_us / single_us, 1),
+        "disagreements": disagreements,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MathDomainClassifier keyword matching")
+    parser.add_argument("--repeats", type=int, default=200,
+                        help="Passes over the query set")
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.repeats), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
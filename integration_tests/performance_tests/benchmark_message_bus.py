@@ -0,0 +1,110 @@
+"""
+Publishing throughput benchmark for RabbitMQBus.
+
+Publishes a burst of messages through an in-process fake broker that confirms
+each message after a fixed latency, and compares the old serial sender
+configuration (one sender, one message at a time) with the pipelined one.
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict, List
+
+from orchestration.message_bus.message_formats import MessageType, create_message
+from orchestration.message_bus.rabbitmq_wrapper import RabbitMQBus
+
+
+class FakeExchange:
+    """Exchange whose publish returns after a simulated broker confirmation."""
+
+    def __init__(self, confirm_latency: float):
+        self.confirm_latency = confirm_latency
+        self.published = 0
+
+    async def publish(self, message, routing_key):
+        await asyncio.sleep(self.confirm_latency)
+        self.published += 1
+
+
+CONFIGURATIONS: Dict[str, Dict[str, int]] = {
+    "serial": {"sender_count": 1, "publish_batch_size": 1, "max_in_flight": 1},
+    "pipelined_1_sender": {"sender_count": 1, "publish_batch_size": 100, "max_in_flight": 1000},
+    "pipelined_4_senders": {"sender_count": 4, "publish_batch_size": 100, "max_in_flight": 1000},
+}
+
+
+async def _run_configuration(config: Dict[str, int], messages: int, confirm_latency: float) -> Dict[str, Any]:
+    """Publish a burst of messages with one bus configuration."""
+    bus = RabbitMQBus(**config)
+    transport = bus.transport
+    transport._connection = object()
+    transport.publish_exchanges = [FakeExchange(confirm_latency) for _ in range(transport.sender_count)]
+    transport._start_senders()
+
+    payloads = [
+        create_message(
+            message_type=MessageType.COMPUTATION_REQUEST,
+            sender="benchmark",
+            recipient="math_computation_agent",
+            body={"operation": "integrate", "expression": f"x**{i} * sin(x)"}
+        )
+        for i in range(messages)
+    ]
+
+    start = time.perf_counter()
+    results: List[bool] = await asyncio.gather(*[bus.send_message(m) for m in payloads])
+    elapsed = time.perf_counter() - start
+
+    await transport._stop_senders()
+
+    return {
+        "seconds": round(elapsed, 3),
+        "messages_per_second": round(messages / elapsed, 1),
+        "confirmed": sum(results),
+        "max_batch_size": transport.publish_stats["max_batch_size"],
+        "max_in_flight": transport.publish_stats["max_in_flight"],
+    }
+
+
+async def run_benchmark(messages: int = 2000, confirm_latency: float = 0.002) -> Dict[str, Any]:
+    """
+    Run the benchmark.
+
+    Args:
+        messages: Number of messages per configuration
+        confirm_latency: Simulated broker confirmation latency in seconds
+
+    Returns:
+        Benchmark results
+    """
+    results = {
+        name: await _run_configuration(config, messages, confirm_latency)
+        for name, config in CONFIGURATIONS.items()
+    }
+    serial = results["serial"]["messages_per_second"]
+
+    return {
+        "messages": messages,
+        "confirm_latency_ms": confirm_latency * 1000,
+        "configurations": results,
+        "speedup": {
+            name: round(result["messages_per_second"] / serial, 1)
+            for name, result in results.items()
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark RabbitMQBus publishing throughput")
+    parser.add_argument("--messages", type=int, default=2000,
+                        help="Messages per configuration")
+    parser.add_argument("--latency-ms", type=float, default=2.0,
+                        help="Simulated broker confirmation latency")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run_benchmark(args.messages, args.latency_ms / 1000)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Encoding benchmark for message bus wire formats.
+
+Encodes and decodes realistic computation and visualization messages with
+each wire format and reports the time per message and the encoded size.
+"""
+import argparse
+import json
+import math
+import time
+from typing import Any, Callable, Dict
+
+from orchestration.message_bus.codecs import CONTENT_TYPE_JSON, CONTENT_TYPE_MSGPACK, MessageCodec
+from orchestration.message_bus.message_formats import (
+    Message, MessageType, create_computation_request, create_message, create_visualization_request
+)
+
+FORMATS: Dict[str, Dict[str, Any]] = {
+    "json": {"content_type": CONTENT_TYPE_JSON, "compression": None},
+    "json_zlib": {"content_type": CONTENT_TYPE_JSON, "compression": "zlib"},
+    "msgpack": {"content_type": CONTENT_TYPE_MSGPACK, "compression": None},
+    "msgpack_zlib": {"content_type": CONTENT_TYPE_MSGPACK, "compression": "zlib"},
+}
+
+
+def _add_hops(message: Message, hops: int) -> Message:
+    """Record agent hops the way a multi-agent workflow accumulates them."""
+    message.header.trace.agent_hops = [
+        {"agent": f"agent_{i}", "timestamp": "2025-05-12T21:25:02.580981", "action": "forwarded"}
+        for i in range(hops)
+    ]
+    return message
+
+
+def build_payloads(hops: int = 6) -> Dict[str, Message]:
+    """Build the benchmark messages."""
+    xs = [i * 0.02 - 10 for i in range(1000)]
+    computation_request = create_computation_request(
+        sender="core_llm_agent",
+        expression="\\int x^2 \\sin(x) \\, dx",
+        operation="integrate",
+        variables=["x"],
+        domain="calculus",
+        step_by_step=True
+    )
+    computation_result = create_message(
+        message_type=MessageType.COMPUTATION_RESULT,
+        sender="math_computation_agent",
+        recipient="core_llm_agent",
+        body={
+            "success": True,
+            "result": "-x**2*cos(x) + 2*x*sin(x) + 2*cos(x)",
+            "latex": "- x^{2} \\cos{\\left(x \\right)} + 2 x \\sin{\\left(x \\right)} + 2 \\cos{\\left(x \\right)}",
+            "steps": [
+                {"description": f"Step {i}: integrate by parts", "expression": f"u = x**{2 - i % 3}"}
+                for i in range(8)
+            ],
+            "verification": {"is_correct": True, "confidence": 0.98, "total_points": 200},
+        }
+    )
+    visualization_request = create_visualization_request(
+        sender="core_llm_agent",
+        visualization_type="function_plot_2d",
+        data={"expression": "sin(x)", "x": xs, "y": [math.sin(x) for x in xs]},
+        parameters={"x_range": [-10, 10], "title": "sin(x)", "grid": True, "color": "blue"}
+    )
+    visualization_result = create_message(
+        message_type=MessageType.VISUALIZATION_RESULT,
+        sender="visualization_agent",
+        recipient="core_llm_agent",
+        body={
+            "success": True,
+            "file_path": "visualizations/function_2d_20250512_212502_58098d0f.png",
+            "base64_image": "iVBORw0KGgoAAAANSUhEUgAA" * 400,
+            "plot_type": "function_plot_2d",
+        }
+    )
+
+    return {
+        name: _add_hops(message, hops)
+        for name, message in {
+            "computation_request": computation_request,
+            "computation_result": computation_result,
+            "visualization_request": visualization_request,
+            "visualization_result": visualization_result,
+        }.items()
+    }
+
+
+def _time_per_call(func: Callable[[], Any], iterations: int) -> float:
+    """Microseconds per call."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def run_benchmark(iterations: int = 2000, hops: int = 6) -> Dict[str, Any]:
+    """
+    Run the benchmark.
+
+    Args:
+        iterations: Encode/decode calls per payload and format
+        hops: Agent hops recorded in each message's trace
+
+    Returns:
+        Benchmark results
+    """
+    results: Dict[str, Any] = {}
+    for payload_name, message in build_payloads(hops).items():
+        results[payload_name] = {}
+        for format_name, options in FORMATS.items():
+            codec = MessageCodec(**options)
+            encoded = codec.encode(message)
+            assert codec.decode(*encoded) == message
+
+            results[payload_name][format_name] = {
+                "bytes": len(encoded.body),
+                "encode_us": round(_time_per_call(lambda: codec.encode(message), iterations), 1),
+                "decode_us": round(_time_per_call(lambda: codec.decode(*encoded), iterations), 1),
+            }
+
+    return {"iterations": iterations, "agent_hops": hops, "payloads": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark message bus wire formats")
+    parser.add_argument("--iterations", type=int, default=2000,
+                        help="Encode/decode calls per payload and format")
+    parser.add_argument("--hops", type=int, default=6,
+                        help="Agent hops in each message trace")
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.iterations, args.hops), indent=2))
+
+
+if __name__ == "__main__":
+    main()
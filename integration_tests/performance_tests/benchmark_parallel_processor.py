@@ -0,0 +1,118 @@
+"""
+Throughput benchmark for ParallelMathProcessor execution modes.
+
+Integrates a corpus of expressions with the thread-based executor and with
+the SymPy process pool, checks that both modes agree, and reports integrals
+per second for each.
+"""
+import argparse
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import sympy as sp
+
+from math_processing.computation.parallel_processor import ParallelMathProcessor
+
+x = sp.Symbol("x")
+
+INTEGRALS: List[sp.Expr] = [
+    x ** 2 * sp.exp(x),
+    x * sp.sin(x),
+    sp.exp(x) * sp.cos(x),
+    sp.log(x) ** 2,
+    x ** 3 * sp.log(x),
+    1 / (x ** 2 + 4),
+    1 / (x ** 2 - 1),
+    (x + 1) / (x ** 2 + 2 * x + 5),
+    sp.sin(x) ** 3,
+    sp.cos(x) ** 4,
+    sp.tan(x) ** 2,
+    sp.sec(x) ** 3,
+    sp.sqrt(1 - x ** 2),
+    x / sp.sqrt(x ** 2 + 1),
+    sp.atan(x),
+    x * sp.asin(x),
+    sp.exp(-x) * x ** 4,
+    sp.sinh(x) * sp.cosh(x),
+    (x ** 3 + 2 * x) / (x ** 4 + 4 * x ** 2 + 3),
+    sp.sin(2 * x) * sp.cos(3 * x),
+]
+
+
+def _run_mode(use_processes: bool, workers: int, repeats: int,
+              timeout: Optional[float]) -> Dict[str, Any]:
+    """Time the corpus in one execution mode."""
+    start = time.perf_counter()
+    processor = ParallelMathProcessor(max_workers=workers, use_processes=use_processes,
+                                      task_timeout=timeout)
+    startup_seconds = time.perf_counter() - start
+
+    try:
+        corpus = INTEGRALS * repeats
+        # One untimed pass so both modes start from warm SymPy caches
+        results = processor.parallel_integrate(INTEGRALS, [x])
+
+        start = time.perf_counter()
+        processor.parallel_integrate(corpus, [x])
+        elapsed = time.perf_counter() - start
+    finally:
+        processor.shutdown()
+
+    return {
+        "startup_seconds": round(startup_seconds, 3),
+        "seconds": round(elapsed, 3),
+        "integrals_per_second": round(len(corpus) / elapsed, 1),
+        "results": results,
+    }
+
+
+def run_benchmark(workers: Optional[int] = None, repeats: int = 3,
+                  timeout: Optional[float] = 60.0) -> Dict[str, Any]:
+    """
+    Run the benchmark.
+
+    Args:
+        workers: Number of threads or processes (defaults to the CPU count)
+        repeats: Number of passes over the integral corpus
+        timeout: Per-integral timeout in seconds
+
+    Returns:
+        Benchmark results
+    """
+    workers = workers or os.cpu_count() or 1
+
+    threads = _run_mode(False, workers, repeats, timeout)
+    processes = _run_mode(True, workers, repeats, timeout)
+
+    disagreements = [
+        str(expr) for expr, a, b in zip(INTEGRALS, threads.pop("results"), processes.pop("results"))
+        if sp.simplify(a - b) != 0
+    ]
+
+    return {
+        "integrals": len(INTEGRALS) * repeats,
+        "workers": workers,
+        "threads": threads,
+        "processes": processes,
+        "speedup": round(threads["seconds"] / processes["seconds"], 2),
+        "disagreements": disagreements,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark thread and process execution modes")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Threads or processes to use")
+    parser.add_argument("--repeats", type=int, default=3,
+                        help="Passes over the integral corpus")
+    parser.add_argument("--timeout", type=float, default=60.0,
+                        help="Per-integral timeout in seconds")
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.workers, args.repeats, args.timeout), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Concurrent workflow benchmark for the orchestration manager.
+
+Starts a burst of workflows through the OrchestrationManager, which runs them
+on the WorkflowEngine, with agents simulated by a fixed per-step latency.
+Compares a single engine lock with locks sharded by workflow ID and reports
+throughput and start-to-finish latency percentiles.
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict, List
+
+from orchestration.manager.orchestration_manager import OrchestrationManager, WorkflowStatus
+from orchestration.workflow.workflow_definition import WorkflowDefinition, WorkflowStep
+from orchestration.workflow.workflow_engine import ActivityStatus, WorkflowEngine
+
+
+def _step(step_id: str, inputs: List[str], outputs: List[str]) -> WorkflowStep:
+    """Create a step with the given keys."""
+    return WorkflowStep(id=step_id, required_capability=step_id, message_type="math_query",
+                        input_keys=inputs, output_keys=outputs)
+
+
+BENCHMARK_WORKFLOW = WorkflowDefinition(
+    "benchmark_math", "Benchmark math", "Math query with parallel explanation and visualization",
+    [
+        _step("classify", ["query"], ["domain", "expression"]),
+        _step("compute", ["expression", "domain"], ["result", "steps"]),
+        _step("explain", ["result", "steps"], ["explanation"]),
+        _step("visualize", ["expression", "result"], ["visualization"]),
+        _step("format", ["explanation", "visualization"], ["response"]),
+    ]
+)
+
+CONFIGURATIONS: Dict[str, int] = {
+    "single_lock": 1,
+    "sharded_locks": 64,
+}
+
+
+class SimulatedAgentEngine(WorkflowEngine):
+    """Engine whose activities wait a fixed latency instead of messaging agents."""
+
+    def __init__(self, agent_latency: float, lock_shards: int):
+        super().__init__(lock_shards=lock_shards)
+        self.agent_latency = agent_latency
+
+    async def _execute_activity(self, workflow, activity_index):
+        activity = workflow.activities[activity_index]
+        await asyncio.sleep(self.agent_latency)
+        result = {key: f"{activity['name']}:{key}" for key in activity.get("output_keys", [])}
+        workflow.set_activity_status(activity_index, ActivityStatus.COMPLETED, result=result)
+        workflow.context.update(result)
+        return True, result
+
+
+async def _timed(future: asyncio.Future, started: float) -> float:
+    """Wait for a workflow and return its latency in milliseconds."""
+    workflow = await future
+    if workflow.status != WorkflowStatus.COMPLETED:
+        raise RuntimeError(f"Workflow {workflow.workflow_id} ended as {workflow.status}")
+    return (time.perf_counter() - started) * 1000
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    return round(values[min(len(values) - 1, int(fraction * len(values)))], 1)
+
+
+async def _run_configuration(lock_shards: int, workflows: int, agent_latency: float) -> Dict[str, Any]:
+    """Run a burst of workflows with one lock configuration."""
+    engine = SimulatedAgentEngine(agent_latency, lock_shards)
+    manager = OrchestrationManager(workflow_engine=engine)
+    manager.workflow_registry.register_workflow(BENCHMARK_WORKFLOW)
+
+    start = time.perf_counter()
+    started = await asyncio.gather(*[
+        manager.start_workflow(BENCHMARK_WORKFLOW.id, {"query": f"integrate x**{i} * sin(x)"})
+        for i in range(workflows)
+    ])
+    latencies = sorted(await asyncio.gather(*[_timed(future, start) for _, future in started]))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "seconds": round(elapsed, 3),
+        "workflows_per_second": round(workflows / elapsed, 1),
+        "p50_ms": _percentile(latencies, 0.5),
+        "p95_ms": _percentile(latencies, 0.95),
+        "p99_ms": _percentile(latencies, 0.99),
+    }
+
+
+async def run_benchmark(workflows: int = 1000, agent_latency: float = 0.005) -> Dict[str, Any]:
+    """
+    Run the benchmark.
+
+    Args:
+        workflows: Number of concurrent workflows per configuration
+        agent_latency: Simulated agent latency per step in seconds
+
+    Returns:
+        Benchmark results
+    """
+    results = {
+        name: await _run_configuration(lock_shards, workflows, agent_latency)
+        for name, lock_shards in CONFIGURATIONS.items()
+    }
+
+    return {
+        "workflows": workflows,
+        "steps_per_workflow": len(BENCHMARK_WORKFLOW.steps),
+        "agent_latency_ms": agent_latency * 1000,
+        "configurations": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent workflow execution")
+    parser.add_argument("--workflows", type=int, default=1000,
+                        help="Concurrent workflows per configuration")
+    parser.add_argument("--latency-ms", type=float, default=5.0,
+                        help="Simulated agent latency per step")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run_benchmark(args.workflows, args.latency_ms / 1000)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,12 +7,222 @@ specialized processing and context-aware responses.
 """
 
 import re
-from typing import Dict, List, Optional, Union, Any, Tuple
+from typing import Dict, List, Optional, Union, Any, Set, Tuple
 import logging
 import json
 import os
 
 
+# Trie key marking the end of a keyword: holds (keyword, domains)
+_TERMINAL = "\0"
+
+# Symbols replaced by their names before matching; order matters because
+# later replacements see the output of earlier ones
+_SYMBOL_REPLACEMENTS = [
+    ("∫", " integrate "),
+    ("∂", " partial derivative "),
+    ("∑", " sum "),
+    ("∏", " product "),
+    ("√", " square root "),
+    ("∞", " infinity "),
+    ("≠", " not equal "),
+    ("≤", " less than or equal "),
+    ("≥", " greater than or equal "),
+    ("→", " approaches "),
+    ("∈", " element of "),
+    ("∪", " union "),
+    ("∩", " intersection "),
+    ("⊂", " subset "),
+    ("⊃", " superset "),
+    ("d/dx", " derivative "),
+    ("dy/dx", " derivative "),
+    ("lim", " limit "),
+    ("sin", " sine "),
+    ("cos", " cosine "),
+    ("tan", " tangent "),
+]
+
+_NON_WORD = re.compile(r'[^\w\s]')
+_WHITESPACE = re.compile(r'\s+')
+
+# Keywords of each domain; this would typically load from a file in a real
+# implementation
+DOMAIN_KEYWORDS = {
+    "algebra": [
+        "equation", "solve", "polynomial", "factor", "expand", "simplify", 
+        "quadratic", "linear equation", "system of equations", "factorize",
+        "binomial", "trinomial", "roots", "coefficients", "discriminant",
+        "completing the square", "rational expression", "algebraic"
+    ],
+
+    "calculus": [
+        "derivative", "differentiate", "integrate", "integration", "limit",
+        "d/dx", "dy/dx", "antiderivative", "chain rule", "product rule",
+        "quotient rule", "power rule", "fundamental theorem", "continuous",
+        "differential", "rate of change", "tangent", "maximum", "minimum",
+        "inflection point", "concave", "convex", "series", "sequence",
+        "converge", "taylor", "maclaurin", "partial derivative", "gradient",
+        "integral", "taylor series", "differential equation"
+    ],
+
+    "linear_algebra": [
+        "matrix", "vector", "determinant", "eigenvalue", "eigenvector",
+        "linear system", "linear transformation", "basis", "span", "invertible",
+        "singular", "transpose", "orthogonal", "orthonormal", "projection",
+        "subspace", "null space", "row space", "column space", "rank",
+        "dimension", "identity matrix", "diagonal", "lower triangular",
+        "upper triangular", "system of linear equations", "augmented matrix",
+        "Gaussian elimination", "row echelon form", "matrices", "vector space",
+        "row echelon"
+    ],
+
+    "statistics": [
+        "probability", "distribution", "mean", "median", "mode", "variance",
+        "standard deviation", "hypothesis test", "p-value", "confidence interval",
+        "significance level", "null hypothesis", "alternative hypothesis",
+        "correlation", "regression", "sample", "population", "t-test",
+        "chi-square", "normal distribution", "binomial", "poisson",
+        "expected value", "random variable", "bayes", "conditional probability",
+        "joint probability", "independent", "dependent", "frequency",
+        "data set", "dataset", "dice", "die", "coin", "cards", "odds", "chance",
+        "independent events"
+    ],
+
+    "geometry": [
+        "angle", "triangle", "circle", "polygon", "perimeter", "area",
+        "volume", "parallel", "perpendicular", "similar", "congruent",
+        "coordinate", "distance", "point", "line", "plane", "cone",
+        "sphere", "cylinder", "rectangle", "square", "regular", "circumference",
+        "diameter", "radius", "hypotenuse", "pythagorean", "coordinate geometry",
+        "cartesian", "transformation", "rotation", "reflection", "translation",
+        "dilation", "euclidean", "parallelogram"
+    ],
+
+    "number_theory": [
+        "prime", "composite", "factor", "multiple", "divisor", "divisible",
+        "modulo", "congruence", "gcd", "lcm", "greatest common divisor",
+        "least common multiple", "coprime", "relatively prime", "fermat",
+        "euler", "parity", "even", "odd", "remainder", "divisibility",
+        "fundamental theorem of arithmetic", "prime factorization",
+        "diophantine", "integer", "natural number", "primes", "mod", "totient"
+    ],
+
+    "trigonometry": [
+        "sine", "cosine", "tangent", "sin", "cos", "tan", "sec", "csc", "cot",
+        "secant", "cosecant", "cotangent", "radian", "degree", "angle",
+        "triangle", "right triangle", "pythagorean", "identity", "law of sines",
+        "law of cosines", "periodic", "amplitude", "frequency", "phase",
+        "unit circle", "trigonometric", "inverse trigonometric", "arcsin",
+        "arccos", "arctan", "periodic function"
+    ],
+
+    "discrete_math": [
+        "combinatorics", "permutation", "combination", "factorial", "choose",
+        "graph", "vertex", "edge", "path", "cycle", "tree", "forest",
+        "connected", "disconnected", "adjacency", "isomorphic", "bijection",
+        "recurrence", "recursive", "sequence", "set", "subset", "union",
+        "intersection", "complement", "difference", "boolean", "logic",
+        "proposition", "predicate", "quantifier", "induction", "pigeonhole",
+        "principle", "modular arithmetic", "permutations", "combinations",
+        "vertices", "edges", "subsets", "truth table", "how many ways"
+    ]
+}
+
+
+
+def normalize_text(text: str) -> str:
+    """
+    Lowercase text, drop special characters and collapse whitespace.
+    
+    Args:
+        text: Text to normalize
+        
+    Returns:
+        Normalized text
+    """
+    # Remove special characters that aren't relevant for classification
+    text = _NON_WORD.sub(' ', text.lower())
+    
+    # Remove multiple spaces
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+class KeywordTrie:
+    """
+    Word-level trie over the keyword tables of several domains.
+    
+    Keywords are normalized like queries and indexed by their words, so a
+    single walk over a query's words finds every keyword of every domain,
+    including overlapping ones such as "linear equation" and "equation".
+    """
+    
+    def __init__(self, domain_keywords: Dict[str, List[str]]):
+        """
+        Compile the keyword tables.
+        
+        Args:
+            domain_keywords: Dictionary mapping domains to lists of keywords
+        """
+        self.domains = list(domain_keywords)
+        self._root: Dict[str, Any] = {}
+        self._max_words = 0
+        
+        for domain, keywords in domain_keywords.items():
+            for keyword in keywords:
+                words = normalize_text(keyword).split()
+                if not words:
+                    continue
+                
+                node = self._root
+                for word in words:
+                    node = node.setdefault(word, {})
+                
+                phrase, domains = node.get(_TERMINAL, (" ".join(words), []))
+                if domain not in domains:
+                    domains.append(domain)
+                node[_TERMINAL] = (phrase, domains)
+                self._max_words = max(self._max_words, len(words))
+    
+    def match(self, normalized_text: str) -> Dict[str, Set[str]]:
+        """
+        Find the distinct keywords of each domain in a text.
+        
+        Args:
+            normalized_text: Text from ``normalize_text``
+            
+        Returns:
+            Dictionary mapping each domain to its matched keywords
+        """
+        found: Dict[str, Set[str]] = {domain: set() for domain in self.domains}
+        words = normalized_text.split()
+        
+        for start in range(len(words)):
+            node = self._root
+            for word in words[start:start + self._max_words]:
+                node = node.get(word)
+                if node is None:
+                    break
+                terminal = node.get(_TERMINAL)
+                if terminal is not None:
+                    phrase, domains = terminal
+                    for domain in domains:
+                        found[domain].add(phrase)
+        
+        return found
+    
+    def score(self, normalized_text: str) -> Dict[str, int]:
+        """
+        Count the distinct keywords of each domain in a text.
+        
+        Args:
+            normalized_text: Text from ``normalize_text``
+            
+        Returns:
+            Dictionary mapping each domain to its number of matched keywords
+        """
+        return {domain: len(phrases) for domain, phrases in self.match(normalized_text).items()}
+
+
 class MathDomainClassifier:
     """Classifier for mathematical domains."""
     
@@ -32,6 +242,9 @@ class MathDomainClassifier:
         if custom_keywords_path and os.path.exists(custom_keywords_path):
             self._load_custom_keywords(custom_keywords_path)
         
+        # Compile all keywords into one matcher
+        self._compile_keywords()
+        
         # Define domain descriptions
         self.domain_descriptions = {
             "algebra": "Algebra deals with symbols and the rules for manipulating these symbols, including equations, polynomials, and factoring.",
@@ -51,86 +264,8 @@ class MathDomainClassifier:
         Returns:
             Dictionary mapping domains to lists of keywords
         """
-        # This would typically load from a file in a real implementation
-        # Here we define them inline for simplicity
-        
-        keywords = {
-            "algebra": [
-                "equation", "solve", "polynomial", "factor", "expand", "simplify", 
-                "quadratic", "linear equation", "system of equations", "factorize",
-                "binomial", "trinomial", "roots", "coefficients", "discriminant",
-                "completing the square", "rational expression", "algebraic"
-            ],
-            
-            "calculus": [
-                "derivative", "differentiate", "integrate", "integration", "limit",
-                "d/dx", "dy/dx", "antiderivative", "chain rule", "product rule",
-                "quotient rule", "power rule", "fundamental theorem", "continuous",
-                "differential", "rate of change", "tangent", "maximum", "minimum",
-                "inflection point", "concave", "convex", "series", "sequence",
-                "converge", "taylor", "maclaurin", "partial derivative", "gradient"
-            ],
-            
-            "linear_algebra": [
-                "matrix", "vector", "determinant", "eigenvalue", "eigenvector",
-                "linear system", "linear transformation", "basis", "span", "invertible",
-                "singular", "transpose", "orthogonal", "orthonormal", "projection",
-                "subspace", "null space", "row space", "column space", "rank",
-                "dimension", "identity matrix", "diagonal", "lower triangular",
-                "upper triangular", "system of linear equations", "augmented matrix",
-                "Gaussian elimination", "row echelon form"
-            ],
-            
-            "statistics": [
-                "probability", "distribution", "mean", "median", "mode", "variance",
-                "standard deviation", "hypothesis test", "p-value", "confidence interval",
-                "significance level", "null hypothesis", "alternative hypothesis",
-                "correlation", "regression", "sample", "population", "t-test",
-                "chi-square", "normal distribution", "binomial", "poisson",
-                "expected value", "random variable", "bayes", "conditional probability",
-                "joint probability", "independent", "dependent", "frequency"
-            ],
-            
-            "geometry": [
-                "angle", "triangle", "circle", "polygon", "perimeter", "area",
-                "volume", "parallel", "perpendicular", "similar", "congruent",
-                "coordinate", "distance", "point", "line", "plane", "cone",
-                "sphere", "cylinder", "rectangle", "square", "regular", "circumference",
-                "diameter", "radius", "hypotenuse", "pythagorean", "coordinate geometry",
-                "cartesian", "transformation", "rotation", "reflection", "translation",
-                "dilation", "euclidean"
-            ],
-            
-            "number_theory": [
-                "prime", "composite", "factor", "multiple", "divisor", "divisible",
-                "modulo", "congruence", "gcd", "lcm", "greatest common divisor",
-                "least common multiple", "coprime", "relatively prime", "fermat",
-                "euler", "parity", "even", "odd", "remainder", "divisibility",
-                "fundamental theorem of arithmetic", "prime factorization",
-                "diophantine", "integer", "natural number"
-            ],
-            
-            "trigonometry": [
-                "sine", "cosine", "tangent", "sin", "cos", "tan", "sec", "csc", "cot",
-                "secant", "cosecant", "cotangent", "radian", "degree", "angle",
-                "triangle", "right triangle", "pythagorean", "identity", "law of sines",
-                "law of cosines", "periodic", "amplitude", "frequency", "phase",
-                "unit circle", "trigonometric", "inverse trigonometric", "arcsin",
-                "arccos", "arctan", "periodic function"
-            ],
-            
-            "discrete_math": [
-                "combinatorics", "permutation", "combination", "factorial", "choose",
-                "graph", "vertex", "edge", "path", "cycle", "tree", "forest",
-                "connected", "disconnected", "adjacency", "isomorphic", "bijection",
-                "recurrence", "recursive", "sequence", "set", "subset", "union",
-                "intersection", "complement", "difference", "boolean", "logic",
-                "proposition", "predicate", "quantifier", "induction", "pigeonhole",
-                "principle", "modular arithmetic"
-            ]
-        }
-        
-        return keywords
+        # Copied so that custom keywords do not change the shared table
+        return {domain: list(keywords) for domain, keywords in DOMAIN_KEYWORDS.items()}
     
     def _load_custom_keywords(self, file_path: str) -> None:
         """
@@ -158,6 +293,22 @@ class MathDomainClassifier:
         except Exception as e:
             self.logger.error(f"Failed to load custom keywords: {str(e)}")
     
+    def _compile_keywords(self) -> None:
+        """Compile the keyword tables into a word-level trie."""
+        self._keyword_trie = KeywordTrie(self.domain_keywords)
+    
+    def _match_keywords(self, normalized_query: str) -> Dict[str, int]:
+        """
+        Count the distinct keywords of each domain found in a query.
+        
+        Args:
+            normalized_query: Query text from ``_preprocess_query``
+            
+        Returns:
+            Dictionary mapping each domain to its number of matched keywords
+        """
+        return self._keyword_trie.score(normalized_query)
+    
     def classify_query(self, 
                      query: str, 
                      include_details: bool = False) -> Dict[str, Any]:
@@ -175,20 +326,8 @@ class MathDomainClassifier:
             # Clean and normalize the query
             normalized_query = self._preprocess_query(query)
             
-            # Count keyword matches for each domain
-            matches = {}
-            for domain, keywords in self.domain_keywords.items():
-                domain_matches = []
-                for keyword in keywords:
-                    # Look for word boundary matches to avoid partial matches
-                    # e.g. "integrate" should match "integrate" but not "integrated circuit"
-                    pattern = r'\b' + re.escape(keyword) + r'\b'
-                    matches_found = re.findall(pattern, normalized_query, re.IGNORECASE)
-                    if matches_found:
-                        domain_matches.extend(matches_found)
-                
-                # Store the number of unique matches
-                matches[domain] = len(set(domain_matches))
+            # Count keyword matches for each domain in a single pass
+            matches = self._match_keywords(normalized_query)
             
             # Calculate confidence scores
             total_matches = sum(matches.values())
@@ -235,6 +374,28 @@ class MathDomainClassifier:
                 "error": str(e)
             }
     
+    def classify_queries(self,
+                         queries: List[str],
+                         include_details: bool = False) -> List[Dict[str, Any]]:
+        """
+        Classify a batch of mathematical queries.
+        
+        Repeated queries within the batch are classified once.
+        
+        Args:
+            queries: Query texts to classify
+            include_details: Whether to include detailed classification information
+            
+        Returns:
+            List of classification results in the same order as ``queries``
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        for query in queries:
+            if query not in results:
+                results[query] = self.classify_query(query, include_details)
+        
+        return [dict(results[query]) for query in queries]
+    
     def _preprocess_query(self, query: str) -> str:
         """
         Preprocess a query for classification.
@@ -249,40 +410,23 @@ class MathDomainClassifier:
         text = query.lower()
         
         # Replace common mathematical symbols with their names to improve matching
-        replacements = {
-            "∫": " integrate ",
-            "∂": " partial derivative ",
-            "∑": " sum ",
-            "∏": " product ",
-            "√": " square root ",
-            "∞": " infinity ",
-            "≠": " not equal ",
-            "≤": " less than or equal ",
-            "≥": " greater than or equal ",
-            "→": " approaches ",
-            "∈": " element of ",
-            "∪": " union ",
-            "∩": " intersection ",
-            "⊂": " subset ",
-            "⊃": " superset ",
-            "d/dx": " derivative ",
-            "dy/dx": " derivative ",
-            "lim": " limit ",
-            "sin": " sine ",
-            "cos": " cosine ",
-            "tan": " tangent "
-        }
-        
-        for symbol, replacement in replacements.items():
+        for symbol, replacement in _SYMBOL_REPLACEMENTS:
             text = text.replace(symbol, replacement)
         
-        # Remove special characters that aren't relevant for classification
-        text = re.sub(r'[^\w\s]', ' ', text)
-        
-        # Remove multiple spaces
-        text = re.sub(r'\s+', ' ', text).strip()
+        return self._normalize_text(text)
+    
+    @staticmethod
+    def _normalize_text(text: str) -> str:
+        """
+        Lowercase text, drop special characters and collapse whitespace.
         
-        return text
+        Args:
+            text: Text to normalize
+            
+        Returns:
+            Normalized text
+        """
+        return normalize_text(text)
     
     def get_domain_examples(self, domain: str, count: int = 3) -> List[str]:
         """
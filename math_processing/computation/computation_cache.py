@@ -2,21 +2,328 @@
 Advanced caching system for mathematical computations.
 Provides intelligent caching strategies for optimizing performance.
 """
+import ast
+import copy
 import time
+import asyncio
+import concurrent.futures
 import hashlib
 import json
 import logging
+import re
+from collections import OrderedDict
 from typing import Dict, Any, Optional, Tuple, List, Callable
 import redis
 import pickle
 import sympy as sp
+from sympy.core.function import UndefinedFunction
 from functools import wraps
 import inspect
 import threading
-from math_llm_system.orchestration.monitoring.logger import get_logger
+from orchestration.monitoring.logger import get_logger
+
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
 
 logger = get_logger("math_processing.computation_cache")
 
+# Default lifetime of cached failures, in seconds
+DEFAULT_NEGATIVE_TTL = 30
+
+# Failures cached by default: timeouts, which would only time out again.
+# Other errors may depend on transient state and are retried.
+DEFAULT_NEGATIVE_EXCEPTIONS = (TimeoutError, asyncio.TimeoutError, concurrent.futures.TimeoutError)
+
+
+def _copy_error(error: BaseException) -> BaseException:
+    """
+    Copy an exception, so that each caller raises its own instance.
+    
+    Raising one instance from several threads or tasks would have them
+    overwrite each other's traceback and context.
+    
+    Args:
+        error: Exception to copy
+        
+    Returns:
+        New exception of the same type and arguments, without a traceback
+    """
+    try:
+        fresh = copy.copy(error)
+    except Exception:
+        # Types whose constructor does not accept their own args
+        fresh = type(error).__new__(type(error))
+        fresh.args = error.args
+    fresh.__traceback__ = None
+    return fresh
+
+
+class CacheSerializer:
+    """Interface for converting cached values to and from bytes."""
+    
+    name = "base"
+    
+    def dumps(self, value: Any) -> bytes:
+        """Serialize a value."""
+        raise NotImplementedError
+    
+    def loads(self, data: bytes) -> Any:
+        """Deserialize a value."""
+        raise NotImplementedError
+
+
+class PickleSerializer(CacheSerializer):
+    """
+    Pickle-based serializer, kept for values the SymPy serializer cannot encode.
+    
+    Unpickling runs arbitrary code, so only use it with a trusted Redis.
+    """
+    
+    name = "pickle"
+    
+    def dumps(self, value: Any) -> bytes:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    
+    def loads(self, data: bytes) -> Any:
+        return pickle.loads(data)
+
+
+class SympySerializer(CacheSerializer):
+    """
+    Serializer for computation results built from SymPy objects and plain data.
+    
+    SymPy objects are stored as their ``srepr`` strings and rebuilt by
+    walking their syntax tree, calling only SymPy classes on SymPy objects,
+    numbers and symbol names; dicts, lists, tuples, sets and scalars are
+    encoded structurally.
+    The envelope is packed with msgpack when available and JSON otherwise,
+    so cached data never requires unpickling or evaluating arbitrary code.
+    """
+    
+    name = "sympy"
+    
+    def dumps(self, value: Any) -> bytes:
+        encoded = self._encode(value)
+        if HAS_MSGPACK:
+            return b"m" + msgpack.packb(encoded, use_bin_type=True)
+        return b"j" + json.dumps(encoded, separators=(",", ":")).encode("utf-8")
+    
+    def loads(self, data: bytes) -> Any:
+        marker, payload = data[:1], data[1:]
+        if marker == b"m":
+            encoded = msgpack.unpackb(payload, raw=False)
+        else:
+            encoded = json.loads(payload.decode("utf-8"))
+        return self._decode(encoded)
+    
+    def _encode(self, value: Any) -> Any:
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, sp.Basic):
+            return {"__sympy__": sp.srepr(value)}
+        if isinstance(value, tuple):
+            return {"__tuple__": [self._encode(v) for v in value]}
+        if isinstance(value, list):
+            return [self._encode(v) for v in value]
+        if isinstance(value, (set, frozenset)):
+            return {"__set__": [self._encode(v) for v in value], "frozen": isinstance(value, frozenset)}
+        if isinstance(value, dict):
+            if all(isinstance(k, str) for k in value):
+                return {"__dict__": {k: self._encode(v) for k, v in value.items()}}
+            return {"__items__": [[self._encode(k), self._encode(v)] for k, v in value.items()]}
+        raise TypeError(f"Cannot serialize value of type {type(value).__name__}")
+    
+    def _decode(self, value: Any) -> Any:
+        if isinstance(value, list):
+            return [self._decode(v) for v in value]
+        if not isinstance(value, dict):
+            return value
+        if "__sympy__" in value:
+            return _parse_srepr(value["__sympy__"])
+        if "__tuple__" in value:
+            return tuple(self._decode(v) for v in value["__tuple__"])
+        if "__set__" in value:
+            items = [self._decode(v) for v in value["__set__"]]
+            return frozenset(items) if value["frozen"] else set(items)
+        if "__dict__" in value:
+            return {k: self._decode(v) for k, v in value["__dict__"].items()}
+        if "__items__" in value:
+            return {self._decode(k): self._decode(v) for k, v in value["__items__"]}
+        return value
+
+
+# Namespace SymPy srepr strings are parsed in, built on first use
+_srepr_namespace: Optional[Dict[str, Any]] = None
+
+# Classes srepr writes with a string name as their first argument; these
+# store the name and never parse it
+_SREPR_NAMED_CLASSES = ("Symbol", "Dummy", "Wild", "Function", "Str")
+
+# The decimal strings Float accepts without evaluating anything
+_FLOAT_LITERAL = re.compile(r"[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?")
+
+
+def _get_srepr_namespace() -> Dict[str, Any]:
+    """Get the SymPy classes and singleton constants srepr strings may name."""
+    global _srepr_namespace
+    if _srepr_namespace is None:
+        namespace = {}
+        classes = [sp.Basic]
+        while classes:
+            cls = classes.pop()
+            namespace.setdefault(cls.__name__, cls)
+            classes.extend(cls.__subclasses__())
+        namespace.update({name: value for name, value in vars(sp).items() if isinstance(value, sp.Basic)})
+        _srepr_namespace = namespace
+    return _srepr_namespace
+
+
+def _parse_srepr(text: str) -> Any:
+    """
+    Rebuild a SymPy object from its srepr string without evaluating arbitrary code.
+    
+    The string is parsed into a Python syntax tree and rebuilt node by node:
+    calls must name SymPy classes, string literals are only accepted as the
+    name of a symbol or function or the digits of a Float, and every other
+    argument is a SymPy object, a Python number or a tuple or list of these.
+    Nothing is ever passed to ``sympify`` as text.
+    
+    Args:
+        text: String produced by ``sp.srepr``
+        
+    Returns:
+        SymPy object
+        
+    Raises:
+        ValueError: If the string contains anything but SymPy names, calls and literals
+    """
+    try:
+        tree = ast.parse(text, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Malformed cached SymPy expression: {str(e)}") from e
+    return _build_srepr_node(tree.body, _get_srepr_namespace())
+
+
+def _build_srepr_node(node: ast.AST, namespace: Dict[str, Any]) -> Any:
+    """Rebuild one node of a parsed srepr string."""
+    if isinstance(node, ast.Call):
+        return _build_srepr_call(node, namespace)
+    if isinstance(node, ast.Name):
+        value = namespace.get(node.id)
+        if not isinstance(value, sp.Basic):
+            raise ValueError(f"Unknown name {node.id!r} in cached SymPy expression")
+        return value
+    if isinstance(node, ast.Tuple):
+        return tuple(_build_srepr_node(item, namespace) for item in node.elts)
+    if isinstance(node, ast.List):
+        return [_build_srepr_node(item, namespace) for item in node.elts]
+    
+    number = node.operand if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub) else node
+    if (isinstance(number, ast.Constant) and isinstance(number.value, (int, float))
+            and not isinstance(number.value, bool)):
+        return -number.value if number is not node else number.value
+    
+    raise ValueError(f"Unexpected {type(node).__name__} in cached SymPy expression")
+
+
+def _build_srepr_call(node: ast.Call, namespace: Dict[str, Any]) -> Any:
+    """Rebuild a call of a SymPy class, or of an undefined function, from a parsed srepr string."""
+    if isinstance(node.func, ast.Name):
+        name = node.func.id
+        func = namespace.get(name)
+        if not (isinstance(func, type) and issubclass(func, sp.Basic)):
+            raise ValueError(f"Unknown class {name!r} in cached SymPy expression")
+    elif isinstance(node.func, ast.Call):
+        # Applied undefined functions are written Function('f')(x)
+        name = None
+        func = _build_srepr_call(node.func, namespace)
+        if not isinstance(func, UndefinedFunction):
+            raise ValueError("Only undefined functions may be applied in cached SymPy expressions")
+    else:
+        raise ValueError(f"Unexpected call of {type(node.func).__name__} in cached SymPy expression")
+    
+    args = []
+    for index, arg in enumerate(node.args):
+        if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+            if index == 0 and (name in _SREPR_NAMED_CLASSES
+                               or name == "Float" and _FLOAT_LITERAL.fullmatch(arg.value)):
+                args.append(arg.value)
+                continue
+            raise ValueError(f"Unexpected string argument of {name or 'function'} in cached SymPy expression")
+        
+        value = _build_srepr_node(arg, namespace)
+        if isinstance(value, (int, float)) and not issubclass(func, sp.Number):
+            value = sp.sympify(value, strict=True)
+        args.append(value)
+    
+    kwargs = {}
+    for keyword in node.keywords:
+        value = keyword.value
+        if keyword.arg is None or not (isinstance(value, ast.Constant) and
+                                       (value.value is None or isinstance(value.value, (bool, int)))):
+            raise ValueError(f"Unexpected keyword argument of {name or 'function'} in cached SymPy expression")
+        kwargs[keyword.arg] = value.value
+    
+    return func(*args, **kwargs)
+
+
+class FallbackSerializer(CacheSerializer):
+    """
+    Uses a primary serializer and falls back to another for unsupported values.
+    
+    Without a fallback, values the primary serializer cannot encode raise
+    TypeError and payloads written by a fallback are refused on load.
+    """
+    
+    name = "fallback"
+    
+    def __init__(self, primary: CacheSerializer, fallback: Optional[CacheSerializer] = None):
+        self.primary = primary
+        self.fallback = fallback
+    
+    def dumps(self, value: Any) -> bytes:
+        try:
+            return b"1" + self.primary.dumps(value)
+        except TypeError:
+            if self.fallback is None:
+                raise
+            return b"2" + self.fallback.dumps(value)
+    
+    def loads(self, data: bytes) -> Any:
+        if data[:1] == b"1":
+            return self.primary.loads(data[1:])
+        if self.fallback is None:
+            raise ValueError("Refusing to load a cache payload written by a fallback serializer")
+        return self.fallback.loads(data[1:])
+
+
+def default_serializer(allow_pickle: bool = False) -> CacheSerializer:
+    """
+    Get the default serializer.
+    
+    Args:
+        allow_pickle: Store values the SymPy serializer cannot encode with
+            pickle, and load such values; only safe with a trusted Redis
+            
+    Returns:
+        SymPy-aware serializer, falling back to pickle only if allowed
+    """
+    return FallbackSerializer(SympySerializer(), PickleSerializer() if allow_pickle else None)
+
+class _Flight:
+    """A computation in progress that other threads can wait on."""
+    
+    def __init__(self):
+        self.owner = threading.get_ident()
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[Exception] = None
+        self.abandoned = False
+
+
 class ComputationCache:
     """
     Provides caching for expensive mathematical computations.
@@ -37,14 +344,20 @@ class ComputationCache:
     
     def __init__(self, redis_url: str = "redis://localhost:6379/0", 
                  default_ttl: int = 3600, 
-                 max_local_cache_size: int = 1000):
+                 max_local_cache_size: int = 1000,
+                 max_local_cache_bytes: int = 64 * 1024 * 1024,
+                 serializer: Optional[CacheSerializer] = None,
+                 redis_client: Optional[Any] = None):
         """
         Initialize the computation cache.
         
         Args:
             redis_url: URL for Redis connection
             default_ttl: Default TTL for cached items in seconds
-            max_local_cache_size: Maximum size of local in-memory cache
+            max_local_cache_size: Maximum number of entries in the local cache
+            max_local_cache_bytes: Maximum serialized size of the local cache
+            serializer: Serializer for Redis values (SymPy-aware by default)
+            redis_client: Existing Redis client to use instead of ``redis_url``
         """
         # Only initialize once for singleton
         if self._initialized:
@@ -52,19 +365,27 @@ class ComputationCache:
             
         self.default_ttl = default_ttl
         self.max_local_cache_size = max_local_cache_size
+        self.max_local_cache_bytes = max_local_cache_bytes
+        self.serializer = serializer or default_serializer()
         
-        # In-memory LRU cache for fast access to frequent items
-        self.local_cache = {}
-        self.local_cache_access_times = {}
+        # In-memory LRU cache: key -> (value, size in bytes, expiry time),
+        # ordered from least to most recently used
+        self.local_cache: "OrderedDict[str, Tuple[Any, int, float]]" = OrderedDict()
+        self.local_cache_bytes = 0
+        self._local_lock = threading.RLock()
         
         # Connect to Redis for distributed caching
-        try:
-            self.redis = redis.from_url(redis_url)
+        if redis_client is not None:
+            self.redis = redis_client
             self.redis_available = True
-            logger.info(f"Connected to Redis cache at {redis_url}")
-        except Exception as e:
-            logger.warning(f"Failed to connect to Redis: {e}. Using local cache only.")
-            self.redis_available = False
+        else:
+            try:
+                self.redis = redis.from_url(redis_url)
+                self.redis_available = True
+                logger.info(f"Connected to Redis cache at {redis_url}")
+            except Exception as e:
+                logger.warning(f"Failed to connect to Redis: {e}. Using local cache only.")
+                self.redis_available = False
         
         # Cache hit/miss metrics
         self.metrics = {
@@ -73,9 +394,22 @@ class ComputationCache:
             "local_hits": 0,
             "redis_hits": 0,
             "stores": 0,
-            "invalidations": 0
+            "invalidations": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "negative_hits": 0,
+            "negative_stores": 0,
+            "coalesced": 0
         }
         
+        # Recent failures: key -> (exception, expiry time)
+        self.negative_cache: "OrderedDict[str, Tuple[Exception, float]]" = OrderedDict()
+        
+        # Computations in progress, for single-flight execution
+        self._flights: Dict[str, _Flight] = {}
+        self._flight_lock = threading.Lock()
+        self._async_flights: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Future] = {}
+        
         # Set of dependency keys to track computation dependencies
         self.dependency_graph = {}
         
@@ -94,10 +428,17 @@ class ComputationCache:
         Returns:
             String cache key
         """
-        # Convert args and kwargs to a JSON-serializable format
+        # Convert args and kwargs to a canonical JSON-serializable format.
+        # SymPy objects use their structural srepr, so structurally equal
+        # expressions share a key and same-looking ones with different
+        # assumptions do not.
         def make_serializable(obj):
             if isinstance(obj, sp.Basic):
-                return str(obj)
+                return {"__sympy__": sp.srepr(obj)}
+            elif isinstance(obj, (list, tuple)):
+                return [make_serializable(item) for item in obj]
+            elif isinstance(obj, dict):
+                return {str(k): make_serializable(v) for k, v in obj.items()}
             elif hasattr(obj, '__dict__'):
                 return str(obj)
             else:
@@ -114,8 +455,8 @@ class ComputationCache:
         }
         
         # Generate a hash of the key data
-        key_json = json.dumps(key_data, sort_keys=True)
-        key_hash = hashlib.md5(key_json.encode()).hexdigest()
+        key_json = json.dumps(key_data, sort_keys=True, default=str)
+        key_hash = hashlib.sha256(key_json.encode()).hexdigest()
         
         return f"math:computation:{key_hash}"
     
@@ -130,12 +471,20 @@ class ComputationCache:
             Tuple of (hit, value) where hit is True if the key was found
         """
         # First check local cache for fastest access
-        if key in self.local_cache:
-            self.metrics["hits"] += 1
-            self.metrics["local_hits"] += 1
-            self.local_cache_access_times[key] = time.time()
-            logger.debug(f"Local cache hit for key: {key}")
-            return True, self.local_cache[key]
+        with self._local_lock:
+            entry = self.local_cache.get(key)
+            if entry is not None:
+                value, size, expires_at = entry
+                if expires_at > time.time():
+                    self.local_cache.move_to_end(key)
+                    self.metrics["hits"] += 1
+                    self.metrics["local_hits"] += 1
+                    logger.debug(f"Local cache hit for key: {key}")
+                    return True, value
+                
+                # Expired: drop it and fall through to Redis
+                self._remove_local(key)
+                self.metrics["expirations"] += 1
         
         # If not in local cache, check Redis
         if self.redis_available:
@@ -143,10 +492,12 @@ class ComputationCache:
                 cached_value = self.redis.get(key)
                 if cached_value is not None:
                     # Deserialize the value
-                    value = pickle.loads(cached_value)
+                    value = self.serializer.loads(cached_value)
                     
-                    # Add to local cache for faster future access
-                    self._add_to_local_cache(key, value)
+                    # Add to local cache for faster future access, keeping
+                    # the remaining Redis TTL when it is known
+                    ttl = self._redis_ttl(key)
+                    self._add_to_local_cache(key, value, len(cached_value), ttl)
                     
                     self.metrics["hits"] += 1
                     self.metrics["redis_hits"] += 1
@@ -175,8 +526,16 @@ class ComputationCache:
         """
         ttl = ttl if ttl is not None else self.default_ttl
         
+        # Serialize once: the payload goes to Redis and its length is the
+        # entry's size in the local cache
+        try:
+            serialized_value = self.serializer.dumps(value)
+        except Exception as e:
+            logger.error(f"Error serializing cache value: {e}")
+            return False
+        
         # Store in local cache
-        self._add_to_local_cache(key, value)
+        self._add_to_local_cache(key, value, len(serialized_value), ttl)
         
         # Track dependencies for invalidation
         if dependencies:
@@ -188,9 +547,6 @@ class ComputationCache:
         # Store in Redis for distributed cache
         if self.redis_available:
             try:
-                # Serialize the value
-                serialized_value = pickle.dumps(value)
-                
                 # Set in Redis with TTL
                 self.redis.setex(key, ttl, serialized_value)
             except Exception as e:
@@ -228,11 +584,11 @@ class ComputationCache:
         # Invalidate all identified keys
         for invalid_key in to_invalidate:
             # Remove from local cache
-            if invalid_key in self.local_cache:
-                del self.local_cache[invalid_key]
-                if invalid_key in self.local_cache_access_times:
-                    del self.local_cache_access_times[invalid_key]
-                invalidated += 1
+            with self._local_lock:
+                self.negative_cache.pop(invalid_key, None)
+                if invalid_key in self.local_cache:
+                    self._remove_local(invalid_key)
+                    invalidated += 1
             
             # Remove from Redis
             if self.redis_available:
@@ -245,39 +601,224 @@ class ComputationCache:
         self.metrics["invalidations"] += invalidated
         return invalidated
     
-    def _add_to_local_cache(self, key: str, value: Any):
+    def _add_to_local_cache(self, key: str, value: Any, size: int, ttl: Optional[int] = None):
         """
-        Add a value to the local cache, managing size limits.
+        Add a value to the local cache, managing entry and byte limits.
         
         Args:
             key: Cache key
             value: Value to store
+            size: Serialized size of the value in bytes
+            ttl: Time-to-live in seconds (uses default_ttl if None)
         """
-        # If we've reached the max size, evict least recently used item
-        if len(self.local_cache) >= self.max_local_cache_size:
-            self._evict_lru()
+        ttl = ttl if ttl is not None else self.default_ttl
+        
+        # Values larger than the whole budget are only kept in Redis
+        if size > self.max_local_cache_bytes:
+            return
         
-        # Add to local cache
-        self.local_cache[key] = value
-        self.local_cache_access_times[key] = time.time()
+        with self._local_lock:
+            if key in self.local_cache:
+                self._remove_local(key)
+            
+            self.local_cache[key] = (value, size, time.time() + ttl)
+            self.local_cache_bytes += size
+            
+            # Evict least recently used items until both limits hold
+            while (len(self.local_cache) > self.max_local_cache_size
+                   or self.local_cache_bytes > self.max_local_cache_bytes):
+                self._evict_lru()
+    
+    def _remove_local(self, key: str):
+        """Remove a key from the local cache. Caller holds the lock."""
+        _, size, _ = self.local_cache.pop(key)
+        self.local_cache_bytes -= size
     
     def _evict_lru(self):
         """Evict the least recently used item from the local cache."""
-        if not self.local_cache_access_times:
-            return
+        with self._local_lock:
+            if not self.local_cache:
+                return
+            
+            _, (_, size, _) = self.local_cache.popitem(last=False)
+            self.local_cache_bytes -= size
+            self.metrics["evictions"] += 1
+    
+    def _redis_ttl(self, key: str) -> Optional[int]:
+        """
+        Get the remaining TTL of a Redis key.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Remaining seconds, or None if unknown
+        """
+        try:
+            remaining = self.redis.ttl(key)
+        except Exception:
+            return None
+        return remaining if isinstance(remaining, int) and remaining > 0 else None
+    
+    def get_failure(self, key: str) -> Optional[Exception]:
+        """
+        Get a recent failure recorded for a key.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            A new copy of the exception raised by the last attempt, or None if
+            there is none or it has expired
+        """
+        with self._local_lock:
+            entry = self.negative_cache.get(key)
+            if entry is None:
+                return None
+            
+            error, expires_at = entry
+            if expires_at <= time.time():
+                del self.negative_cache[key]
+                return None
+            
+            self.metrics["negative_hits"] += 1
+            return _copy_error(error)
+    
+    def set_failure(self, key: str, error: Exception, ttl: int = DEFAULT_NEGATIVE_TTL):
+        """
+        Record a failed computation so it is not retried until the TTL expires.
+        
+        Failures are kept in this process only; exceptions are not written
+        to Redis.
+        
+        Args:
+            key: Cache key
+            error: Exception raised by the computation
+            ttl: Time-to-live in seconds
+        """
+        # Keep a copy, so the cache holds no traceback or frames
+        with self._local_lock:
+            self.negative_cache.pop(key, None)
+            self.negative_cache[key] = (_copy_error(error), time.time() + ttl)
+            while len(self.negative_cache) > self.max_local_cache_size:
+                self.negative_cache.popitem(last=False)
+            self.metrics["negative_stores"] += 1
+    
+    def single_flight(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Run a computation so that concurrent callers for one key share it.
+        
+        The first caller runs ``compute``; others arriving before it finishes
+        wait for its result or exception instead of computing again. A
+        recursive call from the computing thread runs directly.
+        
+        Args:
+            key: Cache key identifying the computation
+            compute: Function producing the result
+            
+        Returns:
+            Result of the computation
+        """
+        while True:
+            with self._flight_lock:
+                flight = self._flights.get(key)
+                if flight is None:
+                    flight = _Flight()
+                    self._flights[key] = flight
+                    break
+            
+            if flight.owner == threading.get_ident():
+                return compute()
             
-        # Find the least recently used key
-        lru_key = min(self.local_cache_access_times.items(), key=lambda x: x[1])[0]
+            self.metrics["coalesced"] += 1
+            flight.done.wait()
+            if flight.abandoned:
+                # The computing thread was interrupted; try again
+                continue
+            if flight.error is not None:
+                raise _copy_error(flight.error) from flight.error
+            return flight.result
         
-        # Remove from local cache
-        del self.local_cache[lru_key]
-        del self.local_cache_access_times[lru_key]
+        try:
+            flight.result = compute()
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        except BaseException:
+            flight.abandoned = True
+            raise
+        finally:
+            with self._flight_lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+    
+    async def single_flight_async(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Run a coroutine computation so that concurrent tasks for one key share it.
+        
+        Args:
+            key: Cache key identifying the computation
+            compute: Function returning an awaitable that produces the result
+            
+        Returns:
+            Result of the computation
+        """
+        loop = asyncio.get_running_loop()
+        flight_key = (loop, key)
+        
+        while True:
+            future = self._async_flights.get(flight_key)
+            if future is None:
+                break
+            
+            self.metrics["coalesced"] += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The computing task was cancelled; try again
+            except Exception as e:
+                raise _copy_error(e) from e
+        
+        future = loop.create_future()
+        self._async_flights[flight_key] = future
+        try:
+            result = await compute()
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters re-raise it; don't warn when there are none
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._async_flights.pop(flight_key, None)
+    
+    def set_cache_size(self, max_entries: int):
+        """
+        Change the maximum number of entries in the local cache.
+        
+        Args:
+            max_entries: New entry limit
+        """
+        with self._local_lock:
+            self.max_local_cache_size = max_entries
+            while len(self.local_cache) > self.max_local_cache_size:
+                self._evict_lru()
     
     def clear(self):
         """Clear all cached values."""
         # Clear local cache
-        self.local_cache.clear()
-        self.local_cache_access_times.clear()
+        with self._local_lock:
+            self.local_cache.clear()
+            self.local_cache_bytes = 0
+            self.negative_cache.clear()
         self.dependency_graph.clear()
         
         # Clear Redis keys (with pattern matching)
@@ -306,7 +847,13 @@ class ComputationCache:
             "stores": self.metrics["stores"],
             "invalidations": self.metrics["invalidations"],
             "hit_ratio": hit_ratio,
+            "evictions": self.metrics["evictions"],
+            "expirations": self.metrics["expirations"],
+            "negative_hits": self.metrics["negative_hits"],
+            "negative_stores": self.metrics["negative_stores"],
+            "coalesced": self.metrics["coalesced"],
             "local_cache_size": len(self.local_cache),
+            "local_cache_bytes": self.local_cache_bytes,
             "local_hit_ratio": self.metrics["local_hits"] / self.metrics["hits"] if self.metrics["hits"] > 0 else 0
         }
     
@@ -338,41 +885,52 @@ class ComputationCache:
             return self.redis.ping()
         except Exception:
             return False
+    
+    def shutdown(self):
+        """Release the Redis connection pool."""
+        if self.redis_available:
+            try:
+                self.redis.close()
+            except Exception as e:
+                logger.error(f"Error closing Redis connection: {e}")
 
 
 # Decorator for caching mathematical operations
 def cached_computation(ttl: Optional[int] = None, 
                        dynamic_ttl: Optional[Callable[[Any], int]] = None,
-                       track_dependencies: bool = True):
+                       track_dependencies: bool = True,
+                       negative_ttl: Optional[int] = DEFAULT_NEGATIVE_TTL,
+                       negative_exceptions: Tuple[type, ...] = DEFAULT_NEGATIVE_EXCEPTIONS):
     """
     Decorator for caching mathematical computation results.
     
+    Concurrent calls with the same arguments are coalesced: one caller
+    computes while the others wait for its result. Works on both plain
+    functions (across threads) and coroutine functions (across tasks).
+    
     Args:
         ttl: Time-to-live for cache entries in seconds
         dynamic_ttl: Function to calculate TTL based on result
         track_dependencies: Whether to track dependencies for invalidation
+        negative_ttl: Time-to-live for cached failures in seconds; None
+            disables negative caching
+        negative_exceptions: Exception types whose failures are cached;
+            timeouts by default
         
     Returns:
         Decorated function with caching
     """
     def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            # Get the cache instance
-            cache = ComputationCache()
-            
-            # Generate cache key
-            func_name = f"{func.__module__}.{func.__name__}"
-            key = cache._generate_key(func_name, args, kwargs)
-            
-            # Check if result is cached
-            hit, cached_result = cache.get(key)
-            if hit:
-                return cached_result
-            
-            # Not cached, compute the result
-            result = func(*args, **kwargs)
-            
+        func_name = f"{func.__module__}.{func.__name__}"
+        
+        def lookup(cache, key):
+            # A recent failure is re-raised rather than recomputed
+            error = cache.get_failure(key)
+            if error is not None:
+                raise error
+            return cache.get(key)
+        
+        def store(cache, key, args, kwargs, result):
             # Determine TTL
             if dynamic_ttl is not None:
                 result_ttl = dynamic_ttl(result)
@@ -397,14 +955,64 @@ def cached_computation(ttl: Optional[int] = None,
                                 dependencies.append(arg_value)
                 
                 # Extract potential dependencies from keyword arguments
-                for key, value in kwargs.items():
+                for name, value in kwargs.items():
                     if isinstance(value, str) and value.startswith("math:computation:"):
                         dependencies.append(value)
             
             # Cache the result
             cache.set(key, result, ttl=result_ttl, dependencies=dependencies)
+        
+        def record_failure(cache, key, error):
+            if negative_ttl and isinstance(error, negative_exceptions):
+                cache.set_failure(key, error, negative_ttl)
+        
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                cache = ComputationCache()
+                key = cache._generate_key(func_name, args, kwargs)
+                
+                hit, cached_result = lookup(cache, key)
+                if hit:
+                    return cached_result
+                
+                async def compute():
+                    try:
+                        result = await func(*args, **kwargs)
+                    except Exception as e:
+                        record_failure(cache, key, e)
+                        raise
+                    store(cache, key, args, kwargs, result)
+                    return result
+                
+                return await cache.single_flight_async(key, compute)
             
-            return result
+            return async_wrapper
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            # Get the cache instance
+            cache = ComputationCache()
+            
+            # Generate cache key
+            key = cache._generate_key(func_name, args, kwargs)
+            
+            # Check if result is cached
+            hit, cached_result = lookup(cache, key)
+            if hit:
+                return cached_result
+            
+            def compute():
+                try:
+                    result = func(*args, **kwargs)
+                except Exception as e:
+                    record_failure(cache, key, e)
+                    raise
+                store(cache, key, args, kwargs, result)
+                return result
+            
+            # Not cached, compute the result once for all concurrent callers
+            return cache.single_flight(key, compute)
         
         return wrapper
     
@@ -11,10 +11,12 @@ import concurrent.futures
 from typing import Dict, Any, List, Callable, Optional, Tuple, Union, TypeVar, Generic
 import sympy as sp
 import numpy as np
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
-from math_llm_system.orchestration.performance.resource_manager import ResourceManager, resource_managed
-from math_llm_system.orchestration.monitoring.logger import get_logger
-from math_llm_system.math_processing.computation.computation_cache import ComputationCache, cached_computation
+from concurrent.futures import ThreadPoolExecutor
+from orchestration.performance.resource_manager import ResourceManager, resource_managed
+from orchestration.monitoring.logger import get_logger
+from math_processing.computation.computation_cache import ComputationCache, cached_computation
+from math_processing.computation.sympy_process_pool import SympyProcessPool, run_operation
+from math_processing.computation.vectorized_evaluator import get_vectorized_evaluator
 
 logger = get_logger("math_processing.parallel_processor")
 
@@ -28,13 +30,17 @@ class ParallelMathProcessor:
     Enables efficient execution of multiple independent operations.
     """
     
-    def __init__(self, max_workers: Optional[int] = None, use_processes: bool = False):
+    def __init__(self, max_workers: Optional[int] = None, use_processes: bool = False,
+                 task_timeout: Optional[float] = None):
         """
         Initialize parallel math processor.
         
         Args:
             max_workers: Maximum number of worker threads/processes
-            use_processes: Whether to use processes instead of threads
+            use_processes: Whether to run symbolic operations in worker processes
+            task_timeout: Timeout for each symbolic operation in seconds. In
+                process mode the worker running an overdue task is killed; in
+                thread mode the caller stops waiting but the thread runs on.
         """
         # Get resource manager for optimal resource allocation
         self.resource_manager = ResourceManager()
@@ -50,16 +56,23 @@ class ParallelMathProcessor:
         
         self.max_workers = max_workers
         self.use_processes = use_processes
+        self.task_timeout = task_timeout
         
-        # Create appropriate executor
-        if use_processes:
-            self.executor = ProcessPoolExecutor(max_workers=max_workers)
-        else:
-            self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        # Threads run arbitrary callables (closures cannot be sent to other
+        # processes); symbolic operations go to pre-warmed worker processes
+        # when process mode is enabled
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.process_pool = (
+            SympyProcessPool(max_workers=max_workers, task_timeout=task_timeout)
+            if use_processes else None
+        )
         
         # Initialize cache for results
         self.cache = ComputationCache()
         
+        # Shared cache of expressions compiled for numerical evaluation
+        self.evaluator = get_vectorized_evaluator()
+        
         logger.info(f"Initialized parallel math processor with {max_workers} workers "
                    f"using {'processes' if use_processes else 'threads'}")
     
@@ -170,71 +183,92 @@ class ParallelMathProcessor:
         Returns:
             List of results
         """
-        # Define wrapper for the symbolic operation
-        def process_expression(expr):
-            try:
-                # Get the operation method from sympy
-                operation = getattr(sp, operation_name, None)
-                if operation is None:
-                    raise ValueError(f"Invalid operation: {operation_name}")
-                
-                # Apply operation
-                result = operation(expr, *args, **kwargs)
-                return result
-            except Exception as e:
-                logger.error(f"Error in symbolic operation {operation_name}: {e}")
+        outcomes = self.run_operations(
+            [(operation_name, (expr,) + args, kwargs) for expr in expressions]
+        )
+        
+        results = []
+        for expr, outcome in zip(expressions, outcomes):
+            if outcome["success"]:
+                results.append(outcome["result"])
+            else:
+                logger.error(f"Error in symbolic operation {operation_name}: {outcome['error']}")
                 # Return the original expression on error
-                return expr
-        
-        # Process expressions in parallel
-        results = self.map(process_expression, expressions)
+                results.append(expr)
         
         return results
     
+    def run_operations(self, tasks: List[Tuple[str, Tuple, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Run named SymPy operations in parallel.
+        
+        Args:
+            tasks: List of (operation, args, kwargs) tuples, where operation is
+                a SymPy function name or a custom operation such as "evaluate"
+            
+        Returns:
+            Outcome dictionaries in task order, each with "success" and either
+            "result" or "error"
+        """
+        if not tasks:
+            return []
+        
+        if self.process_pool is not None:
+            return self.process_pool.run_many(tasks, timeout=self.task_timeout)
+        
+        futures = [self.executor.submit(run_operation, operation, args, kwargs)
+                   for operation, args, kwargs in tasks]
+        outcomes = []
+        for future in futures:
+            try:
+                outcomes.append(future.result(timeout=self.task_timeout))
+            except concurrent.futures.TimeoutError:
+                outcomes.append({
+                    "success": False,
+                    "error": f"Computation timed out after {self.task_timeout}s",
+                    "timeout": True
+                })
+        return outcomes
+    
     @cached_computation(ttl=3600)
     def parallel_evaluate(self, expr: Union[sp.Expr, List[sp.Expr]], 
-                        var_values: Dict[str, Union[float, int]]) -> Union[float, List[float]]:
+                        var_values: Dict[str, Union[float, int, List[float]]]
+                        ) -> Union[float, List[float], List[List[float]]]:
         """
-        Evaluate expression(s) with variable values in parallel.
+        Evaluate expression(s) with variable values.
+        
+        Each expression is compiled to a NumPy function once and reused across
+        calls; passing lists of values evaluates a whole batch of points in a
+        single vectorized call.
         
         Args:
             expr: Expression or list of expressions to evaluate
-            var_values: Dictionary mapping variable names to values
+            var_values: Dictionary mapping variable names to values, or to
+                equally long lists of values for batch evaluation
             
         Returns:
-            Evaluated result(s)
+            Evaluated result(s): a float per expression, or a list of floats
+            per expression for batch evaluation
         """
-        # Handle single expression case
-        if not isinstance(expr, list):
-            # Create lambdified function
-            var_symbols = list(var_values.keys())
-            symbols = [sp.Symbol(v) for v in var_symbols]
-            func = sp.lambdify(symbols, expr)
-            
-            # Evaluate
-            values = [var_values[v] for v in var_symbols]
-            try:
-                return float(func(*values))
-            except Exception as e:
-                logger.error(f"Error evaluating expression {expr}: {e}")
-                return float('nan')
+        batched = any(np.ndim(value) > 0 for value in var_values.values())
         
-        # Handle multiple expressions
-        var_symbols = list(var_values.keys())
-        symbols = [sp.Symbol(v) for v in var_symbols]
-        values = [var_values[v] for v in var_symbols]
-        
-        # Define evaluation function
         def evaluate_single(expression):
             try:
-                func = sp.lambdify(symbols, expression)
-                return float(func(*values))
+                values = self.evaluator.evaluate(expression, var_values)
             except Exception as e:
                 logger.error(f"Error evaluating expression {expression}: {e}")
+                if batched:
+                    size = max(np.size(value) for value in var_values.values())
+                    return [float('nan')] * size
                 return float('nan')
+            return values.tolist() if batched else float(values)
         
-        # Evaluate in parallel
-        return self.map(evaluate_single, expr)
+        # Handle single expression case
+        if not isinstance(expr, list):
+            return evaluate_single(expr)
+        
+        # Compiled NumPy calls are cheap enough that threads would only add overhead
+        return [evaluate_single(expression) for expression in expr]
     
     def parallel_solve(self, equations: List[sp.Eq], 
                      variables: List[sp.Symbol]) -> List[Dict[sp.Symbol, sp.Expr]]:
@@ -248,21 +282,8 @@ class ParallelMathProcessor:
         Returns:
             List of solution dictionaries
         """
-        # Define solving function
-        def solve_system(system_data):
-            eqs = system_data["equations"]
-            vars = system_data["variables"]
-            
-            try:
-                # Solve the system
-                solutions = sp.solve(eqs, vars, dict=True)
-                return solutions
-            except Exception as e:
-                logger.error(f"Error solving equations {eqs}: {e}")
-                return []
-        
-        # Prepare systems data
-        systems = []
+        # Prepare systems
+        tasks = []
         for i, eqs in enumerate(equations):
             # Determine variables for this system
             if isinstance(variables[0], list):
@@ -271,14 +292,19 @@ class ParallelMathProcessor:
             else:
                 # Same variables for all systems
                 vars = variables
-                
-            systems.append({
-                "equations": eqs,
-                "variables": vars
-            })
+            
+            tasks.append(("solve", (eqs, vars), {"dict": True}))
         
         # Solve systems in parallel
-        return self.map(solve_system, systems)
+        results = []
+        for eqs, outcome in zip(equations, self.run_operations(tasks)):
+            if outcome["success"]:
+                results.append(outcome["result"])
+            else:
+                logger.error(f"Error solving equations {eqs}: {outcome['error']}")
+                results.append([])
+        
+        return results
     
     def parallel_integrate(self, expressions: List[sp.Expr], 
                          variables: List[sp.Symbol],
@@ -294,44 +320,29 @@ class ParallelMathProcessor:
         Returns:
             List of integration results
         """
-        # Define integration function
-        def integrate_expr(integration_data):
-            expr = integration_data["expression"]
-            var = integration_data["variable"]
-            
-            try:
-                # Handle definite integral
-                if "limits" in integration_data and integration_data["limits"] is not None:
-                    lower, upper = integration_data["limits"]
-                    result = sp.integrate(expr, (var, lower, upper))
-                else:
-                    # Indefinite integral
-                    result = sp.integrate(expr, var)
-                    
-                return result
-            except Exception as e:
-                logger.error(f"Error integrating expression {expr}: {e}")
-                return sp.S.NaN
-        
-        # Prepare integration data
-        integration_data = []
+        # Prepare integration tasks
+        tasks = []
         for i, expr in enumerate(expressions):
             # Determine variable for this expression
             var = variables[i] if i < len(variables) else variables[-1]
             
-            data = {
-                "expression": expr,
-                "variable": var
-            }
-            
-            # Add limits if provided
-            if limits and i < len(limits):
-                data["limits"] = limits[i]
-            
-            integration_data.append(data)
+            # Handle definite integral if limits are provided
+            if limits and i < len(limits) and limits[i] is not None:
+                lower, upper = limits[i]
+                tasks.append(("integrate", (expr, (var, lower, upper)), {}))
+            else:
+                tasks.append(("integrate", (expr, var), {}))
         
         # Integrate in parallel
-        return self.map(integrate_expr, integration_data)
+        results = []
+        for expr, outcome in zip(expressions, self.run_operations(tasks)):
+            if outcome["success"]:
+                results.append(outcome["result"])
+            else:
+                logger.error(f"Error integrating expression {expr}: {outcome['error']}")
+                results.append(sp.S.NaN)
+        
+        return results
     
     def parallel_differentiate(self, expressions: List[sp.Expr], 
                              variables: List[sp.Symbol],
@@ -347,42 +358,28 @@ class ParallelMathProcessor:
         Returns:
             List of differentiation results
         """
-        # Define differentiation function
-        def differentiate_expr(diff_data):
-            expr = diff_data["expression"]
-            var = diff_data["variable"]
-            
-            try:
-                # Apply the differentiation
-                if "order" in diff_data and diff_data["order"] is not None:
-                    result = sp.diff(expr, var, diff_data["order"])
-                else:
-                    result = sp.diff(expr, var)
-                    
-                return result
-            except Exception as e:
-                logger.error(f"Error differentiating expression {expr}: {e}")
-                return sp.S.NaN
-        
-        # Prepare differentiation data
-        diff_data = []
+        # Prepare differentiation tasks
+        tasks = []
         for i, expr in enumerate(expressions):
             # Determine variable for this expression
             var = variables[i] if i < len(variables) else variables[-1]
             
-            data = {
-                "expression": expr,
-                "variable": var
-            }
-            
             # Add order if provided
-            if orders and i < len(orders):
-                data["order"] = orders[i]
-            
-            diff_data.append(data)
+            if orders and i < len(orders) and orders[i] is not None:
+                tasks.append(("diff", (expr, var, orders[i]), {}))
+            else:
+                tasks.append(("diff", (expr, var), {}))
         
         # Differentiate in parallel
-        return self.map(differentiate_expr, diff_data)
+        results = []
+        for expr, outcome in zip(expressions, self.run_operations(tasks)):
+            if outcome["success"]:
+                results.append(outcome["result"])
+            else:
+                logger.error(f"Error differentiating expression {expr}: {outcome['error']}")
+                results.append(sp.S.NaN)
+        
+        return results
     
     def batch_compute(self, operations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -394,83 +391,97 @@ class ParallelMathProcessor:
         Returns:
             List of operation results
         """
-        # Define operation processor
-        def process_operation(operation):
+        results: List[Optional[Dict[str, Any]]] = [None] * len(operations)
+        tasks = []
+        task_indices = []
+        
+        for index, operation in enumerate(operations):
             op_type = operation.get("type")
-            expr = operation.get("expression")
-            
-            # Convert expression from string if necessary
-            if isinstance(expr, str):
-                try:
-                    expr = sp.sympify(expr)
-                except Exception as e:
-                    return {
-                        "success": False,
-                        "error": f"Invalid expression: {e}",
-                        "operation": op_type
-                    }
-            
             try:
-                # Process based on operation type
-                if op_type == "simplify":
-                    result = sp.simplify(expr)
-                elif op_type == "expand":
-                    result = sp.expand(expr)
-                elif op_type == "factor":
-                    result = sp.factor(expr)
-                elif op_type == "solve":
-                    var = operation.get("variable")
-                    if isinstance(var, str):
-                        var = sp.Symbol(var)
-                    result = sp.solve(expr, var, dict=True)
-                elif op_type == "diff":
-                    var = operation.get("variable")
-                    if isinstance(var, str):
-                        var = sp.Symbol(var)
-                    order = operation.get("order", 1)
-                    result = sp.diff(expr, var, order)
-                elif op_type == "integrate":
-                    var = operation.get("variable")
-                    if isinstance(var, str):
-                        var = sp.Symbol(var)
-                    limits = operation.get("limits")
-                    if limits:
-                        result = sp.integrate(expr, (var, limits[0], limits[1]))
-                    else:
-                        result = sp.integrate(expr, var)
-                elif op_type == "evaluate":
-                    var_values = operation.get("values", {})
-                    for var_name, value in var_values.items():
-                        expr = expr.subs(sp.Symbol(var_name), value)
-                    result = float(expr.evalf())
-                else:
-                    return {
-                        "success": False,
-                        "error": f"Unknown operation type: {op_type}",
-                        "operation": op_type
-                    }
-                
-                return {
-                    "success": True,
-                    "result": result,
-                    "operation": op_type,
-                    "latex": sp.latex(result) if op_type != "solve" else str(result)
-                }
-                
+                task = self._build_batch_task(operation)
             except Exception as e:
-                logger.error(f"Error in {op_type} operation: {e}")
-                return {
+                results[index] = {
+                    "success": False,
+                    "error": f"Invalid expression: {e}",
+                    "operation": op_type
+                }
+                continue
+            
+            if task is None:
+                results[index] = {
                     "success": False,
-                    "error": str(e),
+                    "error": f"Unknown operation type: {op_type}",
                     "operation": op_type
                 }
+                continue
+            
+            tasks.append(task)
+            task_indices.append(index)
         
         # Process operations in parallel
-        return self.process_batch(operations, process_operation)
+        for index, outcome in zip(task_indices, self.run_operations(tasks)):
+            op_type = operations[index].get("type")
+            if not outcome["success"]:
+                logger.error(f"Error in {op_type} operation: {outcome['error']}")
+                results[index] = {
+                    "success": False,
+                    "error": outcome["error"],
+                    "operation": op_type
+                }
+                continue
+            
+            result = outcome["result"]
+            results[index] = {
+                "success": True,
+                "result": result,
+                "operation": op_type,
+                "latex": sp.latex(result) if op_type != "solve" else str(result)
+            }
+        
+        return results
+    
+    @staticmethod
+    def _build_batch_task(operation: Dict[str, Any]) -> Optional[Tuple[str, Tuple, Dict[str, Any]]]:
+        """
+        Translate a batch operation specification into an operation task.
+        
+        Args:
+            operation: Operation specification
+            
+        Returns:
+            (operation, args, kwargs) tuple, or None for unknown operation types
+        """
+        op_type = operation.get("type")
+        expr = operation.get("expression")
+        
+        # Convert expression from string if necessary
+        if isinstance(expr, str):
+            expr = sp.sympify(expr)
+        
+        var = operation.get("variable")
+        if isinstance(var, str):
+            var = sp.Symbol(var)
+        
+        if op_type in ("simplify", "expand", "factor"):
+            return (op_type, (expr,), {})
+        if op_type == "solve":
+            return ("solve", (expr, var), {"dict": True})
+        if op_type == "diff":
+            return ("diff", (expr, var, operation.get("order", 1)), {})
+        if op_type == "integrate":
+            limits = operation.get("limits")
+            if limits:
+                return ("integrate", (expr, (var, limits[0], limits[1])), {})
+            return ("integrate", (expr, var), {})
+        if op_type == "evaluate":
+            return ("evaluate", (expr, operation.get("values", {})), {})
+        return None
     
     def shutdown(self):
         """Shut down the parallel processor."""
         self.executor.shutdown()
+        if self.process_pool is not None:
+            self.process_pool.shutdown()
         logger.info("Parallel math processor shut down")
 
 
@@ -480,7 +491,8 @@ def parallel_compute(use_processes: bool = False, chunk_size: Optional[int] = No
     Decorator for parallel computation of multiple inputs.
     
     Args:
-        use_processes: Whether to use processes instead of threads
+        use_processes: Whether the processor uses worker processes for
+            symbolic operations (inputs are always mapped on threads)
         chunk_size: Size of chunks for batched processing
         
     Returns:
@@ -0,0 +1,345 @@
+"""
+Process pool for CPU-bound SymPy operations.
+
+SymPy work is pure Python and serializes on the GIL, so thread pools give no
+speedup for it. This module runs operations in dedicated worker processes.
+Expressions travel as ``srepr`` strings, workers import SymPy and warm its
+caches before accepting work, and every task has a hard timeout enforced by
+killing and replacing the worker running it.
+
+Everything a worker executes is defined at module level so it can be used
+with any multiprocessing start method.
+"""
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import sympy as sp
+
+logger = logging.getLogger(__name__)
+
+# Message a worker sends once it is ready to accept tasks
+_READY = "ready"
+
+
+def to_wire(value: Any) -> Any:
+    """
+    Encode a value for transport to or from a worker.
+
+    SymPy objects become ``srepr`` strings; containers are encoded recursively.
+
+    Args:
+        value: Value to encode
+
+    Returns:
+        Picklable representation made of plain Python types
+    """
+    if isinstance(value, sp.Basic):
+        return {"__sympy__": sp.srepr(value)}
+    if isinstance(value, tuple):
+        return {"__tuple__": [to_wire(v) for v in value]}
+    if isinstance(value, list):
+        return [to_wire(v) for v in value]
+    if isinstance(value, dict):
+        return {"__items__": [[to_wire(k), to_wire(v)] for k, v in value.items()]}
+    return value
+
+
+def from_wire(value: Any) -> Any:
+    """
+    Decode a value produced by ``to_wire``.
+
+    Args:
+        value: Encoded value
+
+    Returns:
+        Decoded value with SymPy objects rebuilt
+    """
+    if isinstance(value, list):
+        return [from_wire(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    if "__sympy__" in value:
+        return sp.sympify(value["__sympy__"])
+    if "__tuple__" in value:
+        return tuple(from_wire(v) for v in value["__tuple__"])
+    if "__items__" in value:
+        return {from_wire(k): from_wire(v) for k, v in value["__items__"]}
+    return value
+
+
+def evaluate_numeric(expr: sp.Expr, values: Dict[str, Any]) -> float:
+    """
+    Substitute variable values into an expression and evaluate it.
+
+    Args:
+        expr: Expression to evaluate
+        values: Mapping from variable names to values
+
+    Returns:
+        Numeric value
+    """
+    for var_name, value in values.items():
+        expr = expr.subs(sp.Symbol(var_name), value)
+    return float(expr.evalf())
+
+
+# Operations that are not plain SymPy functions
+CUSTOM_OPERATIONS = {
+    "evaluate": evaluate_numeric
+}
+
+
+def run_operation(operation: str, args: Tuple = (), kwargs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Run a named SymPy operation.
+
+    Args:
+        operation: Name of a SymPy function or of a custom operation
+        args: Positional arguments
+        kwargs: Keyword arguments
+
+    Returns:
+        Dictionary with ``success`` and either ``result`` or ``error``
+    """
+    func = CUSTOM_OPERATIONS.get(operation) or getattr(sp, operation, None)
+    if not callable(func):
+        return {"success": False, "error": f"Invalid operation: {operation}"}
+
+    try:
+        return {"success": True, "result": func(*args, **(kwargs or {}))}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+def run_wire_task(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run a task whose arguments and result are in wire format.
+
+    Args:
+        task: Dictionary with ``operation``, ``args`` and ``kwargs``
+
+    Returns:
+        Outcome dictionary with the result in wire format
+    """
+    try:
+        args = from_wire(task.get("args", []))
+        kwargs = from_wire(task.get("kwargs", {}))
+    except Exception as e:
+        return {"success": False, "error": f"Invalid task arguments: {e}"}
+
+    outcome = run_operation(task["operation"], args, kwargs)
+    if outcome["success"]:
+        try:
+            outcome["result"] = to_wire(outcome["result"])
+        except Exception as e:
+            return {"success": False, "error": f"Unencodable result: {e}"}
+    return outcome
+
+
+def warm_worker():
+    """Exercise common SymPy paths so the first real task runs at full speed."""
+    x = sp.Symbol("x")
+    sp.integrate(sp.sin(x) * sp.exp(x), x)
+    sp.solve(x ** 2 - 1, x)
+    sp.simplify(sp.cos(x) ** 2 + sp.sin(x) ** 2)
+    sp.sympify(sp.srepr(x + 1))
+
+
+def worker_main(conn):
+    """
+    Entry point of a worker process.
+
+    Args:
+        conn: Worker end of the pipe to the pool
+    """
+    warm_worker()
+    conn.send(_READY)
+
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            break
+        if task is None:
+            break
+        conn.send(run_wire_task(task))
+
+
+class _Worker:
+    """Handle on one worker process and its pipe."""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+
+    def wait_ready(self):
+        """Block until the worker has finished warming up."""
+        if not self.ready:
+            if self.conn.recv() != _READY:
+                raise RuntimeError("Worker sent an unexpected handshake")
+            self.ready = True
+
+    def stop(self, timeout: float = 1.0):
+        """Ask the worker to exit, killing it if it does not."""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.kill()
+        self.conn.close()
+
+    def kill(self):
+        """Terminate the worker immediately."""
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class SympyProcessPool:
+    """
+    Pool of pre-warmed worker processes for SymPy operations.
+
+    Each worker runs one task at a time. A driver thread per worker sends the
+    task and waits for the reply; when a task exceeds its timeout, or the
+    worker dies, the worker is killed and replaced.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None,
+                 task_timeout: Optional[float] = None,
+                 start_method: Optional[str] = None):
+        """
+        Initialize the pool and start its workers.
+
+        Args:
+            max_workers: Number of worker processes (defaults to the CPU count)
+            task_timeout: Default per-task timeout in seconds (None for no limit)
+            start_method: Multiprocessing start method (platform default if None)
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.task_timeout = task_timeout
+        self._context = multiprocessing.get_context(start_method)
+
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        for _ in range(self.max_workers):
+            self._idle.put(_Worker(self._context))
+
+        self._drivers = ThreadPoolExecutor(max_workers=self.max_workers,
+                                           thread_name_prefix="sympy-pool")
+        self._stats_lock = threading.Lock()
+        self._closed = False
+
+        self.stats = {
+            "tasks": 0,
+            "failures": 0,
+            "timeouts": 0,
+            "restarts": 0
+        }
+
+        logger.info(f"Started SymPy process pool with {self.max_workers} workers")
+
+    def submit(self, operation: str, *args, timeout: Optional[float] = None, **kwargs) -> Future:
+        """
+        Submit an operation to the pool.
+
+        Args:
+            operation: Name of a SymPy function or custom operation
+            *args: Positional arguments for the operation
+            timeout: Per-task timeout in seconds (pool default if None)
+            **kwargs: Keyword arguments for the operation
+
+        Returns:
+            Future resolving to an outcome dictionary with ``success`` and
+            either ``result`` or ``error``
+        """
+        if self._closed:
+            raise RuntimeError("SymPy process pool is shut down")
+
+        task = {"operation": operation, "args": to_wire(list(args)), "kwargs": to_wire(kwargs)}
+        timeout = timeout if timeout is not None else self.task_timeout
+        return self._drivers.submit(self._run, task, timeout)
+
+    def run_many(self, tasks: List[Tuple[str, Tuple, Dict[str, Any]]],
+                 timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Run several operations and wait for all of them.
+
+        Args:
+            tasks: List of (operation, args, kwargs) tuples
+            timeout: Per-task timeout in seconds (pool default if None)
+
+        Returns:
+            Outcome dictionaries in task order
+        """
+        futures = [self.submit(operation, *args, timeout=timeout, **kwargs)
+                   for operation, args, kwargs in tasks]
+        return [future.result() for future in futures]
+
+    def _run(self, task: Dict[str, Any], timeout: Optional[float]) -> Dict[str, Any]:
+        """Run one task on an idle worker. Executes on a driver thread."""
+        worker = self._idle.get()
+        healthy = False
+        start = time.monotonic()
+
+        try:
+            worker.wait_ready()
+            worker.conn.send(task)
+
+            if worker.conn.poll(timeout):
+                outcome = worker.conn.recv()
+                healthy = True
+            else:
+                self._count("timeouts")
+                outcome = {
+                    "success": False,
+                    "error": f"Computation timed out after {timeout}s",
+                    "timeout": True
+                }
+        except (EOFError, OSError) as e:
+            outcome = {"success": False, "error": f"Worker process failed: {e}"}
+        finally:
+            if not healthy:
+                # Kill runaway or dead workers and start a fresh one
+                worker.kill()
+                self._count("restarts")
+                worker = _Worker(self._context)
+            self._idle.put(worker)
+
+        self._count("tasks")
+        if not outcome["success"]:
+            self._count("failures")
+        else:
+            outcome["result"] = from_wire(outcome["result"])
+        outcome["duration"] = time.monotonic() - start
+        return outcome
+
+    def _count(self, name: str):
+        """Increment a statistics counter."""
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def shutdown(self):
+        """Stop all workers after running tasks finish."""
+        if self._closed:
+            return
+        self._closed = True
+        self._drivers.shutdown(wait=True)
+
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            worker.stop()
+
+        logger.info("SymPy process pool shut down")
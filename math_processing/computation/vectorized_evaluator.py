@@ -0,0 +1,253 @@
+"""
+Vectorized numerical evaluation of SymPy expressions.
+
+Expressions are compiled once with ``lambdify`` to NumPy functions, cached by
+their structural representation, and evaluated over whole batches of points
+as arrays. This makes sampling-based checks (equivalence, verification) cheap
+enough to use hundreds of points.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence, Union
+
+import numpy as np
+import sympy as sp
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_POINTS = 200
+DEFAULT_SAMPLE_RANGE = (-10.0, 10.0)
+
+ValueMap = Mapping[Union[str, sp.Symbol], Any]
+
+
+class CompiledExpression:
+    """A SymPy expression compiled to a NumPy function of ordered symbols."""
+
+    def __init__(self, expr: sp.Expr, symbols: Sequence[sp.Symbol]):
+        """
+        Compile an expression.
+
+        Args:
+            expr: Expression to compile
+            symbols: Arguments of the compiled function, in order
+        """
+        self.expr = expr
+        self.symbols = tuple(symbols)
+        self.names = tuple(str(symbol) for symbol in self.symbols)
+        self.vectorized = True
+
+        try:
+            self._func = sp.lambdify(self.symbols, expr, modules="numpy")
+        except Exception as e:
+            # Functions NumPy cannot express fall back to mpmath per point
+            logger.debug(f"NumPy lambdify failed for {expr}, using mpmath: {e}")
+            self._use_mpmath()
+
+    def _use_mpmath(self):
+        """Switch to element-wise evaluation through mpmath."""
+        scalar = sp.lambdify(self.symbols, self.expr, modules="mpmath")
+
+        def evaluate_point(*args):
+            try:
+                value = complex(scalar(*args))
+            except Exception:
+                return np.nan
+            return value.real if abs(value.imag) <= 1e-12 * max(1.0, abs(value.real)) else np.nan
+
+        self._func = np.frompyfunc(evaluate_point, len(self.symbols), 1)
+        self.vectorized = False
+
+    def __call__(self, values: ValueMap) -> np.ndarray:
+        """
+        Evaluate at one point or a batch of points.
+
+        Args:
+            values: Mapping from symbols (or their names) to scalars or
+                equally shaped arrays
+
+        Returns:
+            Float array broadcast to the shape of the inputs; points where
+            the expression is undefined or not real are NaN
+        """
+        by_name = {str(key): value for key, value in values.items()}
+        args = [np.asarray(by_name[name], dtype=float) for name in self.names]
+        shape = np.broadcast_shapes(*(np.shape(value) for value in by_name.values()))
+
+        with np.errstate(all="ignore"):
+            try:
+                result = self._func(*args)
+            except (TypeError, NameError, AttributeError, ValueError):
+                if not self.vectorized:
+                    raise
+                self._use_mpmath()
+                result = self._func(*args)
+
+            result = np.asarray(result)
+            if np.iscomplexobj(result):
+                real = np.abs(result.imag) <= 1e-12 * np.maximum(1.0, np.abs(result.real))
+                result = np.where(real, result.real, np.nan)
+            result = result.astype(float)
+
+        return np.broadcast_to(result, shape).copy() if result.shape != shape else result
+
+
+class VectorizedEvaluator:
+    """Compiles, caches and evaluates expressions over point batches."""
+
+    def __init__(self, max_entries: int = 512):
+        """
+        Initialize the evaluator.
+
+        Args:
+            max_entries: Maximum number of compiled expressions to keep
+        """
+        self.max_entries = max_entries
+        self._compiled: "OrderedDict[str, CompiledExpression]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"compilations": 0, "hits": 0}
+
+    def compile(self, expr: sp.Expr, symbols: Optional[Sequence[sp.Symbol]] = None) -> CompiledExpression:
+        """
+        Get the compiled form of an expression, compiling it at most once.
+
+        Args:
+            expr: Expression to compile
+            symbols: Argument order (defaults to free symbols sorted by name)
+
+        Returns:
+            Compiled expression
+        """
+        expr = sp.sympify(expr)
+        if symbols is None:
+            symbols = sorted(expr.free_symbols, key=str)
+
+        # srepr is structural: it distinguishes assumptions and argument
+        # order that printing hides
+        key = sp.srepr(expr) + "|" + "|".join(sp.srepr(symbol) for symbol in symbols)
+
+        with self._lock:
+            compiled = self._compiled.get(key)
+            if compiled is not None:
+                self._compiled.move_to_end(key)
+                self.stats["hits"] += 1
+                return compiled
+
+        compiled = CompiledExpression(expr, symbols)
+
+        with self._lock:
+            self._compiled[key] = compiled
+            self.stats["compilations"] += 1
+            while len(self._compiled) > self.max_entries:
+                self._compiled.popitem(last=False)
+
+        return compiled
+
+    def evaluate(self, expr: sp.Expr, values: ValueMap) -> np.ndarray:
+        """
+        Evaluate an expression at one point or a batch of points.
+
+        Args:
+            expr: Expression to evaluate
+            values: Mapping from symbols (or names) to scalars or arrays
+
+        Returns:
+            Float array of results
+        """
+        expr = sp.sympify(expr)
+        symbols = sorted(expr.free_symbols, key=str)
+        return self.compile(expr, symbols)(values)
+
+    @staticmethod
+    def sample_points(symbols: Iterable[sp.Symbol], n_points: int = DEFAULT_SAMPLE_POINTS,
+                      low: float = DEFAULT_SAMPLE_RANGE[0], high: float = DEFAULT_SAMPLE_RANGE[1],
+                      seed: Optional[int] = None) -> Dict[sp.Symbol, np.ndarray]:
+        """
+        Draw uniform random sample points.
+
+        Args:
+            symbols: Variables to sample
+            n_points: Number of points
+            low: Lower bound of the sampling interval
+            high: Upper bound of the sampling interval
+            seed: Optional random seed
+
+        Returns:
+            Mapping from each symbol to an array of sampled values
+        """
+        rng = np.random.default_rng(seed)
+        return {symbol: rng.uniform(low, high, n_points)
+                for symbol in sorted(symbols, key=str)}
+
+    def compare(self, expr1: sp.Expr, expr2: sp.Expr,
+                n_points: int = DEFAULT_SAMPLE_POINTS,
+                tolerance: float = 1e-10,
+                relative_tolerance: float = 1e-9,
+                points: Optional[Dict[sp.Symbol, np.ndarray]] = None) -> Dict[str, Any]:
+        """
+        Compare two expressions at random sample points.
+
+        Points where either expression is undefined or not real are skipped.
+
+        Args:
+            expr1: First expression
+            expr2: Second expression
+            n_points: Number of sample points
+            tolerance: Absolute tolerance
+            relative_tolerance: Relative tolerance, for large values
+            points: Sample points to use instead of random ones
+
+        Returns:
+            Dictionary with the evaluated values, a boolean ``matches`` array
+            and a boolean ``valid`` array
+        """
+        expr1 = sp.sympify(expr1)
+        expr2 = sp.sympify(expr2)
+        symbols = sorted(expr1.free_symbols | expr2.free_symbols, key=str)
+        if points is None:
+            points = self.sample_points(symbols, n_points)
+        elif points:
+            n_points = len(next(iter(points.values())))
+
+        values1 = np.broadcast_to(self.compile(expr1, symbols)(points), (n_points,))
+        values2 = np.broadcast_to(self.compile(expr2, symbols)(points), (n_points,))
+
+        valid = np.isfinite(values1) & np.isfinite(values2)
+        matches = valid & np.isclose(values1, values2, rtol=relative_tolerance, atol=tolerance)
+
+        return {
+            "symbols": symbols,
+            "points": points,
+            "values1": values1,
+            "values2": values2,
+            "valid": valid,
+            "matches": matches
+        }
+
+    def clear(self):
+        """Drop all compiled expressions."""
+        with self._lock:
+            self._compiled.clear()
+
+    def __len__(self) -> int:
+        return len(self._compiled)
+
+
+_evaluator: Optional[VectorizedEvaluator] = None
+_evaluator_lock = threading.Lock()
+
+
+def get_vectorized_evaluator() -> VectorizedEvaluator:
+    """
+    Get the shared evaluator, creating it on first use.
+
+    Returns:
+        Process-wide VectorizedEvaluator
+    """
+    global _evaluator
+    if _evaluator is None:
+        with _evaluator_lock:
+            if _evaluator is None:
+                _evaluator = VectorizedEvaluator()
+    return _evaluator
@@ -6,16 +6,25 @@ to determine if they are equivalent, regardless of their specific form.
 """
 
 import sympy as sp
+import numpy as np
 from typing import Dict, Union, Any, Tuple, List
-import random
+
+from math_processing.computation.vectorized_evaluator import (
+    DEFAULT_SAMPLE_POINTS, get_vectorized_evaluator
+)
 
 
 class ExpressionComparator:
     """Comparator for mathematical expressions."""
     
-    def __init__(self):
-        """Initialize the expression comparator."""
-        pass
+    def __init__(self, n_points: int = DEFAULT_SAMPLE_POINTS):
+        """
+        Initialize the expression comparator.
+        
+        Args:
+            n_points: Number of random points for numerical comparison
+        """
+        self.n_points = n_points
     
     def is_equivalent(self, 
                      expr1: Union[sp.Expr, sp.Eq], 
@@ -138,39 +147,37 @@ class ExpressionComparator:
         if not all_symbols:
             return self._symbolic_comparison(expr1, expr2)
         
-        # Test at multiple random points
-        n_points = 5
-        for _ in range(n_points):
-            # Generate random values for all symbols
-            test_point = {sym: random.uniform(-10, 10) for sym in all_symbols}
+        # Evaluate both sides at a batch of random points at once
+        evaluator = get_vectorized_evaluator()
+        points = evaluator.sample_points(all_symbols, self.n_points)
+        
+        if isinstance(expr1, sp.Eq) and isinstance(expr2, sp.Eq):
+            # For equations, check if both are satisfied or not satisfied
+            residual1 = evaluator.compare(expr1.lhs, expr1.rhs, n_points=self.n_points, points=points)
+            residual2 = evaluator.compare(expr2.lhs, expr2.rhs, n_points=self.n_points, points=points)
             
-            try:
-                # Evaluate both expressions at the test point
-                if isinstance(expr1, sp.Eq) and isinstance(expr2, sp.Eq):
-                    # For equations, check if both are satisfied or not satisfied
-                    expr1_lhs_val = float(expr1.lhs.subs(test_point))
-                    expr1_rhs_val = float(expr1.rhs.subs(test_point))
-                    expr2_lhs_val = float(expr2.lhs.subs(test_point))
-                    expr2_rhs_val = float(expr2.rhs.subs(test_point))
-                    
-                    expr1_satisfied = abs(expr1_lhs_val - expr1_rhs_val) < 1e-10
-                    expr2_satisfied = abs(expr2_lhs_val - expr2_rhs_val) < 1e-10
-                    
-                    if expr1_satisfied != expr2_satisfied:
-                        return False, f"The equations differ at point {test_point}"
-                else:
-                    # For expressions, check if their values are equal
-                    expr1_val = float(expr1.subs(test_point))
-                    expr2_val = float(expr2.subs(test_point))
-                    
-                    if abs(expr1_val - expr2_val) > 1e-10:
-                        return False, f"The expressions differ at point {test_point}"
-            except:
-                # Skip points where evaluation fails (e.g., division by zero)
-                continue
+            # Skip points where evaluation fails (e.g., division by zero)
+            valid = residual1["valid"] & residual2["valid"]
+            differs = valid & (residual1["matches"] != residual2["matches"])
+            if differs.any():
+                return False, f"The equations differ at point {self._point_at(points, differs)}"
+        else:
+            # For expressions, check if their values are equal
+            comparison = evaluator.compare(expr1, expr2, n_points=self.n_points, points=points)
+            
+            # Skip points where evaluation fails (e.g., division by zero)
+            differs = comparison["valid"] & ~comparison["matches"]
+            if differs.any():
+                return False, f"The expressions differ at point {self._point_at(points, differs)}"
         
         return True, "The expressions are numerically equivalent at all tested points"
     
+    @staticmethod
+    def _point_at(points: Dict[sp.Symbol, np.ndarray], mask: np.ndarray) -> Dict[sp.Symbol, float]:
+        """Get the first sample point selected by a mask."""
+        index = int(np.argmax(mask))
+        return {sym: float(values[index]) for sym, values in points.items()}
+    
     def _simplify_comparison(self, 
                            expr1: Union[sp.Expr, sp.Eq], 
                            expr2: Union[sp.Expr, sp.Eq]) -> Tuple[bool, str]:
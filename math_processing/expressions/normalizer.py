@@ -5,9 +5,29 @@ This module provides normalization functionality for mathematical expressions,
 ensuring consistent representation regardless of how they were initially written.
 """
 
+import re
+import unicodedata
+from functools import lru_cache
+
 import sympy as sp
+from sympy.parsing.sympy_parser import (
+    parse_expr, standard_transformations, implicit_multiplication_application, convert_xor
+)
 from typing import Dict, Union, Any, Optional
 
+_WHITESPACE = re.compile(r"\s+")
+_OPERATOR_SPACING = re.compile(r"\s*([-+*/^=(),])\s*")
+_WORD = re.compile(r"[A-Za-z]{2,}")
+_EXPRESSION = re.compile(r"[A-Za-z0-9. +\-*/^(),]+")
+
+# Words that may appear in a query that is purely an expression
+_FUNCTION_NAMES = {
+    "sin", "cos", "tan", "cot", "sec", "csc", "asin", "acos", "atan",
+    "sinh", "cosh", "tanh", "exp", "log", "ln", "sqrt", "abs", "pi"
+}
+
+_TRANSFORMATIONS = standard_transformations + (implicit_multiplication_application, convert_xor)
+
 
 class ExpressionNormalizer:
     """Normalizer for mathematical expressions."""
@@ -167,3 +187,35 @@ def normalize_expression(
     """
     normalizer = ExpressionNormalizer()
     return normalizer.normalize(expr, domain)
+
+
+@lru_cache(maxsize=4096)
+def normalize_query(query: str) -> str:
+    """
+    Normalize query text so that equivalent queries compare equal.
+    
+    Whitespace, operator spacing and trailing punctuation are standardized.
+    A query that is purely an expression is parsed without evaluation and
+    keyed on its expression tree, so that for example "x^2 + 2x" and
+    "2*x + x**2" give the same result while "2(x+1)" and "2x+2", which are
+    different questions, do not. Case is preserved, since it is significant
+    in mathematical notation.
+    
+    Args:
+        query: Query text
+        
+    Returns:
+        Normalized query text
+    """
+    text = unicodedata.normalize("NFKC", query)
+    text = _WHITESPACE.sub(" ", text).strip().rstrip("?.!").strip()
+    text = _OPERATOR_SPACING.sub(r"\1", text.replace("**", "^"))
+    
+    # Only plain expressions are parsed; parse_expr must never see arbitrary text
+    if _EXPRESSION.fullmatch(text) and all(word in _FUNCTION_NAMES for word in _WORD.findall(text)):
+        try:
+            return sp.srepr(parse_expr(text, transformations=_TRANSFORMATIONS, evaluate=False))
+        except Exception:
+            pass
+            
+    return text
@@ -12,6 +12,10 @@ import logging
 from typing import Dict, List, Any, Optional, Tuple, Union, Callable
 import math
 
+from math_processing.computation.vectorized_evaluator import (
+    DEFAULT_SAMPLE_POINTS, get_vectorized_evaluator
+)
+
 logger = logging.getLogger(__name__)
 
 class VerificationResult:
@@ -68,6 +72,8 @@ class SolutionVerifier:
     def __init__(self):
         """Initialize the solution verifier."""
         self.tolerance = 1e-10  # Numerical comparison tolerance
+        self.num_sample_points = DEFAULT_SAMPLE_POINTS  # Points for numerical checks
+        self.max_reported_mismatches = 5  # Mismatching points listed in details
     
     def verify_solution(
         self,
@@ -321,58 +327,53 @@ class SolutionVerifier:
                         error_message=None if is_correct else "Numerical values do not match within tolerance"
                     )
                 
-                # For expressions with variables, sample values and compare
-                # This is a simplified approach - in practice, we'd need more
-                # sophisticated sampling strategies
+                # For expressions with variables, evaluate both at a batch of
+                # random points; each expression is compiled once and reused
                 else:
-                    # Define test points
-                    num_points = 5
-                    test_points = []
-                    for _ in range(num_points):
-                        point = {}
-                        for var in variables:
-                            # Sample values in [-10, 10]
-                            point[var] = np.random.uniform(-10, 10)
-                        test_points.append(point)
+                    num_points = self.num_sample_points
+                    comparison = get_vectorized_evaluator().compare(
+                        problem_expr, solution_expr,
+                        n_points=num_points,
+                        tolerance=self.tolerance
+                    )
                     
-                    # Evaluate expressions at test points
-                    matches = 0
-                    mismatches = []
+                    # Points where either expression is undefined are skipped
+                    valid = comparison["valid"]
+                    matching = comparison["matches"]
+                    failing = valid & ~matching
+                    matches = int(matching.sum())
+                    evaluated = int(valid.sum())
                     
-                    for point in test_points:
-                        try:
-                            # Substitute values and evaluate
-                            problem_value = float(problem_expr.subs(point).evalf())
-                            solution_value = float(solution_expr.subs(point).evalf())
-                            
-                            # Check if values match within tolerance
-                            if abs(problem_value - solution_value) < self.tolerance:
-                                matches += 1
-                            else:
-                                mismatches.append({
-                                    "point": {str(var): val for var, val in point.items()},
-                                    "problem_value": problem_value,
-                                    "solution_value": solution_value,
-                                    "difference": abs(problem_value - solution_value)
-                                })
-                        except Exception as e:
-                            # Skip points that cause evaluation errors
-                            logger.warning(f"Error evaluating at point {point}: {e}")
+                    mismatches = []
+                    for index in np.flatnonzero(failing)[:self.max_reported_mismatches]:
+                        problem_value = float(comparison["values1"][index])
+                        solution_value = float(comparison["values2"][index])
+                        mismatches.append({
+                            "point": {str(var): float(values[index])
+                                      for var, values in comparison["points"].items()},
+                            "problem_value": problem_value,
+                            "solution_value": solution_value,
+                            "difference": abs(problem_value - solution_value)
+                        })
                     
                     # Check if all evaluated points match
-                    is_correct = matches == num_points
-                    confidence_score = matches / num_points
+                    is_correct = evaluated > 0 and matches == evaluated
+                    confidence_score = matches / evaluated if evaluated else 0.0
                     
                     return VerificationResult(
                         is_correct=is_correct,
                         verification_method="numerical",
                         details={
                             "total_points": num_points,
+                            "evaluated_points": evaluated,
                             "matching_points": matches,
                             "mismatches": mismatches
                         },
                         confidence_score=confidence_score,
-                        error_message=None if is_correct else f"{num_points - matches} of {num_points} test points failed"
+                        error_message=None if is_correct else (
+                            f"{evaluated - matches} of {evaluated} test points failed"
+                            if evaluated else "Expressions could not be evaluated at any test point"
+                        )
                     )
             
             # Special handling for equation solutions
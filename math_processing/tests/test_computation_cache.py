@@ -0,0 +1,420 @@
+"""
+Tests for the two-tier computation cache.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import sympy as sp
+from math_processing.computation.computation_cache import (
+    ComputationCache, PickleSerializer, SympySerializer, cached_computation,
+    default_serializer
+)
+
+
+class Decimalish:
+    """Value type the SymPy serializer does not know."""
+
+    def __eq__(self, other):
+        return isinstance(other, Decimalish)
+
+
+class FakeRedis:
+    """In-memory stand-in for the subset of the Redis client the cache uses."""
+
+    def __init__(self):
+        self.store = {}
+        self.expiry = {}
+        self.gets = 0
+
+    def get(self, key):
+        self.gets += 1
+        if key in self.expiry and self.expiry[key] <= time.time():
+            self.delete(key)
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+        self.expiry[key] = time.time() + ttl
+        return True
+
+    def ttl(self, key):
+        if key not in self.expiry:
+            return -2
+        return max(int(self.expiry[key] - time.time()), 0)
+
+    def delete(self, key):
+        self.expiry.pop(key, None)
+        return 1 if self.store.pop(key, None) is not None else 0
+
+    def keys(self, pattern):
+        prefix = pattern.rstrip("*")
+        return [key for key in self.store if key.startswith(prefix)]
+
+    def ping(self):
+        return True
+
+    def close(self):
+        pass
+
+
+class TestComputationCache:
+    """Test the local LRU tier, the Redis tier and key derivation."""
+
+    def setup_method(self):
+        """Set up a fresh cache backed by a fake Redis."""
+        ComputationCache._instance = None
+        self.redis = FakeRedis()
+        self.cache = ComputationCache(
+            redis_client=self.redis,
+            max_local_cache_size=3,
+            max_local_cache_bytes=10_000
+        )
+
+    def teardown_method(self):
+        """Drop the singleton so other tests get their own instance."""
+        ComputationCache._instance = None
+
+    def test_lru_evicts_least_recently_used(self):
+        """Reading an entry protects it from the next eviction."""
+        for name in ("a", "b", "c"):
+            self.cache.set(name, name.upper())
+
+        assert self.cache.get("a") == (True, "A")
+        self.cache.set("d", "D")
+
+        assert list(self.cache.local_cache) == ["c", "a", "d"]
+        assert self.cache.metrics["evictions"] == 1
+
+    def test_byte_budget_is_enforced(self):
+        """Entries are evicted until the serialized size fits the budget."""
+        self.cache.max_local_cache_size = 100
+        for i in range(5):
+            self.cache.set(f"k{i}", "x" * 3000)
+
+        assert self.cache.local_cache_bytes <= self.cache.max_local_cache_bytes
+        assert len(self.cache.local_cache) == 3
+        assert self.cache.local_cache_bytes == sum(
+            size for _, size, _ in self.cache.local_cache.values()
+        )
+
+    def test_oversized_values_stay_in_redis(self):
+        """A value larger than the whole budget skips the local tier."""
+        self.cache.set("big", "x" * 20_000)
+
+        assert "big" not in self.cache.local_cache
+        assert self.cache.get("big") == (True, "x" * 20_000)
+        assert self.cache.metrics["redis_hits"] == 1
+
+    def test_per_entry_ttl_expires_locally(self):
+        """An expired local entry is dropped and reloaded from Redis."""
+        self.cache.set("short", 1, ttl=60)
+        value, size, _ = self.cache.local_cache["short"]
+        self.cache.local_cache["short"] = (value, size, time.time() - 1)
+
+        assert self.cache.get("short") == (True, 1)
+        assert self.cache.metrics["expirations"] == 1
+        assert self.cache.metrics["redis_hits"] == 1
+
+    def test_redis_tier_round_trips_sympy(self):
+        """SymPy results survive the Redis tier without pickle."""
+        x = sp.Symbol("x")
+        result = {"solutions": [sp.sqrt(2), -sp.sqrt(2)], "expr": sp.sin(x) ** 2, "n": 2}
+        self.cache.set("solve", result)
+        self.cache.local_cache.clear()
+        self.cache.local_cache_bytes = 0
+
+        hit, value = self.cache.get("solve")
+
+        assert hit
+        assert value == result
+        assert b"Pow" in self.redis.store["solve"]
+
+    def test_structurally_equal_expressions_share_a_key(self):
+        """Keys follow expression structure, not how an argument was built."""
+        x, y = sp.symbols("x y")
+        key_a = self.cache._generate_key("integrate", (x + y,), {})
+        key_b = self.cache._generate_key("integrate", (sp.Add(y, x),), {})
+        key_c = self.cache._generate_key("integrate", (x - y,), {})
+
+        assert key_a == key_b
+        assert key_a != key_c
+        assert key_a.startswith("math:computation:")
+
+    def test_same_printing_different_structure_does_not_collide(self):
+        """Symbols with different assumptions print alike but get distinct keys."""
+        plain = sp.Symbol("x")
+        positive = sp.Symbol("x", positive=True)
+
+        assert str(plain) == str(positive)
+        assert (self.cache._generate_key("f", (plain,), {})
+                != self.cache._generate_key("f", (positive,), {}))
+
+    def test_set_cache_size_shrinks_local_tier(self):
+        """Lowering the entry limit evicts immediately."""
+        for name in ("a", "b", "c"):
+            self.cache.set(name, 1)
+
+        self.cache.set_cache_size(1)
+
+        assert list(self.cache.local_cache) == ["c"]
+
+    def test_local_hit_latency(self):
+        """Local hits avoid Redis and stay well under a millisecond."""
+        x = sp.Symbol("x")
+        self.cache.set("hot", sp.integrate(sp.sin(x) * sp.exp(x), x))
+        gets_before = self.redis.gets
+
+        iterations = 2000
+        start = time.perf_counter()
+        for _ in range(iterations):
+            hit, _ = self.cache.get("hot")
+        per_hit = (time.perf_counter() - start) / iterations
+
+        assert hit
+        assert self.redis.gets == gets_before
+        assert per_hit < 1e-3
+
+
+class TestSerializers:
+    """Test the pluggable cache serializers."""
+
+    def test_sympy_serializer_rejects_arbitrary_objects(self):
+        """Unknown types raise instead of being pickled."""
+        with pytest.raises(TypeError):
+            SympySerializer().dumps(object())
+
+    def test_pickle_is_opt_in(self):
+        """Pickle is neither written nor read unless allowed."""
+        value = {1: Decimalish()}
+        pickled = default_serializer(allow_pickle=True).dumps(value)
+
+        with pytest.raises(TypeError):
+            default_serializer().dumps(value)
+        with pytest.raises(ValueError):
+            default_serializer().loads(pickled)
+        assert isinstance(default_serializer(allow_pickle=True).loads(pickled)[1], Decimalish)
+
+    def test_srepr_is_not_evaluated(self):
+        """Cached expressions naming anything but SymPy classes are refused."""
+        serializer = SympySerializer()
+        x = sp.Symbol("x", positive=True)
+        value = [sp.Piecewise((sp.sin(x), x > 1), (0, True)), {frozenset({1, 2}), (3,)}]
+
+        assert serializer.loads(serializer.dumps(value)) == value
+        for payload in ("__import__('os').system('true')", "Symbol('x').__class__", "sympify('x')"):
+            with pytest.raises(ValueError):
+                serializer.loads(b"j" + json.dumps({"__sympy__": payload}).encode("utf-8"))
+
+    def test_srepr_string_arguments_are_not_sympified(self):
+        """String arguments that SymPy would sympify never reach it."""
+        payload = "sin(\"__import__('os').system('echo PWNED')\")"
+        serializer = SympySerializer()
+
+        for text in (payload, "Integer('2')", "Float('1+1')", "Function('f')('x')"):
+            with pytest.raises(ValueError):
+                serializer.loads(b"j" + json.dumps({"__sympy__": text}).encode("utf-8"))
+
+    def test_srepr_round_trips(self):
+        """Expressions with named, numeric and nested arguments are rebuilt exactly."""
+        x = sp.Symbol("x", real=True)
+        f = sp.Function("f")
+        values = [
+            sp.Float("-2.5e-3") * x, sp.Rational(-1, 3) + sp.pi, sp.Derivative(f(x), x),
+            sp.Integral(sp.sin(x), (x, 0, sp.oo)), sp.Interval(0, 1, True, False),
+            sp.MatrixSymbol("A", 2, 2), sp.ImmutableMatrix([[1, x]]), sp.Lambda(x, x ** 2),
+        ]
+        serializer = SympySerializer()
+
+        assert serializer.loads(serializer.dumps(values)) == values
+
+    def test_non_string_dict_keys_and_tuples(self):
+        """Dicts keyed by SymPy objects and tuples keep their types."""
+        x = sp.Symbol("x")
+        value = {x: (1, 2.5, "a"), "k": None}
+        serializer = SympySerializer()
+
+        assert serializer.loads(serializer.dumps(value)) == value
+
+    def test_pickle_serializer_round_trip(self):
+        """The legacy pickle serializer remains available."""
+        serializer = PickleSerializer()
+        assert serializer.loads(serializer.dumps([1, "two"])) == [1, "two"]
+
+
+class TestCachedComputation:
+    """Test single-flight execution and negative caching in the decorator."""
+
+    def setup_method(self):
+        """Set up a fresh cache backed by a fake Redis."""
+        ComputationCache._instance = None
+        self.cache = ComputationCache(redis_client=FakeRedis())
+
+    def teardown_method(self):
+        """Drop the singleton so other tests get their own instance."""
+        ComputationCache._instance = None
+
+    def test_concurrent_threads_compute_once(self):
+        """Threads asking for the same result share one computation."""
+        calls = []
+        release = threading.Event()
+
+        @cached_computation(ttl=60)
+        def slow_integral(expr):
+            calls.append(expr)
+            release.wait(2)
+            return sp.integrate(expr, sp.Symbol("x"))
+
+        x = sp.Symbol("x")
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [executor.submit(slow_integral, x ** 2) for _ in range(8)]
+            while self.cache.metrics["coalesced"] < 7:
+                time.sleep(0.001)
+            release.set()
+            results = [future.result(timeout=5) for future in futures]
+
+        assert len(calls) == 1
+        assert all(result == x ** 3 / 3 for result in results)
+
+    def test_concurrent_tasks_compute_once(self):
+        """Coroutines asking for the same result share one computation."""
+        calls = []
+
+        @cached_computation(ttl=60)
+        async def slow_solve(expr):
+            calls.append(expr)
+            await asyncio.sleep(0.01)
+            return sp.solve(expr)
+
+        async def run():
+            x = sp.Symbol("x")
+            return await asyncio.gather(*[slow_solve(x ** 2 - 4) for _ in range(10)])
+
+        results = asyncio.run(run())
+
+        assert len(calls) == 1
+        assert all(result == [-2, 2] for result in results)
+        assert self.cache.metrics["coalesced"] == 9
+
+    def test_waiters_receive_the_failure(self):
+        """Callers waiting on a failing computation get its exception."""
+        calls = []
+
+        @cached_computation(ttl=60)
+        async def failing(value):
+            calls.append(value)
+            await asyncio.sleep(0.01)
+            raise TimeoutError("took too long")
+
+        async def run():
+            return await asyncio.gather(*[failing(1) for _ in range(5)],
+                                        return_exceptions=True)
+
+        results = asyncio.run(run())
+
+        assert len(calls) == 1
+        assert all(isinstance(result, TimeoutError) for result in results)
+        assert len({id(result) for result in results}) == len(results)
+
+    def test_thread_waiters_raise_their_own_exception(self):
+        """Threads waiting on a failing computation each raise a fresh copy."""
+        started = threading.Event()
+        release = threading.Event()
+
+        @cached_computation(ttl=60)
+        def failing(value):
+            started.set()
+            release.wait(5)
+            raise TimeoutError("took too long")
+
+        def call():
+            try:
+                failing(1)
+            except TimeoutError as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            first = pool.submit(call)
+            assert started.wait(5)
+            waiters = [pool.submit(call) for _ in range(3)]
+            while self.cache.metrics["coalesced"] < 3:
+                time.sleep(0.001)
+            release.set()
+            errors = [first.result(timeout=5)] + [future.result(timeout=5) for future in waiters]
+
+        assert all(str(error) == "took too long" for error in errors)
+        assert len({id(error) for error in errors}) == len(errors)
+        assert all(error.__cause__ is errors[0] for error in errors[1:])
+
+    def test_failures_are_cached_briefly(self):
+        """A failure is re-raised without recomputing until its TTL lapses."""
+        calls = []
+
+        @cached_computation(ttl=60, negative_ttl=30, negative_exceptions=(ValueError,))
+        def fragile(value):
+            calls.append(value)
+            raise ValueError("no closed form")
+
+        raised = []
+        for _ in range(3):
+            with pytest.raises(ValueError) as info:
+                fragile(1)
+            raised.append(info.value)
+        assert len(calls) == 1
+        assert self.cache.metrics["negative_hits"] == 2
+        assert len({id(error) for error in raised}) == 3
+
+        # Expire the negative entry
+        key = next(iter(self.cache.negative_cache))
+        error, _ = self.cache.negative_cache[key]
+        self.cache.negative_cache[key] = (error, time.time() - 1)
+
+        with pytest.raises(ValueError):
+            fragile(1)
+        assert len(calls) == 2
+
+    def test_only_timeouts_are_cached_by_default(self):
+        """Errors other than timeouts are retried on the next call."""
+        calls = []
+
+        @cached_computation(ttl=60)
+        def fragile(value):
+            calls.append(value)
+            raise ValueError("transient")
+
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                fragile(1)
+        assert len(calls) == 2
+        assert not self.cache.negative_cache
+
+    def test_negative_caching_can_be_disabled(self):
+        """With negative_ttl=None every call retries."""
+        calls = []
+
+        @cached_computation(negative_ttl=None)
+        def fragile(value):
+            calls.append(value)
+            raise ValueError("no closed form")
+
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                fragile(1)
+        assert len(calls) == 2
+
+    def test_recursive_call_does_not_deadlock(self):
+        """A cached function may call itself with the same arguments."""
+        calls = []
+
+        @cached_computation(ttl=60)
+        def recursive(n):
+            calls.append(n)
+            if len(calls) == 1:
+                return recursive(n) + 1
+            return n
+
+        assert recursive(5) == 6
@@ -0,0 +1,70 @@
+"""
+Tests for the mathematical domain classifier.
+"""
+
+import json
+
+from math_processing.classification.domain_classifier import MathDomainClassifier
+
+
+class TestMathDomainClassifier:
+    """Test the compiled keyword matching of the domain classifier."""
+    
+    def setup_method(self):
+        """Set up the test environment."""
+        self.classifier = MathDomainClassifier()
+    
+    def test_overlapping_keywords_all_count(self):
+        """Multi-word keywords and their parts are both counted."""
+        matches = self.classifier._match_keywords(
+            self.classifier._preprocess_query("Solve this linear equation")
+        )
+        
+        # "solve", "linear equation" and "equation" are all algebra keywords
+        assert matches["algebra"] == 3
+    
+    def test_keywords_shared_between_domains(self):
+        """A keyword listed under several domains scores for each of them."""
+        matches = self.classifier._match_keywords("factor 12")
+        
+        assert matches["algebra"] == 1
+        assert matches["number_theory"] == 1
+    
+    def test_whole_words_only(self):
+        """Keywords do not match inside longer words."""
+        matches = self.classifier._match_keywords("integrated circuits")
+        
+        assert matches["calculus"] == 0
+    
+    def test_classify_query(self):
+        """Queries are classified into the domain with most keyword matches."""
+        result = self.classifier.classify_query(
+            "Find the derivative and the limit of x^2", include_details=True
+        )
+        
+        assert result["primary_domain"] == "calculus"
+        assert result["domain_matches"]["calculus"] == 2
+    
+    def test_classify_queries_matches_single(self):
+        """Batch classification returns per-query results in order."""
+        queries = [
+            "Find the determinant of the matrix",
+            "Is 97 a prime number?",
+            "Find the determinant of the matrix",
+        ]
+        
+        results = self.classifier.classify_queries(queries)
+        
+        assert [r["primary_domain"] for r in results] == ["linear_algebra", "number_theory", "linear_algebra"]
+        assert results[0] == self.classifier.classify_query(queries[0])
+        assert results[0] is not results[2]
+    
+    def test_custom_keywords_are_compiled(self, tmp_path):
+        """Keywords loaded from a file take part in matching."""
+        path = tmp_path / "keywords.json"
+        path.write_text(json.dumps({"topology": ["homeomorphism", "open set"]}))
+        
+        classifier = MathDomainClassifier(custom_keywords_path=str(path))
+        result = classifier.classify_query("Show this map is a homeomorphism of an open set")
+        
+        assert result["primary_domain"] == "topology"
@@ -0,0 +1,94 @@
+"""
+Tests for the SymPy process pool.
+"""
+
+import pytest
+import sympy as sp
+from math_processing.computation.sympy_process_pool import (
+    SympyProcessPool, from_wire, run_operation, run_wire_task, to_wire
+)
+
+
+class TestWireFormat:
+    """Test the srepr-based transport encoding."""
+
+    def test_round_trip_preserves_structure(self):
+        """SymPy objects, tuples and symbol-keyed dicts survive encoding."""
+        x = sp.Symbol("x", positive=True)
+        value = [{x: sp.sqrt(2)}, (x, 0, sp.oo), "text", 3]
+
+        assert from_wire(to_wire(value)) == value
+        assert from_wire(to_wire(x)).is_positive
+
+    def test_wire_task_matches_direct_operation(self):
+        """Running a task through the wire format gives the direct result."""
+        x = sp.Symbol("x")
+        task = {"operation": "integrate", "args": to_wire([x * sp.exp(x), x]), "kwargs": {}}
+
+        outcome = run_wire_task(task)
+
+        assert outcome["success"]
+        assert from_wire(outcome["result"]) == run_operation("integrate", (x * sp.exp(x), x))["result"]
+
+    def test_unknown_operation_is_reported(self):
+        """Names that are not SymPy functions fail cleanly."""
+        outcome = run_operation("no_such_operation", (1,))
+
+        assert not outcome["success"]
+        assert "Invalid operation" in outcome["error"]
+
+
+class TestSympyProcessPool:
+    """Test the worker processes."""
+
+    def setup_method(self):
+        """Start a small pool."""
+        self.pool = SympyProcessPool(max_workers=2, task_timeout=2.0)
+
+    def teardown_method(self):
+        """Stop the pool."""
+        self.pool.shutdown()
+
+    def test_runs_operations_in_order(self):
+        """Results come back decoded and in task order."""
+        x = sp.Symbol("x")
+        outcomes = self.pool.run_many([
+            ("integrate", (sp.cos(x), x), {}),
+            ("diff", (x ** 3, x, 2), {}),
+            ("solve", (x ** 2 - 9, x), {"dict": True}),
+            ("evaluate", (x ** 2 + 1, {"x": 2}), {}),
+        ])
+
+        assert [o["success"] for o in outcomes] == [True] * 4
+        assert outcomes[0]["result"] == sp.sin(x)
+        assert outcomes[1]["result"] == 6 * x
+        assert outcomes[2]["result"] == [{x: -3}, {x: 3}]
+        assert outcomes[3]["result"] == 5.0
+
+    def test_errors_are_returned_not_raised(self):
+        """Exceptions inside a worker become failed outcomes."""
+        outcome = self.pool.submit("sympify", "1 +* 2").result()
+
+        assert not outcome["success"]
+        assert self.pool.stats["restarts"] == 0
+
+    def test_runaway_task_is_killed(self):
+        """A task over its timeout is abandoned and its worker replaced."""
+        semiprime = sp.nextprime(10 ** 30) * sp.nextprime(10 ** 31)
+
+        outcome = self.pool.submit("factorint", semiprime, timeout=0.5).result()
+
+        assert not outcome["success"]
+        assert outcome["timeout"]
+        assert self.pool.stats["restarts"] == 1
+
+        # The replacement worker serves later tasks
+        x = sp.Symbol("x")
+        assert self.pool.submit("expand", (x + 1) ** 2).result()["result"] == x ** 2 + 2 * x + 1
+
+    def test_submit_after_shutdown_raises(self):
+        """A closed pool rejects new work."""
+        self.pool.shutdown()
+
+        with pytest.raises(RuntimeError):
+            self.pool.submit("expand", 1)
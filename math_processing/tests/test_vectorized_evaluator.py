@@ -0,0 +1,135 @@
+"""
+Tests for the vectorized expression evaluator and its users.
+"""
+
+import time
+
+import numpy as np
+import sympy as sp
+from math_processing.computation.vectorized_evaluator import VectorizedEvaluator
+from math_processing.expressions.comparators import ExpressionComparator
+from math_processing.solutions.verifier import SolutionVerifier
+
+
+class TestVectorizedEvaluator:
+    """Test compilation caching and batch evaluation."""
+
+    def setup_method(self):
+        """Set up the test environment."""
+        self.evaluator = VectorizedEvaluator()
+        self.x, self.y = sp.symbols("x y")
+
+    def test_compiles_each_expression_once(self):
+        """Structurally equal expressions reuse one compiled function."""
+        self.evaluator.compile(self.x + self.y)
+        self.evaluator.compile(sp.Add(self.y, self.x))
+        self.evaluator.compile(self.x - self.y)
+
+        assert self.evaluator.stats == {"compilations": 2, "hits": 1}
+
+    def test_assumptions_are_part_of_the_key(self):
+        """Expressions that print alike but differ structurally are kept apart."""
+        positive = sp.Symbol("x", positive=True)
+        self.evaluator.compile(sp.sqrt(self.x ** 2))
+        self.evaluator.compile(sp.sqrt(positive ** 2))
+
+        assert self.evaluator.stats["compilations"] == 2
+
+    def test_batch_matches_pointwise_evaluation(self):
+        """Array evaluation agrees with SymPy's own evaluation."""
+        expr = sp.sin(self.x) * sp.exp(self.y) + self.x ** 2
+        xs = np.linspace(-3, 3, 7)
+        ys = np.linspace(0, 1, 7)
+
+        values = self.evaluator.evaluate(expr, {"x": xs, self.y: ys})
+
+        expected = [float(expr.subs({self.x: a, self.y: b})) for a, b in zip(xs, ys)]
+        assert np.allclose(values, expected)
+
+    def test_constant_expressions_broadcast(self):
+        """Expressions without symbols still produce one value per point."""
+        values = self.evaluator.evaluate(sp.Integer(3) + self.x - self.x, {"x": np.zeros(4)})
+
+        assert values.tolist() == [3.0] * 4
+
+    def test_undefined_points_are_nan(self):
+        """Points outside the real domain evaluate to NaN, not errors."""
+        values = self.evaluator.evaluate(sp.sqrt(self.x), {"x": np.array([-4.0, 4.0])})
+
+        assert np.isnan(values[0])
+        assert values[1] == 2.0
+
+    def test_functions_without_numpy_support_fall_back(self):
+        """Expressions NumPy cannot evaluate use mpmath per point."""
+        expr = sp.zeta(self.x)
+        values = self.evaluator.evaluate(expr, {"x": np.array([2.0, 4.0])})
+
+        assert np.allclose(values, [np.pi ** 2 / 6, np.pi ** 4 / 90])
+
+    def test_compare_flags_mismatches(self):
+        """compare() marks matching and non-matching points."""
+        result = self.evaluator.compare((self.x + 1) ** 2, self.x ** 2 + 2 * self.x + 1)
+        assert result["matches"].all()
+
+        result = self.evaluator.compare(self.x ** 2, self.x ** 2 + 1e-3)
+        assert not result["matches"].any()
+
+
+class TestNumericalChecks:
+    """Test the comparator and verifier on top of the evaluator."""
+
+    def test_comparator_detects_equivalence(self):
+        """Equivalent forms pass and different ones fail."""
+        x = sp.Symbol("x")
+        comparator = ExpressionComparator()
+
+        same = comparator.is_equivalent(sp.sin(2 * x), 2 * sp.sin(x) * sp.cos(x), method="numerical")
+        different = comparator.is_equivalent(sp.sin(2 * x), sp.sin(x), method="numerical")
+
+        assert same["equivalent"]
+        assert not different["equivalent"]
+
+    def test_comparator_skips_undefined_points(self):
+        """Points where an expression is undefined do not count as differences."""
+        x = sp.Symbol("x")
+        comparator = ExpressionComparator()
+
+        result = comparator.is_equivalent(sp.log(x ** 2), 2 * sp.log(sp.Abs(x)), method="numerical")
+
+        assert result["equivalent"]
+
+    def test_verifier_uses_many_points(self):
+        """Numerical verification samples hundreds of points."""
+        verifier = SolutionVerifier()
+        problem = {"expression": "(x + 1)*(x - 1)*y"}
+
+        correct = verifier._verify_numerical(problem, {"result": "x**2*y - y"}, "algebra")
+        wrong = verifier._verify_numerical(problem, {"result": "x**2*y + y"}, "algebra")
+
+        assert correct.is_correct
+        assert correct.details["total_points"] == verifier.num_sample_points >= 100
+        assert not wrong.is_correct
+        assert len(wrong.details["mismatches"]) <= verifier.max_reported_mismatches
+
+    def test_many_points_are_faster_than_five_substitutions(self):
+        """A 200-point vectorized check costs less than 5 subs/evalf calls."""
+        x, y = sp.symbols("x y")
+        expr1 = sp.exp(x) * sp.sin(y) + x ** 3 / (1 + y ** 2)
+        expr2 = sp.exp(x) * sp.sin(y) + x ** 3 / (y ** 2 + 1)
+        evaluator = VectorizedEvaluator()
+        evaluator.compare(expr1, expr2)
+
+        start = time.perf_counter()
+        for _ in range(20):
+            evaluator.compare(expr1, expr2, n_points=200)
+        vectorized = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(20):
+            for _ in range(5):
+                point = {x: np.random.uniform(-10, 10), y: np.random.uniform(-10, 10)}
+                float(expr1.subs(point).evalf())
+                float(expr2.subs(point).evalf())
+        pointwise = time.perf_counter() - start
+
+        assert vectorized < pointwise
@@ -134,23 +134,8 @@ class BaseAgent:
                 self._handle_message
             )
             
-            # Subscribe to capability-based routing
-            for capability in self.capabilities:
-                capability_queue = await self.message_bus.declare_queue(
-                    f"capability.{capability}.{self.agent_id}",
-                    durable=False,
-                    exclusive=True
-                )
-                
-                await self.message_bus.bind_queue(
-                    f"capability.{capability}.{self.agent_id}",
-                    f"capability.{capability}"
-                )
-                
-                await self.message_bus.setup_consumer(
-                    f"capability.{capability}.{self.agent_id}",
-                    self._handle_message
-                )
+            # Capability-based routing keys are bound to the agent queue
+            # by setup_agent_queues, so capability messages arrive once
                 
             # Advertise capabilities
             await self.advertise_capabilities()
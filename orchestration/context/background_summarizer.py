@@ -0,0 +1,190 @@
+"""
+Background conversation summarization for the Mathematical Multimodal LLM System.
+
+This module runs LLM summarization of older conversation turns on worker
+threads, so that summaries are produced ahead of the context limit and the
+request path only swaps in a finished summary. Jobs wait in a bounded queue;
+when it is full new jobs are refused rather than queued, so a burst of long
+conversations cannot pile up work behind the request path.
+"""
+
+import queue
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Optional
+
+from orchestration.monitoring.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SummaryJob:
+    """A request to summarize a run of conversation messages."""
+
+    def __init__(self, key: Hashable, message_ids: List[str], text: str):
+        """
+        Initialize a summary job.
+
+        Args:
+            key: Key identifying the conversation the job belongs to
+            message_ids: IDs of the messages the summary replaces
+            text: Text of the messages to summarize
+        """
+        self.key = key
+        self.message_ids = message_ids
+        self.text = text
+        self.summary = None
+        self.error = None
+        self.done = False
+        self.completed_at = None
+
+
+class BackgroundSummarizer:
+    """Summarizes conversation text on worker threads fed by a bounded queue."""
+
+    def __init__(self,
+                llm_summarizer: Callable[[str], str],
+                max_queue_size: int = 64,
+                workers: int = 1,
+                result_ttl: float = 600.0):
+        """
+        Initialize the background summarizer.
+
+        Args:
+            llm_summarizer: LLM-based summarizer function
+            max_queue_size: Maximum number of jobs waiting for a worker
+            workers: Number of worker threads
+            result_ttl: Seconds a finished summary is kept for its conversation
+                to collect before it is dropped
+        """
+        self.llm_summarizer = llm_summarizer
+        self.max_queue_size = max_queue_size
+        self.workers = workers
+        self.result_ttl = result_ttl
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._jobs = {}  # key -> SummaryJob, pending or waiting to be collected
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def submit(self, key: Hashable, message_ids: List[str], text: str) -> bool:
+        """
+        Queue a summary job.
+
+        Args:
+            key: Key identifying the conversation
+            message_ids: IDs of the messages the summary replaces
+            text: Text of the messages to summarize
+
+        Returns:
+            True if queued, False if the conversation already has a job or
+            the queue is full
+        """
+        with self._lock:
+            self._drop_expired()
+            if key in self._jobs:
+                return False
+
+            job = SummaryJob(key, message_ids, text)
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                logger.warning(f"Summary queue is full, deferring summarization for {key}")
+                return False
+
+            self._jobs[key] = job
+            self._start_workers()
+
+        return True
+
+    def take(self, key: Hashable) -> Optional[SummaryJob]:
+        """
+        Collect the finished job of a conversation.
+
+        Args:
+            key: Key identifying the conversation
+
+        Returns:
+            The finished job, which may have failed, or None if the
+            conversation has no job or it is still running
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or not job.done:
+                return None
+            del self._jobs[key]
+            return job
+
+    def is_pending(self, key: Hashable) -> bool:
+        """
+        Check whether a conversation has a job that has not finished.
+
+        Args:
+            key: Key identifying the conversation
+
+        Returns:
+            True if a job is queued or running
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            return job is not None and not job.done
+
+    def discard(self, key: Hashable) -> None:
+        """
+        Forget a conversation's job; a running job's result is ignored.
+
+        Args:
+            key: Key identifying the conversation
+        """
+        with self._lock:
+            self._jobs.pop(key, None)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the worker threads once queued jobs are done.
+
+        Args:
+            timeout: Seconds to wait for each worker
+        """
+        with self._lock:
+            threads = self._threads
+            self._threads = []
+
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join(timeout)
+
+    def _start_workers(self) -> None:
+        """Start the worker threads if they are not running."""
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._run,
+                name=f"summarizer-{len(self._threads)}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _drop_expired(self) -> None:
+        """Drop finished jobs whose conversations did not collect them in time."""
+        cutoff = time.time() - self.result_ttl
+        expired = [key for key, job in self._jobs.items() if job.done and job.completed_at < cutoff]
+        for key in expired:
+            del self._jobs[key]
+
+    def _run(self) -> None:
+        """Process jobs until told to stop."""
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+
+            try:
+                job.summary = self.llm_summarizer(job.text)
+            except Exception as e:
+                job.error = e
+                logger.error(f"Error summarizing conversation {job.key}: {e}")
+            finally:
+                job.completed_at = time.time()
+                job.done = True
@@ -6,19 +6,29 @@ conversation state tracking, entity management, reference resolution, and
 context pruning strategies.
 """
 
+import asyncio
 import time
 import logging
 import json
 import uuid
-from typing import Dict, List, Any, Optional, Set, Tuple, Union
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Dict, List, Any, Optional, Set, Tuple, Union
 
 from orchestration.monitoring.logger import get_logger
+from orchestration.monitoring.metrics import record_cache_access, record_cache_eviction
 from orchestration.context.conversation_state import ConversationState
+from orchestration.context.conversation_store import ConversationStore, create_conversation_store
 from orchestration.context.entity_tracker import EntityTracker
 from orchestration.context.pruning_strategy import PruningStrategy, TokenBudgetStrategy
+from orchestration.context.tokenizer import Tokenizer, get_tokenizer
 
 logger = get_logger(__name__)
 
+# Cache name used in metrics
+CONVERSATION_CACHE_NAME = "conversation_context"
+
 
 class ContextManager:
     """
@@ -27,12 +37,27 @@ class ContextManager:
     The ContextManager maintains the state of conversations, tracks mathematical
     entities, resolves references, and implements pruning strategies to ensure
     the context remains within manageable limits.
+    
+    Conversations are kept in memory as a bounded LRU cache in front of a
+    conversation store. Changes are written behind to the store, idle or
+    least recently used conversations are evicted after being saved, and
+    evicted conversations are rehydrated from the store when next used.
+    Changes are flushed when later changes arrive, by the background flush
+    task once started, and on close. Store writes run in order on a single
+    writer thread; on a running event loop they are not waited for, and
+    conversations are only evicted once their changes have been written.
     """
     
     def __init__(self, 
                  max_context_tokens: int = 4096,
                  entity_tracking_enabled: bool = True,
-                 pruning_strategy: Optional[PruningStrategy] = None):
+                 pruning_strategy: Optional[PruningStrategy] = None,
+                 tokenizer: Optional[Tokenizer] = None,
+                 conversation_store: Optional[ConversationStore] = None,
+                 max_cached_conversations: int = 1000,
+                 idle_timeout: float = 1800.0,
+                 flush_interval: float = 5.0,
+                 revalidate_interval: Optional[float] = None):
         """
         Initialize the context manager.
         
@@ -40,15 +65,46 @@ class ContextManager:
             max_context_tokens: Maximum number of tokens in the context window
             entity_tracking_enabled: Whether to enable mathematical entity tracking
             pruning_strategy: Strategy for pruning context when it exceeds limits
+            tokenizer: Tokenizer for message token counts; the shared tokenizer if not set
+            conversation_store: Store conversations are saved to and rehydrated from;
+                see create_conversation_store
+            max_cached_conversations: Maximum number of conversations kept in memory
+            idle_timeout: Seconds after its last use that a conversation is evicted from memory
+            flush_interval: Seconds between writes of changed conversations to the store,
+                0 to write every change through
+            revalidate_interval: Seconds after which a cached conversation is checked for
+                newer versions saved by other processes; None if no other process writes
+                to the store
         """
         self.max_context_tokens = max_context_tokens
         self.entity_tracking_enabled = entity_tracking_enabled
         self.pruning_strategy = pruning_strategy or TokenBudgetStrategy(max_context_tokens)
-        
-        # Initialize components
-        self.conversation_states = {}  # conversation_id -> ConversationState
+        self.tokenizer = tokenizer or get_tokenizer()
+        self.conversation_store = conversation_store or create_conversation_store()
+        self.max_cached_conversations = max_cached_conversations
+        self.idle_timeout = idle_timeout
+        self.flush_interval = flush_interval
+        self.revalidate_interval = revalidate_interval
+        
+        # Initialize components, least recently used conversation first
+        self.conversation_states = OrderedDict()  # conversation_id -> ConversationState
         self.entity_trackers = {}      # conversation_id -> EntityTracker
         
+        # Cache bookkeeping
+        self.last_accessed = {}        # conversation_id -> time of last use
+        self.saved_versions = {}       # conversation_id -> version of the stored record
+        self.validated_at = {}         # conversation_id -> time the stored version was last checked
+        self.dirty_conversations = set()
+        self.pending_writes = {}       # conversation_id -> number of store writes in flight
+        self.last_flush = time.time()
+        self._flush_task = None
+        self._write_task = None
+        self._store_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="context-store-writer")
+        
+        if not self.conversation_store.durable:
+            logger.info("Conversation store is in memory: evicted conversations are kept serialized "
+                        "in this process; set CONTEXT_STORE_DB to bound memory and persist them")
+        
         logger.info(f"Initialized context manager with max_context_tokens={max_context_tokens}")
     
     def create_conversation(self, 
@@ -68,13 +124,16 @@ class ContextManager:
         conversation_id = str(uuid.uuid4())
         
         # Initialize conversation state
-        state = ConversationState(conversation_id, user_id, metadata)
+        state = ConversationState(conversation_id, user_id, metadata, tokenizer=self.tokenizer)
         self.conversation_states[conversation_id] = state
         
         # Initialize entity tracker if enabled
         if self.entity_tracking_enabled:
             self.entity_trackers[conversation_id] = EntityTracker()
         
+        self._touch(conversation_id)
+        self._mark_changed(conversation_id)
+        
         logger.info(f"Created new conversation {conversation_id} for user {user_id}")
         
         return conversation_id
@@ -112,6 +171,7 @@ class ContextManager:
         
         # Apply pruning if necessary
         pruned = self._apply_pruning_if_needed(conversation_id)
+        self._mark_changed(conversation_id)
         
         # Return updated context information
         return {
@@ -154,6 +214,7 @@ class ContextManager:
         
         # Apply pruning if necessary
         pruned = self._apply_pruning_if_needed(conversation_id)
+        self._mark_changed(conversation_id)
         
         # Return updated context information
         return {
@@ -214,6 +275,8 @@ class ContextManager:
         
         # Resolve references
         resolved_query, referenced_entities = entity_tracker.resolve_references(query)
+        if referenced_entities:
+            self._mark_changed(conversation_id)
         
         logger.debug(f"Resolved references in query: {query} -> {resolved_query}")
         
@@ -273,6 +336,7 @@ class ContextManager:
         success = entity_tracker.update_entity(entity_id, updates)
         
         if success:
+            self._mark_changed(conversation_id)
             logger.debug(f"Updated entity {entity_id} in conversation {conversation_id}")
         
         return success
@@ -322,25 +386,25 @@ class ContextManager:
             True if successful, False otherwise
         """
         # Check if conversation exists
-        if conversation_id not in self.conversation_states:
+        try:
+            state = self._get_conversation_state(conversation_id)
+        except ValueError:
             logger.warning(f"Attempted to clear non-existent conversation: {conversation_id}")
             return False
         
-        # Get conversation state
-        state = self.conversation_states[conversation_id]
-        
         # Preserve metadata and other essential information
         user_id = state.user_id
         metadata = state.metadata
         
         # Create a new state with the same essential information
         self.conversation_states[conversation_id] = ConversationState(
-            conversation_id, user_id, metadata)
+            conversation_id, user_id, metadata, tokenizer=self.tokenizer)
         
         # Reset entity tracker if needed
         if self.entity_tracking_enabled and conversation_id in self.entity_trackers:
             self.entity_trackers[conversation_id] = EntityTracker()
         
+        self._mark_changed(conversation_id)
         logger.info(f"Cleared conversation {conversation_id}")
         
         return True
@@ -356,16 +420,14 @@ class ContextManager:
             True if successful, False otherwise
         """
         # Check if conversation exists
-        if conversation_id not in self.conversation_states:
+        if (conversation_id not in self.conversation_states
+                and self.conversation_store.get_saved_at(conversation_id) is None):
             logger.warning(f"Attempted to delete non-existent conversation: {conversation_id}")
             return False
         
-        # Remove the conversation state
-        del self.conversation_states[conversation_id]
-        
-        # Remove entity tracker if it exists
-        if conversation_id in self.entity_trackers:
-            del self.entity_trackers[conversation_id]
+        # Remove the conversation from memory and the store, after any write in flight
+        self._drop_cached(conversation_id)
+        self._call_writer(self.conversation_store.delete, conversation_id)
         
         logger.info(f"Deleted conversation {conversation_id}")
         
@@ -384,10 +446,19 @@ class ContextManager:
         Raises:
             ValueError: If the conversation doesn't exist
         """
-        if conversation_id not in self.conversation_states:
-            raise ValueError(f"Conversation does not exist: {conversation_id}")
+        state = self.conversation_states.get(conversation_id)
+        if state is not None and self._is_outdated(conversation_id):
+            self._drop_cached(conversation_id)
+            state = None
+        
+        if state is None:
+            record_cache_access(CONVERSATION_CACHE_NAME, False)
+            state = self._load_conversation(conversation_id)
+        else:
+            record_cache_access(CONVERSATION_CACHE_NAME, True)
         
-        return self.conversation_states[conversation_id]
+        self._touch(conversation_id)
+        return state
     
     def _get_entity_tracker(self, conversation_id: str) -> EntityTracker:
         """
@@ -405,6 +476,10 @@ class ContextManager:
         if not self.entity_tracking_enabled:
             raise ValueError("Entity tracking is disabled")
         
+        # Rehydrate the conversation if it was evicted
+        if conversation_id not in self.entity_trackers:
+            self._get_conversation_state(conversation_id)
+        
         if conversation_id not in self.entity_trackers:
             raise ValueError(f"Entity tracker does not exist for conversation: {conversation_id}")
         
@@ -414,6 +489,9 @@ class ContextManager:
         """
         Apply pruning strategy if the context exceeds limits.
         
+        Otherwise the strategy is given the chance to prepare, for example
+        by swapping in a summary produced in the background.
+        
         Args:
             conversation_id: ID of the conversation
             
@@ -440,7 +518,370 @@ class ContextManager:
             
             return True
         
-        return False
+        return self.pruning_strategy.prepare(state)
+    
+    def flush(self) -> int:
+        """
+        Write all changed conversations to the conversation store and wait for the writes.
+        
+        Returns:
+            Number of conversations written
+        """
+        records = self._take_records(list(self.dirty_conversations))
+        written = self._apply_writes(self._call_writer(self._write_records, records))
+        
+        self.last_flush = time.time()
+        return written
+    
+    async def flush_async(self) -> int:
+        """
+        Write all changed conversations to the conversation store on the writer
+        thread, without blocking the event loop.
+        
+        Returns:
+            Number of conversations written
+        """
+        written = 0
+        while self.dirty_conversations:
+            records = self._take_records(list(self.dirty_conversations))
+            try:
+                results = await self._call_writer_async(self._write_records, records)
+            except asyncio.CancelledError:
+                # The write may not have happened, so write these again next time
+                self._abandon_writes(records)
+                raise
+            
+            batch_written = self._apply_writes(results)
+            written += batch_written
+            if batch_written < len(records):
+                # Failed writes stay dirty and are retried by the next flush
+                break
+        
+        self.last_flush = time.time()
+        return written
+    
+    def start_background_flush(self) -> asyncio.Task:
+        """
+        Start a task on the running event loop that periodically flushes
+        changed conversations and evicts idle ones.
+        
+        Without it, changes are only written when a later change arrives, so
+        the last changes to a conversation that goes quiet stay in memory.
+        
+        Returns:
+            The background task
+        """
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_periodically())
+        return self._flush_task
+    
+    def close(self) -> None:
+        """Stop the background flush task, write all changes and close the conversation store."""
+        if self._flush_task is not None:
+            if not self._flush_task.done():
+                self._flush_task.cancel()
+            self._flush_task = None
+        
+        self.flush()
+        self._store_writer.shutdown()
+        self.conversation_store.close()
+        logger.info("Closed context manager")
+    
+    async def _flush_periodically(self) -> None:
+        """Flush changes and evict idle conversations every flush interval."""
+        interval = self.flush_interval if self.flush_interval > 0 else 1.0
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if self.dirty_conversations:
+                    await self.flush_async()
+                self.evict_idle_conversations()
+            except Exception as e:
+                logger.error(f"Error in background context flush: {e}")
+    
+    def evict_idle_conversations(self) -> int:
+        """
+        Save and evict conversations idle for longer than the idle timeout.
+        
+        Returns:
+            Number of conversations evicted
+        """
+        cutoff = time.time() - self.idle_timeout
+        
+        # Conversations are ordered by last use, so stop at the first recent one
+        idle_ids = []
+        for conversation_id in self.conversation_states:
+            if self.last_accessed.get(conversation_id, 0) > cutoff:
+                break
+            idle_ids.append(conversation_id)
+        
+        return sum(1 for conversation_id in idle_ids if self._evict(conversation_id, "idle"))
+    
+    def _touch(self, conversation_id: str) -> None:
+        """Record a use of a cached conversation."""
+        self.conversation_states.move_to_end(conversation_id)
+        self.last_accessed[conversation_id] = time.time()
+    
+    def _mark_changed(self, conversation_id: str) -> None:
+        """
+        Record a change to a conversation and run due cache maintenance.
+        
+        Args:
+            conversation_id: ID of the changed conversation
+        """
+        self.dirty_conversations.add(conversation_id)
+        
+        if time.time() - self.last_flush >= self.flush_interval:
+            self._flush_behind()
+        
+        self.evict_idle_conversations()
+        
+        excess = len(self.conversation_states) - self.max_cached_conversations
+        if excess > 0:
+            for least_recent_id in list(islice(self.conversation_states, excess)):
+                self._evict(least_recent_id, "capacity")
+    
+    def _flush_behind(self) -> None:
+        """Write changed conversations, in a task on the running event loop if there is one."""
+        if not self._on_event_loop():
+            self.flush()
+            return
+        
+        self.last_flush = time.time()
+        if self._write_task is None or self._write_task.done():
+            self._write_task = asyncio.get_running_loop().create_task(self.flush_async())
+    
+    @staticmethod
+    def _on_event_loop() -> bool:
+        """Check whether this is called from a running event loop."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return True
+    
+    def _save_conversation(self, conversation_id: str) -> None:
+        """
+        Write a cached conversation to the conversation store and wait for the write.
+        
+        Args:
+            conversation_id: ID of the conversation
+        """
+        records = self._take_records([conversation_id])
+        self._apply_writes(self._call_writer(self._write_records, records))
+    
+    def _take_records(self, conversation_ids: List[str]) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Serialize changed conversations for writing and mark the writes in flight.
+        
+        Args:
+            conversation_ids: IDs of the conversations to write
+            
+        Returns:
+            (conversation ID, record) pairs
+        """
+        records = []
+        for conversation_id in conversation_ids:
+            self.dirty_conversations.discard(conversation_id)
+            state = self.conversation_states.get(conversation_id)
+            if state is None:
+                continue
+            
+            entity_tracker = self.entity_trackers.get(conversation_id)
+            records.append((conversation_id, {
+                "conversation": state.to_dict(),
+                "entities": entity_tracker.to_dict() if entity_tracker else None
+            }))
+            self.pending_writes[conversation_id] = self.pending_writes.get(conversation_id, 0) + 1
+        
+        return records
+    
+    def _write_records(self, records: List[Tuple[str, Dict[str, Any]]]) -> List[Tuple[str, Any]]:
+        """
+        Save records to the conversation store; runs on the writer thread.
+        
+        Args:
+            records: (conversation ID, record) pairs
+            
+        Returns:
+            (conversation ID, saved version or the exception raised) pairs
+        """
+        results = []
+        for conversation_id, record in records:
+            try:
+                results.append((conversation_id, self.conversation_store.save(conversation_id, record)))
+            except Exception as e:
+                results.append((conversation_id, e))
+        return results
+    
+    def _apply_writes(self, results: List[Tuple[str, Any]]) -> int:
+        """
+        Record the outcome of store writes.
+        
+        Args:
+            results: (conversation ID, saved version or exception) pairs
+            
+        Returns:
+            Number of conversations written
+        """
+        written = 0
+        for conversation_id, outcome in results:
+            self._finish_write(conversation_id)
+            cached = conversation_id in self.conversation_states
+            
+            if isinstance(outcome, Exception):
+                # Keep the conversation dirty so the write is retried
+                if cached:
+                    self.dirty_conversations.add(conversation_id)
+                logger.error(f"Error saving conversation {conversation_id}: {outcome}")
+                continue
+            
+            if cached:
+                self.saved_versions[conversation_id] = outcome
+                self.validated_at[conversation_id] = time.time()
+            written += 1
+        
+        return written
+    
+    def _abandon_writes(self, records: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Mark conversations whose writes were not waited for as changed again."""
+        for conversation_id, _ in records:
+            self._finish_write(conversation_id)
+            if conversation_id in self.conversation_states:
+                self.dirty_conversations.add(conversation_id)
+    
+    def _finish_write(self, conversation_id: str) -> None:
+        """Record that a store write for a conversation is no longer in flight."""
+        remaining = self.pending_writes.get(conversation_id, 0) - 1
+        if remaining > 0:
+            self.pending_writes[conversation_id] = remaining
+        else:
+            self.pending_writes.pop(conversation_id, None)
+    
+    def _call_writer(self, operation: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a store operation on the writer thread, after earlier writes, and wait for it.
+        
+        Args:
+            operation: Function to call
+            args: Arguments to the function
+            
+        Returns:
+            The function's result
+        """
+        try:
+            future = self._store_writer.submit(operation, *args)
+        except RuntimeError:
+            # The writer has shut down
+            return operation(*args)
+        return future.result()
+    
+    async def _call_writer_async(self, operation: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a store operation on the writer thread, after earlier writes, without
+        blocking the event loop.
+        
+        Args:
+            operation: Function to call
+            args: Arguments to the function
+            
+        Returns:
+            The function's result
+        """
+        try:
+            future = self._store_writer.submit(operation, *args)
+        except RuntimeError:
+            # The writer has shut down
+            return operation(*args)
+        return await asyncio.wrap_future(future)
+    
+    def _is_outdated(self, conversation_id: str) -> bool:
+        """
+        Check whether another process saved a newer version of a cached conversation.
+        
+        Args:
+            conversation_id: ID of the conversation
+            
+        Returns:
+            True if the cached copy should be reloaded
+        """
+        if (self.revalidate_interval is None or conversation_id in self.dirty_conversations
+                or conversation_id in self.pending_writes):
+            return False
+        
+        now = time.time()
+        if now - self.validated_at.get(conversation_id, 0) < self.revalidate_interval:
+            return False
+        
+        self.validated_at[conversation_id] = now
+        saved_at = self.conversation_store.get_saved_at(conversation_id)
+        return saved_at is not None and saved_at > self.saved_versions.get(conversation_id, 0)
+    
+    def _load_conversation(self, conversation_id: str) -> ConversationState:
+        """
+        Rehydrate a conversation from the conversation store.
+        
+        Args:
+            conversation_id: ID of the conversation
+            
+        Returns:
+            ConversationState object
+            
+        Raises:
+            ValueError: If the conversation doesn't exist
+        """
+        record = self.conversation_store.load(conversation_id)
+        if record is None:
+            raise ValueError(f"Conversation does not exist: {conversation_id}")
+        
+        state = ConversationState.from_dict(record["conversation"], self.tokenizer)
+        self.conversation_states[conversation_id] = state
+        if self.entity_tracking_enabled:
+            self.entity_trackers[conversation_id] = EntityTracker.from_dict(record.get("entities") or {})
+        
+        self.saved_versions[conversation_id] = record["saved_at"]
+        self.validated_at[conversation_id] = time.time()
+        
+        logger.debug(f"Rehydrated conversation {conversation_id} from the conversation store")
+        
+        return state
+    
+    def _evict(self, conversation_id: str, reason: str) -> bool:
+        """
+        Save a conversation if it changed and drop it from memory.
+        
+        On a running event loop the save is started in the background and the
+        conversation is kept until a later eviction pass finds it written.
+        
+        Args:
+            conversation_id: ID of the conversation
+            reason: Eviction reason recorded in metrics
+            
+        Returns:
+            True if evicted, False if it is not yet saved and was kept
+        """
+        if conversation_id in self.dirty_conversations:
+            if self._on_event_loop():
+                self._flush_behind()
+            else:
+                self._save_conversation(conversation_id)
+        if conversation_id in self.dirty_conversations or conversation_id in self.pending_writes:
+            # Not saved, so keep it rather than lose the changes
+            return False
+        
+        self._drop_cached(conversation_id)
+        record_cache_eviction(CONVERSATION_CACHE_NAME, reason)
+        logger.debug(f"Evicted conversation {conversation_id} from memory ({reason})")
+        return True
+    
+    def _drop_cached(self, conversation_id: str) -> None:
+        """Remove a conversation and its bookkeeping from memory."""
+        self.conversation_states.pop(conversation_id, None)
+        self.entity_trackers.pop(conversation_id, None)
+        self.last_accessed.pop(conversation_id, None)
+        self.saved_versions.pop(conversation_id, None)
+        self.validated_at.pop(conversation_id, None)
+        self.dirty_conversations.discard(conversation_id)
 
 
 # Singleton instance
@@ -12,6 +12,10 @@ from typing import Dict, List, Any, Optional, Tuple, Union
 from datetime import datetime
 
 from orchestration.monitoring.logger import get_logger
+from orchestration.context.message_store import MessageStore
+from orchestration.context.tokenizer import (
+    CONVERSATION_OVERHEAD_TOKENS, MESSAGE_OVERHEAD_TOKENS, Tokenizer, get_tokenizer
+)
 
 logger = get_logger(__name__)
 
@@ -24,7 +28,8 @@ class Message:
                 role: str,
                 content: str,
                 timestamp: float,
-                metadata: Optional[Dict[str, Any]] = None):
+                metadata: Optional[Dict[str, Any]] = None,
+                token_count: Optional[int] = None):
         """
         Initialize a message.
         
@@ -34,12 +39,14 @@ class Message:
             content: Content of the message
             timestamp: Timestamp when the message was created
             metadata: Optional metadata about the message
+            token_count: Token count including message overhead, if already known
         """
         self.message_id = message_id
         self.role = role
         self.content = content
         self.timestamp = timestamp
         self.metadata = metadata or {}
+        self.token_count = token_count
     
     def to_dict(self, include_metadata: bool = True) -> Dict[str, Any]:
         """
@@ -56,7 +63,8 @@ class Message:
             "role": self.role,
             "content": self.content,
             "timestamp": self.timestamp,
-            "datetime": datetime.fromtimestamp(self.timestamp).isoformat()
+            "datetime": datetime.fromtimestamp(self.timestamp).isoformat(),
+            "token_count": self.estimate_token_count()
         }
         
         if include_metadata and self.metadata:
@@ -64,18 +72,52 @@ class Message:
         
         return message_dict
     
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Message':
+        """
+        Create a message from its dictionary representation.
+        
+        Args:
+            data: Dictionary from to_dict
+            
+        Returns:
+            Message object
+        """
+        return cls(
+            data["message_id"],
+            data["role"],
+            data["content"],
+            data["timestamp"],
+            data.get("metadata"),
+            data.get("token_count")
+        )
+    
+    def count_tokens(self, tokenizer: Optional[Tokenizer] = None) -> int:
+        """
+        Count the tokens in the message and store the count.
+        
+        Args:
+            tokenizer: Tokenizer to count with; the shared tokenizer if not set
+            
+        Returns:
+            Token count including message overhead
+        """
+        tokenizer = tokenizer or get_tokenizer()
+        self.token_count = tokenizer.count(self.content) + MESSAGE_OVERHEAD_TOKENS
+        return self.token_count
+    
     def estimate_token_count(self) -> int:
         """
-        Estimate the number of tokens in the message.
+        Get the number of tokens in the message.
         
-        This is a simple approximation. For more accurate counts,
-        you would use a proper tokenizer.
+        The count is computed once and stored on the message.
         
         Returns:
-            Estimated token count
+            Token count including message overhead
         """
-        # Simple approximation: 1 token ≈ 4 characters for English text
-        return len(self.content) // 4 + 5  # Add 5 tokens for message overhead
+        if self.token_count is None:
+            return self.count_tokens()
+        return self.token_count
     
     def update_metadata(self, updates: Dict[str, Any]) -> None:
         """
@@ -98,7 +140,8 @@ class ConversationState:
     def __init__(self, 
                 conversation_id: str,
                 user_id: str,
-                metadata: Optional[Dict[str, Any]] = None):
+                metadata: Optional[Dict[str, Any]] = None,
+                tokenizer: Optional[Tokenizer] = None):
         """
         Initialize conversation state.
         
@@ -106,15 +149,21 @@ class ConversationState:
             conversation_id: Unique identifier for the conversation
             user_id: ID of the user in the conversation
             metadata: Optional metadata about the conversation
+            tokenizer: Tokenizer for message token counts; the shared tokenizer if not set
         """
         self.conversation_id = conversation_id
         self.user_id = user_id
         self.metadata = metadata or {}
-        self.messages = []  # List of Message objects
-        self.message_map = {}  # message_id -> Message object
+        self.tokenizer = tokenizer or get_tokenizer()
+        self.store = MessageStore()  # Messages in order with prefix token sums
         self.created_at = time.time()
         self.updated_at = self.created_at
     
+    @property
+    def messages(self) -> List[Message]:
+        """Messages in the conversation, in order. The list must not be modified."""
+        return self.store.list()
+    
     def add_user_message(self, 
                         content: str,
                         metadata: Optional[Dict[str, Any]] = None) -> str:
@@ -128,26 +177,40 @@ class ConversationState:
         Returns:
             Message ID
         """
-        message_id = str(uuid.uuid4())
-        timestamp = time.time()
-        
-        message = Message(message_id, "user", content, timestamp, metadata)
-        self.messages.append(message)
-        self.message_map[message_id] = message
-        
-        self.updated_at = timestamp
-        
-        return message_id
+        return self._add_message("user", content, metadata)
     
     def add_system_message(self, 
                           content: str,
-                          metadata: Optional[Dict[str, Any]] = None) -> str:
+                          metadata: Optional[Dict[str, Any]] = None,
+                          position: Optional[int] = None) -> str:
         """
         Add a system message to the conversation.
         
         Args:
             content: Message content
             metadata: Optional message metadata
+            position: Index among the messages to insert the message at;
+                appended after the latest message if not set
+            
+        Returns:
+            Message ID
+        """
+        return self._add_message("system", content, metadata, position)
+    
+    def _add_message(self, 
+                    role: str,
+                    content: str,
+                    metadata: Optional[Dict[str, Any]] = None,
+                    position: Optional[int] = None) -> str:
+        """
+        Add a message and count its tokens.
+        
+        Args:
+            role: Role of the message sender
+            content: Message content
+            metadata: Optional message metadata
+            position: Index among the messages to insert the message at;
+                appended if not set
             
         Returns:
             Message ID
@@ -155,9 +218,12 @@ class ConversationState:
         message_id = str(uuid.uuid4())
         timestamp = time.time()
         
-        message = Message(message_id, "system", content, timestamp, metadata)
-        self.messages.append(message)
-        self.message_map[message_id] = message
+        message = Message(message_id, role, content, timestamp, metadata)
+        message.count_tokens(self.tokenizer)
+        if position is None:
+            self.store.append(message)
+        else:
+            self.store.insert(position, message)
         
         self.updated_at = timestamp
         
@@ -173,7 +239,7 @@ class ConversationState:
         Returns:
             Message object if found, None otherwise
         """
-        return self.message_map.get(message_id)
+        return self.store.get(message_id)
     
     def update_message_metadata(self, 
                                message_id: str, 
@@ -257,20 +323,59 @@ class ConversationState:
             "metadata": self.metadata
         }
     
-    def estimate_token_count(self) -> int:
+    def to_dict(self) -> Dict[str, Any]:
         """
-        Estimate the total token count for the conversation.
+        Convert the conversation state to a dictionary for storage.
         
         Returns:
-            Estimated token count
+            Dictionary representation of the conversation, including the
+            name of the tokenizer its token counts were made with
+        """
+        state_dict = self.get_context_dict(include_metadata=True)
+        state_dict["tokenizer"] = self.tokenizer.get_name()
+        return state_dict
+    
+    @classmethod
+    def from_dict(cls, 
+                 data: Dict[str, Any],
+                 tokenizer: Optional[Tokenizer] = None) -> 'ConversationState':
         """
-        # Sum token counts for all messages
-        message_tokens = sum(message.estimate_token_count() for message in self.messages)
+        Rebuild a conversation state from its dictionary representation.
         
-        # Add overhead for conversation structure
-        overhead_tokens = 10  # Approximate overhead
+        Stored token counts are reused unless they were made with a
+        different tokenizer.
         
-        return message_tokens + overhead_tokens
+        Args:
+            data: Dictionary from to_dict
+            tokenizer: Tokenizer for message token counts; the shared tokenizer if not set
+            
+        Returns:
+            ConversationState object
+        """
+        state = cls(data["conversation_id"], data["user_id"], data.get("metadata"), tokenizer)
+        recount = data.get("tokenizer") != state.tokenizer.get_name()
+        
+        for message_data in data.get("messages", []):
+            message = Message.from_dict(message_data)
+            if recount or message.token_count is None:
+                message.count_tokens(state.tokenizer)
+            state.store.append(message)
+        
+        state.created_at = data.get("created_at", state.created_at)
+        state.updated_at = data.get("updated_at", state.updated_at)
+        return state
+    
+    def estimate_token_count(self) -> int:
+        """
+        Get the total token count for the conversation.
+        
+        Message counts are kept as a running total, so this does not
+        revisit the messages.
+        
+        Returns:
+            Token count including conversation overhead
+        """
+        return self.store.total_tokens + CONVERSATION_OVERHEAD_TOKENS
     
     def get_message_count(self) -> int:
         """
@@ -279,7 +384,7 @@ class ConversationState:
         Returns:
             Message count
         """
-        return len(self.messages)
+        return len(self.store)
     
     def remove_message(self, message_id: str) -> bool:
         """
@@ -291,18 +396,11 @@ class ConversationState:
         Returns:
             True if successful, False otherwise
         """
-        message = self.message_map.get(message_id)
-        if not message:
-            return False
-        
-        self.messages.remove(message)
-        del self.message_map[message_id]
-        
-        return True
+        return self.store.remove(message_id) is not None
     
     def remove_messages(self, message_ids: List[str]) -> int:
         """
-        Remove multiple messages from the conversation.
+        Remove multiple messages from the conversation in one pass.
         
         Args:
             message_ids: List of message IDs to remove
@@ -310,13 +408,7 @@ class ConversationState:
         Returns:
             Number of messages successfully removed
         """
-        removed_count = 0
-        
-        for message_id in message_ids:
-            if self.remove_message(message_id):
-                removed_count += 1
-        
-        return removed_count
+        return len(self.store.remove_many(message_ids))
     
     def _get_messages_within_token_budget(self, max_tokens: int) -> List[Message]:
         """
@@ -326,25 +418,6 @@ class ConversationState:
             max_tokens: Maximum number of tokens
             
         Returns:
-            List of messages within the token budget, most recent first
+            List of the most recent messages within the token budget, in order
         """
-        if max_tokens <= 0:
-            return []
-        
-        # Start with the most recent message
-        messages_included = []
-        tokens_used = 0
-        
-        # Iterate through messages in reverse order (newest first)
-        for message in reversed(self.messages):
-            message_tokens = message.estimate_token_count()
-            
-            # Check if adding this message would exceed the budget
-            if tokens_used + message_tokens <= max_tokens:
-                messages_included.insert(0, message)  # Insert at beginning to maintain order
-                tokens_used += message_tokens
-            else:
-                # Can't include more messages
-                break
-        
-        return messages_included
+        return self.store.select_suffix(max_tokens)
@@ -0,0 +1,241 @@
+"""
+Conversation storage for the Mathematical Multimodal LLM System.
+
+This module provides the stores that ContextManager writes conversation
+state and tracked entities to, so that idle conversations can be evicted
+from memory, rehydrated on their next use, and shared between server
+processes pointed at the same store.
+"""
+
+import abc
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from orchestration.monitoring.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ConversationStore(abc.ABC):
+    """Abstract base class for conversation stores."""
+
+    # Whether stored conversations outlive the process
+    durable = False
+
+    @abc.abstractmethod
+    def save(self, conversation_id: str, record: Dict[str, Any]) -> float:
+        """
+        Save a conversation record, replacing any earlier one.
+
+        Args:
+            conversation_id: ID of the conversation
+            record: Conversation record
+
+        Returns:
+            Time the record was saved, used as its version
+        """
+        pass
+
+    @abc.abstractmethod
+    def load(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a conversation record.
+
+        Args:
+            conversation_id: ID of the conversation
+
+        Returns:
+            The record with its "saved_at" version, or None if not stored
+        """
+        pass
+
+    @abc.abstractmethod
+    def delete(self, conversation_id: str) -> None:
+        """
+        Delete a conversation record.
+
+        Args:
+            conversation_id: ID of the conversation
+        """
+        pass
+
+    def get_saved_at(self, conversation_id: str) -> Optional[float]:
+        """
+        Get the version of a stored conversation without loading it.
+
+        Args:
+            conversation_id: ID of the conversation
+
+        Returns:
+            Time the record was last saved, or None if not stored
+        """
+        record = self.load(conversation_id)
+        return record.get("saved_at") if record else None
+
+    def close(self) -> None:
+        """Release the store's resources."""
+        pass
+
+
+class InMemoryConversationStore(ConversationStore):
+    """
+    Conversation store that keeps serialized records in process memory.
+
+    Records are never dropped, so evicting conversations from the context
+    manager only trades live objects for their serialized form and memory
+    still grows with the number of conversations. Use a durable store to
+    bound process memory.
+    """
+
+    def __init__(self):
+        """Initialize the store."""
+        self._records = {}  # conversation_id -> (saved_at, serialized record)
+        self._lock = threading.Lock()
+
+    def save(self, conversation_id: str, record: Dict[str, Any]) -> float:
+        saved_at = time.time()
+        with self._lock:
+            self._records[conversation_id] = (saved_at, json.dumps(record, separators=(",", ":")))
+        return saved_at
+
+    def load(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._records.get(conversation_id)
+        if entry is None:
+            return None
+        record = json.loads(entry[1])
+        record["saved_at"] = entry[0]
+        return record
+
+    def delete(self, conversation_id: str) -> None:
+        with self._lock:
+            self._records.pop(conversation_id, None)
+
+    def get_saved_at(self, conversation_id: str) -> Optional[float]:
+        with self._lock:
+            entry = self._records.get(conversation_id)
+        return entry[0] if entry else None
+
+
+class SQLiteConversationStore(ConversationStore):
+    """Conversation store backed by a local SQLite file, shareable between processes."""
+
+    durable = True
+
+    def __init__(self, path: str):
+        """
+        Initialize the store.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS conversation_states ("
+            "conversation_id TEXT PRIMARY KEY, saved_at REAL NOT NULL, record TEXT NOT NULL)"
+        )
+        self._db.commit()
+
+    def save(self, conversation_id: str, record: Dict[str, Any]) -> float:
+        saved_at = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO conversation_states (conversation_id, saved_at, record) VALUES (?, ?, ?)",
+                (conversation_id, saved_at, json.dumps(record, separators=(",", ":")))
+            )
+        return saved_at
+
+    def load(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT saved_at, record FROM conversation_states WHERE conversation_id = ?",
+                (conversation_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        record = json.loads(row[1])
+        record["saved_at"] = row[0]
+        return record
+
+    def delete(self, conversation_id: str) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM conversation_states WHERE conversation_id = ?", (conversation_id,))
+
+    def get_saved_at(self, conversation_id: str) -> Optional[float]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT saved_at FROM conversation_states WHERE conversation_id = ?",
+                (conversation_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class MongoConversationStore(ConversationStore):
+    """Conversation store backed by a MongoDB collection."""
+
+    durable = True
+
+    def __init__(self, mongodb_wrapper, collection_name: str = "context_states"):
+        """
+        Initialize the store.
+
+        Args:
+            mongodb_wrapper: MongoDBWrapper from database.access
+            collection_name: Collection to store conversation records in
+        """
+        self.collection = mongodb_wrapper.get_collection(collection_name)
+
+    def save(self, conversation_id: str, record: Dict[str, Any]) -> float:
+        saved_at = time.time()
+        self.collection.replace_one(
+            {"_id": conversation_id},
+            {"_id": conversation_id, "saved_at": saved_at, "record": json.dumps(record, separators=(",", ":"))},
+            upsert=True
+        )
+        return saved_at
+
+    def load(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        document = self.collection.find_one({"_id": conversation_id})
+        if document is None:
+            return None
+        record = json.loads(document["record"])
+        record["saved_at"] = document["saved_at"]
+        return record
+
+    def delete(self, conversation_id: str) -> None:
+        self.collection.delete_one({"_id": conversation_id})
+
+    def get_saved_at(self, conversation_id: str) -> Optional[float]:
+        document = self.collection.find_one({"_id": conversation_id}, {"saved_at": 1})
+        return document["saved_at"] if document else None
+
+
+def create_conversation_store(path: Optional[str] = None) -> ConversationStore:
+    """
+    Create a conversation store.
+
+    Args:
+        path: SQLite file to persist conversations in; defaults to the
+            CONTEXT_STORE_DB environment variable, and conversations are
+            kept in memory, without bound, if neither is set
+
+    Returns:
+        Conversation store
+    """
+    path = path or os.environ.get("CONTEXT_STORE_DB")
+    if path:
+        logger.info(f"Persisting conversation context to {path}")
+        return SQLiteConversationStore(path)
+    return InMemoryConversationStore()
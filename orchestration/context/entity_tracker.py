@@ -9,7 +9,10 @@ entities.
 import re
 import uuid
 import time
-from typing import Dict, List, Any, Optional, Set, Tuple, Union
+import heapq
+import itertools
+from collections import Counter
+from typing import Dict, Iterator, List, Any, Optional, Set, Tuple, Union
 import json
 
 from orchestration.monitoring.logger import get_logger
@@ -67,6 +70,30 @@ class MathematicalEntity:
             "reference_count": self.reference_count
         }
     
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'MathematicalEntity':
+        """
+        Create an entity from its dictionary representation.
+        
+        Args:
+            data: Dictionary from to_dict
+            
+        Returns:
+            MathematicalEntity object
+        """
+        entity = cls(
+            data["entity_id"],
+            data["entity_type"],
+            data["value"],
+            data.get("display_form"),
+            data.get("latex_form"),
+            data.get("metadata")
+        )
+        entity.created_at = data.get("created_at", entity.created_at)
+        entity.last_referenced_at = data.get("last_referenced_at", entity.last_referenced_at)
+        entity.reference_count = data.get("reference_count", 0)
+        return entity
+    
     def update_metadata(self, updates: Dict[str, Any]) -> None:
         """
         Update entity metadata.
@@ -82,6 +109,91 @@ class MathematicalEntity:
         self.reference_count += 1
 
 
+class SubstringIndex:
+    """
+    Index of strings supporting lookup of those contained in a query.
+    
+    Each string is keyed on one of its substrings of at most three
+    characters, chosen as the least shared key when it is added. Any string
+    contained in a query has its key among the query's short substrings, so
+    only strings sharing a key with the query are compared.
+    """
+    
+    KEY_LENGTH = 3
+    
+    def __init__(self):
+        """Initialize the index."""
+        self.keys = {}  # string -> key
+        self.strings_by_key = {}  # key -> set of strings
+    
+    def __len__(self) -> int:
+        return len(self.keys)
+    
+    def add(self, string: str) -> None:
+        """
+        Add a string to the index.
+        
+        Args:
+            string: String to add
+        """
+        if not string or string in self.keys:
+            return
+        
+        if len(string) <= self.KEY_LENGTH:
+            key = string
+        else:
+            key = min(
+                (string[i:i + self.KEY_LENGTH] for i in range(len(string) - self.KEY_LENGTH + 1)),
+                key=lambda k: len(self.strings_by_key.get(k, ()))
+            )
+        
+        self.keys[string] = key
+        self.strings_by_key.setdefault(key, set()).add(string)
+    
+    def discard(self, string: str) -> None:
+        """
+        Remove a string from the index.
+        
+        Args:
+            string: String to remove
+        """
+        key = self.keys.pop(string, None)
+        if key is None:
+            return
+        
+        strings = self.strings_by_key[key]
+        strings.discard(string)
+        if not strings:
+            del self.strings_by_key[key]
+    
+    def find_in(self, query: str) -> Set[str]:
+        """
+        Find the indexed strings contained in a query.
+        
+        Args:
+            query: Text to search
+            
+        Returns:
+            Set of indexed strings that occur in the query
+        """
+        found = set()
+        if not self.keys:
+            return found
+        
+        seen_keys = set()
+        for length in range(1, self.KEY_LENGTH + 1):
+            for i in range(len(query) - length + 1):
+                key = query[i:i + length]
+                if key in seen_keys:
+                    continue
+                seen_keys.add(key)
+                for string in self.strings_by_key.get(key, ()):
+                    if string in query:
+                        found.add(string)
+        
+        return found
+
+
 class EntityTracker:
     """
     Tracks mathematical entities and resolves references to them.
@@ -99,6 +211,17 @@ class EntityTracker:
         self.entities_by_type = {}  # entity_type -> set of entity_ids
         self.named_entities = {}  # name -> entity_id
         
+        # Indexes maintained as entities are added, updated and referenced
+        self.entities_in_order = {}  # entity_type -> entity_ids, oldest first
+        self.entities_by_display_form = {}  # display form -> set of entity_ids
+        self.entities_by_token = {}  # lowercase value token -> set of entity_ids
+        self.display_form_index = SubstringIndex()  # display forms, searched within queries
+        self.name_index = SubstringIndex()  # entity names, searched within queries
+        self._ordinals = {}  # entity_id -> order of addition
+        self._recency_heaps = {}  # entity_type -> heap of (-last_referenced_at, sequence, entity_id)
+        self._recency_sequences = {}  # entity_id -> sequence of its live heap entry
+        self._sequence = itertools.count()
+        
         # Reference patterns for different types of entities
         self.reference_patterns = {
             # Expression references
@@ -166,7 +289,7 @@ class EntityTracker:
             )
             
             # Add to named entities for easy reference
-            self.named_entities[var_name] = entity_id
+            self._name_entity(var_name, entity_id)
             
             extracted_entities.append({
                 "entity_id": entity_id,
@@ -194,7 +317,7 @@ class EntityTracker:
             )
             
             # Add to named entities for easy reference
-            self.named_entities[func_name] = entity_id
+            self._name_entity(func_name, entity_id)
             
             extracted_entities.append({
                 "entity_id": entity_id,
@@ -253,21 +376,20 @@ class EntityTracker:
                         resolved_query = resolved_query.replace(match.group(0), replacement)
                         
                         # Record the reference
-                        entity.record_reference()
+                        self._record_reference(entity)
                         
                         # Add to referenced entities
                         referenced_entities[entity.entity_id] = entity.to_dict()
         
         # Also check for direct references to named entities
-        for name, entity_id in self.named_entities.items():
-            if name in query:
-                entity = self.entities.get(entity_id)
-                if entity:
-                    # Record the reference
-                    entity.record_reference()
-                    
-                    # Add to referenced entities
-                    referenced_entities[entity.entity_id] = entity.to_dict()
+        for name in sorted(self.name_index.find_in(query)):
+            entity = self.entities.get(self.named_entities[name])
+            if entity:
+                # Record the reference
+                self._record_reference(entity)
+                
+                # Add to referenced entities
+                referenced_entities[entity.entity_id] = entity.to_dict()
         
         return resolved_query, referenced_entities
     
@@ -284,21 +406,69 @@ class EntityTracker:
         Returns:
             List of relevant entity dictionaries
         """
-        if not self.entities:
+        if not self.entities or max_entities <= 0:
             return []
         
-        # Calculate relevance scores for each entity
-        scored_entities = []
-        for entity_id, entity in self.entities.items():
-            score = self._calculate_relevance_score(entity, query)
-            scored_entities.append((entity, score))
-        
-        # Sort by relevance score (descending)
-        scored_entities.sort(key=lambda x: x[1], reverse=True)
+        now = time.time()
+        matched_types = {entity_type for entity_type in self.entities_by_type if entity_type in query}
+        
+        # Entities whose display form or value tokens occur in the query
+        token_overlaps = Counter()
+        for token in set(query.lower().split()):
+            token_overlaps.update(self.entities_by_token.get(token, ()))
+        
+        display_matches = set()
+        for display_form in self.display_form_index.find_in(query):
+            display_matches.update(self.entities_by_display_form[display_form])
+        
+        # Keep the best entities in a min-heap; ties go to the earliest added
+        best = []
+        def consider(entity: MathematicalEntity) -> None:
+            score = self._score_entity(
+                entity,
+                entity.entity_id in display_matches,
+                entity.entity_type in matched_types,
+                token_overlaps.get(entity.entity_id, 0),
+                now
+            )
+            item = (score, -self._ordinals[entity.entity_id], entity.entity_id)
+            if len(best) < max_entities:
+                heapq.heappush(best, item)
+            elif item > best[0]:
+                heapq.heapreplace(best, item)
+        
+        for entity_id in display_matches:
+            consider(self.entities[entity_id])
+        
+        # Score the remaining candidates by decreasing token overlap until
+        # an overlap group cannot beat the top
+        type_bonus = 0.5 if matched_types else 0.0
+        overlap_groups = {}
+        for entity_id, overlap in token_overlaps.items():
+            if entity_id not in display_matches:
+                overlap_groups.setdefault(overlap, []).append(entity_id)
+        
+        for overlap in sorted(overlap_groups, reverse=True):
+            if len(best) == max_entities and type_bonus + 0.1 * overlap + 0.5 < best[0][0]:
+                break
+            for entity_id in overlap_groups[overlap]:
+                consider(self.entities[entity_id])
+        
+        # Other entities score only on type, recency and references, so visit
+        # them most recently referenced first until none can beat the top
+        candidates = display_matches.union(token_overlaps)
+        for entity in self._iter_by_recency():
+            if entity.entity_id in candidates:
+                continue
+            if len(best) == max_entities:
+                bound = type_bonus + 0.3 * self._time_factor(entity, now) + 0.2
+                if bound < best[0][0]:
+                    break
+            consider(entity)
         
         # Return the top entities
-        top_entities = [entity.to_dict() for entity, _ in scored_entities[:max_entities]]
-        return top_entities
+        best.sort(reverse=True)
+        return [self.entities[entity_id].to_dict() for _, _, entity_id in best]
     
     def update_entity(self, entity_id: str, updates: Dict[str, Any]) -> bool:
         """
@@ -320,10 +490,14 @@ class EntityTracker:
             entity.update_metadata(updates["metadata"])
         
         if "value" in updates:
+            self._unindex_value(entity)
             entity.value = updates["value"]
+            self._index_value(entity)
         
         if "display_form" in updates:
+            self._unindex_display_form(entity)
             entity.display_form = updates["display_form"]
+            self._index_display_form(entity)
         
         if "latex_form" in updates:
             entity.latex_form = updates["latex_form"]
@@ -363,6 +537,36 @@ class EntityTracker:
             "named_entities": len(self.named_entities)
         }
     
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the tracker to a dictionary for storage.
+        
+        Returns:
+            Dictionary with the tracked entities and entity names
+        """
+        return {
+            "entities": [entity.to_dict() for entity in self.entities.values()],
+            "named_entities": dict(self.named_entities)
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'EntityTracker':
+        """
+        Rebuild a tracker from its dictionary representation.
+        
+        Args:
+            data: Dictionary from to_dict
+            
+        Returns:
+            EntityTracker object
+        """
+        tracker = cls()
+        for entity_data in data.get("entities", []):
+            tracker._track(MathematicalEntity.from_dict(entity_data))
+        for name, entity_id in data.get("named_entities", {}).items():
+            tracker._name_entity(name, entity_id)
+        return tracker
+    
     def _add_entity(self, 
                    entity_type: str, 
                    value: str,
@@ -393,14 +597,137 @@ class EntityTracker:
             metadata
         )
         
+        self._track(entity)
+        
+        return entity_id
+    
+    def _track(self, entity: MathematicalEntity) -> None:
+        """
+        Store an entity and add it to the indexes.
+        
+        Args:
+            entity: Entity to track
+        """
+        entity_id = entity.entity_id
         self.entities[entity_id] = entity
+        self._ordinals[entity_id] = len(self._ordinals)
+        
+        # Add to type-based indexes
+        if entity.entity_type not in self.entities_by_type:
+            self.entities_by_type[entity.entity_type] = set()
+            self.entities_in_order[entity.entity_type] = []
+            self._recency_heaps[entity.entity_type] = []
+        self.entities_by_type[entity.entity_type].add(entity_id)
+        self.entities_in_order[entity.entity_type].append(entity_id)
+        
+        self._index_display_form(entity)
+        self._index_value(entity)
+        self._index_recency(entity)
+    
+    def _name_entity(self, name: str, entity_id: str) -> None:
+        """
+        Register a name that refers to an entity.
         
-        # Add to type-based index
-        if entity_type not in self.entities_by_type:
-            self.entities_by_type[entity_type] = set()
-        self.entities_by_type[entity_type].add(entity_id)
+        Args:
+            name: Name of the entity
+            entity_id: ID of the entity
+        """
+        self.named_entities[name] = entity_id
+        self.name_index.add(name)
+    
+    def _record_reference(self, entity: MathematicalEntity) -> None:
+        """
+        Record a reference to an entity and update the recency index.
         
-        return entity_id
+        Args:
+            entity: Referenced entity
+        """
+        entity.record_reference()
+        self._index_recency(entity)
+    
+    def _index_display_form(self, entity: MathematicalEntity) -> None:
+        """Add an entity to the display form indexes."""
+        if not entity.display_form:
+            return
+        self.entities_by_display_form.setdefault(entity.display_form, set()).add(entity.entity_id)
+        self.display_form_index.add(entity.display_form)
+    
+    def _unindex_display_form(self, entity: MathematicalEntity) -> None:
+        """Remove an entity from the display form indexes."""
+        entity_ids = self.entities_by_display_form.get(entity.display_form)
+        if entity_ids is None:
+            return
+        entity_ids.discard(entity.entity_id)
+        if not entity_ids:
+            del self.entities_by_display_form[entity.display_form]
+            self.display_form_index.discard(entity.display_form)
+    
+    def _index_value(self, entity: MathematicalEntity) -> None:
+        """Add an entity to the inverted index of its value tokens."""
+        for token in set(entity.value.lower().split()):
+            self.entities_by_token.setdefault(token, set()).add(entity.entity_id)
+    
+    def _unindex_value(self, entity: MathematicalEntity) -> None:
+        """Remove an entity from the inverted index of its value tokens."""
+        for token in set(entity.value.lower().split()):
+            entity_ids = self.entities_by_token.get(token)
+            if entity_ids is None:
+                continue
+            entity_ids.discard(entity.entity_id)
+            if not entity_ids:
+                del self.entities_by_token[token]
+    
+    def _index_recency(self, entity: MathematicalEntity) -> None:
+        """
+        Push an entity's last reference time onto its type's recency heap.
+        
+        Earlier entries for the entity are left in place and skipped as
+        stale, and the heap is rebuilt once stale entries dominate.
+        """
+        heap = self._recency_heaps[entity.entity_type]
+        sequence = next(self._sequence)
+        self._recency_sequences[entity.entity_id] = sequence
+        heapq.heappush(heap, (-entity.last_referenced_at, sequence, entity.entity_id))
+        
+        if len(heap) > 2 * len(self.entities_by_type[entity.entity_type]) + 64:
+            heap[:] = [entry for entry in heap if self._recency_sequences[entry[2]] == entry[1]]
+            heapq.heapify(heap)
+    
+    def _iter_recency_heap(self, entity_type: str) -> Iterator[MathematicalEntity]:
+        """
+        Iterate over the entities of a type, most recently referenced first.
+        
+        The heap is walked through a frontier of its nodes rather than
+        popped, so it is left unchanged and only visited entries are ordered.
+        
+        Args:
+            entity_type: Type of entity
+            
+        Yields:
+            Entities in order of last reference, most recent first
+        """
+        heap = self._recency_heaps.get(entity_type)
+        if not heap:
+            return
+        
+        frontier = [(heap[0], 0)]
+        while frontier:
+            (_, sequence, entity_id), index = heapq.heappop(frontier)
+            if self._recency_sequences.get(entity_id) == sequence:
+                yield self.entities[entity_id]
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+    
+    def _iter_by_recency(self) -> Iterator[MathematicalEntity]:
+        """
+        Iterate over all entities, most recently referenced first.
+        
+        Yields:
+            Entities in order of last reference, most recent first
+        """
+        iterators = [self._iter_recency_heap(entity_type) for entity_type in self._recency_heaps]
+        return heapq.merge(*iterators, key=lambda entity: -entity.last_referenced_at)
     
     def _extract_latex_expressions(self, text: str) -> List[str]:
         """
@@ -540,13 +867,12 @@ class EntityTracker:
         Returns:
             Most recent entity or None if no entities of that type
         """
-        entities = self._get_entities_by_type(entity_type)
-        if not entities:
+        entity_ids = self.entities_in_order.get(entity_type)
+        if not entity_ids:
             return None
         
-        # Sort by creation time (most recent first)
-        entities.sort(key=lambda e: e.created_at, reverse=True)
-        return entities[0]
+        # Entities are kept in order of creation
+        return self.entities[entity_ids[-1]]
     
     def _get_most_recently_referenced_entity(self, 
                                            entity_type: str) -> Optional[MathematicalEntity]:
@@ -559,13 +885,8 @@ class EntityTracker:
         Returns:
             Most recently referenced entity or None if no entities of that type
         """
-        entities = self._get_entities_by_type(entity_type)
-        if not entities:
-            return None
-        
-        # Sort by last referenced time (most recent first)
-        entities.sort(key=lambda e: e.last_referenced_at, reverse=True)
-        return entities[0]
+        # The recency heap yields the most recently referenced entity first
+        return next(self._iter_recency_heap(entity_type), None)
     
     def _get_entity_by_reference(self, 
                                entity_type: str, 
@@ -582,17 +903,13 @@ class EntityTracker:
         """
         # If reference is a number, interpret as index
         if reference.isdigit():
-            # Get entities of this type sorted by creation time
-            entities = self._get_entities_by_type(entity_type)
-            if not entities:
-                return None
-            
-            entities.sort(key=lambda e: e.created_at)
+            # Entities of this type are kept in order of creation
+            entity_ids = self.entities_in_order.get(entity_type, [])
             
             # Use 1-indexed numbering (1 = oldest)
             index = int(reference) - 1
-            if 0 <= index < len(entities):
-                return entities[index]
+            if 0 <= index < len(entity_ids):
+                return self.entities[entity_ids[index]]
             
             return None
         
@@ -603,10 +920,13 @@ class EntityTracker:
             if entity and entity.entity_type == entity_type:
                 return entity
         
-        # Try to match by display form
-        for entity in self._get_entities_by_type(entity_type):
-            if entity.display_form == reference:
-                return entity
+        # Try to match by display form, oldest first
+        matches = [
+            entity_id for entity_id in self.entities_by_display_form.get(reference, ())
+            if self.entities[entity_id].entity_type == entity_type
+        ]
+        if matches:
+            return self.entities[min(matches, key=self._ordinals.get)]
         
         return None
     
@@ -618,31 +938,62 @@ class EntityTracker:
             entity: Entity to score
             query: Query text
             
+        Returns:
+            Relevance score (higher is more relevant)
+        """
+        query_tokens = set(query.lower().split())
+        value_tokens = set(entity.value.lower().split())
+        
+        return self._score_entity(
+            entity,
+            bool(entity.display_form) and entity.display_form in query,
+            entity.entity_type in query,
+            len(query_tokens.intersection(value_tokens)),
+            time.time()
+        )
+    
+    def _score_entity(self, 
+                     entity: MathematicalEntity,
+                     display_match: bool,
+                     type_match: bool,
+                     token_overlap: int,
+                     now: float) -> float:
+        """
+        Combine the relevance signals for an entity into a score.
+        
+        Args:
+            entity: Entity to score
+            display_match: Whether the entity's display form appears in the query
+            type_match: Whether the entity's type is mentioned in the query
+            token_overlap: Number of query tokens shared with the entity's value
+            now: Current time
+            
         Returns:
             Relevance score (higher is more relevant)
         """
         score = 0.0
         
         # Check if entity appears in query
-        if entity.display_form and entity.display_form in query:
+        if display_match:
             score += 1.0
         
         # Check if entity type is mentioned in query
-        if entity.entity_type in query:
+        if type_match:
             score += 0.5
         
         # Check for value overlap
-        query_tokens = set(query.lower().split())
-        value_tokens = set(entity.value.lower().split())
-        token_overlap = len(query_tokens.intersection(value_tokens))
         if token_overlap > 0:
             score += 0.1 * token_overlap
         
         # Consider recency and reference count
-        time_factor = 1.0 / (1.0 + (time.time() - entity.last_referenced_at) / 3600)  # Decay over hours
-        score += 0.3 * time_factor
+        score += 0.3 * self._time_factor(entity, now)
         
         ref_count_factor = min(entity.reference_count / 5.0, 1.0)  # Cap at 5 references
         score += 0.2 * ref_count_factor
         
         return score
+    
+    @staticmethod
+    def _time_factor(entity: MathematicalEntity, now: float) -> float:
+        """Recency factor of an entity, decaying over hours since its last reference."""
+        return 1.0 / (1.0 + (now - entity.last_referenced_at) / 3600)
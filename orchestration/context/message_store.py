@@ -0,0 +1,233 @@
+"""
+Indexed message storage for the Mathematical Multimodal LLM System.
+
+This module keeps the messages of a conversation in order together with a
+Fenwick tree of their token counts, so that the most recent messages fitting
+a token budget are found by binary search and messages are removed without
+shifting the rest of the conversation. Inserting anywhere but the end
+rebuilds the index and is meant for rare edits such as summaries.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from orchestration.monitoring.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class MessageStore:
+    """
+    Ordered message store with prefix token sums.
+
+    Removed messages leave a tombstone in their slot with a token count of
+    zero, and the slots are compacted once tombstones outnumber the live
+    messages.
+    """
+
+    def __init__(self, min_compaction_size: int = 64):
+        """
+        Initialize the message store.
+
+        Args:
+            min_compaction_size: Number of tombstones below which the store is never compacted
+        """
+        self.min_compaction_size = min_compaction_size
+
+        self._slots = []  # Message objects in order, None for removed messages
+        self._tree = [0]  # Fenwick tree of slot token counts (1-based)
+        self._positions = {}  # message_id -> slot index
+        self._total_tokens = 0
+        self._view = None  # Cached list of live messages
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, message_id: str) -> bool:
+        return message_id in self._positions
+
+    def __iter__(self) -> Iterator:
+        return iter(self.list())
+
+    @property
+    def total_tokens(self) -> int:
+        """Total token count of the live messages."""
+        return self._total_tokens
+
+    @property
+    def tombstones(self) -> int:
+        """Number of slots left by removed messages."""
+        return len(self._slots) - len(self._positions)
+
+    def append(self, message) -> None:
+        """
+        Append a message.
+
+        Args:
+            message: Message to append; its token count is stored with it
+        """
+        tokens = message.estimate_token_count()
+        self._slots.append(message)
+        self._positions[message.message_id] = len(self._slots) - 1
+
+        # The new node covers the slots (n - lowbit(n), n]
+        n = len(self._slots)
+        self._tree.append(tokens + self._prefix(n - 1) - self._prefix(n - (n & -n)))
+        self._total_tokens += tokens
+
+        if self._view is not None:
+            self._view.append(message)
+
+    def insert(self, index: int, message) -> None:
+        """
+        Insert a message before the live message at an index.
+
+        Unlike append this rebuilds the index, in linear time.
+
+        Args:
+            index: Position among the live messages to insert at
+            message: Message to insert
+        """
+        if index >= len(self._positions):
+            self.append(message)
+            return
+
+        messages = self.list().copy()
+        messages.insert(max(index, 0), message)
+        self._rebuild(messages)
+        self._total_tokens += message.estimate_token_count()
+
+    def get(self, message_id: str):
+        """
+        Get a message by ID.
+
+        Args:
+            message_id: ID of the message
+
+        Returns:
+            Message object if found, None otherwise
+        """
+        position = self._positions.get(message_id)
+        return None if position is None else self._slots[position]
+
+    def list(self) -> List:
+        """
+        Get the live messages in order.
+
+        The list is cached between removals and must not be modified.
+
+        Returns:
+            List of messages
+        """
+        if self._view is None:
+            self._view = [message for message in self._slots if message is not None]
+        return self._view
+
+    def remove(self, message_id: str):
+        """
+        Remove a message.
+
+        Args:
+            message_id: ID of the message to remove
+
+        Returns:
+            The removed message, or None if it was not found
+        """
+        removed = self.remove_many([message_id])
+        return removed[0] if removed else None
+
+    def remove_many(self, message_ids: Iterable[str]) -> List:
+        """
+        Remove several messages in one pass.
+
+        Args:
+            message_ids: IDs of the messages to remove
+
+        Returns:
+            The removed messages
+        """
+        removed = []
+        for message_id in message_ids:
+            position = self._positions.pop(message_id, None)
+            if position is None:
+                continue
+
+            message = self._slots[position]
+            tokens = message.estimate_token_count()
+            self._slots[position] = None
+            self._add(position, -tokens)
+            self._total_tokens -= tokens
+            removed.append(message)
+
+        if removed:
+            self._view = None
+            if self.tombstones > max(self.min_compaction_size, len(self._positions)):
+                self.compact()
+
+        return removed
+
+    def select_suffix(self, max_tokens: int) -> List:
+        """
+        Get the most recent messages whose combined token count fits a budget.
+
+        Args:
+            max_tokens: Maximum number of tokens
+
+        Returns:
+            The longest run of most recent messages within the budget, in order
+        """
+        if max_tokens <= 0:
+            return []
+
+        # The suffix after slot k fits when prefix(k) >= total - budget
+        target = self._total_tokens - max_tokens
+        start = 0 if target <= 0 else self._first_prefix_at_least(target)
+
+        return [message for message in self._slots[start:] if message is not None]
+
+    def compact(self) -> None:
+        """Drop tombstones and rebuild the index."""
+        self._rebuild(self.list().copy())
+
+        logger.debug(f"Compacted message store to {len(self._slots)} messages")
+
+    def _rebuild(self, messages: List) -> None:
+        """Replace the slots with live messages and rebuild the index."""
+        self._slots = messages
+        self._positions = {message.message_id: i for i, message in enumerate(self._slots)}
+        self._view = None
+
+        # Build the tree in linear time by pushing each node into its parent
+        tree = [0] + [message.estimate_token_count() for message in self._slots]
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _add(self, position: int, delta: int) -> None:
+        """Add to the token count of a slot."""
+        i = position + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, count: int) -> int:
+        """Sum the token counts of the first count slots."""
+        total = 0
+        while count > 0:
+            total += self._tree[count]
+            count -= count & -count
+        return total
+
+    def _first_prefix_at_least(self, target: int) -> int:
+        """Find the smallest k such that the first k slots hold at least target tokens."""
+        position = 0
+        remaining = target
+        step = 1 << (len(self._slots).bit_length() - 1) if self._slots else 0
+        while step:
+            node = position + step
+            if node < len(self._tree) and self._tree[node] < remaining:
+                position = node
+                remaining -= self._tree[node]
+            step >>= 1
+        return position + 1
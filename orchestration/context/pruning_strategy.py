@@ -8,6 +8,7 @@ exceeds the maximum allowed size, ensuring efficient use of the context window.
 import abc
 from typing import Dict, List, Any, Optional, Set, Tuple
 
+from orchestration.context.background_summarizer import BackgroundSummarizer
 from orchestration.monitoring.logger import get_logger
 
 logger = get_logger(__name__)
@@ -26,6 +27,20 @@ class PruningStrategy(abc.ABC):
         """
         pass
     
+    def prepare(self, conversation_state) -> bool:
+        """
+        Do work ahead of pruning while the context is within limits.
+        
+        Called after each message that does not require pruning.
+        
+        Args:
+            conversation_state: ConversationState object that may later be pruned
+            
+        Returns:
+            True if the conversation state was changed, False otherwise
+        """
+        return False
+    
     @abc.abstractmethod
     def get_name(self) -> str:
         """
@@ -78,12 +93,12 @@ class TokenBudgetStrategy(PruningStrategy):
             return
         
         # Get all messages
-        messages = conversation_state.messages.copy()
+        messages = conversation_state.messages
         if not messages:
             return
         
         # Determine how many messages to keep
-        current_tokens = conversation_state.estimate_token_count()
+        initial_tokens = current_tokens
         target_tokens = self.target_tokens
         
         # Always preserve the last N turns (1 turn = user message + system message)
@@ -125,23 +140,20 @@ class TokenBudgetStrategy(PruningStrategy):
         # Sort removable messages by timestamp (oldest first)
         removable_messages.sort(key=lambda x: x[1].timestamp)
         
-        # Remove messages until we're under the target token count
-        removed_count = 0
+        # Select messages until we're under the target token count
+        message_ids_to_remove = []
         for _, message in removable_messages:
-            message_tokens = message.estimate_token_count()
-            message_id = message.message_id
+            message_ids_to_remove.append(message.message_id)
+            current_tokens -= message.estimate_token_count()
             
-            # Remove the message
-            if conversation_state.remove_message(message_id):
-                current_tokens -= message_tokens
-                removed_count += 1
-                
-                if current_tokens <= target_tokens:
-                    break
+            if current_tokens <= target_tokens:
+                break
+        
+        # Remove the selected messages in one pass
+        removed_count = conversation_state.remove_messages(message_ids_to_remove)
         
         logger.info(f"TokenBudgetStrategy removed {removed_count} messages, "
-                  f"reducing token count from {current_tokens + message_tokens * removed_count} "
-                  f"to {current_tokens}")
+                  f"reducing token count from {initial_tokens} to {current_tokens}")
     
     def get_name(self) -> str:
         """
@@ -191,7 +203,7 @@ class RelevancePruningStrategy(PruningStrategy):
             return
         
         # Get all messages
-        messages = conversation_state.messages.copy()
+        messages = conversation_state.messages
         if not messages:
             return
         
@@ -219,6 +231,7 @@ class RelevancePruningStrategy(PruningStrategy):
                         break
         
         # Calculate relevance scores for each message
+        initial_tokens = current_tokens
         scores = []
         for i, message in enumerate(messages):
             # Skip preserved messages
@@ -231,23 +244,20 @@ class RelevancePruningStrategy(PruningStrategy):
         # Sort by relevance score (lowest first)
         scores.sort(key=lambda x: x[2])
         
-        # Remove messages until we're under the target token count
-        removed_count = 0
+        # Select messages until we're under the target token count
+        message_ids_to_remove = []
         for _, message, score in scores:
-            message_tokens = message.estimate_token_count()
-            message_id = message.message_id
+            message_ids_to_remove.append(message.message_id)
+            current_tokens -= message.estimate_token_count()
             
-            # Remove the message
-            if conversation_state.remove_message(message_id):
-                current_tokens -= message_tokens
-                removed_count += 1
-                
-                if current_tokens <= self.target_tokens:
-                    break
+            if current_tokens <= self.target_tokens:
+                break
+        
+        # Remove the selected messages in one pass
+        removed_count = conversation_state.remove_messages(message_ids_to_remove)
         
         logger.info(f"RelevancePruningStrategy removed {removed_count} messages, "
-                  f"reducing token count from {current_tokens + message_tokens * removed_count} "
-                  f"to {current_tokens}")
+                  f"reducing token count from {initial_tokens} to {current_tokens}")
     
     def _calculate_relevance_score(self, message, current_message) -> float:
         """
@@ -291,23 +301,59 @@ class SummaryPruningStrategy(PruningStrategy):
     Pruning strategy that summarizes older parts of the conversation.
     
     Replaces older message groups with summaries to save tokens.
+    
+    With a background summarizer, a rolling summary of the older turns is
+    produced on worker threads once the context passes the summarize ratio,
+    and swapped in, in place of the turns it covers, once a later turn is
+    complete. Pruning itself then only swaps in a finished summary, falling
+    back to token budget pruning if the limit is reached before the summary
+    is ready.
     """
     
     def __init__(self, 
                 max_tokens: int,
                 target_ratio: float = 0.8,
-                llm_summarizer = None):
+                llm_summarizer = None,
+                summarizer: Optional[BackgroundSummarizer] = None,
+                summarize_ratio: float = 0.6):
         """
         Initialize the summary pruning strategy.
         
         Args:
             max_tokens: Maximum token budget
             target_ratio: Target token usage ratio after pruning (0.0-1.0)
-            llm_summarizer: LLM-based summarizer function
+            llm_summarizer: LLM-based summarizer function, called on the request path
+                unless a background summarizer is given
+            summarizer: Background summarizer used to summarize ahead of the limit
+            summarize_ratio: Token usage ratio at which background summarization starts (0.0-1.0)
         """
         self.max_tokens = max_tokens
         self.target_tokens = int(max_tokens * target_ratio)
         self.llm_summarizer = llm_summarizer
+        self.summarizer = summarizer
+        self.summarize_tokens = int(max_tokens * summarize_ratio)
+    
+    def prepare(self, conversation_state) -> bool:
+        """
+        Swap in a finished summary at the end of a turn, or start one once the
+        context is large enough.
+        
+        Args:
+            conversation_state: ConversationState object that may later be pruned
+            
+        Returns:
+            True if a summary was swapped in, False otherwise
+        """
+        if self.summarizer is None:
+            return False
+        
+        if self._swap_in_summary(conversation_state):
+            return True
+        
+        if conversation_state.estimate_token_count() > self.summarize_tokens:
+            self._submit_summary(conversation_state)
+        
+        return False
     
     def apply(self, conversation_state) -> None:
         """
@@ -316,6 +362,10 @@ class SummaryPruningStrategy(PruningStrategy):
         Args:
             conversation_state: ConversationState object to prune
         """
+        if self.summarizer is not None:
+            self._apply_background(conversation_state)
+            return
+        
         # Check if we have a summarizer function
         if not self.llm_summarizer:
             logger.warning("SummaryPruningStrategy requires a summarizer function")
@@ -331,11 +381,133 @@ class SummaryPruningStrategy(PruningStrategy):
             # No pruning needed
             return
         
-        # Get all messages
-        messages = conversation_state.messages.copy()
-        if len(messages) < 4:  # Need at least 2 turns to summarize
+        # Select the oldest turns to summarize
+        turns_to_summarize = self._select_turns(conversation_state.messages)
+        if not turns_to_summarize:
             return
         
+        # Generate summary
+        summary = self.llm_summarizer(self._format_turns(turns_to_summarize))
+        
+        # Replace summarized messages with a summary
+        message_ids_to_remove = self._turn_message_ids(turns_to_summarize)
+        
+        # Remove messages that will be summarized
+        conversation_state.remove_messages(message_ids_to_remove)
+        
+        # Add summary as a system message at the beginning
+        conversation_state.add_system_message(
+            f"[Summary of previous conversation: {summary}]",
+            metadata={"is_summary": True, "summarized_messages": len(message_ids_to_remove)}
+        )
+        
+        logger.info(f"SummaryPruningStrategy summarized {len(message_ids_to_remove)} messages "
+                  f"into a summary message")
+    
+    def _apply_background(self, conversation_state) -> None:
+        """
+        Prune using summaries produced by the background summarizer.
+        
+        Args:
+            conversation_state: ConversationState object to prune
+        """
+        self._swap_in_summary(conversation_state)
+        
+        # Enforce the limit now if the summary is not ready or not enough,
+        # dropping the oldest messages of either role
+        if conversation_state.estimate_token_count() > self.max_tokens:
+            TokenBudgetStrategy(self.max_tokens, preserve_system_messages=False).apply(conversation_state)
+        
+        if conversation_state.estimate_token_count() > self.summarize_tokens:
+            self._submit_summary(conversation_state)
+    
+    def _submit_summary(self, conversation_state) -> bool:
+        """
+        Queue a rolling summary of the older turns and any earlier summary.
+        
+        Args:
+            conversation_state: ConversationState object to summarize
+            
+        Returns:
+            True if a summary job was queued, False otherwise
+        """
+        key = self._summary_key(conversation_state)
+        if self.summarizer.is_pending(key):
+            return False
+        
+        messages = conversation_state.messages
+        turns_to_summarize = self._select_turns(messages)
+        if not turns_to_summarize:
+            return False
+        
+        # Fold earlier summaries into the new one
+        earlier_summaries = [message for message in messages if message.metadata.get("is_summary")]
+        summary_text = "".join(f"{message.content}\n\n" for message in earlier_summaries)
+        summary_text += self._format_turns(turns_to_summarize)
+        message_ids = [message.message_id for message in earlier_summaries]
+        message_ids.extend(self._turn_message_ids(turns_to_summarize))
+        
+        return self.summarizer.submit(key, message_ids, summary_text)
+    
+    def _swap_in_summary(self, conversation_state) -> bool:
+        """
+        Replace summarized messages with a finished background summary.
+        
+        Summaries are only swapped in once the latest turn has its answer, so
+        a question and its answer are never split, and the summary takes the
+        place of the oldest message it covers.
+        
+        Args:
+            conversation_state: ConversationState object to update
+            
+        Returns:
+            True if a summary was swapped in, False otherwise
+        """
+        messages = conversation_state.messages
+        if not messages or messages[-1].role == "user":
+            return False
+        
+        job = self.summarizer.take(self._summary_key(conversation_state))
+        if job is None or job.error is not None or job.summary is None:
+            return False
+        
+        # Messages pruned while the summary was produced are already gone,
+        # and the summary keeps what they said; the messages before the
+        # first summarized one stay where they are
+        summarized = set(job.message_ids)
+        position = next(
+            (index for index, message in enumerate(messages) if message.message_id in summarized), 0
+        )
+        conversation_state.remove_messages(job.message_ids)
+        conversation_state.add_system_message(
+            f"[Summary of previous conversation: {job.summary}]",
+            metadata={"is_summary": True, "summarized_messages": len(job.message_ids)},
+            position=position
+        )
+        
+        logger.info(f"SummaryPruningStrategy swapped in a background summary of "
+                  f"{len(job.message_ids)} messages")
+        
+        return True
+    
+    def _summary_key(self, conversation_state) -> Tuple[str, float]:
+        """Key background summaries on the conversation and its creation, so cleared conversations start over."""
+        return (conversation_state.conversation_id, conversation_state.created_at)
+    
+    def _select_turns(self, messages) -> List[Tuple[Any, Any]]:
+        """
+        Select the oldest turns to summarize.
+        
+        Args:
+            messages: Messages in the conversation
+            
+        Returns:
+            List of (user message, system message or None) turns, empty if
+            the conversation is too short to summarize
+        """
+        if len(messages) < 4:  # Need at least 2 turns to summarize
+            return []
+        
         # Group messages into conversation turns (user message + system response)
         turns = []
         i = 0
@@ -359,41 +531,30 @@ class SummaryPruningStrategy(PruningStrategy):
         
         # If we have a very short conversation, don't summarize yet
         if len(turns) < 2:
-            return
+            return []
         
         # Determine how many turns to summarize (oldest first)
         # Start by summarizing half of the conversation except the most recent turn
         num_turns_to_summarize = max(1, len(turns) // 2)
-        turns_to_summarize = turns[:num_turns_to_summarize]
-        
-        # Prepare text for summarization
+        return turns[:num_turns_to_summarize]
+    
+    def _format_turns(self, turns) -> str:
+        """Prepare the text of conversation turns for summarization."""
         summary_text = ""
-        for user_msg, system_msg in turns_to_summarize:
+        for user_msg, system_msg in turns:
             summary_text += f"User: {user_msg.content}\n"
             if system_msg:
                 summary_text += f"System: {system_msg.content}\n\n"
-        
-        # Generate summary
-        summary = self.llm_summarizer(summary_text)
-        
-        # Replace summarized messages with a summary
-        message_ids_to_remove = []
-        for user_msg, system_msg in turns_to_summarize:
-            message_ids_to_remove.append(user_msg.message_id)
+        return summary_text
+    
+    def _turn_message_ids(self, turns) -> List[str]:
+        """Get the IDs of the messages in conversation turns."""
+        message_ids = []
+        for user_msg, system_msg in turns:
+            message_ids.append(user_msg.message_id)
             if system_msg:
-                message_ids_to_remove.append(system_msg.message_id)
-        
-        # Remove messages that will be summarized
-        conversation_state.remove_messages(message_ids_to_remove)
-        
-        # Add summary as a system message at the beginning
-        conversation_state.add_system_message(
-            f"[Summary of previous conversation: {summary}]",
-            metadata={"is_summary": True, "summarized_messages": len(message_ids_to_remove)}
-        )
-        
-        logger.info(f"SummaryPruningStrategy summarized {len(message_ids_to_remove)} messages "
-                  f"into a summary message")
+                message_ids.append(system_msg.message_id)
+        return message_ids
     
     def get_name(self) -> str:
         """
@@ -0,0 +1,158 @@
+"""
+Unit tests for background conversation summarization.
+"""
+
+import threading
+import time
+import unittest
+
+from orchestration.context.background_summarizer import BackgroundSummarizer
+from orchestration.context.context_manager import ContextManager
+from orchestration.context.conversation_store import InMemoryConversationStore
+from orchestration.context.pruning_strategy import SummaryPruningStrategy
+from orchestration.context.tokenizer import CharHeuristicTokenizer
+
+
+class BlockingSummarizer:
+    """LLM summarizer stand-in that blocks until released."""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.texts = []
+
+    def __call__(self, text):
+        self.texts.append(text)
+        self.started.set()
+        self.release.wait(5)
+        return f"summary {len(self.texts)}"
+
+
+def wait_for(condition, timeout=5.0):
+    """Wait until a condition holds."""
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            raise AssertionError("Timed out waiting for condition")
+        time.sleep(0.005)
+
+
+class TestBackgroundSummarizer(unittest.TestCase):
+    """Tests for the BackgroundSummarizer class."""
+
+    def test_bounded_queue(self):
+        """Jobs beyond the queue size and repeat jobs for a conversation are refused."""
+        llm = BlockingSummarizer()
+        summarizer = BackgroundSummarizer(llm, max_queue_size=1)
+        self.addCleanup(summarizer.close, 5)
+
+        self.assertTrue(summarizer.submit("a", ["m1"], "first"))
+        self.assertTrue(llm.started.wait(5))
+        self.assertFalse(summarizer.submit("a", ["m2"], "again"))
+        self.assertTrue(summarizer.submit("b", ["m3"], "queued"))
+        self.assertFalse(summarizer.submit("c", ["m4"], "refused"))
+        self.assertIsNone(summarizer.take("a"))
+
+        llm.release.set()
+        wait_for(lambda: not summarizer.is_pending("b"))
+        self.assertEqual(summarizer.take("a").summary, "summary 1")
+        self.assertEqual(summarizer.take("b").summary, "summary 2")
+        self.assertIsNone(summarizer.take("a"))
+
+    def test_failed_job(self):
+        """A failing summarizer produces a job carrying the error."""
+        def fail(text):
+            raise RuntimeError("model unavailable")
+
+        summarizer = BackgroundSummarizer(fail)
+        self.addCleanup(summarizer.close, 5)
+        summarizer.submit("a", ["m1"], "text")
+
+        wait_for(lambda: not summarizer.is_pending("a"))
+        job = summarizer.take("a")
+        self.assertIsInstance(job.error, RuntimeError)
+        self.assertIsNone(job.summary)
+
+
+class TestBackgroundSummaryPruning(unittest.TestCase):
+    """Tests for SummaryPruningStrategy with a background summarizer."""
+
+    def setUp(self):
+        self.llm = BlockingSummarizer()
+        self.summarizer = BackgroundSummarizer(self.llm)
+        self.addCleanup(self.summarizer.close, 5)
+        self.addCleanup(self.llm.release.set)
+        self.strategy = SummaryPruningStrategy(400, summarizer=self.summarizer, summarize_ratio=0.5)
+        self.manager = ContextManager(
+            max_context_tokens=400,
+            entity_tracking_enabled=False,
+            pruning_strategy=self.strategy,
+            tokenizer=CharHeuristicTokenizer(),
+            conversation_store=InMemoryConversationStore()
+        )
+        self.conversation_id = self.manager.create_conversation("user")
+
+    def add_turns(self, count):
+        """Add user and system turns of about 35 tokens per message."""
+        for i in range(count):
+            self.manager.add_user_message(self.conversation_id, f"question {i} " + "x" * 100)
+            self.manager.add_system_message(self.conversation_id, f"answer {i} " + "y" * 100)
+
+    def state(self):
+        return self.manager.conversation_states[self.conversation_id]
+
+    def test_summary_prepared_before_limit(self):
+        """Summarization starts before the limit and its result is swapped in later."""
+        self.add_turns(3)
+        self.assertTrue(self.llm.started.wait(5))
+        self.assertLess(self.state().estimate_token_count(), 400)
+        summarized = self.summarizer._jobs[self.strategy._summary_key(self.state())].message_ids
+
+        self.llm.release.set()
+        wait_for(lambda: not self.summarizer.is_pending(self.strategy._summary_key(self.state())))
+
+        # The summary waits for the turn to be answered
+        self.assertFalse(self.manager.add_user_message(self.conversation_id, "next question")["pruned"])
+        self.assertTrue(self.manager.add_system_message(self.conversation_id, "next answer")["pruned"])
+
+        messages = self.state().messages
+        self.assertTrue(all(self.state().get_message(message_id) is None for message_id in summarized))
+        self.assertEqual(messages[0].content, "[Summary of previous conversation: summary 1]")
+        self.assertEqual(messages[0].metadata["summarized_messages"], len(summarized))
+        self.assertEqual([message.content for message in messages[-2:]], ["next question", "next answer"])
+
+    def test_limit_enforced_while_summarizing(self):
+        """The limit holds while a summary is running and the summary is applied afterwards."""
+        self.add_turns(3)
+        self.assertTrue(self.llm.started.wait(5))
+
+        self.add_turns(4)
+        self.assertLessEqual(self.state().estimate_token_count(), 400)
+        self.assertEqual(len(self.llm.texts), 1)
+
+        self.llm.release.set()
+        wait_for(lambda: not self.summarizer.is_pending(self.strategy._summary_key(self.state())))
+        self.add_turns(1)
+
+        summaries = [message for message in self.state().messages if message.metadata.get("is_summary")]
+        self.assertEqual(len(summaries), 1)
+        self.assertIs(self.state().messages[0], summaries[0])
+
+    def test_rolling_summary_and_cleared_conversation(self):
+        """Later summaries fold in earlier ones, and clearing drops pending summaries."""
+        self.llm.release.set()
+        self.add_turns(3)
+        wait_for(lambda: len(self.llm.texts) == 1 and not self.summarizer.is_pending(
+            self.strategy._summary_key(self.state())))
+        self.add_turns(3)
+        wait_for(lambda: len(self.llm.texts) == 2)
+        self.assertTrue(self.llm.texts[1].startswith("[Summary of previous conversation: summary 1]"))
+
+        self.manager.clear_conversation(self.conversation_id)
+        time.sleep(0.05)
+        self.manager.add_user_message(self.conversation_id, "fresh start")
+        self.assertEqual([message.content for message in self.state().messages], ["fresh start"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+"""
+Unit tests for conversation persistence and eviction in the context manager.
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from orchestration.context.context_manager import ContextManager
+from orchestration.context.conversation_store import InMemoryConversationStore, SQLiteConversationStore
+from orchestration.context.tokenizer import CharHeuristicTokenizer
+
+
+class SlowConversationStore(InMemoryConversationStore):
+    """In-memory store whose saves are slow and record the thread they ran on."""
+
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+        self.save_threads = []
+
+    def save(self, conversation_id, record):
+        self.save_threads.append(threading.current_thread().name)
+        time.sleep(self.delay)
+        return super().save(conversation_id, record)
+
+
+class TestConversationStore(unittest.TestCase):
+    """Tests for ContextManager caching in front of a conversation store."""
+
+    def make_manager(self, store, **kwargs):
+        return ContextManager(tokenizer=CharHeuristicTokenizer(), conversation_store=store, **kwargs)
+
+    def test_evicted_conversations_rehydrate(self):
+        """Least recently used conversations are saved, evicted and loaded back on use."""
+        manager = self.make_manager(InMemoryConversationStore(), max_cached_conversations=2)
+        conversation_ids = [manager.create_conversation(f"user{i}") for i in range(3)]
+        manager.add_user_message(conversation_ids[0], "Let f(x) = x^2 + 1")
+
+        manager.add_user_message(conversation_ids[2], "hello")
+        manager.add_user_message(conversation_ids[1], "hello")
+
+        self.assertNotIn(conversation_ids[0], manager.conversation_states)
+        self.assertEqual(len(manager.conversation_states), 2)
+
+        context = manager.get_conversation_context(conversation_ids[0])
+        self.assertIn("USER: Let f(x) = x^2 + 1", context)
+        self.assertGreaterEqual(len(manager.get_relevant_entities(conversation_ids[0], "f(x)")), 1)
+
+    def test_idle_conversations_are_evicted(self):
+        """Conversations unused for longer than the idle timeout leave memory but not the store."""
+        manager = self.make_manager(InMemoryConversationStore(), idle_timeout=0.05, flush_interval=60)
+        idle_id = manager.create_conversation("idle")
+        manager.add_user_message(idle_id, "first question")
+
+        time.sleep(0.1)
+        active_id = manager.create_conversation("active")
+
+        self.assertEqual(list(manager.conversation_states), [active_id])
+        self.assertEqual(manager.get_context_summary(idle_id)["message_count"], 1)
+
+    def test_shared_sqlite_store(self):
+        """Two managers on one SQLite file see each other's conversations."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "context.db")
+            first = self.make_manager(SQLiteConversationStore(path), flush_interval=0, revalidate_interval=0)
+            second = self.make_manager(SQLiteConversationStore(path), flush_interval=0, revalidate_interval=0)
+
+            conversation_id = first.create_conversation("user")
+            first.add_user_message(conversation_id, "What is 2 + 2?")
+            second.add_system_message(conversation_id, "4")
+            first_context = first.get_conversation_context(conversation_id)
+
+            self.assertTrue(second.delete_conversation(conversation_id))
+            restarted = self.make_manager(SQLiteConversationStore(path))
+            with self.assertRaises(ValueError):
+                restarted.get_conversation_context(conversation_id)
+
+        self.assertIn("USER: What is 2 + 2?", first_context)
+        self.assertIn("SYSTEM: 4", first_context)
+
+    def test_quiet_conversations_are_flushed(self):
+        """The background task and close write changes no later change would flush."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "context.db")
+            manager = self.make_manager(SQLiteConversationStore(path), flush_interval=0.05)
+            reader = self.make_manager(SQLiteConversationStore(path))
+
+            async def run():
+                manager.start_background_flush()
+                conversation_id = manager.create_conversation("user")
+                manager.add_user_message(conversation_id, "first")
+                manager.add_user_message(conversation_id, "second")
+                await asyncio.sleep(0.2)
+                return conversation_id
+
+            conversation_id = asyncio.run(run())
+            self.assertEqual(reader.get_context_summary(conversation_id)["message_count"], 2)
+
+            manager.flush_interval = 60
+            manager.add_user_message(conversation_id, "third")
+            self.assertIn(conversation_id, manager.dirty_conversations)
+            manager.close()
+            restarted = self.make_manager(SQLiteConversationStore(path))
+            self.assertEqual(restarted.get_context_summary(conversation_id)["message_count"], 3)
+            reader.close()
+            restarted.close()
+
+
+class TestWriteBehind(unittest.IsolatedAsyncioTestCase):
+    """Tests for conversation store writes made from the event loop."""
+
+    async def test_writes_run_off_the_event_loop(self):
+        """Changes on the event loop are written on the writer thread without waiting."""
+        store = SlowConversationStore(delay=0.2)
+        manager = ContextManager(tokenizer=CharHeuristicTokenizer(), conversation_store=store,
+                                 flush_interval=0, idle_timeout=0)
+
+        started = time.monotonic()
+        conversation_id = manager.create_conversation("user")
+        manager.add_user_message(conversation_id, "What is 2 + 2?")
+        self.assertLess(time.monotonic() - started, 0.1)
+
+        # Not evicted while its changes are unwritten
+        self.assertIn(conversation_id, manager.conversation_states)
+
+        await manager.flush_async()
+        while manager.pending_writes:
+            await asyncio.sleep(0.05)
+        self.assertTrue(all(name.startswith("context-store-writer") for name in store.save_threads))
+        self.assertEqual(manager.evict_idle_conversations(), 1)
+        self.assertEqual(manager.get_context_summary(conversation_id)["message_count"], 1)
+        manager.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
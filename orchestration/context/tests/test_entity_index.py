@@ -0,0 +1,125 @@
+"""
+Unit tests for the entity tracker indexes.
+"""
+
+import random
+import time
+import unittest
+from unittest import mock
+
+from orchestration.context.entity_tracker import EntityTracker, SubstringIndex
+
+NOW = 1_700_000_000.0
+
+TYPES = ["expression", "variable", "function", "equation"]
+WORDS = ["x", "y", "sin", "cos", "+", "2", "derivative", "integral", "of", "limit"]
+
+
+def random_tracker(rng, count):
+    """Build a tracker of random entities with repeated times, forms and tokens."""
+    entities = []
+    for i in range(count):
+        value = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+        entities.append({
+            "entity_id": f"e{i}",
+            "entity_type": rng.choice(TYPES),
+            "value": value,
+            "display_form": rng.choice([None, f"f{rng.randint(0, 30)}", value]),
+            "created_at": NOW - 7200 + i,
+            "last_referenced_at": NOW - rng.choice([0, 60, 600, 3600, rng.uniform(0, 86400)]),
+            "reference_count": rng.randint(0, 8),
+        })
+    return EntityTracker.from_dict({"entities": entities, "named_entities": {}})
+
+
+def random_query(rng):
+    """Build a query mixing value words, entity types and display forms."""
+    parts = [rng.choice(WORDS + TYPES + [f"f{rng.randint(0, 30)}"]) for _ in range(rng.randint(0, 6))]
+    return " ".join(parts)
+
+
+def naive_relevant(tracker, query, max_entities):
+    """Score every entity and sort, as the tracker did before it was indexed."""
+    ranked = sorted(
+        tracker.entities.values(),
+        key=lambda entity: tracker._calculate_relevance_score(entity, query),
+        reverse=True
+    )
+    return [entity.entity_id for entity in ranked[:max_entities]]
+
+
+class TestSubstringIndex(unittest.TestCase):
+    """Tests for the SubstringIndex class."""
+
+    def test_matches_naive_containment(self):
+        """Strings found in a query are exactly the indexed strings it contains."""
+        rng = random.Random(3)
+        alphabet = "abcx12^ "
+        strings = {"".join(rng.choice(alphabet) for _ in range(rng.randint(1, 6))) for _ in range(300)}
+        index = SubstringIndex()
+        for string in strings:
+            index.add(string)
+        for string in list(strings)[:50]:
+            index.discard(string)
+            strings.discard(string)
+
+        for _ in range(200):
+            query = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+            self.assertEqual(index.find_in(query), {string for string in strings if string in query})
+
+
+class TestEntityIndex(unittest.TestCase):
+    """Tests for indexed entity lookups."""
+
+    def test_relevant_entities_match_full_scan(self):
+        """Indexed relevance ranking agrees with scoring every entity."""
+        rng = random.Random(11)
+        tracker = random_tracker(rng, 400)
+
+        with mock.patch("orchestration.context.entity_tracker.time.time", return_value=NOW):
+            for _ in range(200):
+                query = random_query(rng)
+                max_entities = rng.choice([1, 5, 20])
+                relevant = [entity["entity_id"] for entity in tracker.get_relevant_entities(query, max_entities)]
+                self.assertEqual(relevant, naive_relevant(tracker, query, max_entities), query)
+
+    def test_indexes_follow_updates_and_references(self):
+        """Updated values and references are reflected in later lookups."""
+        tracker = EntityTracker()
+        first = tracker._add_entity("expression", "x + 1")
+        second = tracker._add_entity("expression", "y + 2", display_form="g")
+
+        tracker.update_entity(first, {"value": "integral of x", "display_form": "h"})
+        self.assertEqual(tracker.entities_by_token.get("+"), {second})
+        self.assertEqual(tracker._get_entity_by_reference("expression", "h").entity_id, first)
+        self.assertIsNone(tracker._get_entity_by_reference("expression", "x + 1"))
+
+        later = time.time() + 10
+        with mock.patch("orchestration.context.entity_tracker.time.time", return_value=later):
+            tracker._record_reference(tracker.entities[first])
+            self.assertEqual(tracker._get_most_recently_referenced_entity("expression").entity_id, first)
+            self.assertEqual(tracker.get_relevant_entities("unrelated", 1)[0]["entity_id"], first)
+
+        with mock.patch("orchestration.context.entity_tracker.time.time", return_value=later + 10):
+            for _ in range(200):
+                tracker._record_reference(tracker.entities[second])
+        self.assertLessEqual(len(tracker._recency_heaps["expression"]), 2 * 2 + 64)
+        self.assertEqual(tracker._get_most_recently_referenced_entity("expression").entity_id, second)
+
+    def test_reference_lookups(self):
+        """Ordinal, latest and named references resolve through the indexes."""
+        tracker = EntityTracker()
+        tracker.extract_entities("Let a = 3 and let b = 4. Define f(x) = x^2.")
+        variables = tracker.entities_in_order["variable"]
+
+        self.assertEqual(tracker._get_entity_by_reference("variable", "2").entity_id, variables[1])
+        self.assertIsNone(tracker._get_entity_by_reference("variable", "9"))
+        self.assertEqual(tracker._get_most_recent_entity("variable").entity_id, variables[-1])
+
+        _, referenced = tracker.resolve_references("Now double b")
+        self.assertIn(tracker.named_entities["b"], referenced)
+        self.assertNotIn(tracker.named_entities["a"], referenced)
+
+
+if __name__ == "__main__":
+    unittest.main()
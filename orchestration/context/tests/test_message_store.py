@@ -0,0 +1,79 @@
+"""
+Unit tests for the indexed message store.
+"""
+
+import random
+import unittest
+
+from orchestration.context.conversation_state import Message
+from orchestration.context.message_store import MessageStore
+
+
+def make_message(index, tokens):
+    """Create a message with a known token count."""
+    return Message(f"m{index}", "user", f"message {index}", float(index), token_count=tokens)
+
+
+def naive_suffix(messages, max_tokens):
+    """Select the most recent messages within a budget the straightforward way."""
+    selected = []
+    used = 0
+    for message in reversed(messages):
+        if used + message.token_count > max_tokens:
+            break
+        selected.insert(0, message)
+        used += message.token_count
+    return selected
+
+
+class TestMessageStore(unittest.TestCase):
+    """Tests for the MessageStore class."""
+
+    def test_matches_naive_selection(self):
+        """Budgeted selection agrees with a linear scan through appends, inserts and removals."""
+        rng = random.Random(7)
+        store = MessageStore(min_compaction_size=8)
+        expected = []
+
+        for i in range(500):
+            message = make_message(i, rng.randint(0, 40))
+            store.append(message)
+            expected.append(message)
+
+            if i % 7 == 0:
+                removed = rng.sample(expected, min(len(expected), 3))
+                store.remove_many(message.message_id for message in removed)
+                expected = [message for message in expected if message not in removed]
+
+            if i % 11 == 0:
+                position = rng.randint(0, len(expected))
+                inserted = make_message(10000 + i, rng.randint(0, 40))
+                store.insert(position, inserted)
+                expected.insert(position, inserted)
+
+            budget = rng.randint(0, 400)
+            self.assertEqual(store.select_suffix(budget), naive_suffix(expected, budget))
+
+        self.assertEqual(store.list(), expected)
+        self.assertEqual(store.total_tokens, sum(message.token_count for message in expected))
+
+    def test_tombstones_are_compacted(self):
+        """Removed slots are reclaimed once they outnumber live messages."""
+        store = MessageStore(min_compaction_size=10)
+        for i in range(100):
+            store.append(make_message(i, 1))
+
+        store.remove_many(f"m{i}" for i in range(0, 100, 2))
+        self.assertEqual(store.tombstones, 50)
+
+        self.assertIsNotNone(store.remove("m1"))
+        self.assertIsNone(store.remove("m1"))
+
+        self.assertEqual(store.tombstones, 0)
+        self.assertEqual(len(store), 49)
+        self.assertEqual(store.get("m99").content, "message 99")
+        self.assertEqual([message.message_id for message in store.select_suffix(2)], ["m97", "m99"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Unit tests for context token counting.
+"""
+
+import unittest
+from unittest.mock import patch
+
+from orchestration.context.context_manager import ContextManager
+from orchestration.context.conversation_state import ConversationState
+from orchestration.context.tokenizer import (
+    CONVERSATION_OVERHEAD_TOKENS, MESSAGE_OVERHEAD_TOKENS,
+    CharHeuristicTokenizer, Tokenizer, create_tokenizer
+)
+
+
+class WordTokenizer(Tokenizer):
+    """Tokenizer counting whitespace-separated words and the calls made to it."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def count(self, text):
+        self.calls += 1
+        return len(text.split())
+
+    def get_name(self):
+        return "WordTokenizer"
+
+
+class TestTokenizer(unittest.TestCase):
+    """Tests for tokenizer selection and the heuristic fallback."""
+
+    def test_heuristic_rounds_up(self):
+        """Heuristic counts never under-count partial tokens."""
+        tokenizer = CharHeuristicTokenizer(chars_per_token=4)
+
+        self.assertEqual(tokenizer.count(""), 0)
+        self.assertEqual(tokenizer.count("x"), 1)
+        self.assertEqual(tokenizer.count("x^2 + 1"), 2)
+
+    def test_missing_vocabulary_falls_back(self):
+        """A missing vocabulary file falls back to the heuristic."""
+        with patch.dict("os.environ", {"MISTRAL_TOKENIZER_PATH": "/nonexistent/tokenizer.model"}):
+            tokenizer = create_tokenizer()
+
+        self.assertIsInstance(tokenizer, CharHeuristicTokenizer)
+
+
+class TestTokenAccounting(unittest.TestCase):
+    """Tests for per-message token counts and the running conversation total."""
+
+    def setUp(self):
+        self.tokenizer = WordTokenizer()
+        self.state = ConversationState("conversation", "user", tokenizer=self.tokenizer)
+
+    def test_counts_are_computed_once(self):
+        """Each message is tokenized once and budget checks reuse the stored counts."""
+        message_id = self.state.add_user_message("find the derivative of x^2")
+        self.state.add_system_message("2x")
+
+        for _ in range(10):
+            self.state.estimate_token_count()
+            self.state.get_context_text(max_tokens=100)
+
+        self.assertEqual(self.tokenizer.calls, 2)
+        self.assertEqual(self.state.get_message(message_id).token_count, 5 + MESSAGE_OVERHEAD_TOKENS)
+        self.assertEqual(self.state.estimate_token_count(),
+                         6 + 2 * MESSAGE_OVERHEAD_TOKENS + CONVERSATION_OVERHEAD_TOKENS)
+
+    def test_total_follows_removals(self):
+        """Removing messages keeps the running total equal to the sum of the messages."""
+        message_ids = [self.state.add_user_message("word " * i) for i in range(1, 6)]
+
+        self.state.remove_messages(message_ids[1:3])
+
+        expected = sum(message.token_count for message in self.state.messages)
+        self.assertEqual(self.state.estimate_token_count(), expected + CONVERSATION_OVERHEAD_TOKENS)
+
+    def test_pruning_stays_within_budget(self):
+        """Pruning measured with the manager's tokenizer brings the context under the limit."""
+        context_manager = ContextManager(max_context_tokens=100, entity_tracking_enabled=False,
+                                         tokenizer=self.tokenizer)
+        conversation_id = context_manager.create_conversation("user")
+
+        for i in range(20):
+            result = context_manager.add_user_message(conversation_id, "word " * 10)
+
+        self.assertLessEqual(result["context_tokens"], 100)
+        self.assertEqual(self.tokenizer.calls, 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
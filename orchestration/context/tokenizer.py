@@ -0,0 +1,182 @@
+"""
+Token counting for the Mathematical Multimodal LLM System.
+
+This module provides the tokenizers used to measure conversation context
+against the model's context window. When a Mistral SentencePiece vocabulary
+is available locally, counts are exact; otherwise a conservative character
+heuristic is used so that budgets err on the side of leaving room.
+"""
+
+import abc
+import math
+import os
+from typing import Optional
+
+from orchestration.monitoring.logger import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import sentencepiece
+    HAS_SENTENCEPIECE = True
+except ImportError:
+    HAS_SENTENCEPIECE = False
+
+# Tokens added per message by the chat template (role markers, separators)
+MESSAGE_OVERHEAD_TOKENS = 5
+
+# Tokens added once per conversation (BOS and prompt framing)
+CONVERSATION_OVERHEAD_TOKENS = 10
+
+
+class Tokenizer(abc.ABC):
+    """Abstract base class for token counters."""
+
+    @abc.abstractmethod
+    def count(self, text: str) -> int:
+        """
+        Count the tokens in a text.
+
+        Args:
+            text: Text to count
+
+        Returns:
+            Number of tokens
+        """
+        pass
+
+    @abc.abstractmethod
+    def get_name(self) -> str:
+        """
+        Get the name of the tokenizer.
+
+        Returns:
+            Tokenizer name
+        """
+        pass
+
+
+class CharHeuristicTokenizer(Tokenizer):
+    """
+    Tokenizer that estimates counts from the text length.
+
+    Mathematical text (symbols, digits, LaTeX) tokenizes more densely than
+    prose, so the default ratio is below the usual 4 characters per token
+    and counts are rounded up.
+    """
+
+    def __init__(self, chars_per_token: float = 3.5):
+        """
+        Initialize the heuristic tokenizer.
+
+        Args:
+            chars_per_token: Average number of characters per token
+        """
+        self.chars_per_token = chars_per_token
+
+    def count(self, text: str) -> int:
+        """
+        Estimate the tokens in a text.
+
+        Args:
+            text: Text to count
+
+        Returns:
+            Estimated number of tokens
+        """
+        return math.ceil(len(text) / self.chars_per_token)
+
+    def get_name(self) -> str:
+        """
+        Get the name of the tokenizer.
+
+        Returns:
+            Tokenizer name
+        """
+        return "CharHeuristicTokenizer"
+
+
+class SentencePieceTokenizer(Tokenizer):
+    """Tokenizer that counts with a SentencePiece vocabulary such as Mistral's tokenizer.model."""
+
+    def __init__(self, model_path: str):
+        """
+        Load a SentencePiece vocabulary.
+
+        Args:
+            model_path: Path to the SentencePiece model file
+
+        Raises:
+            ImportError: If sentencepiece is not installed
+        """
+        if not HAS_SENTENCEPIECE:
+            raise ImportError("sentencepiece is required for SentencePieceTokenizer")
+
+        self.model_path = model_path
+        self.processor = sentencepiece.SentencePieceProcessor(model_file=model_path)
+
+    def count(self, text: str) -> int:
+        """
+        Count the tokens in a text.
+
+        Args:
+            text: Text to count
+
+        Returns:
+            Number of tokens
+        """
+        return len(self.processor.encode(text))
+
+    def get_name(self) -> str:
+        """
+        Get the name of the tokenizer.
+
+        Returns:
+            Tokenizer name
+        """
+        return "SentencePieceTokenizer"
+
+
+def create_tokenizer(model_path: Optional[str] = None) -> Tokenizer:
+    """
+    Create the most accurate tokenizer available.
+
+    Args:
+        model_path: Path to a SentencePiece model file; read from the
+            MISTRAL_TOKENIZER_PATH environment variable if not given
+
+    Returns:
+        SentencePiece tokenizer if the vocabulary can be loaded, otherwise
+        the character heuristic
+    """
+    model_path = model_path or os.environ.get("MISTRAL_TOKENIZER_PATH")
+
+    if model_path:
+        if not HAS_SENTENCEPIECE:
+            logger.warning("sentencepiece is not installed, using heuristic token counts")
+        elif not os.path.exists(model_path):
+            logger.warning(f"Tokenizer model not found at {model_path}, using heuristic token counts")
+        else:
+            try:
+                return SentencePieceTokenizer(model_path)
+            except Exception as e:
+                logger.warning(f"Could not load tokenizer model {model_path}: {e}")
+
+    return CharHeuristicTokenizer()
+
+
+# Singleton instance
+_tokenizer = None
+
+def get_tokenizer() -> Tokenizer:
+    """
+    Get the singleton instance of the tokenizer.
+
+    Returns:
+        The tokenizer instance
+    """
+    global _tokenizer
+    if _tokenizer is None:
+        _tokenizer = create_tokenizer()
+        logger.info(f"Using {_tokenizer.get_name()} for context token counts")
+    return _tokenizer
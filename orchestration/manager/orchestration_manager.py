@@ -23,6 +23,10 @@ from ..monitoring.logger import get_logger
 from ..monitoring.tracing import get_tracer, Span
 from ..monitoring.metrics import get_registry, record_processing_time
 from ..workflow.workflow_registry import WorkflowRegistry, get_workflow_registry
+from ..workflow.workflow_engine import (
+    RESPONSE_MESSAGE_TYPES, TERMINAL_EVENTS, WorkflowEngine, WorkflowExecution,
+    WorkflowExecutionStatus, get_workflow_engine
+)
 from ..agents.registry import AgentRegistry, get_agent_registry
 
 logger = get_logger(__name__)
@@ -80,16 +84,39 @@ class WorkflowContext(BaseModel):
         self.update_status(WorkflowStatus.FAILED)
 
 
+# Manager status for each engine execution status
+EXECUTION_STATUSES = {
+    WorkflowExecutionStatus.CREATED: WorkflowStatus.CREATED,
+    WorkflowExecutionStatus.RUNNING: WorkflowStatus.RUNNING,
+    WorkflowExecutionStatus.WAITING: WorkflowStatus.WAITING,
+    WorkflowExecutionStatus.PAUSED: WorkflowStatus.WAITING,
+    WorkflowExecutionStatus.COMPLETED: WorkflowStatus.COMPLETED,
+    WorkflowExecutionStatus.FAILED: WorkflowStatus.FAILED,
+    WorkflowExecutionStatus.CANCELED: WorkflowStatus.CANCELED,
+    WorkflowExecutionStatus.TIMED_OUT: WorkflowStatus.FAILED
+}
+
+
 class OrchestrationManager:
     """
     Orchestration Manager for coordinating workflows between agents.
+    
+    Workflows run on the shared WorkflowEngine, which owns their state,
+    step dispatch, response handling and cleanup. The manager presents
+    them to its callers and subscribers as WorkflowContext objects.
     """
-    def __init__(self):
+    def __init__(self, workflow_engine: Optional[WorkflowEngine] = None):
+        """
+        Initialize the orchestration manager.
+        
+        Args:
+            workflow_engine: Engine that executes the workflows; the shared engine if not set
+        """
         self.message_bus = get_message_bus()
         self.workflow_registry = get_workflow_registry()
         self.agent_registry = get_agent_registry()
+        self.engine = workflow_engine or get_workflow_engine()
         
-        self.active_workflows: Dict[str, WorkflowContext] = {}
         self.workflow_futures: Dict[str, asyncio.Future] = {}
         self.workflow_subscription_callbacks: Dict[str, List[Callable]] = {}
         
@@ -101,9 +128,8 @@ class OrchestrationManager:
         
     async def initialize(self):
         """Initialize the orchestration manager."""
-        # Connect to the message bus if not already connected
-        if not self.message_bus.connection:
-            await self.message_bus.connect()
+        # Start the engine, which connects to the message bus and consumes agent responses
+        await self.engine.start()
             
         # Set up the orchestration queue
         orchestration_queue = await self.message_bus.declare_queue(
@@ -162,84 +188,11 @@ class OrchestrationManager:
         
     async def _handle_message(self, message: Message):
         """Handle messages sent to the orchestration manager."""
-        message_type = message.header.message_type
+        # Agents replying to the manager are answering workflow steps run by the engine
+        await self.engine._handle_message(message)
         
-        # Handle different message types
-        if message_type in [MessageType.COMPUTATION_RESULT, MessageType.VISUALIZATION_RESULT, 
-                           MessageType.OCR_RESULT, MessageType.SEARCH_RESULT, MessageType.QUERY_RESPONSE]:
-            await self._handle_response(message)
-            
-        elif message_type == MessageType.ERROR:
-            await self._handle_error(message)
-            
-    async def _handle_response(self, message: Message):
-        """Handle response messages from agents."""
-        # Check if this is a response for an active workflow
-        flow_id = message.header.route.flow_id
-        if flow_id and flow_id in self.active_workflows:
-            workflow = self.active_workflows[flow_id]
-            
-            # Record the step completion
-            if workflow.current_step_index < len(workflow.steps):
-                current_step = workflow.steps[workflow.current_step_index]
-                current_step["completed_at"] = datetime.datetime.now().isoformat()
-                current_step["result"] = {
-                    "message_id": message.header.message_id,
-                    "message_type": message.header.message_type,
-                    "timestamp": message.header.timestamp
-                }
-                
-            # Update workflow data with response
-            if message.body:
-                workflow.update_data(message.body)
-                
-            # Continue workflow execution
-            await self._continue_workflow(workflow)
-            
-            # Notify subscribers
-            await self._notify_workflow_subscribers(workflow.workflow_id, "step_completed", workflow)
-            
         # Handle normal response correlation
-        if message.header.correlation_id:
-            await self.message_bus.handle_response(message)
-            
-    async def _handle_error(self, message: Message):
-        """Handle error messages."""
-        # Check if this is an error for an active workflow
-        flow_id = message.header.route.flow_id
-        if flow_id and flow_id in self.active_workflows:
-            workflow = self.active_workflows[flow_id]
-            
-            # Record the error
-            error_message = message.body.get("error_message", "Unknown error")
-            error_code = message.body.get("error_code", "AGENT_ERROR")
-            
-            workflow.set_error(error_message, error_code, message.body)
-            
-            # Record the step failure
-            if workflow.current_step_index < len(workflow.steps):
-                current_step = workflow.steps[workflow.current_step_index]
-                current_step["completed_at"] = datetime.datetime.now().isoformat()
-                current_step["error"] = {
-                    "message": error_message,
-                    "code": error_code
-                }
-                
-            # Metrics
-            self.metrics_registry.counter("orchestration.workflows.failed").increment()
-            self.metrics_registry.counter("orchestration.steps.failed").increment()
-            
-            # Notify subscribers
-            await self._notify_workflow_subscribers(workflow.workflow_id, "workflow_failed", workflow)
-            
-            # Complete the workflow future if it exists
-            if workflow.workflow_id in self.workflow_futures:
-                future = self.workflow_futures[workflow.workflow_id]
-                if not future.done():
-                    future.set_result(workflow)
-                    
-        # Handle normal error correlation
-        if message.header.correlation_id:
+        if message.header.correlation_id and message.header.message_type in RESPONSE_MESSAGE_TYPES:
             await self.message_bus.handle_response(message)
             
     async def _handle_status_update(self, message: Message):
@@ -273,291 +226,113 @@ class OrchestrationManager:
         if not self.workflow_registry.has_workflow(workflow_type):
             raise ValueError(f"Unknown workflow type: {workflow_type}")
             
-        # Create a new workflow context
-        workflow = WorkflowContext(
-            workflow_type=workflow_type,
-            conversation_id=conversation_id,
-            data=initial_data.copy(),
-            metadata=metadata or {}
-        )
-        
-        # Store the workflow
-        self.active_workflows[workflow.workflow_id] = workflow
+        metadata = dict(metadata or {})
+        if conversation_id:
+            metadata["conversation_id"] = conversation_id
+        workflow_id = str(uuid.uuid4())
         
         # Create a future for tracking completion
-        future = asyncio.Future()
-        self.workflow_futures[workflow.workflow_id] = future
+        future = asyncio.get_running_loop().create_future()
+        self.workflow_futures[workflow_id] = future
+        
+        # Follow the workflow's events before it starts
+        self.engine.subscribe_to_workflow_events(workflow_id, self._handle_engine_event)
         
         # Start the workflow
-        await self._execute_workflow(workflow)
+        await self.engine.execute_workflow(
+            workflow_type,
+            initial_data.copy(),
+            workflow_id=workflow_id,
+            metadata=metadata
+        )
         
         # Update metrics
         self.metrics_registry.counter("orchestration.workflows.total").increment()
-        self.metrics_registry.gauge("orchestration.workflows.active").set(len(self.active_workflows))
+        self.metrics_registry.gauge("orchestration.workflows.active").set(len(self.workflow_futures))
         
         # Log workflow start
-        logger.info(f"Started workflow {workflow.workflow_id} of type {workflow_type}")
+        logger.info(f"Started workflow {workflow_id} of type {workflow_type}")
         
-        return workflow.workflow_id, future
+        return workflow_id, future
         
-    async def _execute_workflow(self, workflow: WorkflowContext):
-        """Execute a workflow."""
-        # Get the workflow definition
-        workflow_def = self.workflow_registry.get_workflow(workflow.workflow_type)
-        if not workflow_def:
-            workflow.set_error(f"Workflow type not found: {workflow.workflow_type}")
+    async def _handle_engine_event(self, event_type: str, event: Dict[str, Any]):
+        """Translate an engine event for the manager's subscribers and futures."""
+        workflow_id = event["workflow_id"]
+        execution = self.engine.active_workflows.get(workflow_id)
+        if execution is None:
             return
-            
-        # Update status
-        workflow.update_status(WorkflowStatus.RUNNING)
-        
-        # Create a trace span for the workflow
-        with self.tracer.span(
-            f"workflow.{workflow.workflow_type}",
-            metadata={"workflow_id": workflow.workflow_id}
-        ) as span:
-            # Get initial steps
-            try:
-                steps = await workflow_def.get_initial_steps(workflow.data)
-                
-                # Add steps to the workflow
-                for step in steps:
-                    workflow.add_step(step)
-                    
-                # Start execution
-                await self._continue_workflow(workflow)
-                
-                # Notify subscribers
-                await self._notify_workflow_subscribers(workflow.workflow_id, "workflow_started", workflow)
-                
-            except Exception as e:
-                logger.error(f"Error starting workflow {workflow.workflow_id}: {str(e)}")
-                workflow.set_error(f"Error starting workflow: {str(e)}")
-                
-                # Metrics
-                self.metrics_registry.counter("orchestration.workflows.failed").increment()
-                
-                # Notify subscribers
-                await self._notify_workflow_subscribers(workflow.workflow_id, "workflow_failed", workflow)
-                
-                # Complete the future
-                if workflow.workflow_id in self.workflow_futures:
-                    future = self.workflow_futures[workflow.workflow_id]
-                    if not future.done():
-                        future.set_result(workflow)
-                        
-    async def _continue_workflow(self, workflow: WorkflowContext):
-        """Continue execution of a workflow."""
-        # Check if the workflow is already done
-        if workflow.status in [WorkflowStatus.COMPLETED, WorkflowStatus.FAILED, WorkflowStatus.CANCELED]:
+        workflow = self._to_context(execution)
+        
+        if event_type == "activity_completed":
+            self.metrics_registry.counter("orchestration.steps.total").increment()
+            await self._notify_workflow_subscribers(workflow_id, "step_completed", workflow)
             return
             
-        # Get the workflow definition
-        workflow_def = self.workflow_registry.get_workflow(workflow.workflow_type)
-        if not workflow_def:
-            workflow.set_error(f"Workflow definition not found: {workflow.workflow_type}")
+        if event_type == "activity_failed":
+            self.metrics_registry.counter("orchestration.steps.total").increment()
+            self.metrics_registry.counter("orchestration.steps.failed").increment()
             return
             
-        # Check if we're at the end of the steps
-        if workflow.current_step_index >= len(workflow.steps):
-            # Determine next steps
-            try:
-                next_steps = await workflow_def.determine_next_steps(workflow.data, workflow.steps)
-                
-                # If there are no next steps, the workflow is complete
-                if not next_steps:
-                    workflow.update_status(WorkflowStatus.COMPLETED)
-                    
-                    # Calculate duration
-                    created_time = datetime.datetime.fromisoformat(workflow.created_at)
-                    completed_time = datetime.datetime.fromisoformat(workflow.completed_at)
-                    duration_ms = (completed_time - created_time).total_seconds() * 1000
-                    
-                    # Record metrics
-                    self.metrics_registry.counter("orchestration.workflows.completed").increment()
-                    self.metrics_registry.gauge("orchestration.workflows.active").set(len(self.active_workflows) - 1)
-                    self.metrics_registry.histogram("orchestration.workflow.duration").observe(duration_ms)
-                    
-                    # Notify subscribers
-                    await self._notify_workflow_subscribers(workflow.workflow_id, "workflow_completed", workflow)
-                    
-                    # Complete the future
-                    if workflow.workflow_id in self.workflow_futures:
-                        future = self.workflow_futures[workflow.workflow_id]
-                        if not future.done():
-                            future.set_result(workflow)
-                            
-                    return
-                    
-                # Add next steps and continue execution
-                for step in next_steps:
-                    workflow.add_step(step)
-                    
-            except Exception as e:
-                logger.error(f"Error determining next steps for workflow {workflow.workflow_id}: {str(e)}")
-                workflow.set_error(f"Error determining next steps: {str(e)}")
-                
-                # Metrics
-                self.metrics_registry.counter("orchestration.workflows.failed").increment()
-                self.metrics_registry.gauge("orchestration.workflows.active").set(len(self.active_workflows) - 1)
-                
-                # Notify subscribers
-                await self._notify_workflow_subscribers(workflow.workflow_id, "workflow_failed", workflow)
-                
-                # Complete the future
-                if workflow.workflow_id in self.workflow_futures:
-                    future = self.workflow_futures[workflow.workflow_id]
-                    if not future.done():
-                        future.set_result(workflow)
-                        
-                return
-                
-        # Execute the current step
-        await self._execute_step(workflow)
-        
-    async def _execute_step(self, workflow: WorkflowContext):
-        """Execute a single workflow step."""
-        # Get the current step
-        if workflow.current_step_index >= len(workflow.steps):
+        if event_type not in TERMINAL_EVENTS:
+            await self._notify_workflow_subscribers(workflow_id, event_type, workflow)
             return
             
-        current_step = workflow.steps[workflow.current_step_index]
-        
-        # Mark step as started
-        current_step["started_at"] = datetime.datetime.now().isoformat()
-        
-        # Create a trace span for the step
-        with self.tracer.span(
-            f"workflow_step.{current_step.get('type', 'unknown')}",
-            trace_id=workflow.workflow_id,
-            metadata={"step_index": workflow.current_step_index}
-        ) as span:
-            # Get the agent for this step
-            agent_id = current_step.get("agent")
-            if not agent_id:
-                # Try to find an agent with the required capability
-                capability = current_step.get("capability")
-                if capability:
-                    agent_id = self.message_bus.router.get_optimal_agent(capability)
-                    
-            if not agent_id:
-                logger.error(f"No agent found for step: {current_step}")
-                workflow.set_error(f"No agent found for step: {current_step.get('type', 'unknown')}")
-                return
-                
-            # Prepare the message
-            step_type = current_step.get("type", "unknown")
-            message_type = self._get_message_type_for_step(step_type)
-            
-            # Create the message body from the step parameters
-            body = current_step.get("parameters", {}).copy()
-            
-            # Add any additional context from the workflow data
-            if "context_keys" in current_step:
-                for key in current_step["context_keys"]:
-                    if key in workflow.data:
-                        body[key] = workflow.data[key]
-                        
-            # Create the message
-            message = create_message(
-                message_type=message_type,
-                sender="orchestration_manager",
-                recipient=agent_id,
-                body=body,
-                flow_id=workflow.workflow_id,
-                correlation_id=str(uuid.uuid4())
-            )
-            
-            # Record metrics
-            self.metrics_registry.counter("orchestration.steps.total").increment()
+        # Record metrics
+        if event_type == "workflow_completed":
+            created_time = datetime.datetime.fromisoformat(workflow.created_at)
+            completed_time = datetime.datetime.fromisoformat(workflow.completed_at or workflow.updated_at)
+            duration_ms = (completed_time - created_time).total_seconds() * 1000
+            self.metrics_registry.counter("orchestration.workflows.completed").increment()
+            self.metrics_registry.histogram("orchestration.workflow.duration").observe(duration_ms)
+        elif event_type == "workflow_failed":
+            self.metrics_registry.counter("orchestration.workflows.failed").increment()
             
-            # Send the message
-            try:
-                success = await self.message_bus.send_message(message)
-                if not success:
-                    workflow.set_error(f"Failed to send message to agent: {agent_id}")
-                    # Increment the step index to move past this step
-                    workflow.current_step_index += 1
-                    # Continue the workflow (will trigger error handling)
-                    await self._continue_workflow(workflow)
-                    
-            except Exception as e:
-                logger.error(f"Error executing step {workflow.current_step_index} of workflow {workflow.workflow_id}: {str(e)}")
-                workflow.set_error(f"Error executing step: {str(e)}")
-                # Increment the step index to move past this step
-                workflow.current_step_index += 1
-                # Continue the workflow (will trigger error handling)
-                await self._continue_workflow(workflow)
-                
-    def _get_message_type_for_step(self, step_type: str) -> MessageType:
-        """Get the appropriate message type for a step type."""
-        step_type_mapping = {
-            "computation": MessageType.COMPUTATION_REQUEST,
-            "visualization": MessageType.VISUALIZATION_REQUEST,
-            "ocr": MessageType.OCR_REQUEST,
-            "search": MessageType.SEARCH_REQUEST,
-            "query": MessageType.QUERY
-        }
+        # Notify subscribers
+        await self._notify_workflow_subscribers(workflow_id, event_type, workflow)
         
-        return step_type_mapping.get(step_type, MessageType.QUERY)
+        # Complete the future
+        self.engine.unsubscribe_from_workflow_events(workflow_id, self._handle_engine_event)
+        future = self.workflow_futures.pop(workflow_id, None)
+        if future is not None and not future.done():
+            future.set_result(workflow)
+        self.metrics_registry.gauge("orchestration.workflows.active").set(len(self.workflow_futures))
+        
+    @staticmethod
+    def _to_context(execution: WorkflowExecution) -> WorkflowContext:
+        """Present an engine workflow execution as a WorkflowContext."""
+        return WorkflowContext(
+            workflow_id=execution.workflow_id,
+            conversation_id=execution.metadata.get("conversation_id"),
+            workflow_type=execution.workflow_type,
+            status=EXECUTION_STATUSES.get(execution.status, WorkflowStatus.RUNNING),
+            created_at=execution.created_at,
+            updated_at=execution.updated_at,
+            completed_at=execution.completed_at,
+            data=execution.context,
+            steps=execution.activities,
+            current_step_index=max(execution.current_activity_index, 0),
+            error=execution.error,
+            metadata=execution.metadata
+        )
         
     async def get_workflow(self, workflow_id: str) -> Optional[WorkflowContext]:
         """Get a workflow by ID."""
-        return self.active_workflows.get(workflow_id)
+        execution = await self.engine.get_workflow(workflow_id)
+        return self._to_context(execution) if execution else None
         
     async def cancel_workflow(self, workflow_id: str) -> bool:
         """Cancel a workflow."""
-        if workflow_id not in self.active_workflows:
-            return False
-            
-        workflow = self.active_workflows[workflow_id]
-        if workflow.status in [WorkflowStatus.COMPLETED, WorkflowStatus.FAILED, WorkflowStatus.CANCELED]:
-            return False
-            
-        workflow.update_status(WorkflowStatus.CANCELED)
-        
-        # Notify subscribers
-        await self._notify_workflow_subscribers(workflow_id, "workflow_canceled", workflow)
-        
-        # Complete the future
-        if workflow_id in self.workflow_futures:
-            future = self.workflow_futures[workflow_id]
-            if not future.done():
-                future.set_result(workflow)
-                
-        # Update metrics
-        self.metrics_registry.gauge("orchestration.workflows.active").set(len(self.active_workflows) - 1)
-        
-        return True
+        return await self.engine.cancel_workflow(workflow_id)
         
     async def cleanup_completed_workflows(self, max_age_seconds: int = 3600):
         """Clean up completed workflows that are older than the specified age."""
-        now = datetime.datetime.now()
-        workflows_to_remove = []
-        
-        for workflow_id, workflow in self.active_workflows.items():
-            if workflow.status in [WorkflowStatus.COMPLETED, WorkflowStatus.FAILED, WorkflowStatus.CANCELED]:
-                if workflow.completed_at:
-                    completed_time = datetime.datetime.fromisoformat(workflow.completed_at)
-                    age_seconds = (now - completed_time).total_seconds()
-                    
-                    if age_seconds > max_age_seconds:
-                        workflows_to_remove.append(workflow_id)
-                        
-        # Remove the old workflows
-        for workflow_id in workflows_to_remove:
-            del self.active_workflows[workflow_id]
+        removed = self.engine.evict_finished_workflows(max_age_seconds)
+        for workflow_id in removed:
+            self.workflow_futures.pop(workflow_id, None)
+            self.workflow_subscription_callbacks.pop(workflow_id, None)
             
-            # Clean up futures
-            if workflow_id in self.workflow_futures:
-                del self.workflow_futures[workflow_id]
-                
-            # Clean up subscriptions
-            if workflow_id in self.workflow_subscription_callbacks:
-                del self.workflow_subscription_callbacks[workflow_id]
-                
-        if workflows_to_remove:
-            logger.info(f"Cleaned up {len(workflows_to_remove)} completed workflows")
+        if removed:
+            logger.info(f"Cleaned up {len(removed)} completed workflows")
             
     def subscribe_to_workflow(self, workflow_id: str, callback: Callable):
         """Subscribe to workflow events."""
@@ -595,12 +370,11 @@ class OrchestrationManager:
         """Shutdown the orchestration manager gracefully."""
         logger.info("Shutting down orchestration manager")
         
-        # Cancel any active workflows
-        for workflow_id in list(self.active_workflows.keys()):
-            try:
-                await self.cancel_workflow(workflow_id)
-            except Exception as e:
-                logger.error(f"Error canceling workflow {workflow_id} during shutdown: {e}")
+        # Stop the engine, which cancels or checkpoints the active workflows
+        try:
+            await self.engine.stop()
+        except Exception as e:
+            logger.error(f"Error stopping workflow engine during shutdown: {e}")
         
         # Clear all workflow futures
         for future in self.workflow_futures.values():
@@ -608,7 +382,6 @@ class OrchestrationManager:
                 future.cancel()
         
         # Clear collections
-        self.active_workflows.clear()
         self.workflow_futures.clear()
         self.workflow_subscription_callbacks.clear()
         
@@ -0,0 +1,207 @@
+"""
+Wire formats for Multi-agent Communication Protocol (MCP) messages.
+
+Messages can be sent as JSON or as compact msgpack, and either can be
+compressed once it grows past a size threshold. The format travels with the
+message as its content type and content encoding, so receivers decode
+whatever they are sent and agents can switch formats one at a time.
+
+The msgpack format drops field names: a message is encoded as
+``[schema_version, header, body]`` where models are arrays of their field
+values in declaration order. Fields may only ever be appended to the
+message models; a decoder ignores trailing values it does not know and
+fills fields missing from older senders with their defaults.
+"""
+import zlib
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Type
+
+from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
+
+from .message_formats import Message
+
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+CONTENT_TYPE_JSON = "application/json"
+CONTENT_TYPE_MSGPACK = "application/msgpack"
+
+# Version of the positional msgpack layout
+WIRE_SCHEMA_VERSION = 1
+
+
+class WireFormatError(ValueError):
+    """Raised when a message body cannot be decoded."""
+
+
+class EncodedMessage(NamedTuple):
+    """An encoded message and the properties needed to decode it."""
+    body: bytes
+    content_type: str
+    content_encoding: Optional[str]
+
+
+class _ModelCodec:
+    """Positional encoder and decoder for one model class, built once."""
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+        self.fields: Tuple[str, ...] = tuple(model.model_fields)
+        self.nested: Dict[int, "_ModelCodec"] = {
+            index: get_model_codec(info.annotation)
+            for index, info in enumerate(model.model_fields.values())
+            if isinstance(info.annotation, type) and issubclass(info.annotation, BaseModel)
+        }
+
+    def to_list(self, obj: BaseModel) -> List[Any]:
+        values = [getattr(obj, name) for name in self.fields]
+        for index, codec in self.nested.items():
+            if values[index] is not None:
+                values[index] = codec.to_list(values[index])
+        return values
+
+    def to_dict(self, values: List[Any]) -> Dict[str, Any]:
+        values = values[:len(self.fields)]
+        for index, codec in self.nested.items():
+            if index < len(values) and isinstance(values[index], list):
+                values[index] = codec.to_dict(values[index])
+        return dict(zip(self.fields, values))
+
+
+_model_codecs: Dict[Type[BaseModel], _ModelCodec] = {}
+
+
+def get_model_codec(model: Type[BaseModel]) -> _ModelCodec:
+    """Get the positional codec for a model class, building it on first use."""
+    codec = _model_codecs.get(model)
+    if codec is None:
+        codec = _model_codecs[model] = _ModelCodec(model)
+    return codec
+
+
+_COMPRESSORS: Dict[str, Tuple[Callable[[bytes, int], bytes], Callable[[bytes], bytes]]] = {
+    "zlib": (zlib.compress, zlib.decompress),
+}
+if HAS_ZSTD:
+    _COMPRESSORS["zstd"] = (
+        lambda data, level: zstandard.ZstdCompressor(level=level).compress(data),
+        lambda data: zstandard.ZstdDecompressor().decompress(data),
+    )
+
+
+class MessageCodec:
+    """Encodes messages in a configured wire format and decodes any supported one."""
+
+    def __init__(
+        self,
+        content_type: str = CONTENT_TYPE_JSON,
+        compression: Optional[str] = "zlib",
+        compression_threshold: int = 4096,
+        compression_level: int = 1
+    ):
+        """
+        Initialize the codec.
+
+        Args:
+            content_type: Format to encode with, CONTENT_TYPE_JSON or CONTENT_TYPE_MSGPACK
+            compression: "zlib", "zstd" or None
+            compression_threshold: Encoded size in bytes above which bodies are compressed
+            compression_level: Compression level
+
+        Raises:
+            ValueError: If the format or compression is not available
+        """
+        if content_type not in (CONTENT_TYPE_JSON, CONTENT_TYPE_MSGPACK):
+            raise ValueError(f"Unsupported content type: {content_type}")
+        if content_type == CONTENT_TYPE_MSGPACK and not HAS_MSGPACK:
+            raise ValueError("msgpack is not installed")
+        if compression is not None and compression not in _COMPRESSORS:
+            raise ValueError(f"Unsupported compression: {compression}")
+
+        self.content_type = content_type
+        self.compression = compression
+        self.compression_threshold = compression_threshold
+        self.compression_level = compression_level
+        self._message_codec = get_model_codec(Message)
+
+    def encode(self, message: Message) -> EncodedMessage:
+        """
+        Encode a message.
+
+        Args:
+            message: Message to encode
+
+        Returns:
+            Encoded body with its content type and encoding
+        """
+        if self.content_type == CONTENT_TYPE_MSGPACK:
+            body = msgpack.packb(
+                [WIRE_SCHEMA_VERSION] + self._message_codec.to_list(message),
+                default=to_jsonable_python,
+                use_bin_type=True
+            )
+        else:
+            body = message.model_dump_json().encode()
+
+        content_encoding = None
+        if self.compression and len(body) > self.compression_threshold:
+            compress, _ = _COMPRESSORS[self.compression]
+            compressed = compress(body, self.compression_level)
+            if len(compressed) < len(body):
+                body = compressed
+                content_encoding = self.compression
+
+        return EncodedMessage(body, self.content_type, content_encoding)
+
+    def decode(self, body: bytes, content_type: Optional[str] = None,
+               content_encoding: Optional[str] = None) -> Message:
+        """
+        Decode a message in any supported format.
+
+        Args:
+            body: Encoded body
+            content_type: Content type of the body (JSON if not set)
+            content_encoding: Compression applied to the body, if any
+
+        Returns:
+            Decoded message
+
+        Raises:
+            WireFormatError: If the format is unknown or the body is malformed
+            pydantic.ValidationError: If the decoded fields are invalid
+        """
+        if content_encoding:
+            if content_encoding not in _COMPRESSORS:
+                raise WireFormatError(f"Unsupported content encoding: {content_encoding}")
+            _, decompress = _COMPRESSORS[content_encoding]
+            try:
+                body = decompress(body)
+            except Exception as e:
+                raise WireFormatError(f"Cannot decompress {content_encoding} body: {e}") from e
+
+        if not content_type or content_type == CONTENT_TYPE_JSON:
+            return Message.model_validate_json(body)
+
+        if content_type != CONTENT_TYPE_MSGPACK:
+            raise WireFormatError(f"Unsupported content type: {content_type}")
+        if not HAS_MSGPACK:
+            raise WireFormatError("msgpack is not installed")
+
+        try:
+            values = msgpack.unpackb(body, raw=False)
+        except Exception as e:
+            raise WireFormatError(f"Malformed msgpack body: {e}") from e
+        if not isinstance(values, list) or not values or not isinstance(values[0], int):
+            raise WireFormatError("msgpack body is not a versioned message")
+
+        # Newer senders only append fields, which to_dict drops
+        return Message.model_validate(self._message_codec.to_dict(values[1:]))
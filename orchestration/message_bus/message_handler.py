@@ -4,13 +4,18 @@ Message handler for the Multi-agent Communication Protocol (MCP).
 This module provides functionality for routing, processing, and tracking messages
 between agents in the system.
 """
-from typing import Dict, Any, Optional, List, Callable, Set
+from typing import Dict, Any, Optional, List, Callable, Set, Tuple, Awaitable
+from collections import deque
 import logging
 import time
 import datetime
 import asyncio
+import inspect
 from .message_formats import Message, MessageType, MessagePriority, create_error_response
 from ..monitoring.logger import get_logger
+from ..monitoring.metrics import (
+    record_processing_time, record_queue_depth, record_queue_wait, record_message_shed
+)
 
 logger = get_logger(__name__)
 
@@ -97,8 +102,49 @@ class MessageRouter:
         """
         Route a message to the appropriate handlers.
         
+        Coroutines returned by async handlers are scheduled as tasks; use
+        route_message_async to wait for them.
+        
         Returns True if the message was successfully routed, False otherwise.
         """
+        routed, pending = self._route(message)
+        for label, awaitable in pending:
+            asyncio.ensure_future(self._await_handler(label, awaitable))
+        return routed
+    
+    async def route_message_async(self, message: Message) -> bool:
+        """
+        Route a message and wait for any async handlers to finish.
+        
+        Returns True if the message was successfully routed, False otherwise.
+        """
+        routed, pending = self._route(message)
+        for label, awaitable in pending:
+            await self._await_handler(label, awaitable)
+        return routed
+    
+    async def _await_handler(self, label: str, awaitable: Awaitable):
+        """Wait for an async handler, logging its errors like a sync one."""
+        try:
+            await awaitable
+        except Exception as e:
+            logger.error(f"Error in {label}: {str(e)}")
+    
+    def _call_handlers(self, handlers: List[Callable], message: Message, label: str,
+                       pending: List[Tuple[str, Awaitable]]):
+        """Call handlers, collecting the awaitables returned by async ones."""
+        for handler in handlers:
+            try:
+                result = handler(message)
+                if inspect.isawaitable(result):
+                    pending.append((label, result))
+            except Exception as e:
+                logger.error(f"Error in {label}: {str(e)}")
+    
+    def _route(self, message: Message) -> Tuple[bool, List[Tuple[str, Awaitable]]]:
+        """Call the handlers for a message; returns whether it was routed and pending awaitables."""
+        pending: List[Tuple[str, Awaitable]] = []
+        
         # Update message trace information
         message.header.trace.agent_hops.append({
             "agent": "message_router",
@@ -110,74 +156,156 @@ class MessageRouter:
         message.header.route.hop_count += 1
         if message.header.route.hop_count > message.header.route.max_hops:
             logger.warning(f"Message {message.header.message_id} exceeded max hops: {message.header.route.hop_count}")
-            return False
+            return False, pending
             
         # Handle broadcast messages
         if message.header.route.broadcast:
             message_type = message.header.message_type
             if message_type in self.broadcast_handlers:
-                for handler in self.broadcast_handlers[message_type]:
-                    try:
-                        handler(message)
-                    except Exception as e:
-                        logger.error(f"Error in broadcast handler for {message_type}: {str(e)}")
-            return True
+                self._call_handlers(self.broadcast_handlers[message_type], message,
+                                    f"broadcast handler for {message_type}", pending)
+            return True, pending
             
         # Route to specific handlers
         route_key = self.get_route_key(message)
         if route_key in self.route_handlers:
-            for handler in self.route_handlers[route_key]:
-                try:
-                    handler(message)
-                except Exception as e:
-                    logger.error(f"Error in route handler for {route_key}: {str(e)}")
-            return True
+            self._call_handlers(self.route_handlers[route_key], message,
+                                f"route handler for {route_key}", pending)
+            return True, pending
         
         # If no specific handlers, try finding by capability
         recipient = message.header.route.recipient
         if recipient in self.agent_capabilities:
             # Recipient exists, but no handler registered
             logger.warning(f"No handler registered for route {route_key}")
-            return False
+            return False, pending
         
         # Try to find an alternate agent with required capability
         # This would require extracting capability from message content
         # For now, just log that the recipient wasn't found
         logger.warning(f"No recipient found for message: {message.header.message_id}")
-        return False
+        return False, pending
+
+
+# Relative share of dispatches each priority gets while others are waiting
+DEFAULT_PRIORITY_WEIGHTS: Dict[MessagePriority, int] = {
+    MessagePriority.CRITICAL: 8,
+    MessagePriority.HIGH: 4,
+    MessagePriority.NORMAL: 2,
+    MessagePriority.LOW: 1,
+}
+
+# Maximum messages of each priority processed at once
+DEFAULT_PRIORITY_WORKERS: Dict[MessagePriority, int] = {
+    MessagePriority.CRITICAL: 8,
+    MessagePriority.HIGH: 8,
+    MessagePriority.NORMAL: 6,
+    MessagePriority.LOW: 2,
+}
+
+OVERFLOW_POLICIES = ("block", "reject", "drop_oldest")
 
 
 class MessageProcessor:
     """
     Processes incoming messages with validation, prioritization, and error handling.
+    
+    Messages wait in one bounded queue per priority. A shared pool of workers
+    takes the next message with smooth weighted round-robin across the
+    non-empty queues, so higher priorities get proportionally more of the
+    workers and lower ones are never starved. Each priority also has its own
+    concurrency limit, so a slow handler only ties up that priority's share.
     """
-    def __init__(self, router: MessageRouter):
+    def __init__(
+        self,
+        router: MessageRouter,
+        max_workers: int = 16,
+        priority_workers: Dict[MessagePriority, int] = None,
+        priority_weights: Dict[MessagePriority, int] = None,
+        max_queue_size: int = 1000,
+        overflow_policy: str = "block",
+        enqueue_timeout: float = 30.0
+    ):
+        """
+        Initialize the processor.
+        
+        Args:
+            router: Router that delivers processed messages
+            max_workers: Total number of worker tasks
+            priority_workers: Maximum concurrent messages per priority
+            priority_weights: Dispatch weight per priority
+            max_queue_size: Maximum waiting messages per priority
+            overflow_policy: What to do when a priority queue is full:
+                "block" waits up to enqueue_timeout and then rejects,
+                "reject" rejects immediately, and "drop_oldest" sheds the
+                oldest waiting message of that priority
+            enqueue_timeout: Seconds to wait for space under "block"
+        """
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+        
         self.router = router
-        self.priority_queues: Dict[MessagePriority, asyncio.Queue] = {
-            priority: asyncio.Queue() for priority in MessagePriority
+        self.max_workers = max(1, max_workers)
+        self.priority_workers = {**DEFAULT_PRIORITY_WORKERS, **(priority_workers or {})}
+        self.priority_weights = {**DEFAULT_PRIORITY_WEIGHTS, **(priority_weights or {})}
+        self.max_queue_size = max(1, max_queue_size)
+        self.overflow_policy = overflow_policy
+        self.enqueue_timeout = enqueue_timeout
+        
+        # Waiting messages as (enqueue time, message)
+        self.priority_queues: Dict[MessagePriority, deque] = {
+            priority: deque() for priority in MessagePriority
+        }
+        self.active: Dict[MessagePriority, int] = {priority: 0 for priority in MessagePriority}
+        self._credit: Dict[MessagePriority, int] = {priority: 0 for priority in MessagePriority}
+        
+        # Workers wait for work and blocked producers for space, on one lock
+        self._lock: Optional[asyncio.Lock] = None
+        self._has_work: Optional[asyncio.Condition] = None
+        self._has_space: Optional[asyncio.Condition] = None
+        
+        self.stats: Dict[MessagePriority, Dict[str, float]] = {
+            priority: {
+                "enqueued": 0,
+                "processed": 0,
+                "rejected": 0,
+                "shed": 0,
+                "expired": 0,
+                "total_wait_ms": 0.0,
+                "max_wait_ms": 0.0
+            }
+            for priority in MessagePriority
         }
+        
         self.processing_tasks = []
         self.running = False
         
         # Store a reference to the loop we'll use
         self.loop = None
         
+    def _ensure_loop(self):
+        """Bind to the shared or running event loop on first use."""
+        if not self.loop:
+            if hasattr(asyncio, '_mathllm_shared_loop'):
+                self.loop = getattr(asyncio, '_mathllm_shared_loop')
+            else:
+                self.loop = asyncio.get_running_loop()
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+            self._has_work = asyncio.Condition(self._lock)
+            self._has_space = asyncio.Condition(self._lock)
+        
     async def start(self):
         """Start processing messages."""
         self.running = True
+        self._ensure_loop()
         
-        # Get the shared event loop if available, otherwise get the current loop
-        if hasattr(asyncio, '_mathllm_shared_loop'):
-            self.loop = getattr(asyncio, '_mathllm_shared_loop')
-        else:
-            self.loop = asyncio.get_running_loop()
-        
-        # Create a processing task for each priority level
-        for priority in MessagePriority:
-            task = self.loop.create_task(self._process_queue(priority))
+        # Create the shared worker pool
+        for _ in range(self.max_workers):
+            task = self.loop.create_task(self._worker())
             self.processing_tasks.append(task)
             
-        logger.info("Message processor started")
+        logger.info(f"Message processor started with {self.max_workers} workers")
         
     async def stop(self):
         """Stop processing messages."""
@@ -189,33 +317,122 @@ class MessageProcessor:
             
         if self.processing_tasks:
             await asyncio.gather(*self.processing_tasks, return_exceptions=True)
+        self.processing_tasks = []
         
         logger.info("Message processor stopped")
         
-    async def enqueue_message(self, message: Message):
-        """Enqueue a message for processing based on its priority."""
+    async def enqueue_message(self, message: Message) -> bool:
+        """
+        Enqueue a message for processing based on its priority.
+        
+        Returns True if the message was queued, False if it was rejected
+        because its priority queue is full.
+        """
         priority = message.header.priority
+        queue = self.priority_queues[priority]
+        stats = self.stats[priority]
         
         # Ensure operation takes place in the current event loop
-        if not self.loop:
-            if hasattr(asyncio, '_mathllm_shared_loop'):
-                self.loop = getattr(asyncio, '_mathllm_shared_loop')
-            else:
-                self.loop = asyncio.get_running_loop()
+        self._ensure_loop()
         
-        await asyncio.wait_for(self.priority_queues[priority].put(message), timeout=30.0)
+        async with self._lock:
+            if len(queue) >= self.max_queue_size:
+                if self.overflow_policy == "drop_oldest":
+                    _, shed = queue.popleft()
+                    self._shed(shed, "overflow")
+                elif self.overflow_policy == "block":
+                    try:
+                        await asyncio.wait_for(
+                            self._has_space.wait_for(lambda: len(queue) < self.max_queue_size),
+                            timeout=self.enqueue_timeout
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+                        
+                if len(queue) >= self.max_queue_size:
+                    stats["rejected"] += 1
+                    record_message_shed(priority.value, "rejected")
+                    logger.warning(f"Message {message.header.message_id} rejected: "
+                                   f"{priority} queue is full")
+                    return False
+                    
+            queue.append((time.monotonic(), message))
+            stats["enqueued"] += 1
+            record_queue_depth(priority.value, len(queue))
+            self._has_work.notify()
         
         logger.debug(f"Message {message.header.message_id} enqueued with priority {priority}")
+        return True
         
-    async def _process_queue(self, priority: MessagePriority):
-        """Process messages from a specific priority queue."""
-        queue = self.priority_queues[priority]
+    def _shed(self, message: Message, reason: str):
+        """Count and log a message dropped without processing."""
+        priority = message.header.priority
+        self.stats[priority]["expired" if reason == "expired" else "shed"] += 1
+        record_message_shed(priority.value, reason)
+        logger.warning(f"Message {message.header.message_id} shed ({reason})")
+        
+    def _eligible(self) -> List[MessagePriority]:
+        """Priorities with waiting messages and spare concurrency."""
+        return [
+            priority for priority, queue in self.priority_queues.items()
+            if queue and self.active[priority] < self.priority_workers[priority]
+        ]
+        
+    def _select_priority(self, eligible: List[MessagePriority]) -> MessagePriority:
+        """
+        Pick the next priority with smooth weighted round-robin.
+        
+        Every eligible priority earns its weight in credit; the richest one
+        is picked and pays back the total, so over time each priority is
+        picked in proportion to its weight.
+        """
+        total = 0
+        for priority in eligible:
+            self._credit[priority] += self.priority_weights[priority]
+            total += self.priority_weights[priority]
+        selected = max(eligible, key=lambda priority: self._credit[priority])
+        self._credit[selected] -= total
+        return selected
+        
+    async def _next_message(self) -> Tuple[MessagePriority, Message]:
+        """Wait for a dispatchable message and claim a concurrency slot for it."""
+        async with self._lock:
+            while True:
+                await self._has_work.wait_for(self._eligible)
+                priority = self._select_priority(self._eligible())
+                queue = self.priority_queues[priority]
+                enqueued_at, message = queue.popleft()
+                record_queue_depth(priority.value, len(queue))
+                # A slot in the queue opened up for blocked producers
+                self._has_space.notify_all()
+                
+                wait_ms = (time.monotonic() - enqueued_at) * 1000
+                if wait_ms > message.header.route.ttl * 1000:
+                    self._shed(message, "expired")
+                    continue
+                    
+                stats = self.stats[priority]
+                stats["total_wait_ms"] += wait_ms
+                stats["max_wait_ms"] = max(stats["max_wait_ms"], wait_ms)
+                record_queue_wait(priority.value, wait_ms)
+                
+                self.active[priority] += 1
+                return priority, message
+                
+    async def _release(self, priority: MessagePriority):
+        """Free a concurrency slot and wake a waiting worker."""
+        async with self._lock:
+            self.active[priority] -= 1
+            self.stats[priority]["processed"] += 1
+            self._has_work.notify()
         
+    async def _worker(self):
+        """Process messages picked by the weighted fair scheduler."""
         while self.running:
             try:
-                # Get a message from the queue
-                message = await queue.get()
+                priority, message = await self._next_message()
                 
+                start = time.monotonic()
                 try:
                     # Process the message
                     success = await self._process_message(message)
@@ -223,16 +440,31 @@ class MessageProcessor:
                     if not success:
                         logger.warning(f"Failed to process message {message.header.message_id}")
                 finally:
-                    # Always mark the task as done, even if processing fails
-                    queue.task_done()
+                    # Always free the slot, even if processing fails
+                    record_processing_time((time.monotonic() - start) * 1000)
+                    await self._release(priority)
                     
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"Error processing message from {priority} queue: {str(e)}")
+                logger.error(f"Error in message processor worker: {str(e)}")
                 # Add a small delay to avoid tight loop in case of recurring errors
                 await asyncio.sleep(0.1)
                 
+    def get_queue_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get depth, concurrency and wait-time statistics per priority."""
+        result = {}
+        for priority in MessagePriority:
+            stats = self.stats[priority]
+            dispatched = stats["processed"] + self.active[priority]
+            result[priority.value] = {
+                **stats,
+                "depth": len(self.priority_queues[priority]),
+                "active": self.active[priority],
+                "avg_wait_ms": stats["total_wait_ms"] / dispatched if dispatched else 0.0
+            }
+        return result
+                
     async def _process_message(self, message: Message) -> bool:
         """
         Process a single message.
@@ -252,8 +484,8 @@ class MessageProcessor:
                 "action": "process"
             })
             
-            # Route the message
-            return self.router.route_message(message)
+            # Route the message, waiting for async handlers
+            return await self.router.route_message_async(message)
             
         except Exception as e:
             logger.error(f"Error processing message {message.header.message_id}: {str(e)}")
@@ -271,11 +503,7 @@ class MessageProcessor:
                     )
                     
                     # Ensure we're using the correct loop
-                    if not self.loop:
-                        if hasattr(asyncio, '_mathllm_shared_loop'):
-                            self.loop = getattr(asyncio, '_mathllm_shared_loop')
-                        else:
-                            self.loop = asyncio.get_running_loop()
+                    self._ensure_loop()
                     
                     # Create a task in the correct loop
                     self.loop.create_task(self.enqueue_message(error_response))
@@ -4,18 +4,14 @@ RabbitMQ wrapper for the Multi-agent Communication Protocol (MCP).
 This module provides a wrapper around the RabbitMQ client library to support
 the MCP message format and provide reliable messaging between agents.
 """
-import json
+import os
 import asyncio
-import aio_pika
 from typing import Dict, Any, Optional, List, Callable, Union
-import logging
-import time
-import ssl
-from pydantic import ValidationError
-from .message_formats import Message, MessageType, MessagePriority, create_error_response
+from .message_formats import Message, MessageType
 from .message_handler import MessageRouter, MessageProcessor
+from .codecs import CONTENT_TYPE_JSON, MessageCodec
+from .transports import MessageTransport, AMQPTransport, InMemoryTransport
 from ..monitoring.logger import get_logger
-from ..monitoring.metrics import record_message_metrics
 
 logger = get_logger(__name__)
 
@@ -23,6 +19,10 @@ logger = get_logger(__name__)
 class RabbitMQBus:
     """
     RabbitMQ implementation of the message bus for the MCP.
+
+    Messages are carried by a pluggable ``MessageTransport``: RabbitMQ by
+    default, or an in-process transport for co-located agents. Routing,
+    request/response correlation and listeners are the same for both.
     """
     def __init__(
         self,
@@ -35,58 +35,94 @@ class RabbitMQBus:
         ssl_options: Dict[str, Any] = None,
         connection_attempts: int = 3,
         retry_delay: int = 5,
-        heartbeat: int = 60
+        heartbeat: int = 60,
+        sender_count: int = 4,
+        publish_batch_size: int = 100,
+        max_in_flight: int = 1000,
+        max_queue_size: int = 10000,
+        transport: Union[str, MessageTransport, None] = None,
+        wire_format: str = CONTENT_TYPE_JSON,
+        compression: Optional[str] = "zlib",
+        compression_threshold: int = 4096
     ):
-        self.host = host
-        self.port = port
-        self.vhost = vhost
-        self.username = username
-        self.password = password
-        self.use_ssl = use_ssl
-        self.ssl_options = ssl_options or {}
-        self.connection_attempts = connection_attempts
-        self.retry_delay = retry_delay
-        self.heartbeat = heartbeat
+        """
+        Initialize the message bus.
         
-        self.connection = None
-        self.channel = None
+        Args:
+            host: RabbitMQ host
+            port: RabbitMQ port
+            vhost: Virtual host
+            username: Login user
+            password: Login password
+            use_ssl: Whether to connect over TLS
+            ssl_options: Attributes to set on the SSL context
+            connection_attempts: Number of connection attempts
+            retry_delay: Delay between connection attempts in seconds
+            heartbeat: Heartbeat interval in seconds
+            sender_count: Number of sender tasks, each with its own channel
+            publish_batch_size: Maximum messages a sender drains from the queue at once
+            max_in_flight: Maximum published messages awaiting broker confirmation
+            max_queue_size: Maximum messages waiting to be published
+            transport: Transport instance, or "amqp" (default) or "memory";
+                the connection arguments only apply to "amqp"
+            wire_format: Content type published messages are encoded with
+                ("application/json" or "application/msgpack")
+            compression: Compression for large bodies ("zlib", "zstd" or None)
+            compression_threshold: Encoded size in bytes above which bodies are compressed
+        """
         self.exchange_name = "math_system"
         self.exchange_type = "topic"
         
+        if transport is None or transport == "amqp":
+            transport = AMQPTransport(
+                host=host,
+                port=port,
+                vhost=vhost,
+                username=username,
+                password=password,
+                use_ssl=use_ssl,
+                ssl_options=ssl_options,
+                connection_attempts=connection_attempts,
+                retry_delay=retry_delay,
+                heartbeat=heartbeat,
+                exchange_name=self.exchange_name,
+                exchange_type=self.exchange_type,
+                sender_count=sender_count,
+                publish_batch_size=publish_batch_size,
+                max_in_flight=max_in_flight,
+                max_queue_size=max_queue_size,
+                codec=MessageCodec(wire_format, compression, compression_threshold)
+            )
+        elif transport == "memory":
+            transport = InMemoryTransport()
+        elif not isinstance(transport, MessageTransport):
+            raise ValueError(f"Unknown message bus transport: {transport}")
+        self.transport: MessageTransport = transport
+        
         self.router = MessageRouter()
         self.processor = MessageProcessor(self.router)
         
         self.response_handlers: Dict[str, asyncio.Future] = {}
         self.message_listeners: Dict[str, List[Callable]] = {}
         
-        # Queue to track messages being sent
-        self.message_queue = asyncio.Queue()
-        
         # Get the shared event loop if available
         if hasattr(asyncio, '_mathllm_shared_loop'):
             self.loop = getattr(asyncio, '_mathllm_shared_loop')
         else:
             self.loop = None
+            
+    @property
+    def connection(self) -> Any:
+        """The transport's connection, or None when not connected."""
+        return self.transport.connection
         
-    async def connect(self):
-        """Connect to RabbitMQ server."""
-        connection_params = {
-            "host": self.host,
-            "port": self.port,
-            "login": self.username,
-            "password": self.password,
-            "virtualhost": self.vhost,
-            "heartbeat": self.heartbeat
-        }
-        
-        if self.use_ssl:
-            ssl_context = ssl.create_default_context()
-            for k, v in self.ssl_options.items():
-                if hasattr(ssl_context, k):
-                    setattr(ssl_context, k, v)
-            connection_params["ssl"] = True
-            connection_params["ssl_context"] = ssl_context
+    @property
+    def channel(self) -> Any:
+        """The AMQP channel, for transports that have one."""
+        return getattr(self.transport, "channel", None)
         
+    async def connect(self):
+        """Connect the transport and start the message processor."""
         # Get the shared event loop or current running loop
         if not self.loop:
             if hasattr(asyncio, '_mathllm_shared_loop'):
@@ -94,144 +130,25 @@ class RabbitMQBus:
             else:
                 self.loop = asyncio.get_running_loop()
         
-        # Try to connect with retry
-        for attempt in range(1, self.connection_attempts + 1):
-            try:
-                self.connection = await aio_pika.connect_robust(**connection_params)
-                self.channel = await self.connection.channel()
-                
-                # Declare exchange
-                await self.channel.declare_exchange(
-                    self.exchange_name,
-                    self.exchange_type,
-                    durable=True
-                )
-                
-                # Start message processor
-                await self.processor.start()
-                
-                # Start message sender task
-                self._sender_task = self.loop.create_task(self._message_sender())
-                
-                logger.info(f"Connected to RabbitMQ at {self.host}:{self.port}/{self.vhost}")
-                return
-                
-            except Exception as e:
-                if attempt == self.connection_attempts:
-                    logger.error(f"Failed to connect to RabbitMQ after {self.connection_attempts} attempts: {str(e)}")
-                    raise
-                else:
-                    logger.warning(f"Connection attempt {attempt} failed, retrying in {self.retry_delay} seconds...")
-                    await asyncio.sleep(self.retry_delay)
+        await self.transport.connect()
+        
+        # Start message processor
+        await self.processor.start()
                     
     async def disconnect(self):
-        """Disconnect from RabbitMQ server."""
+        """Stop the message processor and disconnect the transport."""
         # Stop the message processor
         await self.processor.stop()
         
-        # Cancel the sender task
-        if hasattr(self, '_sender_task'):
-            self._sender_task.cancel()
-            try:
-                await self._sender_task
-            except asyncio.CancelledError:
-                pass
-        
-        # Close the channel and connection
-        if self.channel:
-            await self.channel.close()
-            self.channel = None
-            
-        if self.connection:
-            await self.connection.close()
-            self.connection = None
-            
-        logger.info("Disconnected from RabbitMQ")
-            
-    async def _message_sender(self):
-        """Background task to send messages from the queue."""
-        # Make sure we have a loop reference
-        if not self.loop:
-            if hasattr(asyncio, '_mathllm_shared_loop'):
-                self.loop = getattr(asyncio, '_mathllm_shared_loop')
-            else:
-                self.loop = asyncio.get_running_loop()
-            
-        while True:
-            try:
-                message, routing_key, future = await self.message_queue.get()
-                
-                try:
-                    # Serialize the message
-                    message_json = message.json()
-                    
-                    # Send the message
-                    await self.channel.default_exchange.publish(
-                        aio_pika.Message(
-                            body=message_json.encode(),
-                            delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
-                            message_id=message.header.message_id,
-                            correlation_id=message.header.correlation_id,
-                            priority=self._get_priority_value(message.header.priority),
-                            expiration=str(message.header.route.ttl * 1000)  # Convert to milliseconds
-                        ),
-                        routing_key=routing_key
-                    )
-                    
-                    # Record metrics
-                    record_message_metrics(
-                        message_type=message.header.message_type,
-                        sender=message.header.route.sender,
-                        recipient=message.header.route.recipient,
-                        size=len(message_json)
-                    )
-                    
-                    if future and not future.done():
-                        # Set the result in the same loop context
-                        self.loop.call_soon_threadsafe(lambda: future.set_result(True))
-                        
-                except Exception as e:
-                    logger.error(f"Error sending message {message.header.message_id}: {str(e)}")
-                    if future and not future.done():
-                        # Set the exception in the same loop context
-                        self.loop.call_soon_threadsafe(lambda f=future, ex=e: f.set_exception(ex))
-                        
-                finally:
-                    self.message_queue.task_done()
-                    
-            except asyncio.CancelledError:
-                # Task was cancelled, exit
-                break
-                
-            except Exception as e:
-                logger.error(f"Unexpected error in message sender: {str(e)}")
-                # Add a small delay to avoid tight loop if there's an error
-                await asyncio.sleep(1)
-                
-    def _get_priority_value(self, priority: MessagePriority) -> int:
-        """Convert MessagePriority enum to RabbitMQ priority value (0-9)."""
-        priority_map = {
-            MessagePriority.LOW: 1,
-            MessagePriority.NORMAL: 5,
-            MessagePriority.HIGH: 7,
-            MessagePriority.CRITICAL: 9
-        }
-        return priority_map.get(priority, 5)
+        await self.transport.disconnect()
                 
     async def declare_queue(self, queue_name: str, durable: bool = True, exclusive: bool = False):
-        """Declare a queue and bind it to the exchange."""
-        queue = await self.channel.declare_queue(
-            queue_name,
-            durable=durable,
-            exclusive=exclusive,
-            auto_delete=exclusive  # Auto-delete if exclusive
-        )
-        return queue
+        """Declare a queue."""
+        return await self.transport.declare_queue(queue_name, durable=durable, exclusive=exclusive)
         
     async def bind_queue(self, queue_name: str, routing_key: str):
         """Bind a queue to a routing key."""
-        queue = await self.channel.get_queue(queue_name)
-        await queue.bind(self.exchange_name, routing_key)
+        await self.transport.bind_queue(queue_name, routing_key)
         logger.debug(f"Queue {queue_name} bound to routing key {routing_key}")
         
     async def setup_agent_queues(self, agent_id: str, capabilities: List[str]):
@@ -241,6 +158,7 @@ class RabbitMQBus:
         await self.bind_queue(f"agent.{agent_id}", f"agent.{agent_id}")
         
         # Bind to capability-based routing keys
+        # (broadcasts are bound by agents to their own broadcast queue)
         for capability in capabilities:
             await self.bind_queue(f"agent.{agent_id}", f"capability.{capability}")
             
@@ -251,32 +169,24 @@ class RabbitMQBus:
         
     async def setup_consumer(self, queue_name: str, callback: Callable):
         """Set up a consumer for a queue."""
-        queue = await self.channel.get_queue(queue_name)
-        
-        async def _message_handler(message: aio_pika.IncomingMessage):
-            async with message.process():
-                try:
-                    # Parse the message
-                    message_json = message.body.decode()
-                    parsed_message = Message.parse_raw(message_json)
-                    
-                    # Process with user callback
-                    await callback(parsed_message)
-                    
-                except ValidationError as e:
-                    logger.error(f"Invalid message format: {str(e)}")
-                except Exception as e:
-                    logger.error(f"Error processing message: {str(e)}")
-        
-        # Start consuming
-        consumer_tag = await queue.consume(_message_handler)
+        consumer_tag = await self.transport.consume(queue_name, callback)
         logger.info(f"Consumer set up for queue {queue_name} with tag {consumer_tag}")
         return consumer_tag
         
-    async def send_message(self, message: Message) -> bool:
-        """Send a message to the exchange."""
-        if not self.channel:
-            logger.error("Not connected to RabbitMQ")
+    async def send_message(self, message: Message, wait_for_confirm: bool = True) -> bool:
+        """
+        Send a message through the transport.
+        
+        Args:
+            message: Message to send
+            wait_for_confirm: Whether to wait until the transport confirms the
+                message; otherwise return once it is queued for publishing
+            
+        Returns:
+            True if the message was confirmed (or queued), False otherwise
+        """
+        if not self.transport.connection:
+            logger.error("Message bus is not connected")
             return False
             
         # Determine routing key
@@ -289,22 +199,8 @@ class RabbitMQBus:
             # Direct routing to agent
             routing_key = f"agent.{message.header.route.recipient}"
             
-        # Make sure we have a loop reference
-        if not self.loop:
-            if hasattr(asyncio, '_mathllm_shared_loop'):
-                self.loop = getattr(asyncio, '_mathllm_shared_loop')
-            else:
-                self.loop = asyncio.get_running_loop()
-            
-        # Create a future for tracking message delivery
-        future = self.loop.create_future()
-        
-        # Add to send queue
         try:
-            await asyncio.wait_for(self.message_queue.put((message, routing_key, future)), timeout=30.0)
-        
-            # Wait for the message to be sent
-            await asyncio.wait_for(future, timeout=30.0)
+            await self.transport.publish(message, routing_key, wait_for_confirm=wait_for_confirm)
             return True
         except Exception as e:
             logger.error(f"Failed to send message: {str(e)}")
@@ -385,6 +281,7 @@ def get_message_bus(config: Dict[str, Any] = None) -> RabbitMQBus:
     """Get or create the message bus singleton instance."""
     global _message_bus_instance
     if _message_bus_instance is None:
-        config = config or {}
+        config = dict(config or {})
+        config.setdefault("transport", os.environ.get("MESSAGE_BUS_TRANSPORT", "amqp"))
         _message_bus_instance = RabbitMQBus(**config)
     return _message_bus_instance
@@ -0,0 +1,608 @@
+"""
+Transports for the Multi-agent Communication Protocol (MCP) message bus.
+
+A transport moves ``Message`` objects between queues using topic-exchange
+routing semantics: queues are bound to routing key patterns such as
+``agent.<id>``, ``capability.<name>`` or ``broadcast.#``, and a published
+message is delivered to every queue whose bindings match its routing key.
+
+``AMQPTransport`` talks to RabbitMQ. ``InMemoryTransport`` delivers messages
+by reference through asyncio queues, for agents running in one process.
+"""
+import abc
+import asyncio
+import functools
+import ssl
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import aio_pika
+from pydantic import ValidationError
+
+from .codecs import MessageCodec, WireFormatError
+from .message_formats import Message, MessagePriority
+from ..monitoring.logger import get_logger
+from ..monitoring.metrics import record_message_metrics
+
+logger = get_logger(__name__)
+
+MessageCallback = Callable[[Message], Awaitable[None]]
+
+
+def _get_priority_value(priority: MessagePriority) -> int:
+    """Convert MessagePriority enum to RabbitMQ priority value (0-9)."""
+    priority_map = {
+        MessagePriority.LOW: 1,
+        MessagePriority.NORMAL: 5,
+        MessagePriority.HIGH: 7,
+        MessagePriority.CRITICAL: 9
+    }
+    return priority_map.get(priority, 5)
+
+
+@functools.lru_cache(maxsize=4096)
+def topic_matches(pattern: str, routing_key: str) -> bool:
+    """
+    Check a routing key against an AMQP topic binding pattern.
+
+    ``*`` matches exactly one dot-separated word and ``#`` matches zero or
+    more words.
+
+    Args:
+        pattern: Binding pattern, e.g. ``broadcast.#``
+        routing_key: Routing key of a message
+
+    Returns:
+        True if the routing key matches the pattern
+    """
+    return _match_words(tuple(pattern.split(".")), tuple(routing_key.split(".")))
+
+
+def _match_words(pattern: Tuple[str, ...], words: Tuple[str, ...]) -> bool:
+    if not pattern:
+        return not words
+    head, rest = pattern[0], pattern[1:]
+    if head == "#":
+        return any(_match_words(rest, words[i:]) for i in range(len(words) + 1))
+    if not words:
+        return False
+    return (head == "*" or head == words[0]) and _match_words(rest, words[1:])
+
+
+class MessageTransport(abc.ABC):
+    """Interface between the message bus and the system that carries messages."""
+
+    @property
+    @abc.abstractmethod
+    def connection(self) -> Any:
+        """The underlying connection, or None when not connected."""
+
+    @abc.abstractmethod
+    async def connect(self):
+        """Connect the transport."""
+
+    @abc.abstractmethod
+    async def disconnect(self):
+        """Disconnect the transport, waiting for pending deliveries."""
+
+    @abc.abstractmethod
+    async def declare_queue(self, queue_name: str, durable: bool = True, exclusive: bool = False) -> Any:
+        """Declare a queue."""
+
+    @abc.abstractmethod
+    async def bind_queue(self, queue_name: str, routing_key: str):
+        """Bind a queue to a routing key pattern."""
+
+    @abc.abstractmethod
+    async def consume(self, queue_name: str, callback: MessageCallback) -> str:
+        """Deliver messages from a queue to a callback; returns a consumer tag."""
+
+    @abc.abstractmethod
+    async def publish(self, message: Message, routing_key: str, wait_for_confirm: bool = True):
+        """
+        Publish a message.
+
+        Raises:
+            Exception: If the message cannot be published
+        """
+
+
+class AMQPTransport(MessageTransport):
+    """
+    RabbitMQ transport.
+
+    Messages are encoded by a ``MessageCodec`` and published to a durable topic exchange
+    through a pipeline: several sender tasks, each with its own channel,
+    drain a shared queue in batches and publish with asynchronous publisher
+    confirms, with a bounded number of messages awaiting confirmation.
+
+    Because consecutive messages may be taken by different senders and
+    published on different channels, the broker does not necessarily
+    receive them in the order they were sent. A caller that needs ordering
+    must wait for each message's confirmation before sending the next.
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 5672,
+        vhost: str = "/",
+        username: str = "guest",
+        password: str = "guest",
+        use_ssl: bool = False,
+        ssl_options: Dict[str, Any] = None,
+        connection_attempts: int = 3,
+        retry_delay: int = 5,
+        heartbeat: int = 60,
+        exchange_name: str = "math_system",
+        exchange_type: str = "topic",
+        sender_count: int = 4,
+        publish_batch_size: int = 100,
+        max_in_flight: int = 1000,
+        max_queue_size: int = 10000,
+        codec: Optional[MessageCodec] = None
+    ):
+        """
+        Initialize the transport.
+
+        Args:
+            host: RabbitMQ host
+            port: RabbitMQ port
+            vhost: Virtual host
+            username: Login user
+            password: Login password
+            use_ssl: Whether to connect over TLS
+            ssl_options: Attributes to set on the SSL context
+            connection_attempts: Number of connection attempts
+            retry_delay: Delay between connection attempts in seconds
+            heartbeat: Heartbeat interval in seconds
+            exchange_name: Name of the exchange messages are published to
+            exchange_type: Type of the exchange
+            sender_count: Number of sender tasks, each with its own channel
+            publish_batch_size: Maximum messages a sender drains from the queue at once
+            max_in_flight: Maximum published messages awaiting broker confirmation
+            max_queue_size: Maximum messages waiting to be published
+            codec: Wire format for published messages (JSON by default);
+                consumers decode any supported format
+        """
+        self.host = host
+        self.port = port
+        self.vhost = vhost
+        self.username = username
+        self.password = password
+        self.use_ssl = use_ssl
+        self.ssl_options = ssl_options or {}
+        self.connection_attempts = connection_attempts
+        self.retry_delay = retry_delay
+        self.heartbeat = heartbeat
+        self.exchange_name = exchange_name
+        self.exchange_type = exchange_type
+        self.sender_count = max(1, sender_count)
+        self.publish_batch_size = max(1, publish_batch_size)
+        self.max_in_flight = max(1, max_in_flight)
+        self.codec = codec or MessageCodec()
+
+        self._connection = None
+        self.channel = None
+        self.publish_channels: List[Any] = []
+        self.publish_exchanges: List[Any] = []
+
+        # Queue of messages waiting to be published
+        self.message_queue = asyncio.Queue(maxsize=max_queue_size)
+        self._sender_tasks: List[asyncio.Task] = []
+        self._in_flight: Optional[asyncio.Semaphore] = None
+        self._in_flight_count = 0
+        self._pending_publishes: Set[asyncio.Task] = set()
+
+        self.publish_stats = {
+            "published": 0,
+            "failed": 0,
+            "batches": 0,
+            "max_batch_size": 0,
+            "max_in_flight": 0
+        }
+
+    @property
+    def connection(self) -> Any:
+        return self._connection
+
+    async def connect(self):
+        """Connect to RabbitMQ server."""
+        connection_params = {
+            "host": self.host,
+            "port": self.port,
+            "login": self.username,
+            "password": self.password,
+            "virtualhost": self.vhost,
+            "heartbeat": self.heartbeat
+        }
+
+        if self.use_ssl:
+            ssl_context = ssl.create_default_context()
+            for k, v in self.ssl_options.items():
+                if hasattr(ssl_context, k):
+                    setattr(ssl_context, k, v)
+            connection_params["ssl"] = True
+            connection_params["ssl_context"] = ssl_context
+
+        # Try to connect with retry
+        for attempt in range(1, self.connection_attempts + 1):
+            try:
+                self._connection = await aio_pika.connect_robust(**connection_params)
+                self.channel = await self._connection.channel()
+
+                # Declare exchange
+                await self.channel.declare_exchange(
+                    self.exchange_name,
+                    self.exchange_type,
+                    durable=True
+                )
+
+                # Publisher channels confirm deliveries asynchronously; several
+                # channels let publishing spread over more than one frame stream
+                self.publish_channels = [
+                    await self._connection.channel(publisher_confirms=True)
+                    for _ in range(self.sender_count)
+                ]
+                self.publish_exchanges = [
+                    await channel.get_exchange(self.exchange_name, ensure=False)
+                    for channel in self.publish_channels
+                ]
+
+                # Start message sender tasks
+                self._start_senders()
+
+                logger.info(f"Connected to RabbitMQ at {self.host}:{self.port}/{self.vhost}")
+                return
+
+            except Exception as e:
+                if attempt == self.connection_attempts:
+                    logger.error(f"Failed to connect to RabbitMQ after {self.connection_attempts} attempts: {str(e)}")
+                    raise
+                else:
+                    logger.warning(f"Connection attempt {attempt} failed, retrying in {self.retry_delay} seconds...")
+                    await asyncio.sleep(self.retry_delay)
+
+    async def disconnect(self):
+        """Disconnect from RabbitMQ server."""
+        # Cancel the sender tasks and wait for outstanding confirmations
+        await self._stop_senders()
+
+        # Close the channels and connection
+        for channel in self.publish_channels:
+            await channel.close()
+        self.publish_channels = []
+        self.publish_exchanges = []
+
+        if self.channel:
+            await self.channel.close()
+            self.channel = None
+
+        if self._connection:
+            await self._connection.close()
+            self._connection = None
+
+        logger.info("Disconnected from RabbitMQ")
+
+    def _start_senders(self):
+        """Start one sender task per publish exchange."""
+        loop = asyncio.get_running_loop()
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        self._sender_tasks = [
+            loop.create_task(self._message_sender(exchange))
+            for exchange in self.publish_exchanges
+        ]
+
+    async def _stop_senders(self):
+        """Cancel the sender tasks, wait for in-flight publishes and fail unsent messages."""
+        for task in self._sender_tasks:
+            task.cancel()
+        for task in self._sender_tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._sender_tasks = []
+
+        if self._pending_publishes:
+            await asyncio.gather(*self._pending_publishes, return_exceptions=True)
+
+        unsent = []
+        while not self.message_queue.empty():
+            unsent.append(self.message_queue.get_nowait())
+        self._fail_unsent(unsent)
+
+    def _fail_unsent(self, messages: List[tuple]):
+        """Fail queued messages that no sender will publish."""
+        for message, routing_key, future in messages:
+            self.publish_stats["failed"] += 1
+            if future and not future.done():
+                future.set_exception(ConnectionError(
+                    f"Transport stopped before message {message.header.message_id} was published"
+                ))
+            self.message_queue.task_done()
+
+    async def _next_batch(self) -> List[tuple]:
+        """Wait for a queued message, then take whatever else is ready up to the batch size."""
+        batch = [await self.message_queue.get()]
+        while len(batch) < self.publish_batch_size:
+            try:
+                batch.append(self.message_queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _message_sender(self, exchange):
+        """
+        Background task to publish messages from the queue.
+
+        Messages are drained in batches and published without waiting for
+        each broker confirmation; confirmations resolve the senders' futures
+        as they arrive, with at most ``max_in_flight`` outstanding.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[tuple] = []
+            started = 0
+            try:
+                batch = await self._next_batch()
+
+                self.publish_stats["batches"] += 1
+                self.publish_stats["max_batch_size"] = max(self.publish_stats["max_batch_size"], len(batch))
+
+                for message, routing_key, future in batch:
+                    await self._in_flight.acquire()
+                    self._in_flight_count += 1
+                    task = loop.create_task(
+                        self._publish(exchange, message, routing_key, future)
+                    )
+                    self._pending_publishes.add(task)
+                    task.add_done_callback(self._pending_publishes.discard)
+                    started += 1
+
+                self.publish_stats["max_in_flight"] = max(self.publish_stats["max_in_flight"],
+                                                          self._in_flight_count)
+
+                # Let the other senders take the next batch
+                await asyncio.sleep(0)
+
+            except asyncio.CancelledError:
+                # Task was cancelled; messages of the batch not yet handed to
+                # a publish would otherwise never be resolved
+                self._fail_unsent(batch[started:])
+                break
+
+            except Exception as e:
+                logger.error(f"Unexpected error in message sender: {str(e)}")
+                self._fail_unsent(batch[started:])
+                # Add a small delay to avoid tight loop if there's an error
+                await asyncio.sleep(1)
+
+    async def _publish(self, exchange, message: Message, routing_key: str, future: Optional[asyncio.Future]):
+        """Publish one message and resolve its future once the broker confirms it."""
+        try:
+            # Serialize the message
+            encoded = self.codec.encode(message)
+
+            # Send the message; with publisher confirms this returns on ack
+            await exchange.publish(
+                aio_pika.Message(
+                    body=encoded.body,
+                    content_type=encoded.content_type,
+                    content_encoding=encoded.content_encoding,
+                    delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                    message_id=message.header.message_id,
+                    correlation_id=message.header.correlation_id,
+                    priority=_get_priority_value(message.header.priority),
+                    expiration=str(message.header.route.ttl * 1000)  # Convert to milliseconds
+                ),
+                routing_key=routing_key
+            )
+
+            # Record metrics
+            record_message_metrics(
+                message_type=message.header.message_type,
+                sender=message.header.route.sender,
+                recipient=message.header.route.recipient,
+                size=len(encoded.body)
+            )
+
+            self.publish_stats["published"] += 1
+            if future and not future.done():
+                future.set_result(True)
+
+        except Exception as e:
+            self.publish_stats["failed"] += 1
+            logger.error(f"Error sending message {message.header.message_id}: {str(e)}")
+            if future and not future.done():
+                future.set_exception(e)
+
+        finally:
+            self._in_flight_count -= 1
+            self._in_flight.release()
+            self.message_queue.task_done()
+
+    async def publish(self, message: Message, routing_key: str, wait_for_confirm: bool = True):
+        """
+        Queue a message for the sender pipeline, optionally waiting for its confirmation.
+
+        Messages are not guaranteed to reach the broker in the order they are
+        queued; see the class documentation.
+        """
+        future = asyncio.get_running_loop().create_future() if wait_for_confirm else None
+        await asyncio.wait_for(self.message_queue.put((message, routing_key, future)), timeout=30.0)
+
+        # Wait for the message to be sent
+        if future is not None:
+            await asyncio.wait_for(future, timeout=30.0)
+
+    async def declare_queue(self, queue_name: str, durable: bool = True, exclusive: bool = False):
+        """Declare a queue."""
+        return await self.channel.declare_queue(
+            queue_name,
+            durable=durable,
+            exclusive=exclusive,
+            auto_delete=exclusive  # Auto-delete if exclusive
+        )
+
+    async def bind_queue(self, queue_name: str, routing_key: str):
+        """Bind a queue to a routing key on the exchange."""
+        queue = await self.channel.get_queue(queue_name)
+        await queue.bind(self.exchange_name, routing_key)
+
+    async def consume(self, queue_name: str, callback: MessageCallback) -> str:
+        """Decode messages from a queue and pass them to a callback."""
+        queue = await self.channel.get_queue(queue_name)
+
+        async def _message_handler(message: aio_pika.IncomingMessage):
+            async with message.process():
+                try:
+                    # Parse the message in whatever format it was sent
+                    parsed_message = self.codec.decode(
+                        message.body, message.content_type, message.content_encoding
+                    )
+
+                    # Process with user callback
+                    await callback(parsed_message)
+
+                except (ValidationError, WireFormatError) as e:
+                    logger.error(f"Invalid message format: {str(e)}")
+                except Exception as e:
+                    logger.error(f"Error processing message: {str(e)}")
+
+        return await queue.consume(_message_handler)
+
+
+class InMemoryTransport(MessageTransport):
+    """
+    In-process transport for co-located agents.
+
+    Messages are passed by reference through asyncio queues, so nothing is
+    serialized and there is no broker hop. Receivers get the sender's
+    ``Message`` object and should treat it as read-only.
+    """
+
+    def __init__(self, max_queue_size: int = 0, drain_timeout: float = 5.0):
+        """
+        Initialize the transport.
+
+        Args:
+            max_queue_size: Maximum messages per queue (0 for unbounded)
+            drain_timeout: Seconds disconnect waits for queued messages to be handled
+        """
+        self.max_queue_size = max_queue_size
+        self.drain_timeout = drain_timeout
+
+        self.queues: Dict[str, asyncio.Queue] = {}
+        self.bindings: Dict[str, Set[str]] = {}
+        self._consumers: Dict[str, asyncio.Task] = {}  # queue name -> consumer task
+        self._connected = False
+
+        self.publish_stats = {
+            "published": 0,
+            "delivered": 0,
+            "unroutable": 0
+        }
+
+    @property
+    def connection(self) -> Any:
+        return self if self._connected else None
+
+    async def connect(self):
+        """Mark the transport as connected."""
+        self._connected = True
+        logger.info("Connected to in-memory message transport")
+
+    async def disconnect(self):
+        """Wait for queued messages to be handled, then stop the consumers."""
+        drains = [self.queues[queue_name].join() for queue_name in self._consumers]
+        if drains:
+            try:
+                await asyncio.wait_for(asyncio.gather(*drains), timeout=self.drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"In-memory transport queues not drained within {self.drain_timeout}s; "
+                               f"stopping consumers with messages pending")
+
+        for task in self._consumers.values():
+            task.cancel()
+        for task in self._consumers.values():
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._consumers = {}
+        self._connected = False
+        logger.info("Disconnected from in-memory message transport")
+
+    async def declare_queue(self, queue_name: str, durable: bool = True, exclusive: bool = False) -> asyncio.Queue:
+        """Declare a queue; declaring an existing queue returns it."""
+        if queue_name not in self.queues:
+            self.queues[queue_name] = asyncio.Queue(maxsize=self.max_queue_size)
+            self.bindings[queue_name] = set()
+        return self.queues[queue_name]
+
+    async def bind_queue(self, queue_name: str, routing_key: str):
+        """Bind a queue to a routing key pattern."""
+        if queue_name not in self.queues:
+            raise KeyError(f"Queue {queue_name} has not been declared")
+        self.bindings[queue_name].add(routing_key)
+
+    def route(self, routing_key: str) -> List[str]:
+        """
+        Get the queues a routing key is delivered to.
+
+        Args:
+            routing_key: Routing key of a message
+
+        Returns:
+            Names of queues with at least one matching binding
+        """
+        return [
+            queue_name for queue_name, patterns in self.bindings.items()
+            if any(topic_matches(pattern, routing_key) for pattern in patterns)
+        ]
+
+    async def publish(self, message: Message, routing_key: str, wait_for_confirm: bool = True):
+        """Deliver a message to every queue bound to its routing key."""
+        if not self._connected:
+            raise ConnectionError("In-memory transport is not connected")
+
+        queue_names = self.route(routing_key)
+        self.publish_stats["published"] += 1
+
+        if not queue_names:
+            self.publish_stats["unroutable"] += 1
+            logger.warning(f"No queue bound for routing key {routing_key}; "
+                           f"message {message.header.message_id} dropped")
+            return
+
+        for queue_name in queue_names:
+            await self.queues[queue_name].put(message)
+        self.publish_stats["delivered"] += len(queue_names)
+
+        record_message_metrics(
+            message_type=message.header.message_type,
+            sender=message.header.route.sender,
+            recipient=message.header.route.recipient,
+            size=0
+        )
+
+    async def consume(self, queue_name: str, callback: MessageCallback) -> str:
+        """Start a task that passes messages from a queue to a callback."""
+        queue = await self.declare_queue(queue_name)
+        consumer_tag = f"memory.{queue_name}"
+
+        if queue_name in self._consumers:
+            raise ValueError(f"Queue {queue_name} already has a consumer")
+
+        async def _consume():
+            while True:
+                message = await queue.get()
+                try:
+                    await callback(message)
+                except Exception as e:
+                    logger.error(f"Error processing message: {str(e)}")
+                finally:
+                    queue.task_done()
+
+        self._consumers[queue_name] = asyncio.get_running_loop().create_task(_consume())
+        return consumer_tag
@@ -254,6 +254,33 @@ def record_processing_time(duration_ms: float):
     registry.histogram("message_bus.latency.processing").observe(duration_ms)
 
 
+def record_queue_depth(priority: str, depth: int):
+    """Record the number of messages waiting in a priority queue."""
+    registry = get_registry()
+    registry.gauge(
+        "message_bus.queue.depth",
+        labels={"priority": priority}
+    ).set(depth)
+
+
+def record_queue_wait(priority: str, wait_ms: float):
+    """Record how long a message waited in its priority queue."""
+    registry = get_registry()
+    registry.histogram(
+        "message_bus.latency.queue_wait",
+        labels={"priority": priority}
+    ).observe(wait_ms)
+
+
+def record_message_shed(priority: str, reason: str):
+    """Record a message dropped or rejected without being processed."""
+    registry = get_registry()
+    registry.counter(
+        "message_bus.messages.shed",
+        labels={"priority": priority, "reason": reason}
+    ).increment()
+
+
 def record_error(error_type: str):
     """Record an error."""
     registry = get_registry()
@@ -264,5 +291,43 @@ def record_error(error_type: str):
     ).increment()
 
 
+def record_cache_access(cache_name: str, hit: bool, tier: str = "memory"):
+    """Record a cache lookup outcome; record one per lookup, labelled with the tier that decided it."""
+    registry = get_registry()
+    registry.counter(
+        "cache.hits" if hit else "cache.misses",
+        labels={"cache": cache_name, "tier": tier}
+    ).increment()
+
+
+def record_cache_eviction(cache_name: str, reason: str = "capacity"):
+    """Record a cache eviction."""
+    registry = get_registry()
+    registry.counter(
+        "cache.evictions",
+        labels={"cache": cache_name, "reason": reason}
+    ).increment()
+
+
+def get_cache_stats(cache_name: str) -> Dict[str, Any]:
+    """Get hit/miss totals and hit rate for a cache, overall and per tier."""
+    registry = get_registry()
+    tiers: Dict[str, Dict[str, int]] = {}
+    for c in registry.counters.values():
+        if c.name in ("cache.hits", "cache.misses") and c.labels.get("cache") == cache_name:
+            tier = tiers.setdefault(c.labels.get("tier", "memory"), {"hits": 0, "misses": 0})
+            tier["hits" if c.name == "cache.hits" else "misses"] += c.value
+
+    hits = sum(tier["hits"] for tier in tiers.values())
+    misses = sum(tier["misses"] for tier in tiers.values())
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / total if total else 0.0,
+        "tiers": tiers
+    }
+
+
 # Initialize default metrics
 setup_message_bus_metrics()
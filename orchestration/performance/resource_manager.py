@@ -15,7 +15,7 @@ from typing import Dict, Any, List, Callable, Optional, Tuple, Union
 import numpy as np
 from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, Future
-from math_llm_system.orchestration.monitoring.logger import get_logger
+from orchestration.monitoring.logger import get_logger
 
 logger = get_logger("orchestration.performance.resource_manager")
 
@@ -0,0 +1,124 @@
+"""
+Tests for the deadline scheduler and the engine timeouts built on it.
+"""
+
+import asyncio
+import unittest
+
+from orchestration.workflow.deadline_scheduler import DeadlineScheduler
+from orchestration.workflow.workflow_definition import WorkflowDefinition
+from orchestration.workflow.workflow_engine import WorkflowExecution, WorkflowExecutionStatus
+
+from orchestration.tests.test_workflow_dag import MATH_STEPS, FakeActivityEngine
+
+
+class TestDeadlineScheduler(unittest.IsolatedAsyncioTestCase):
+    """Test cases for DeadlineScheduler."""
+
+    async def test_callbacks_run_in_deadline_order(self):
+        """Expired keys are called back earliest first."""
+        scheduler = DeadlineScheduler()
+        fired = []
+        for key, delay in (("c", 0.03), ("a", 0.01), ("b", 0.02)):
+            scheduler.schedule(key, delay, fired.append)
+
+        await asyncio.sleep(0.06)
+
+        self.assertEqual(fired, ["a", "b", "c"])
+        self.assertEqual(len(scheduler), 0)
+
+    async def test_cancel_and_reschedule(self):
+        """Cancelled keys never fire and rescheduled keys fire once, at the new deadline."""
+        scheduler = DeadlineScheduler()
+        fired = []
+        scheduler.schedule("cancelled", 0.01, fired.append)
+        scheduler.schedule("moved", 0.01, fired.append)
+        scheduler.schedule("kept", 0.02, fired.append)
+
+        self.assertTrue(scheduler.cancel("cancelled"))
+        self.assertFalse(scheduler.cancel("unknown"))
+        scheduler.schedule("moved", 0.04, fired.append)
+
+        await asyncio.sleep(0.03)
+        self.assertEqual(fired, ["kept"])
+        await asyncio.sleep(0.03)
+        self.assertEqual(fired, ["kept", "moved"])
+
+    async def test_stale_entries_are_compacted(self):
+        """Churning deadlines does not grow the heap without bound."""
+        scheduler = DeadlineScheduler()
+        for i in range(10000):
+            scheduler.schedule(i % 10, 60.0, lambda key: None)
+
+        self.assertEqual(len(scheduler), 10)
+        self.assertLess(len(scheduler._heap), 200)
+        scheduler.close()
+
+
+class TestEngineDeadlines(unittest.IsolatedAsyncioTestCase):
+    """Test cases for engine response timeouts and workflow eviction."""
+
+    async def test_response_timeout(self):
+        """Unanswered responses time out and answered ones clear their deadline."""
+        engine = FakeActivityEngine()
+        engine.default_activity_timeout = 0.02
+        loop = asyncio.get_running_loop()
+
+        unanswered = loop.create_future()
+        answered = loop.create_future()
+        engine.register_response_future("unanswered", unanswered)
+        engine.register_response_future("answered", answered)
+        answered.set_result("response")
+        await asyncio.sleep(0)
+
+        self.assertEqual(len(engine.response_deadlines), 1)
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(unanswered, timeout=1.0)
+        self.assertEqual(engine.response_futures, {})
+        self.assertEqual(len(engine.response_deadlines), 0)
+
+    async def test_finished_workflows_are_evicted(self):
+        """Finished workflows and their checkpoints are removed once their TTL passes."""
+        engine = FakeActivityEngine(delay=0.001)
+        engine.completed_workflow_ttl = 0.05
+        definition = WorkflowDefinition("evicted", "Evicted", "", MATH_STEPS)
+        engine.workflow_registry.register_workflow(definition)
+
+        workflow_id, workflow = await engine.execute_workflow(
+            "evicted", {"query": "x"}, wait_for_completion=True, timeout=5.0
+        )
+
+        self.assertEqual(workflow.status, WorkflowExecutionStatus.COMPLETED)
+        self.assertIn(workflow_id, engine.active_workflows)
+        self.assertIn(workflow_id, engine.checkpoint_store.list_workflows())
+
+        await asyncio.sleep(0.1)
+
+        self.assertNotIn(workflow_id, engine.active_workflows)
+        self.assertNotIn(workflow_id, engine.checkpoint_store.list_workflows())
+
+    async def test_workflows_finished_without_events_are_evicted(self):
+        """Workflows that fail or time out outside the lifecycle events are evicted too."""
+        engine = FakeActivityEngine()
+        engine.completed_workflow_ttl = 0.05
+        unknown = WorkflowExecution("unregistered")
+        timed_out = WorkflowExecution("math")
+        engine.active_workflows[unknown.workflow_id] = unknown
+        engine.active_workflows[timed_out.workflow_id] = timed_out
+
+        await engine._execute_workflow(unknown)
+        timed_out.update_status(WorkflowExecutionStatus.TIMED_OUT)
+        engine._sweep_workflows()
+
+        self.assertEqual(unknown.status, WorkflowExecutionStatus.FAILED)
+        self.assertIn(unknown.workflow_id, engine.workflow_expirations)
+        self.assertIn(timed_out.workflow_id, engine.workflow_expirations)
+
+        await asyncio.sleep(0.1)
+
+        self.assertEqual(engine.active_workflows, {})
+        self.assertEqual(engine.checkpoint_store.list_workflows(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+"""
+Tests for the in-memory message bus transport.
+"""
+
+import asyncio
+import unittest
+from unittest import mock
+
+from orchestration.agents.base_agent import BaseAgent
+from orchestration.message_bus.message_formats import MessageType, create_message
+from orchestration.message_bus.rabbitmq_wrapper import RabbitMQBus
+from orchestration.message_bus.transports import InMemoryTransport, topic_matches
+
+
+class TestTopicMatching(unittest.TestCase):
+    """Test cases for AMQP topic pattern matching."""
+
+    def test_patterns(self):
+        """Literal words, * and # match like a RabbitMQ topic exchange."""
+        self.assertTrue(topic_matches("agent.core_llm", "agent.core_llm"))
+        self.assertFalse(topic_matches("agent.core_llm", "agent.ocr"))
+        self.assertTrue(topic_matches("capability.*", "capability.integrate"))
+        self.assertFalse(topic_matches("capability.*", "capability.integrate.fast"))
+        self.assertTrue(topic_matches("broadcast.#", "broadcast"))
+        self.assertTrue(topic_matches("broadcast.#", "broadcast.status_update"))
+        self.assertTrue(topic_matches("#.update", "a.b.update"))
+        self.assertFalse(topic_matches("broadcast.#", "agent.core_llm"))
+
+
+class TestInMemoryBus(unittest.IsolatedAsyncioTestCase):
+    """Test cases for RabbitMQBus on the in-memory transport."""
+
+    async def asyncSetUp(self):
+        self.bus = RabbitMQBus(transport="memory")
+        await self.bus.connect()
+        self.received = {}
+
+    async def asyncTearDown(self):
+        await self.bus.disconnect()
+
+    async def add_agent(self, agent_id, capabilities=()):
+        """Register an agent whose consumer records what it receives."""
+        self.received[agent_id] = []
+        await self.bus.setup_agent_queues(agent_id, list(capabilities))
+        await self.bus.declare_queue(f"broadcast.{agent_id}", durable=False, exclusive=True)
+        await self.bus.bind_queue(f"broadcast.{agent_id}", "broadcast.#")
+
+        async def callback(message):
+            self.received[agent_id].append(message)
+
+        await self.bus.setup_consumer(f"agent.{agent_id}", callback)
+        await self.bus.setup_consumer(f"broadcast.{agent_id}", callback)
+
+    async def test_direct_messages_are_passed_by_reference(self):
+        """A direct message reaches only its recipient, as the same object."""
+        await self.add_agent("a")
+        await self.add_agent("b")
+        message = create_message(MessageType.COMPUTATION_REQUEST, "tester", "a", {"x": 1})
+
+        self.assertTrue(await self.bus.send_message(message))
+        await self.bus.transport.queues["agent.a"].join()
+
+        self.assertIs(self.received["a"][0], message)
+        self.assertEqual(self.received["b"], [])
+
+    async def test_capability_and_broadcast_routing(self):
+        """Capability messages reach capable agents; broadcasts reach everyone."""
+        await self.add_agent("a", ["integrate"])
+        await self.add_agent("b", ["plot"])
+
+        await self.bus.send_message(
+            create_message(MessageType.COMPUTATION_REQUEST, "tester", "capability.plot", {})
+        )
+        await self.bus.send_message(
+            create_message(MessageType.STATUS_UPDATE, "tester", "broadcast", {}, broadcast=True)
+        )
+        for queue in self.bus.transport.queues.values():
+            await queue.join()
+
+        self.assertEqual([m.header.message_type for m in self.received["a"]],
+                         [MessageType.STATUS_UPDATE])
+        self.assertEqual([m.header.message_type for m in self.received["b"]],
+                         [MessageType.COMPUTATION_REQUEST, MessageType.STATUS_UPDATE])
+
+    async def test_base_agent_receives_each_message_once(self):
+        """A started BaseAgent gets every broadcast and capability message exactly once."""
+        with mock.patch("orchestration.agents.base_agent.get_message_bus", return_value=self.bus):
+            agent = BaseAgent("a1", "test", ["compute"])
+        received = []
+
+        async def handle(message):
+            received.append(message.header.message_type)
+
+        agent._handle_message = handle
+        self.assertTrue(await agent.start())
+        agent.running = False
+
+        self.assertEqual(self.bus.transport.route("broadcast.heartbeat"), ["broadcast.a1"])
+        self.assertEqual(self.bus.transport.route("capability.compute"), ["agent.a1"])
+
+        await self.bus.send_message(
+            create_message(MessageType.COMPUTATION_REQUEST, "tester", "capability.compute", {})
+        )
+        await self.bus.send_message(
+            create_message(MessageType.STATUS_UPDATE, "tester", "broadcast", {}, broadcast=True)
+        )
+        for queue in self.bus.transport.queues.values():
+            await queue.join()
+
+        self.assertEqual(sorted(received), sorted([MessageType.COMPUTATION_REQUEST, MessageType.STATUS_UPDATE]))
+
+    async def test_send_and_wait_response(self):
+        """Responses are correlated back to the waiting sender."""
+        await self.bus.setup_agent_queues("caller", [])
+        await self.bus.setup_consumer("agent.caller", self.bus.handle_response)
+        await self.bus.setup_agent_queues("echo", [])
+
+        async def echo(message):
+            await self.bus.send_message(create_message(
+                MessageType.COMPUTATION_RESULT,
+                "echo",
+                message.header.route.sender,
+                {"echo": message.body["value"]},
+                correlation_id=message.header.correlation_id
+            ))
+
+        await self.bus.setup_consumer("agent.echo", echo)
+
+        request = create_message(MessageType.COMPUTATION_REQUEST, "caller", "echo", {"value": 42})
+        response = await self.bus.send_and_wait_response(request, timeout=1.0)
+
+        self.assertEqual(response.body, {"echo": 42})
+        self.assertEqual(self.bus.response_handlers, {})
+
+    async def test_unroutable_messages_are_counted(self):
+        """Messages without a bound queue are dropped, not queued forever."""
+        self.assertTrue(await self.bus.send_message(
+            create_message(MessageType.COMPUTATION_REQUEST, "tester", "nobody", {})
+        ))
+        self.assertEqual(self.bus.transport.publish_stats["unroutable"], 1)
+
+    async def test_one_consumer_per_queue(self):
+        """A second consumer on a queue is refused rather than replacing the first."""
+        async def callback(message):
+            pass
+
+        await self.bus.setup_consumer("agent.a", callback)
+        with self.assertRaises(ValueError):
+            await self.bus.setup_consumer("agent.a", callback)
+        self.assertEqual(len(self.bus.transport._consumers), 1)
+
+    async def test_disconnect_does_not_wait_for_blocked_consumers(self):
+        """Disconnecting gives up on a blocked callback after the drain timeout."""
+        transport = InMemoryTransport(drain_timeout=0.05)
+        await transport.connect()
+        await transport.declare_queue("q")
+        await transport.bind_queue("q", "q")
+        blocked = asyncio.Event()
+
+        async def callback(message):
+            await blocked.wait()
+
+        await transport.consume("q", callback)
+        await transport.publish(create_message(MessageType.COMPUTATION_REQUEST, "tester", "q", {}), "q")
+
+        await asyncio.wait_for(transport.disconnect(), timeout=1.0)
+        self.assertEqual(transport._consumers, {})
+
+    async def test_disconnected_send_fails(self):
+        """Sending before connecting reports failure."""
+        bus = RabbitMQBus(transport=InMemoryTransport())
+
+        self.assertFalse(await bus.send_message(
+            create_message(MessageType.COMPUTATION_REQUEST, "tester", "a", {})
+        ))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+Tests for stage scheduling in the integrated response workflow.
+"""
+
+import asyncio
+import sys
+import types
+import unittest
+from unittest import mock
+
+
+class StubResponseFormatter:
+    """Formatter stand-in that returns the response data unchanged."""
+
+    def format_response(self, response_data, **options):
+        return dict(response_data)
+
+
+# The real formatter module does not import here, and the workflow only
+# needs format_response
+_formatter_module = types.ModuleType("math_processing.formatting.response_formatter")
+_formatter_module.ResponseFormatter = StubResponseFormatter
+
+with mock.patch.dict(sys.modules, {_formatter_module.__name__: _formatter_module}):
+    from orchestration.workflow.integrated_response_workflow import IntegratedResponseWorkflow
+
+
+ANALYSIS = {
+    "requires_computation": True,
+    "requires_search": True,
+    "operation": "differentiate",
+    "expression": "x^2",
+    "domain": "calculus",
+    "visualization_type": "function_plot",
+}
+
+RESPONSES = {
+    "analyze_math_query": {"analysis": ANALYSIS},
+    "compute_math": {"result": "2*x", "steps": ["d/dx x^2 = 2x"]},
+    "generate_math_explanation": {"explanation": "The derivative of x^2 is 2x."},
+    "generate_visualization": {"visualizations": [{"type": "function_plot"}]},
+    "search": {"results": [{"title": "Power rule", "url": "https://example.org/power-rule"}]},
+}
+
+
+class FakeRegistry:
+    """Registry with one agent per capability."""
+
+    def find_agent_by_capability(self, capability):
+        return [f"{capability}_agent"]
+
+
+class FakeBus:
+    """Message bus that answers each request type after a delay and logs the calls."""
+
+    def __init__(self, delays=None):
+        self.delays = delays or {}
+        self.events = []
+
+    async def send_request_async(self, recipient, message_body, message_type):
+        self.events.append(("start", message_type))
+        await asyncio.sleep(self.delays.get(message_type, 0))
+        self.events.append(("end", message_type))
+        return RESPONSES[message_type]
+
+
+class TestIntegratedResponseWorkflow(unittest.IsolatedAsyncioTestCase):
+    """Test cases for IntegratedResponseWorkflow stage scheduling."""
+
+    def make_workflow(self, delays=None, stage_timeouts=None):
+        self.bus = FakeBus(delays)
+        return IntegratedResponseWorkflow(
+            message_bus=self.bus,
+            agent_registry=FakeRegistry(),
+            stage_timeouts=stage_timeouts
+        )
+
+    async def test_search_overlaps_computation(self):
+        """Search starts once the query is analyzed, before the computation finishes."""
+        workflow = self.make_workflow(delays={"compute_math": 0.05, "search": 0.05})
+
+        response = await workflow.execute("Differentiate x^2")
+
+        events = self.bus.events
+        self.assertLess(events.index(("start", "search")), events.index(("end", "compute_math")))
+        self.assertLess(events.index(("start", "generate_visualization")),
+                        events.index(("end", "generate_math_explanation")))
+        self.assertEqual(response["explanation"], "The derivative of x^2 is 2x.")
+        self.assertEqual(response["citations"], ["Power rule - https://example.org/power-rule"])
+        self.assertEqual(response["metadata"]["pending_stages"], [])
+
+    async def test_timed_out_stage_is_reported_pending(self):
+        """A stage that misses its deadline is left out and reported pending."""
+        workflow = self.make_workflow(delays={"search": 1.0}, stage_timeouts={"search": 0.05})
+
+        response = await asyncio.wait_for(workflow.execute("Differentiate x^2"), timeout=0.5)
+
+        self.assertNotIn("error", response)
+        self.assertEqual(response["explanation"], "The derivative of x^2 is 2x.")
+        self.assertEqual(response["latex_expressions"], ["2*x"])
+        self.assertEqual(response["citations"], [])
+        self.assertEqual(response["metadata"]["pending_stages"], ["search"])
+        self.assertEqual(response["metadata"]["failed_stages"], [])
+        self.assertEqual(response["metadata"]["stage_timings"]["search"]["status"], "pending")
+
+    async def test_failed_optional_stage_is_reported(self):
+        """A failing optional stage is reported failed while the response is still built."""
+        workflow = self.make_workflow()
+        workflow._generate_visualizations = mock.AsyncMock(side_effect=RuntimeError("renderer crashed"))
+
+        response = await workflow.execute("Differentiate x^2")
+
+        self.assertEqual(response["metadata"]["failed_stages"], ["visualizations"])
+        self.assertEqual(response["metadata"]["stage_timings"]["visualizations"]["error"], "renderer crashed")
+        self.assertEqual(response["visualizations"], [])
+        self.assertEqual(response["explanation"], "The derivative of x^2 is 2x.")
+
+
+if __name__ == "__main__":
+    unittest.main()
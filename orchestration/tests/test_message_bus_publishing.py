@@ -0,0 +1,141 @@
+"""
+Tests for batched, pipelined publishing in the AMQP transport.
+"""
+
+import asyncio
+import unittest
+
+from orchestration.message_bus.message_formats import MessageType, create_message
+from orchestration.message_bus.rabbitmq_wrapper import RabbitMQBus
+
+
+class FakeExchange:
+    """Exchange whose publish returns after a simulated broker confirmation."""
+
+    def __init__(self, confirm_latency: float = 0.005, fail: bool = False):
+        self.confirm_latency = confirm_latency
+        self.fail = fail
+        self.published = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def publish(self, message, routing_key):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.confirm_latency)
+            if self.fail:
+                raise ConnectionError("channel closed")
+            self.published.append((routing_key, message))
+        finally:
+            self.in_flight -= 1
+
+
+def make_message(index: int):
+    """Create a direct message to a test agent."""
+    return create_message(
+        message_type=MessageType.COMPUTATION_REQUEST,
+        sender="tester",
+        recipient="math_computation_agent",
+        body={"expression": f"x + {index}"}
+    )
+
+
+class TestPipelinedPublishing(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the publishing pipeline."""
+
+    def make_bus(self, exchanges, **kwargs):
+        bus = RabbitMQBus(**kwargs)
+        bus.transport._connection = object()
+        bus.transport.publish_exchanges = exchanges
+        bus.transport._start_senders()
+        return bus
+
+    async def asyncTearDown(self):
+        await self.bus.transport._stop_senders()
+
+    async def test_many_messages_are_in_flight(self):
+        """Concurrent sends are published without waiting for each confirmation."""
+        exchange = FakeExchange(confirm_latency=0.01)
+        self.bus = self.make_bus([exchange], sender_count=1, max_in_flight=64)
+
+        results = await asyncio.wait_for(
+            asyncio.gather(*[self.bus.send_message(make_message(i)) for i in range(64)]),
+            timeout=0.5
+        )
+
+        self.assertTrue(all(results))
+        self.assertEqual(len(exchange.published), 64)
+        self.assertGreater(exchange.max_in_flight, 1)
+        self.assertGreater(self.bus.transport.publish_stats["max_batch_size"], 1)
+        self.assertEqual(exchange.published[0][0], "agent.math_computation_agent")
+
+    async def test_in_flight_limit_is_respected(self):
+        """No more than max_in_flight messages await confirmation at once."""
+        exchange = FakeExchange(confirm_latency=0.005)
+        self.bus = self.make_bus([exchange], sender_count=1, max_in_flight=5)
+
+        await asyncio.gather(*[self.bus.send_message(make_message(i)) for i in range(30)])
+
+        self.assertLessEqual(exchange.max_in_flight, 5)
+        self.assertEqual(self.bus.transport.publish_stats["published"], 30)
+
+    async def test_senders_share_the_load(self):
+        """Each sender channel publishes part of the traffic."""
+        exchanges = [FakeExchange(), FakeExchange(), FakeExchange()]
+        self.bus = self.make_bus(exchanges, sender_count=3, publish_batch_size=4)
+
+        await asyncio.gather(*[self.bus.send_message(make_message(i)) for i in range(60)])
+
+        self.assertEqual(sum(len(e.published) for e in exchanges), 60)
+        self.assertTrue(all(e.published for e in exchanges))
+
+    async def test_failed_publish_reports_false(self):
+        """A publish error resolves the sender's future with a failure."""
+        self.bus = self.make_bus([FakeExchange(fail=True)], sender_count=1)
+
+        self.assertFalse(await self.bus.send_message(make_message(0)))
+        self.assertEqual(self.bus.transport.publish_stats["failed"], 1)
+
+    async def test_send_without_waiting_for_confirm(self):
+        """wait_for_confirm=False returns once the message is queued."""
+        exchange = FakeExchange(confirm_latency=0.05)
+        self.bus = self.make_bus([exchange], sender_count=1)
+
+        self.assertTrue(await asyncio.wait_for(
+            self.bus.send_message(make_message(0), wait_for_confirm=False), timeout=0.01
+        ))
+
+        await self.bus.transport.message_queue.join()
+        self.assertEqual(len(exchange.published), 1)
+
+    async def test_stopping_resolves_drained_messages(self):
+        """Messages a stopped sender drained but did not publish are failed, not lost."""
+        exchange = FakeExchange(confirm_latency=0.05)
+        self.bus = self.make_bus([exchange], sender_count=1, max_in_flight=1)
+        transport = self.bus.transport
+
+        sends = [asyncio.create_task(self.bus.send_message(make_message(i))) for i in range(5)]
+        while transport.publish_stats["batches"] == 0 or not transport.message_queue.empty():
+            await asyncio.sleep(0)
+        await transport._stop_senders()
+
+        results = await asyncio.wait_for(asyncio.gather(*sends), timeout=0.5)
+        self.assertEqual(results, [True, False, False, False, False])
+        self.assertEqual(transport.publish_stats["failed"], 4)
+        await asyncio.wait_for(transport.message_queue.join(), timeout=0.5)
+
+    async def test_stopping_resolves_queued_messages(self):
+        """Messages still queued when the senders stop are failed."""
+        self.bus = self.make_bus([], sender_count=1)
+        sends = [asyncio.create_task(self.bus.send_message(make_message(i))) for i in range(3)]
+        while self.bus.transport.message_queue.qsize() < 3:
+            await asyncio.sleep(0)
+
+        await self.bus.transport._stop_senders()
+
+        self.assertEqual(await asyncio.wait_for(asyncio.gather(*sends), timeout=0.5), [False] * 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
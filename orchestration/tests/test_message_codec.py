@@ -0,0 +1,101 @@
+"""
+Tests for message wire formats.
+"""
+
+import unittest
+
+import msgpack
+
+from orchestration.message_bus.codecs import (
+    CONTENT_TYPE_JSON, CONTENT_TYPE_MSGPACK, WIRE_SCHEMA_VERSION,
+    MessageCodec, WireFormatError
+)
+from orchestration.message_bus.message_formats import MessageType, create_message
+
+
+def make_message(points: int = 3):
+    """Create a message with a few agent hops and a numeric payload."""
+    message = create_message(
+        message_type=MessageType.VISUALIZATION_REQUEST,
+        sender="core_llm_agent",
+        recipient="visualization_agent",
+        body={"x": [i / 10 for i in range(points)], "title": "sin(x)", "grid": True}
+    )
+    message.header.trace.agent_hops = [{"agent": "orchestrator", "at": "t0"}]
+    message.header.metadata = {"retry": 1}
+    return message
+
+
+class TestMessageCodec(unittest.TestCase):
+    """Test cases for MessageCodec."""
+
+    def test_round_trips(self):
+        """Both formats decode to an equal message."""
+        message = make_message()
+        for content_type in (CONTENT_TYPE_JSON, CONTENT_TYPE_MSGPACK):
+            codec = MessageCodec(content_type)
+            encoded = codec.encode(message)
+
+            self.assertEqual(encoded.content_type, content_type)
+            self.assertEqual(codec.decode(*encoded), message)
+
+    def test_msgpack_is_smaller(self):
+        """The positional msgpack layout is smaller than JSON."""
+        message = make_message()
+        json_size = len(MessageCodec(CONTENT_TYPE_JSON).encode(message).body)
+        msgpack_size = len(MessageCodec(CONTENT_TYPE_MSGPACK).encode(message).body)
+
+        self.assertLess(msgpack_size, json_size * 0.7)
+
+    def test_compression_above_threshold(self):
+        """Only bodies larger than the threshold are compressed."""
+        codec = MessageCodec(CONTENT_TYPE_MSGPACK, compression_threshold=2048)
+
+        small = codec.encode(make_message(3))
+        large_message = make_message(2000)
+        large = codec.encode(large_message)
+
+        self.assertIsNone(small.content_encoding)
+        self.assertEqual(large.content_encoding, "zlib")
+        self.assertEqual(codec.decode(*large), large_message)
+
+    def test_any_format_is_decoded(self):
+        """A codec decodes formats other than the one it encodes with."""
+        message = make_message()
+        body = message.model_dump_json().encode()
+        codec = MessageCodec(CONTENT_TYPE_MSGPACK)
+
+        self.assertEqual(codec.decode(body), message)
+        self.assertEqual(codec.decode(body, CONTENT_TYPE_JSON), message)
+
+    def test_mixed_schema_versions(self):
+        """Appended fields from newer senders are ignored; missing ones get defaults."""
+        message = make_message()
+        codec = MessageCodec(CONTENT_TYPE_MSGPACK)
+        version, header, body = msgpack.unpackb(codec.encode(message).body)
+
+        newer = msgpack.packb([WIRE_SCHEMA_VERSION + 1, header + ["new_field"], body, "extra"])
+        self.assertEqual(codec.decode(newer, CONTENT_TYPE_MSGPACK), message)
+
+        # An older sender without the trailing header fields
+        older = msgpack.packb([version, header[:-2], body])
+        decoded = codec.decode(older, CONTENT_TYPE_MSGPACK)
+        self.assertEqual(decoded.header.version, "1.0")
+        self.assertEqual(decoded.header.metadata, {})
+
+    def test_invalid_bodies(self):
+        """Unknown formats and malformed bodies raise WireFormatError."""
+        codec = MessageCodec()
+
+        with self.assertRaises(WireFormatError):
+            codec.decode(b"{}", "application/xml")
+        with self.assertRaises(WireFormatError):
+            codec.decode(b"not zlib", CONTENT_TYPE_JSON, "zlib")
+        with self.assertRaises(WireFormatError):
+            codec.decode(msgpack.packb({"a": 1}), CONTENT_TYPE_MSGPACK)
+        with self.assertRaises(ValueError):
+            MessageCodec("application/xml")
+
+
+if __name__ == "__main__":
+    unittest.main()
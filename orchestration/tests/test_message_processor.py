@@ -0,0 +1,155 @@
+"""
+Tests for weighted fair scheduling in MessageProcessor.
+"""
+
+import asyncio
+import unittest
+
+from orchestration.message_bus.message_formats import MessagePriority, MessageType, create_message
+from orchestration.message_bus.message_handler import MessageProcessor, MessageRouter
+
+
+def make_message(priority: MessagePriority, index: int = 0, ttl: int = 300):
+    """Create a message from tester to worker."""
+    message = create_message(
+        message_type=MessageType.COMPUTATION_REQUEST,
+        sender="tester",
+        recipient="worker",
+        body={"index": index},
+        priority=priority
+    )
+    message.header.route.ttl = ttl
+    return message
+
+
+class TestMessageProcessor(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the message processor scheduler."""
+
+    def make_processor(self, handler, **kwargs):
+        router = MessageRouter()
+        router.register_route_handler(router.get_route_key(make_message(MessagePriority.NORMAL)), handler)
+        self.processor = MessageProcessor(router, **kwargs)
+        return self.processor
+
+    async def asyncTearDown(self):
+        await self.processor.stop()
+
+    async def wait_processed(self, count: int):
+        """Wait until the processor has finished count messages."""
+        async def _wait():
+            while sum(s["processed"] for s in self.processor.stats.values()) < count:
+                await asyncio.sleep(0.001)
+        await asyncio.wait_for(_wait(), timeout=2.0)
+
+    async def test_slow_handler_does_not_serialize_priority(self):
+        """Messages of one priority are processed concurrently."""
+        async def slow(message):
+            await asyncio.sleep(0.05)
+
+        processor = self.make_processor(slow, max_workers=8)
+        await processor.start()
+
+        start = asyncio.get_running_loop().time()
+        for i in range(6):
+            await processor.enqueue_message(make_message(MessagePriority.NORMAL, i))
+        await self.wait_processed(6)
+
+        self.assertLess(asyncio.get_running_loop().time() - start, 0.2)
+
+    async def test_priority_concurrency_limit(self):
+        """A priority never runs more messages than its worker limit."""
+        running = []
+        peak = []
+
+        async def handler(message):
+            running.append(message)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.remove(message)
+
+        processor = self.make_processor(handler, max_workers=8,
+                                        priority_workers={MessagePriority.LOW: 2})
+        await processor.start()
+        for i in range(10):
+            await processor.enqueue_message(make_message(MessagePriority.LOW, i))
+        await self.wait_processed(10)
+
+        self.assertEqual(max(peak), 2)
+
+    async def test_weighted_fair_order(self):
+        """Higher priorities go first in proportion, but LOW is not starved."""
+        order = []
+        processor = self.make_processor(
+            lambda message: order.append(message.header.priority), max_workers=1
+        )
+        for priority in (MessagePriority.LOW, MessagePriority.NORMAL, MessagePriority.HIGH):
+            for i in range(20):
+                await processor.enqueue_message(make_message(priority, i))
+
+        await processor.start()
+        await self.wait_processed(60)
+
+        first = order[:14]
+        self.assertEqual(first.count(MessagePriority.HIGH), 8)
+        self.assertEqual(first.count(MessagePriority.NORMAL), 4)
+        self.assertEqual(first.count(MessagePriority.LOW), 2)
+
+    async def test_reject_when_full(self):
+        """The reject policy refuses messages once the queue is full."""
+        processor = self.make_processor(lambda message: None, max_queue_size=2,
+                                        overflow_policy="reject")
+
+        results = [await processor.enqueue_message(make_message(MessagePriority.NORMAL, i))
+                   for i in range(3)]
+
+        self.assertEqual(results, [True, True, False])
+        self.assertEqual(processor.stats[MessagePriority.NORMAL]["rejected"], 1)
+
+    async def test_drop_oldest_when_full(self):
+        """The drop_oldest policy sheds the oldest waiting message."""
+        seen = []
+        processor = self.make_processor(lambda message: seen.append(message.body["index"]),
+                                        max_queue_size=2, overflow_policy="drop_oldest")
+        for i in range(3):
+            self.assertTrue(await processor.enqueue_message(make_message(MessagePriority.NORMAL, i)))
+
+        await processor.start()
+        await self.wait_processed(2)
+
+        self.assertEqual(sorted(seen), [1, 2])
+        self.assertEqual(processor.stats[MessagePriority.NORMAL]["shed"], 1)
+
+    async def test_block_waits_for_space(self):
+        """The block policy waits for a slot and then enqueues."""
+        processor = self.make_processor(lambda message: None, max_queue_size=1,
+                                        overflow_policy="block", enqueue_timeout=1.0)
+        await processor.enqueue_message(make_message(MessagePriority.NORMAL, 0))
+
+        blocked = asyncio.ensure_future(processor.enqueue_message(make_message(MessagePriority.NORMAL, 1)))
+        await asyncio.sleep(0.01)
+        self.assertFalse(blocked.done())
+
+        await processor.start()
+        self.assertTrue(await asyncio.wait_for(blocked, timeout=1.0))
+        await self.wait_processed(2)
+
+    async def test_expired_messages_are_shed(self):
+        """Messages that outlive their TTL in the queue are not processed."""
+        seen = []
+        processor = self.make_processor(lambda message: seen.append(message), max_workers=1)
+        await processor.enqueue_message(make_message(MessagePriority.NORMAL, ttl=0))
+        await processor.enqueue_message(make_message(MessagePriority.NORMAL, ttl=300))
+        await asyncio.sleep(0.01)
+
+        await processor.start()
+        await self.wait_processed(1)
+
+        self.assertEqual(len(seen), 1)
+        stats = processor.get_queue_stats()["normal"]
+        self.assertEqual(stats["expired"], 1)
+        self.assertEqual(stats["depth"], 0)
+        self.assertGreater(stats["max_wait_ms"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
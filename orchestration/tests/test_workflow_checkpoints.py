@@ -0,0 +1,208 @@
+"""
+Tests for delta workflow checkpoints and their durable store.
+"""
+
+import asyncio
+import datetime
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from orchestration.workflow.checkpoint_store import (
+    InMemoryCheckpointStore, SQLiteCheckpointStore, decode_value, encode_value
+)
+from orchestration.workflow.workflow_definition import WorkflowDefinition
+from orchestration.workflow.workflow_engine import (
+    ActivityStatus, WorkflowExecution, WorkflowExecutionStatus
+)
+
+from orchestration.tests.test_workflow_dag import MATH_STEPS, FakeActivityEngine
+
+
+class TestWorkflowCheckpoints(unittest.TestCase):
+    """Test cases for WorkflowExecution checkpoints."""
+
+    def test_only_changed_values_are_recorded(self):
+        """A checkpoint records the keys changed since the previous one."""
+        image = "iVBORw0KGgo" * 10000
+        workflow = WorkflowExecution("math", initial_context={"query": "x^2", "image": image})
+
+        first = workflow.checkpoint()
+        workflow.context["result"] = "2x"
+        second = workflow.checkpoint()
+        del workflow.context["query"]
+        third = workflow.checkpoint()
+
+        self.assertTrue(first["full"])
+        self.assertEqual(set(first["context"]), {"query", "image"})
+        self.assertFalse(second["full"])
+        self.assertEqual(second["context"], {"result": '"2x"'})
+        self.assertEqual(third["context"], {})
+        self.assertEqual(third["removed"], ["query"])
+
+    def test_in_place_changes_are_recorded(self):
+        """Values changed in place are recorded once marked."""
+        workflow = WorkflowExecution("math", initial_context={"recovery": {"skips": []}})
+        workflow.add_activity({"name": "plot", "status": ActivityStatus.PENDING})
+        workflow.checkpoint()
+
+        workflow.context["recovery"]["skips"].append("plot")
+        workflow.mark_context_changed("recovery")
+        workflow.activities[0]["attempts"] = 2
+        workflow.mark_activity_changed(0)
+        record = workflow.checkpoint()
+
+        self.assertEqual(record["context"], {"recovery": '{"skips":["plot"]}'})
+        self.assertEqual(decode_value(record["activities"]["0"])["attempts"], 2)
+
+    def test_unchanged_values_are_not_encoded(self):
+        """Only values written since the last checkpoint are encoded, full checkpoints included."""
+        workflow = WorkflowExecution("math", initial_context={"image": {"data": "iVBORw0KGgo" * 10000}})
+        workflow.full_checkpoint_interval = 2
+        workflow.add_activity({"name": "ocr", "status": ActivityStatus.PENDING})
+        workflow.checkpoint()
+
+        with mock.patch("orchestration.workflow.workflow_engine.encode_value", wraps=encode_value) as encode:
+            workflow.context.update({"text": "x^2"})
+            workflow.checkpoint()
+            workflow.set_activity_status(0, ActivityStatus.COMPLETED)
+            full = workflow.checkpoint()
+
+        encoded = [call.args[0] for call in encode.call_args_list]
+        self.assertNotIn(workflow.context["image"], encoded)
+        self.assertIn("x^2", encoded)
+        self.assertTrue(full["full"])
+        self.assertEqual(set(full["context"]), {"image", "text"})
+
+    def test_restore_preserves_types(self):
+        """Values JSON cannot represent come back with their types; others are rejected."""
+        when = datetime.datetime(2024, 5, 1, 12, 30)
+        context = {
+            "point": (1, 2),
+            "seen": {"x", "y"},
+            "roots": {(0, 1): [when, datetime.date(2024, 5, 1)]},
+            "raw": b"\x00\x01",
+            "tagged": {"__type__": "tuple"},
+        }
+        workflow = WorkflowExecution("math", initial_context=dict(context))
+        workflow.checkpoint()
+        workflow.context["point"] = (3, 4)
+        workflow.checkpoint()
+
+        self.assertTrue(workflow.restore_checkpoint(0))
+        self.assertEqual(workflow.context, context)
+
+        workflow.context["answer"] = object()
+        with self.assertRaises(TypeError):
+            workflow.checkpoint()
+        del workflow.context["answer"]
+        self.assertEqual(workflow.checkpoint()["sequence"], 2)
+
+    def test_restore_beyond_history_limit(self):
+        """Older checkpoints folded out of the history still restore correctly."""
+        workflow = WorkflowExecution("math", initial_context={"step": 0})
+        workflow.full_checkpoint_interval = 100
+        for step in range(15):
+            workflow.context["step"] = step
+            workflow.context[f"key{step}"] = [step]
+            workflow.checkpoint()
+
+        self.assertEqual(len(workflow.checkpoint_history), workflow.max_checkpoint_history)
+        self.assertTrue(workflow.restore_checkpoint(0))
+
+        self.assertEqual(workflow.context["step"], 5)
+        self.assertEqual(workflow.context["key5"], [5])
+        self.assertNotIn("key6", workflow.context)
+
+    def test_sqlite_store_round_trip(self):
+        """Workflows rebuild from a SQLite store opened by a new process."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "checkpoints.db")
+            store = SQLiteCheckpointStore(path)
+            workflow = WorkflowExecution("math", initial_context={"query": "x^2"}, metadata={"user": "u1"})
+            workflow.full_checkpoint_interval = 3
+            workflow.add_activity({"name": "compute", "status": ActivityStatus.PENDING})
+            for step in range(5):
+                workflow.context["step"] = step
+                store.save(workflow.checkpoint())
+            workflow.set_activity_status(0, ActivityStatus.COMPLETED, result={"result": "2x"})
+            store.save(workflow.checkpoint())
+            store.close()
+
+            reopened = SQLiteCheckpointStore(path)
+            records = reopened.load(workflow.workflow_id)
+            restored = WorkflowExecution.from_checkpoints(records)
+            reopened.close()
+
+        # Records before the last full checkpoint are dropped
+        self.assertEqual([record["sequence"] for record in records], [3, 4, 5])
+        self.assertEqual(restored.context, workflow.context)
+        self.assertEqual(restored.activities, workflow.activities)
+        self.assertEqual(restored.metadata, {"user": "u1"})
+        self.assertEqual(restored.checkpoint_sequence, 5)
+
+
+class TestWorkflowRecovery(unittest.IsolatedAsyncioTestCase):
+    """Test cases for resuming workflows from stored checkpoints."""
+
+    async def test_durable_writes_leave_the_event_loop(self):
+        """Saves to a durable store run on the writer thread, in order."""
+        with tempfile.TemporaryDirectory() as directory:
+            store = SQLiteCheckpointStore(os.path.join(directory, "checkpoints.db"))
+            threads = []
+            save = store.save
+            store.save = lambda record: (threads.append(threading.current_thread()), save(record))
+
+            engine = FakeActivityEngine()
+            engine.checkpoint_store = store
+            workflow = WorkflowExecution("math", initial_context={"query": "x^2"})
+            for step in range(3):
+                workflow.context["step"] = step
+                engine._checkpoint(workflow)
+            await engine.flush_checkpoints()
+
+            self.assertNotIn(threading.current_thread(), threads)
+            self.assertEqual([record["sequence"] for record in store.load(workflow.workflow_id)], [0, 1, 2])
+            await engine.shutdown()
+
+    async def test_resume_after_restart(self):
+        """A new engine finishes a workflow from its last checkpoint."""
+        store = InMemoryCheckpointStore()
+        definition = WorkflowDefinition("resumable", "Resumable", "", MATH_STEPS)
+
+        # The previous process finished classification and was computing
+        workflow = WorkflowExecution("resumable", initial_context={"query": "d/dx x^2"})
+        for step in await definition.get_initial_steps(workflow.context):
+            workflow.add_activity(step)
+        workflow.update_status(WorkflowExecutionStatus.RUNNING)
+        workflow.set_activity_status(0, ActivityStatus.COMPLETED)
+        workflow.context.update({"domain": "classify:domain", "expression": "classify:expression"})
+        workflow.set_activity_status(1, ActivityStatus.RUNNING)
+        store.save(workflow.checkpoint())
+
+        engine = FakeActivityEngine(delay=0.01)
+        engine.checkpoint_store = store
+        engine.workflow_registry.register_workflow(definition)
+
+        self.assertEqual(await engine.recover_workflows(), [workflow.workflow_id])
+
+        resumed = engine.active_workflows[workflow.workflow_id]
+        while resumed.status != WorkflowExecutionStatus.COMPLETED:
+            await asyncio.sleep(0.01)
+
+        self.assertEqual(engine.started[0], "compute")
+        self.assertNotIn("classify", engine.started)
+        self.assertEqual(resumed.context["response"], "format:response")
+
+        # The completed state is checkpointed, so it is not resumed again
+        restarted = FakeActivityEngine()
+        restarted.checkpoint_store = store
+        self.assertEqual(await restarted.recover_workflows(), [])
+        self.assertEqual(restarted.active_workflows[workflow.workflow_id].status,
+                         WorkflowExecutionStatus.COMPLETED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+"""
+Tests for dependency-driven parallel step execution in WorkflowEngine.
+"""
+
+import asyncio
+import unittest
+
+from orchestration.workflow.workflow_definition import WorkflowDefinition, WorkflowStep
+from orchestration.workflow.workflow_engine import (
+    ActivityStatus, WorkflowEngine, WorkflowExecution, WorkflowExecutionStatus
+)
+
+
+def step(step_id, inputs, outputs):
+    """Create a step with the given keys."""
+    return WorkflowStep(id=step_id, required_capability=step_id, message_type="math_query",
+                        input_keys=inputs, output_keys=outputs)
+
+
+MATH_STEPS = [
+    step("classify", ["query"], ["domain", "expression"]),
+    step("compute", ["expression", "domain"], ["result", "steps"]),
+    step("explain", ["result", "steps"], ["explanation"]),
+    step("visualize", ["expression", "result"], ["visualization"]),
+    step("search", ["domain", "result"], ["search_results"]),
+    step("format", ["explanation", "visualization", "search_results"], ["response"]),
+]
+
+
+class FakeActivityEngine(WorkflowEngine):
+    """Engine whose activities sleep and write their output keys instead of messaging agents."""
+
+    def __init__(self, delay: float = 0.03, fail: str = None, delays: dict = None):
+        super().__init__()
+        self.delay = delay
+        self.fail = fail
+        self.delays = delays or {}
+        self.running = set()
+        self.peak = 0
+        self.started = []
+
+    async def _execute_activity(self, workflow, activity_index):
+        activity = workflow.activities[activity_index]
+        name = activity["name"]
+        missing = [key for key in activity.get("input_keys", []) if key not in workflow.context]
+        assert not missing or activity_index == 0, f"{name} started without {missing}"
+
+        self.started.append(name)
+        self.running.add(name)
+        self.peak = max(self.peak, len(self.running))
+        try:
+            await asyncio.sleep(self.delays.get(name, self.delay))
+        finally:
+            self.running.discard(name)
+
+        if name == self.fail:
+            workflow.set_activity_status(activity_index, ActivityStatus.FAILED, error={"message": "boom"})
+            return False, {"error": {"message": "boom"}}
+
+        result = {key: f"{name}:{key}" for key in activity.get("output_keys", [])}
+        workflow.set_activity_status(activity_index, ActivityStatus.COMPLETED, result=result)
+        workflow.context.update(result)
+        return True, result
+
+
+class TestWorkflowDag(unittest.IsolatedAsyncioTestCase):
+    """Test cases for DAG-parallel workflow execution."""
+
+    async def run_workflow(self, engine, definition, context=None):
+        engine.workflow_registry.register_workflow(definition)
+        _, workflow = await engine.execute_workflow(
+            definition.id, context or {"query": "d/dx x^2"}, wait_for_completion=True, timeout=5.0
+        )
+        return workflow
+
+    def test_dependencies_from_keys(self):
+        """Steps depend on the earlier steps producing their inputs."""
+        definition = WorkflowDefinition("deps", "Deps", "", MATH_STEPS)
+
+        dependencies = definition.get_dependencies()
+
+        self.assertEqual(dependencies["classify"], set())
+        self.assertEqual(dependencies["visualize"], {"classify", "compute"})
+        self.assertEqual(dependencies["format"], {"explain", "visualize", "search"})
+
+    async def test_independent_steps_run_concurrently(self):
+        """Explanation, visualization and search run together after computation."""
+        engine = FakeActivityEngine(delay=0.05)
+        definition = WorkflowDefinition("dag_math", "DAG math", "", MATH_STEPS)
+
+        start = asyncio.get_running_loop().time()
+        workflow = await self.run_workflow(engine, definition)
+        elapsed = asyncio.get_running_loop().time() - start
+
+        self.assertEqual(workflow.status, WorkflowExecutionStatus.COMPLETED)
+        self.assertEqual(engine.peak, 3)
+        self.assertEqual(engine.started[:2], ["classify", "compute"])
+        self.assertEqual(engine.started[-1], "format")
+        self.assertEqual(workflow.context["response"], "format:response")
+        # Critical path is four steps, not six
+        self.assertLess(elapsed, 0.05 * 5.5)
+
+    async def test_concurrency_cap(self):
+        """No more than max_concurrency steps of a workflow run at once."""
+        engine = FakeActivityEngine()
+        steps = [step(f"s{i}", ["query"], [f"out{i}"]) for i in range(5)]
+        definition = WorkflowDefinition("dag_capped", "Capped", "", steps, max_concurrency=2)
+
+        workflow = await self.run_workflow(engine, definition)
+
+        self.assertEqual(workflow.status, WorkflowExecutionStatus.COMPLETED)
+        self.assertEqual(engine.peak, 2)
+
+    async def test_undeclared_activities_run_in_order(self):
+        """Activities without declared keys keep sequential semantics."""
+        engine = FakeActivityEngine()
+        workflow = WorkflowExecution("legacy")
+        for name in ("a", "b", "c"):
+            workflow.add_activity({"name": name, "context_keys": []})
+
+        self.assertEqual(engine._ready_activities(workflow, set()), [0])
+
+        workflow.set_activity_status(0, ActivityStatus.COMPLETED)
+        self.assertEqual(engine._ready_activities(workflow, set()), [1])
+
+    async def test_failure_stops_dependents(self):
+        """A failed step fails the workflow and its dependents never start."""
+        engine = FakeActivityEngine(fail="compute")
+        definition = WorkflowDefinition("dag_failing", "Failing", "", MATH_STEPS)
+
+        workflow = await self.run_workflow(engine, definition)
+
+        self.assertEqual(workflow.status, WorkflowExecutionStatus.FAILED)
+        self.assertEqual(engine.started, ["classify", "compute"])
+
+    async def test_failure_cancels_siblings(self):
+        """Siblings still running when a step fails the workflow are cancelled."""
+        engine = FakeActivityEngine(delay=0.01, fail="check", delays={"render": 5.0})
+        steps = [step("check", ["query"], ["checked"]), step("render", ["query"], ["image"])]
+        definition = WorkflowDefinition("dag_siblings", "Siblings", "", steps)
+
+        start = asyncio.get_running_loop().time()
+        workflow = await self.run_workflow(engine, definition)
+        elapsed = asyncio.get_running_loop().time() - start
+
+        self.assertEqual(workflow.status, WorkflowExecutionStatus.FAILED)
+        self.assertEqual(sorted(engine.started), ["check", "render"])
+        self.assertEqual(engine.running, set())
+        self.assertNotIn("image", workflow.context)
+        self.assertLess(elapsed, 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+Tests for the orchestration manager running workflows on the workflow engine.
+"""
+
+import asyncio
+import unittest
+
+from orchestration.manager.orchestration_manager import OrchestrationManager, WorkflowStatus
+from orchestration.workflow.workflow_definition import WorkflowDefinition
+from orchestration.workflow.workflow_engine import WorkflowExecutionStatus
+
+from orchestration.tests.test_workflow_dag import MATH_STEPS, FakeActivityEngine
+
+
+class TestManagerOnEngine(unittest.IsolatedAsyncioTestCase):
+    """Test cases for workflows started through the orchestration manager."""
+
+    def setUp(self):
+        self.engine = FakeActivityEngine(delay=0.001)
+        self.manager = OrchestrationManager(workflow_engine=self.engine)
+        self.manager.workflow_registry.register_workflow(
+            WorkflowDefinition("managed_math", "Managed math", "", MATH_STEPS)
+        )
+
+    async def test_workflow_runs_on_engine(self):
+        """The manager's future resolves with the engine's results and events."""
+        events = []
+
+        async def on_event(event):
+            events.append(event["event_type"])
+
+        workflow_id, future = await self.manager.start_workflow(
+            "managed_math", {"query": "d/dx x^2"}, conversation_id="c1"
+        )
+        self.manager.subscribe_to_workflow(workflow_id, on_event)
+        workflow = await asyncio.wait_for(future, timeout=5.0)
+
+        self.assertEqual(workflow.status, WorkflowStatus.COMPLETED)
+        self.assertEqual(workflow.conversation_id, "c1")
+        self.assertEqual(workflow.data["response"], "format:response")
+        self.assertEqual(sorted(self.engine.started), sorted(step.id for step in MATH_STEPS))
+        self.assertEqual(events, ["workflow_started", "workflow_completed"])
+
+        stored = await self.manager.get_workflow(workflow_id)
+        self.assertEqual(stored.status, WorkflowStatus.COMPLETED)
+        self.assertEqual(self.manager.workflow_futures, {})
+
+    async def test_concurrent_workflows(self):
+        """Many workflows run side by side without sharing state."""
+        started = await asyncio.gather(*(
+            self.manager.start_workflow("managed_math", {"query": f"x^{i}"}) for i in range(200)
+        ))
+        workflows = await asyncio.wait_for(
+            asyncio.gather(*(future for _, future in started)), timeout=10.0
+        )
+
+        self.assertTrue(all(workflow.status == WorkflowStatus.COMPLETED for workflow in workflows))
+        self.assertEqual([workflow.data["query"] for workflow in workflows],
+                         [f"x^{i}" for i in range(200)])
+        self.assertEqual(len(self.engine.started), 200 * len(MATH_STEPS))
+
+    async def test_cancel_is_serialized_with_progress(self):
+        """A canceled workflow stops dispatching steps and cannot complete afterwards."""
+        self.engine.delay = 0.02
+        workflow_id, future = await self.manager.start_workflow("managed_math", {"query": "x"})
+        await asyncio.sleep(0.01)
+
+        self.assertTrue(await self.manager.cancel_workflow(workflow_id))
+        self.assertFalse(await self.manager.cancel_workflow(workflow_id))
+        workflow = await asyncio.wait_for(future, timeout=5.0)
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(workflow.status, WorkflowStatus.CANCELED)
+        self.assertEqual(self.engine.active_workflows[workflow_id].status, WorkflowExecutionStatus.CANCELED)
+        self.assertNotIn("format", self.engine.started)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+"""
+Tests for workflow result memoization.
+"""
+
+import asyncio
+import unittest
+
+from orchestration.manager.orchestration_manager import OrchestrationManager, WorkflowStatus
+from orchestration.workflow.result_cache import WorkflowResultCache
+from orchestration.workflow.workflow_definition import WorkflowDefinition
+from orchestration.workflow.workflow_engine import WorkflowExecutionStatus
+
+from orchestration.tests.test_workflow_dag import MATH_STEPS, FakeActivityEngine
+
+
+class TestWorkflowResultCache(unittest.TestCase):
+    """Test cases for WorkflowResultCache."""
+
+    def test_keys_use_normalized_queries(self):
+        """Equivalent queries share a key; other types and unconfigured types do not."""
+        cache = WorkflowResultCache()
+        cache.configure("math", ttl=60)
+        cache.configure("plot", ttl=60)
+
+        key = cache.make_key("math", {"query": "x^2 + 2x"})
+
+        self.assertEqual(cache.make_key("math", {"query": "2*x + x**2", "user_id": "u2"}), key)
+        self.assertEqual(cache.make_key("math", {"query": "differentiate  x^2 sin x?"}),
+                         cache.make_key("math", {"query": "differentiate x ^ 2 sin x"}))
+        self.assertNotEqual(cache.make_key("math", {"query": "x(x + 2)"}), key)
+        self.assertNotEqual(cache.make_key("math", {"query": "2(x+1)"}),
+                            cache.make_key("math", {"query": "2x+2"}))
+        self.assertNotEqual(cache.make_key("plot", {"query": "x^2 + 2x"}), key)
+        self.assertIsNone(cache.make_key("search", {"query": "x^2 + 2x"}))
+        self.assertIsNone(cache.make_key("math", {"expression": "x^2"}))
+
+    def test_outputs_keep_their_types(self):
+        """Cached outputs round-trip with their types, and unencodable outputs are not cached."""
+        cache = WorkflowResultCache()
+        cache.configure("math", ttl=60)
+        outputs = {"roots": (1, 2), "variables": {"x"}, "steps": [{"index": 1}]}
+        cache.put("math", {"query": "x^2 - 3x + 2"}, outputs)
+        cache.put("math", {"query": "x"}, {"result": object()})
+
+        self.assertEqual(cache.get("math", {"query": "x^2 - 3x + 2"}), outputs)
+        self.assertIsNone(cache.get("math", {"query": "x"}))
+        self.assertIsNone(cache.make_key("math", {"query": object()}))
+
+    def test_per_type_ttl(self):
+        """Results expire after their workflow type's TTL."""
+        cache = WorkflowResultCache()
+        cache.configure("short", ttl=0)
+        cache.configure("long", ttl=60)
+        for workflow_type in ("short", "long"):
+            cache.put(workflow_type, {"query": "x"}, {"result": workflow_type})
+
+        self.assertIsNone(cache.get("short", {"query": "x"}))
+        self.assertEqual(cache.get("long", {"query": "x"}), {"result": "long"})
+
+    def test_invalidation_hooks(self):
+        """Invalidation drops results and notifies hooks."""
+        cache = WorkflowResultCache()
+        cache.configure("math", ttl=60)
+        cache.configure("plot", ttl=60)
+        invalidated = []
+        cache.add_invalidation_hook(lambda workflow_type, key: invalidated.append((workflow_type, key)))
+        for query in ("a", "b"):
+            cache.put("math", {"query": query}, {"result": query})
+        cache.put("plot", {"query": "a"}, {"result": "plot"})
+
+        self.assertEqual(cache.invalidate("math", {"query": "a"}), 1)
+        self.assertEqual(cache.invalidate("math"), 1)
+
+        self.assertIsNone(cache.get("math", {"query": "b"}))
+        self.assertIsNotNone(cache.get("plot", {"query": "a"}))
+        self.assertEqual(invalidated, [("math", cache.make_key("math", {"query": "a"})), ("math", None)])
+
+
+class TestCachedWorkflows(unittest.IsolatedAsyncioTestCase):
+    """Test cases for cache hits in the workflow engine and orchestration manager."""
+
+    async def test_engine_cache_hit(self):
+        """An identical query completes from the cache with the usual events."""
+        engine = FakeActivityEngine(delay=0.001)
+        engine.result_cache = WorkflowResultCache()
+        engine.result_cache.configure("cached_math", ttl=60)
+        engine.workflow_registry.register_workflow(
+            WorkflowDefinition("cached_math", "Cached math", "", MATH_STEPS)
+        )
+
+        _, first = await engine.execute_workflow(
+            "cached_math", {"query": "x^2 + 2x"}, wait_for_completion=True, timeout=5.0
+        )
+        self.assertEqual(len(engine.started), len(MATH_STEPS))
+
+        events = []
+
+        async def on_event(event_type, event):
+            events.append(event_type)
+
+        engine.subscribe_to_workflow_events("repeat", on_event)
+        _, second = await engine.execute_workflow(
+            "cached_math", {"query": "2*x + x**2", "user_id": "u2"},
+            workflow_id="repeat", wait_for_completion=True
+        )
+
+        self.assertEqual(second.status, WorkflowExecutionStatus.COMPLETED)
+        self.assertTrue(second.metadata["cache_hit"])
+        self.assertEqual(len(engine.started), len(MATH_STEPS))
+        self.assertEqual(second.context["response"], first.context["response"])
+        self.assertEqual(second.context["query"], "2*x + x**2")
+        self.assertEqual(second.context["user_id"], "u2")
+        self.assertEqual(events, ["workflow_started", "workflow_completed"])
+
+    async def test_recovered_runs_are_not_cached(self):
+        """Outputs of a run that used a fallback or recorded a recovery are not cached."""
+        engine = FakeActivityEngine(delay=0.001)
+        engine.result_cache = WorkflowResultCache()
+        engine.result_cache.configure("cached_math", ttl=60)
+        engine.workflow_registry.register_workflow(
+            WorkflowDefinition("cached_math", "Cached math", "", MATH_STEPS)
+        )
+        execute_activity = engine._execute_activity
+
+        async def degraded(workflow, activity_index):
+            result = await execute_activity(workflow, activity_index)
+            if workflow.activities[activity_index]["name"] == "search":
+                if workflow.context["query"] == "x^2":
+                    workflow.activities[activity_index]["fallback_used"] = True
+                else:
+                    workflow.context["recovery"] = {"skips": [{"activity": "search"}]}
+            return result
+
+        engine._execute_activity = degraded
+        for query in ("x^2", "x^3"):
+            _, workflow = await engine.execute_workflow(
+                "cached_math", {"query": query}, wait_for_completion=True, timeout=5.0
+            )
+            self.assertEqual(workflow.status, WorkflowExecutionStatus.COMPLETED)
+            self.assertIsNone(engine.result_cache.get("cached_math", {"query": query}))
+
+    async def test_manager_cache_hit(self):
+        """The orchestration manager resolves the workflow future from the cache."""
+        engine = FakeActivityEngine()
+        engine.result_cache = WorkflowResultCache()
+        engine.result_cache.configure("cached_math", ttl=60)
+        manager = OrchestrationManager(workflow_engine=engine)
+        manager.workflow_registry.register_workflow(
+            WorkflowDefinition("cached_math", "Cached math", "", MATH_STEPS)
+        )
+        engine.result_cache.put("cached_math", {"query": "x^2"}, {"query": "x^2", "response": "2x"})
+
+        workflow_id, future = await manager.start_workflow("cached_math", {"query": "x ^ 2"})
+        workflow = await asyncio.wait_for(future, timeout=1.0)
+
+        self.assertEqual(workflow.status, WorkflowStatus.COMPLETED)
+        self.assertEqual(workflow.data, {"query": "x ^ 2", "response": "2x"})
+        self.assertEqual(engine.started, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,367 @@
+"""
+Durable checkpoint storage for workflow executions.
+
+A checkpoint is a delta: it records the workflow's state fields plus only
+the context values and activities that changed since the previous
+checkpoint, each encoded as JSON text. Every few checkpoints a full one is
+recorded instead, so a workflow is rebuilt by replaying its records from
+the latest full checkpoint, and stores can drop everything before it.
+Changes are tracked as values are written, so a checkpoint encodes only
+the values that changed and never re-encodes the rest.
+
+Stores keep checkpoint records outside process memory so that workflows
+can be resumed after a restart.
+"""
+import base64
+import datetime
+import decimal
+import json
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Key marking an encoded value JSON cannot represent natively
+_TYPE_KEY = "__type__"
+
+# Types encoded as their string form, with the function that decodes them
+_STRING_TYPES = {
+    "datetime": (datetime.datetime, datetime.datetime.fromisoformat),
+    "date": (datetime.date, datetime.date.fromisoformat),
+    "time": (datetime.time, datetime.time.fromisoformat),
+    "decimal": (decimal.Decimal, decimal.Decimal),
+    "uuid": (uuid.UUID, uuid.UUID),
+}
+
+
+def _to_json(value: Any) -> Any:
+    """Convert a value to JSON-native data, tagging types JSON would lose."""
+    if value is None or type(value) in (str, int, float, bool):
+        return value
+    if type(value) is list:
+        return [_to_json(item) for item in value]
+    if type(value) is dict or isinstance(value, ChangeTrackingDict):
+        if _TYPE_KEY in value or not all(type(key) is str for key in value):
+            return {_TYPE_KEY: "dict", "items": [[_to_json(key), _to_json(item)] for key, item in value.items()]}
+        return {key: _to_json(item) for key, item in value.items()}
+    if type(value) is tuple:
+        return {_TYPE_KEY: "tuple", "items": [_to_json(item) for item in value]}
+    if type(value) in (set, frozenset):
+        return {_TYPE_KEY: type(value).__name__, "items": [_to_json(item) for item in value]}
+    if type(value) is bytes:
+        return {_TYPE_KEY: "bytes", "value": base64.b64encode(value).decode("ascii")}
+    for name, (value_type, _) in _STRING_TYPES.items():
+        if type(value) is value_type:
+            return {_TYPE_KEY: name, "value": str(value)}
+
+    raise TypeError(f"Cannot checkpoint value of type {type(value).__name__}")
+
+
+def _from_json(value: Dict[str, Any]) -> Any:
+    """Decode a JSON object, restoring tagged values."""
+    name = value.get(_TYPE_KEY)
+    if name is None:
+        return value
+    if name == "dict":
+        return {key: item for key, item in value["items"]}
+    if name == "tuple":
+        return tuple(value["items"])
+    if name == "set":
+        return set(value["items"])
+    if name == "frozenset":
+        return frozenset(value["items"])
+    if name == "bytes":
+        return base64.b64decode(value["value"])
+    return _STRING_TYPES[name][1](value["value"])
+
+
+def encode_value(value: Any) -> str:
+    """
+    Encode a checkpointed value as JSON text.
+
+    Tuples, sets, bytes, dates and times, decimals and UUIDs, and dicts with
+    keys other than strings are tagged so that ``decode_value`` restores
+    them as they were.
+
+    Args:
+        value: Value to encode
+
+    Returns:
+        JSON text
+
+    Raises:
+        TypeError: If the value contains a type that cannot be restored
+    """
+    return json.dumps(_to_json(value), separators=(",", ":"))
+
+
+def decode_value(encoded: str) -> Any:
+    """
+    Decode JSON text produced by ``encode_value``.
+
+    Args:
+        encoded: JSON text
+
+    Returns:
+        Decoded value
+    """
+    return json.loads(encoded, object_hook=_from_json)
+
+
+class ChangeTrackingDict(dict):
+    """
+    Dict that records the keys written and removed since it was last checkpointed.
+
+    Only writes through the dict itself are seen; a value modified in place
+    must be marked with ``mark_changed`` or assigned again.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.changed: Set[Any] = set(self)
+        self.removed: Set[Any] = set()
+
+    def mark_changed(self, key: Any):
+        """Record that the value of a key was modified in place."""
+        if key in self:
+            self.changed.add(key)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.changed.add(key)
+        self.removed.discard(key)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.changed.discard(key)
+        self.removed.add(key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *default):
+        if key in self:
+            value = self[key]
+            del self[key]
+            return value
+        return super().pop(key, *default)
+
+    def popitem(self):
+        key, value = super().popitem()
+        self.changed.discard(key)
+        self.removed.add(key)
+        return key, value
+
+    def clear(self):
+        self.removed.update(self)
+        self.changed.clear()
+        super().clear()
+
+
+def replay_checkpoints(
+    records: Iterable[Dict[str, Any]],
+    base: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Replay checkpoint records into the encoded state they describe.
+
+    Unchanged encodings are shared between the base and the result rather
+    than copied.
+
+    Args:
+        records: Checkpoint records in sequence order
+        base: Encoded state before the first record, if any
+
+    Returns:
+        Encoded state after the last record, or None if there are no records
+    """
+    state = None
+    if base is not None:
+        state = {**base, "context": dict(base["context"]), "activities": dict(base["activities"])}
+
+    for record in records:
+        if state is None or record["full"]:
+            state = {"context": {}, "activities": {}}
+
+        state["workflow_id"] = record["workflow_id"]
+        state["workflow_type"] = record["workflow_type"]
+        state["sequence"] = record["sequence"]
+        state["state"] = record["state"]
+        state["activity_count"] = record["activity_count"]
+        state["context"].update(record["context"])
+        for key in record["removed"]:
+            state["context"].pop(key, None)
+        state["activities"].update(record["activities"])
+
+    return state
+
+
+class CheckpointStore(ABC):
+    """Interface for durable workflow checkpoint storage."""
+
+    # Whether checkpoints outlive the process
+    durable = False
+
+    @abstractmethod
+    def save(self, record: Dict[str, Any]):
+        """
+        Save a checkpoint record.
+
+        A full record replaces all earlier records of its workflow.
+
+        Args:
+            record: Checkpoint record
+        """
+        pass
+
+    @abstractmethod
+    def load(self, workflow_id: str) -> List[Dict[str, Any]]:
+        """
+        Load the checkpoint records of a workflow.
+
+        Args:
+            workflow_id: Workflow ID
+
+        Returns:
+            Records in sequence order, starting with a full record
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, workflow_id: str):
+        """
+        Delete the checkpoint records of a workflow.
+
+        Args:
+            workflow_id: Workflow ID
+        """
+        pass
+
+    @abstractmethod
+    def list_workflows(self) -> List[str]:
+        """
+        List the workflows that have checkpoints.
+
+        Returns:
+            Workflow IDs
+        """
+        pass
+
+    def close(self):
+        """Release the store's resources."""
+        pass
+
+
+class InMemoryCheckpointStore(CheckpointStore):
+    """Checkpoint store that keeps records in process memory."""
+
+    def __init__(self):
+        """Initialize the store."""
+        self._records: Dict[str, List[Dict[str, Any]]] = {}
+
+    def save(self, record: Dict[str, Any]):
+        records = self._records.setdefault(record["workflow_id"], [])
+        if record["full"]:
+            records.clear()
+        records.append(record)
+
+    def load(self, workflow_id: str) -> List[Dict[str, Any]]:
+        return list(self._records.get(workflow_id, []))
+
+    def delete(self, workflow_id: str):
+        self._records.pop(workflow_id, None)
+
+    def list_workflows(self) -> List[str]:
+        return list(self._records)
+
+
+class SQLiteCheckpointStore(CheckpointStore):
+    """Checkpoint store backed by a local SQLite file."""
+
+    durable = True
+
+    def __init__(self, path: str):
+        """
+        Initialize the store.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS workflow_checkpoints ("
+            "workflow_id TEXT NOT NULL, sequence INTEGER NOT NULL, record TEXT NOT NULL, "
+            "PRIMARY KEY (workflow_id, sequence))"
+        )
+        self._db.commit()
+
+    def save(self, record: Dict[str, Any]):
+        with self._lock, self._db:
+            if record["full"]:
+                self._db.execute(
+                    "DELETE FROM workflow_checkpoints WHERE workflow_id = ?",
+                    (record["workflow_id"],)
+                )
+            self._db.execute(
+                "INSERT OR REPLACE INTO workflow_checkpoints (workflow_id, sequence, record) VALUES (?, ?, ?)",
+                (record["workflow_id"], record["sequence"], json.dumps(record, separators=(",", ":")))
+            )
+
+    def load(self, workflow_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT record FROM workflow_checkpoints WHERE workflow_id = ? ORDER BY sequence",
+                (workflow_id,)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def delete(self, workflow_id: str):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM workflow_checkpoints WHERE workflow_id = ?", (workflow_id,))
+
+    def list_workflows(self) -> List[str]:
+        with self._lock:
+            rows = self._db.execute("SELECT DISTINCT workflow_id FROM workflow_checkpoints").fetchall()
+        return [row[0] for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def create_checkpoint_store(path: Optional[str] = None) -> CheckpointStore:
+    """
+    Create a checkpoint store.
+
+    Args:
+        path: SQLite file to persist checkpoints in; defaults to the
+            WORKFLOW_CHECKPOINT_DB environment variable, and checkpoints
+            are kept in memory if neither is set
+
+    Returns:
+        Checkpoint store
+    """
+    path = path or os.environ.get("WORKFLOW_CHECKPOINT_DB")
+    if path:
+        logger.info(f"Persisting workflow checkpoints to {path}")
+        return SQLiteCheckpointStore(path)
+    return InMemoryCheckpointStore()
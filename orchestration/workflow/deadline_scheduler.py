@@ -0,0 +1,126 @@
+"""
+Deadline scheduler for the workflow engine.
+
+Keeps any number of keyed deadlines in a heap behind a single event loop
+timer, instead of one sleeping task per deadline. The timer is always set
+for the earliest deadline, so each tick only touches the entries that
+actually expired.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineScheduler:
+    """Runs a callback for each key whose deadline passes."""
+
+    def __init__(self, name: str = "deadlines"):
+        """
+        Initialize the scheduler.
+
+        Args:
+            name: Scheduler name used in log messages
+        """
+        self.name = name
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._entries: Dict[Hashable, Tuple[float, int, Callable[[Hashable], None]]] = {}
+        self._counter = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_deadline: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def schedule(self, key: Hashable, delay: float, callback: Callable[[Hashable], None]):
+        """
+        Schedule a callback, replacing any deadline already set for the key.
+
+        Must be called from within the running event loop.
+
+        Args:
+            key: Key identifying the deadline
+            delay: Seconds until the deadline
+            callback: Called with the key once the deadline passes
+        """
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+
+        deadline = self._loop.time() + max(0.0, delay)
+        sequence = next(self._counter)
+        self._entries[key] = (deadline, sequence, callback)
+        heapq.heappush(self._heap, (deadline, sequence, key))
+
+        # Replaced and cancelled entries stay in the heap until popped
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._compact()
+
+        if self._timer_deadline is None or deadline < self._timer_deadline:
+            self._arm(deadline)
+
+    def cancel(self, key: Hashable) -> bool:
+        """
+        Cancel the deadline for a key.
+
+        Args:
+            key: Key identifying the deadline
+
+        Returns:
+            True if a deadline was cancelled, False if none was set
+        """
+        return self._entries.pop(key, None) is not None
+
+    def close(self):
+        """Cancel the timer and drop all deadlines."""
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = None
+        self._timer_deadline = None
+        self._heap.clear()
+        self._entries.clear()
+
+    def _compact(self):
+        """Rebuild the heap from the live entries."""
+        self._heap = [(deadline, sequence, key) for key, (deadline, sequence, _) in self._entries.items()]
+        heapq.heapify(self._heap)
+
+    def _arm(self, deadline: float):
+        """Set the timer for a deadline."""
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = self._loop.call_at(deadline, self._tick)
+        self._timer_deadline = deadline
+
+    def _tick(self):
+        """Run the callbacks of every expired deadline and re-arm the timer."""
+        self._timer = None
+        self._timer_deadline = None
+        now = self._loop.time()
+
+        while self._heap and self._heap[0][0] <= now:
+            deadline, sequence, key = heapq.heappop(self._heap)
+            entry = self._entries.get(key)
+            if entry is None or entry[1] != sequence:
+                continue
+
+            del self._entries[key]
+            try:
+                entry[2](key)
+            except Exception as e:
+                logger.error(f"Error in {self.name} callback for {key}: {str(e)}")
+
+        # Drop stale entries so the timer is set for a live deadline
+        while self._heap:
+            deadline, sequence, key = self._heap[0]
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == sequence:
+                self._arm(deadline)
+                break
+            heapq.heappop(self._heap)
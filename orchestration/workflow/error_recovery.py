@@ -683,6 +683,7 @@ class RecoveryManager:
         await asyncio.sleep(backoff_time)
         
         # Reset the activity index in the workflow to retry this activity
+        workflow.mark_activity_changed(activity_index)
         workflow.current_activity_index = activity_index - 1
         
         # Continue the workflow
@@ -757,11 +758,13 @@ class RecoveryManager:
             "simplification_level": simplification_level,
             "timestamp": datetime.datetime.now().isoformat()
         })
+        workflow.mark_context_changed("recovery")
         
         # Log the simplification
         logger.info(f"Simplified activity {activity_index} to level {simplification_level}")
         
         # Reset the activity index in the workflow to retry this activity
+        workflow.mark_activity_changed(activity_index)
         workflow.current_activity_index = activity_index - 1
         
         # Continue the workflow
@@ -988,11 +991,13 @@ class RecoveryManager:
             "precision": precision,
             "timestamp": datetime.datetime.now().isoformat()
         })
+        workflow.mark_context_changed("recovery")
         
         # Log the approximation
         logger.info(f"Using approximation for activity {activity_index} with {precision} precision")
         
         # Reset the activity index in the workflow to retry this activity
+        workflow.mark_activity_changed(activity_index)
         workflow.current_activity_index = activity_index - 1
         
         # Continue the workflow
@@ -1064,6 +1069,7 @@ class RecoveryManager:
         logger.info(f"Switched from agent {current_agent} to {alternative_agent} for activity {activity_index}")
         
         # Reset the activity index in the workflow to retry this activity
+        workflow.mark_activity_changed(activity_index)
         workflow.current_activity_index = activity_index - 1
         
         # Continue the workflow
@@ -1141,6 +1147,7 @@ class RecoveryManager:
                                f"could not be completed due to an error and was skipped.",
                 "timestamp": datetime.datetime.now().isoformat()
             })
+        workflow.mark_context_changed("recovery")
             
         # Log the skip
         logger.info(f"Skipping activity {activity_index} due to unrecoverable error")
@@ -1316,6 +1323,7 @@ class MathematicalDomainRecovery:
             activity["status"] = ActivityStatus.PENDING
             
             # Reset workflow to retry the activity
+            workflow.mark_activity_changed(activity_index)
             workflow.current_activity_index = activity_index - 1
             
             # Continue the workflow
@@ -1347,6 +1355,7 @@ class MathematicalDomainRecovery:
             activity["status"] = ActivityStatus.PENDING
             
             # Reset workflow to retry the activity
+            workflow.mark_activity_changed(activity_index)
             workflow.current_activity_index = activity_index - 1
             
             # Continue the workflow
@@ -1418,6 +1427,7 @@ class MathematicalDomainRecovery:
                 activity["status"] = ActivityStatus.PENDING
                 
                 # Reset workflow to retry the activity
+                workflow.mark_activity_changed(activity_index)
                 workflow.current_activity_index = activity_index - 1
                 
                 # Continue the workflow
@@ -1485,6 +1495,7 @@ class MathematicalDomainRecovery:
             activity["status"] = ActivityStatus.PENDING
             
             # Reset workflow to retry the activity
+            workflow.mark_activity_changed(activity_index)
             workflow.current_activity_index = activity_index - 1
             
             # Continue the workflow
@@ -1552,6 +1563,7 @@ class MathematicalDomainRecovery:
             activity["status"] = ActivityStatus.PENDING
             
             # Reset workflow to retry the activity
+            workflow.mark_activity_changed(activity_index)
             workflow.current_activity_index = activity_index - 1
             
             # Continue the workflow
@@ -6,10 +6,12 @@ the outputs from multiple specialized agents (Core LLM, Mathematical Computation
 Visualization, and Search) into a cohesive, well-structured response.
 """
 
+import asyncio
 import logging
+import time
 import uuid
 import datetime
-from typing import Dict, List, Optional, Union, Any
+from typing import Awaitable, Dict, List, Optional, Union, Any
 
 from orchestration.message_bus.rabbitmq_wrapper import RabbitMQBus
 from orchestration.agents.registry import AgentRegistry
@@ -17,6 +19,15 @@ from math_processing.formatting.response_formatter import ResponseFormatter
 
 logger = logging.getLogger(__name__)
 
+# Seconds each stage may take before the response is assembled without it
+DEFAULT_STAGE_TIMEOUTS = {
+    "analysis": 30.0,
+    "computation": 60.0,
+    "explanation": 45.0,
+    "visualizations": 30.0,
+    "search": 15.0
+}
+
 class IntegratedResponseWorkflow:
     """
     Coordinates the generation of integrated mathematical responses.
@@ -26,19 +37,29 @@ class IntegratedResponseWorkflow:
     2. Dispatches appropriate requests to specialized agents
     3. Collects and integrates results into a coherent response
     4. Formats the response according to user preferences
+    
+    Independent stages run concurrently: search starts as soon as the query
+    is analyzed, and explanation and visualization run together once the
+    computation is done. Stages that miss their deadline are left out of
+    the response and marked pending in its metadata.
     """
     
-    def __init__(self, message_bus: Optional[RabbitMQBus] = None, agent_registry: Optional[AgentRegistry] = None):
+    def __init__(self,
+                 message_bus: Optional[RabbitMQBus] = None,
+                 agent_registry: Optional[AgentRegistry] = None,
+                 stage_timeouts: Optional[Dict[str, float]] = None):
         """
         Initialize the workflow.
         
         Args:
             message_bus: Message bus for agent communication
             agent_registry: Registry of available agents
+            stage_timeouts: Per-stage timeouts in seconds, overriding the defaults
         """
         self.message_bus = message_bus or RabbitMQBus()
         self.agent_registry = agent_registry or AgentRegistry()
         self.response_formatter = ResponseFormatter()
+        self.stage_timeouts = {**DEFAULT_STAGE_TIMEOUTS, **(stage_timeouts or {})}
         
     async def execute(self, 
                     query: str, 
@@ -79,46 +100,63 @@ class IntegratedResponseWorkflow:
             "include_search": include_search
         }
         
+        # Timing and outcome of each stage, reported in the response metadata
+        stage_timings: Dict[str, Dict[str, Any]] = {}
+        workflow_data["stage_timings"] = stage_timings
+        
         try:
-            # Step 2: Analyze query with Core LLM Agent
-            query_analysis = await self._analyze_query(query, context)
+            # Step 2: Analyze query with Core LLM Agent (everything depends on it)
+            query_analysis = await self._run_stage(
+                "analysis", self._analyze_query(query, context), stage_timings, required=True
+            )
             workflow_data["query_analysis"] = query_analysis
             
-            # Step 3: Perform mathematical computation if needed
+            # Step 3: Search only needs the analysis, so it runs alongside computation
+            search_task = None
+            if include_search and query_analysis.get("requires_search", False):
+                search_task = asyncio.ensure_future(self._run_stage(
+                    "search", self._perform_search(query, query_analysis), stage_timings
+                ))
+            
+            # Step 4: Perform mathematical computation if needed
             if query_analysis.get("requires_computation", False):
-                computation_result = await self._perform_computation(
-                    query, 
-                    query_analysis, 
-                    include_step_by_step
+                computation_result = await self._run_stage(
+                    "computation",
+                    self._perform_computation(query, query_analysis, include_step_by_step),
+                    stage_timings
                 )
-                workflow_data["computation_result"] = computation_result
-            
-            # Step 4: Generate natural language explanation
-            explanation = await self._generate_explanation(
-                query, 
-                query_analysis,
-                workflow_data.get("computation_result")
-            )
-            workflow_data["explanation"] = explanation
+                if computation_result is not None:
+                    workflow_data["computation_result"] = computation_result
             
-            # Step 5: Generate visualizations if appropriate
-            if include_visualizations and query_analysis.get("visualization_type"):
-                visualizations = await self._generate_visualizations(
+            # Step 5: Explanation and visualizations both build on the computation
+            stages = {
+                "explanation": self._generate_explanation(
                     query,
                     query_analysis,
                     workflow_data.get("computation_result")
                 )
-                workflow_data["visualizations"] = visualizations
-            
-            # Step 6: Perform search for external information if needed
-            if include_search and query_analysis.get("requires_search", False):
-                search_results = await self._perform_search(
+            }
+            if include_visualizations and query_analysis.get("visualization_type"):
+                stages["visualizations"] = self._generate_visualizations(
                     query,
-                    query_analysis
+                    query_analysis,
+                    workflow_data.get("computation_result")
                 )
-                workflow_data["search_results"] = search_results
             
-            # Step 7: Format the integrated response
+            results = await asyncio.gather(*[
+                self._run_stage(name, coroutine, stage_timings)
+                for name, coroutine in stages.items()
+            ])
+            for name, result in zip(stages, results):
+                if result is not None:
+                    workflow_data[name] = result
+            
+            if search_task is not None:
+                search_results = await search_task
+                if search_results is not None:
+                    workflow_data["search_results"] = search_results
+            
+            # Step 6: Format the integrated response from whatever completed
             integrated_response = self._format_integrated_response(
                 workflow_data,
                 format_type,
@@ -142,6 +180,51 @@ class IntegratedResponseWorkflow:
             }
             return error_response
     
+    async def _run_stage(self,
+                         name: str,
+                         coroutine: Awaitable[Any],
+                         stage_timings: Dict[str, Dict[str, Any]],
+                         required: bool = False) -> Any:
+        """
+        Run one workflow stage under its deadline and record how it went.
+        
+        Args:
+            name: Stage name, used to look up its timeout
+            coroutine: Stage coroutine
+            stage_timings: Timings to record the stage's outcome in
+            required: Whether the workflow cannot continue without this stage
+            
+        Returns:
+            Stage result, or None if the stage timed out or failed and is
+            not required
+            
+        Raises:
+            Exception: If a required stage times out or fails
+        """
+        timeout = self.stage_timeouts.get(name)
+        start = time.perf_counter()
+        timing = {"status": "completed"}
+        stage_timings[name] = timing
+        
+        try:
+            return await asyncio.wait_for(coroutine, timeout=timeout)
+        except asyncio.TimeoutError:
+            # The stage missed its deadline; the response goes out without it
+            timing["status"] = "pending"
+            logger.warning(f"Stage {name} did not finish within {timeout} seconds")
+            if required:
+                raise ValueError(f"Stage {name} timed out")
+            return None
+        except Exception as e:
+            timing["status"] = "failed"
+            timing["error"] = str(e)
+            if required:
+                raise
+            logger.warning(f"Stage {name} failed: {str(e)}")
+            return None
+        finally:
+            timing["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    
     async def _analyze_query(self, query: str, context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Analyze the mathematical query to determine required operations.
@@ -395,7 +478,7 @@ class IntegratedResponseWorkflow:
         
         # Extract LaTeX expressions from computation result
         latex_expressions = []
-        computation_result = workflow_data.get("computation_result", {})
+        computation_result = workflow_data.get("computation_result") or {}
         if computation_result:
             if "latex_result" in computation_result:
                 latex_expressions.append(computation_result["latex_result"])
@@ -441,6 +524,17 @@ class IntegratedResponseWorkflow:
             workflow_data.get("start_time")
         )
         
+        # Report per-stage timings and the stages the response is missing
+        stage_timings = workflow_data.get("stage_timings", {})
+        metadata = formatted_response.setdefault("metadata", {})
+        metadata["stage_timings"] = stage_timings
+        metadata["pending_stages"] = [
+            name for name, timing in stage_timings.items() if timing["status"] == "pending"
+        ]
+        metadata["failed_stages"] = [
+            name for name, timing in stage_timings.items() if timing["status"] == "failed"
+        ]
+        
         return formatted_response
     
     def _calculate_processing_time(self, start_time: Optional[str]) -> Optional[float]:
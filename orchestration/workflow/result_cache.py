@@ -0,0 +1,250 @@
+"""
+Workflow result cache for the Mathematical Multimodal LLM System.
+
+Memoizes the outputs of completed workflows, keyed on the workflow type and
+its normalized inputs, so that repeated queries complete without running
+the agents again. Caching is opt-in per workflow type: a type is cached
+only once it has been configured with a TTL.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from math_processing.expressions.normalizer import normalize_query
+
+from ..monitoring.logger import get_logger
+from ..monitoring.metrics import record_cache_access, record_cache_eviction
+from .checkpoint_store import decode_value, encode_value
+
+logger = get_logger(__name__)
+
+# Inputs normalized as query text rather than compared exactly
+QUERY_KEYS = {"query", "text", "expression"}
+
+
+class WorkflowResultCache:
+    """LRU cache of completed workflow outputs with per-type TTLs."""
+
+    def __init__(self, max_entries: int = 1024, name: str = "workflow_result"):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached results
+            name: Cache name used in metrics
+        """
+        self.max_entries = max_entries
+        self.name = name
+
+        # Per-type TTL and the input keys results are keyed on
+        self._policies: Dict[str, Tuple[float, Tuple[str, ...]]] = {}
+        self._entries: "OrderedDict[str, Tuple[str, str, float]]" = OrderedDict()
+        self._invalidation_hooks: List[Callable[[Optional[str], Optional[str]], None]] = []
+        self._lock = threading.Lock()
+
+    def configure(self, workflow_type: str, ttl: float, input_keys: Sequence[str] = ("query",)):
+        """
+        Enable caching for a workflow type.
+
+        Args:
+            workflow_type: Workflow type to cache
+            ttl: Seconds a result stays valid
+            input_keys: Context keys that determine the result
+        """
+        self._policies[workflow_type] = (ttl, tuple(input_keys))
+
+    def disable(self, workflow_type: str):
+        """
+        Stop caching a workflow type and drop its results.
+
+        Args:
+            workflow_type: Workflow type
+        """
+        self._policies.pop(workflow_type, None)
+        self.invalidate(workflow_type)
+
+    def is_enabled(self, workflow_type: str) -> bool:
+        """Check whether results of a workflow type are cached."""
+        return workflow_type in self._policies
+
+    def make_key(self, workflow_type: str, inputs: Dict[str, Any]) -> Optional[str]:
+        """
+        Derive the cache key for a workflow's inputs.
+
+        Args:
+            workflow_type: Workflow type
+            inputs: Initial workflow context
+
+        Returns:
+            Hex digest identifying the request, or None if the type is not
+            cached, an input key is missing or an input cannot be encoded
+        """
+        policy = self._policies.get(workflow_type)
+        if policy is None:
+            return None
+
+        material = [workflow_type]
+        for key in policy[1]:
+            if key not in inputs:
+                return None
+            value = inputs[key]
+            if key in QUERY_KEYS and isinstance(value, str):
+                value = normalize_query(value)
+            material.append([key, value])
+
+        try:
+            encoded = json.dumps(material, default=encode_value, sort_keys=True, ensure_ascii=False)
+        except TypeError:
+            return None
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up cached outputs by key.
+
+        Args:
+            key: Cache key from ``make_key``
+
+        Returns:
+            Fresh copy of the cached outputs, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] <= time.time():
+                del self._entries[key]
+                record_cache_eviction(self.name, "expired")
+                entry = None
+            if entry is None:
+                record_cache_access(self.name, False)
+                return None
+
+            self._entries.move_to_end(key)
+            record_cache_access(self.name, True)
+
+        return decode_value(entry[1])
+
+    def store(self, key: str, workflow_type: str, outputs: Dict[str, Any]):
+        """
+        Store the outputs of a completed workflow by key.
+
+        Args:
+            key: Cache key from ``make_key``
+            workflow_type: Workflow type, whose TTL applies
+            outputs: Final workflow context
+        """
+        policy = self._policies.get(workflow_type)
+        if policy is None:
+            return
+
+        try:
+            value = encode_value(outputs)
+        except TypeError as e:
+            logger.warning(f"Not caching {workflow_type} outputs: {str(e)}")
+            return
+
+        with self._lock:
+            self._entries[key] = (workflow_type, value, time.time() + policy[0])
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                record_cache_eviction(self.name, "capacity")
+
+    def get(self, workflow_type: str, inputs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Look up the outputs of an identical earlier workflow.
+
+        Args:
+            workflow_type: Workflow type
+            inputs: Initial workflow context
+
+        Returns:
+            Fresh copy of the cached outputs, or None on a miss
+        """
+        key = self.make_key(workflow_type, inputs)
+        return None if key is None else self.lookup(key)
+
+    def put(self, workflow_type: str, inputs: Dict[str, Any], outputs: Dict[str, Any]):
+        """
+        Store the outputs of a completed workflow.
+
+        Args:
+            workflow_type: Workflow type
+            inputs: Initial workflow context
+            outputs: Final workflow context
+        """
+        key = self.make_key(workflow_type, inputs)
+        if key is not None:
+            self.store(key, workflow_type, outputs)
+
+    def invalidate(self, workflow_type: Optional[str] = None, inputs: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Drop cached results.
+
+        Args:
+            workflow_type: Only drop results of this type; all types if None
+            inputs: Only drop the result for these inputs
+
+        Returns:
+            Number of results dropped
+        """
+        key = None
+        with self._lock:
+            if inputs is not None and workflow_type is not None:
+                key = self.make_key(workflow_type, inputs)
+                removed = [key] if key in self._entries else []
+            else:
+                removed = [
+                    entry_key for entry_key, entry in self._entries.items()
+                    if workflow_type is None or entry[0] == workflow_type
+                ]
+            for entry_key in removed:
+                del self._entries[entry_key]
+                record_cache_eviction(self.name, "invalidated")
+
+        for hook in list(self._invalidation_hooks):
+            try:
+                hook(workflow_type, key)
+            except Exception as e:
+                logger.error(f"Error in workflow result cache invalidation hook: {str(e)}")
+
+        return len(removed)
+
+    def add_invalidation_hook(self, hook: Callable[[Optional[str], Optional[str]], None]):
+        """
+        Register a callback run whenever results are invalidated.
+
+        Hooks receive the invalidated workflow type and cache key, either of
+        which is None when the invalidation was broader, and can be used to
+        propagate invalidations to other caches or processes.
+
+        Args:
+            hook: Callback taking (workflow_type, key)
+        """
+        self._invalidation_hooks.append(hook)
+
+    def remove_invalidation_hook(self, hook: Callable[[Optional[str], Optional[str]], None]):
+        """
+        Unregister an invalidation callback.
+
+        Args:
+            hook: Callback previously registered
+        """
+        if hook in self._invalidation_hooks:
+            self._invalidation_hooks.remove(hook)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Create singleton instance
+_workflow_result_cache_instance = None
+
+def get_workflow_result_cache() -> WorkflowResultCache:
+    """Get or create the workflow result cache singleton instance."""
+    global _workflow_result_cache_instance
+    if _workflow_result_cache_instance is None:
+        _workflow_result_cache_instance = WorkflowResultCache()
+    return _workflow_result_cache_instance
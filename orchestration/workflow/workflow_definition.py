@@ -4,10 +4,13 @@ Workflow definition for the Mathematical Multimodal LLM System.
 This module defines the structure of workflows and steps for orchestration.
 """
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set
 
 logger = logging.getLogger(__name__)
 
+# Engine activity types, matched against words in a step's message type
+_ACTIVITY_TYPES = ("computation", "visualization", "ocr", "search")
+
 class WorkflowStep:
     """
     Definition of a step in a workflow.
@@ -71,6 +74,31 @@ class WorkflowStep:
             "retry_policy": self.retry_policy
         }
     
+    def to_activity(self) -> Dict[str, Any]:
+        """
+        Convert the step to a workflow engine activity.
+        
+        The activity keeps the step's input and output keys, which the
+        engine uses to run independent steps concurrently.
+        
+        Returns:
+            Activity dictionary
+        """
+        activity_type = next(
+            (name for name in _ACTIVITY_TYPES if name in self.message_type),
+            "query"
+        )
+        return {
+            "type": activity_type,
+            "name": self.id,
+            "description": self.description,
+            "capability": self.required_capability,
+            "parameters": {"step": self.id, "message_type": self.message_type},
+            "input_keys": list(self.input_keys),
+            "output_keys": list(self.output_keys),
+            "context_keys": list(self.input_keys)
+        }
+    
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'WorkflowStep':
         """
@@ -96,8 +124,10 @@ class WorkflowDefinition:
     """
     Definition of a workflow.
     
-    A workflow consists of a sequence of steps that need to be executed
-    in order to complete a particular task.
+    A workflow consists of steps that need to be executed to complete a
+    particular task. A step runs once the steps producing its input keys
+    have finished, so steps that do not depend on each other run
+    concurrently.
     """
     
     def __init__(
@@ -107,7 +137,8 @@ class WorkflowDefinition:
         description: str,
         steps: List[WorkflowStep],
         timeout: Optional[int] = None,
-        version: str = "1.0.0"
+        version: str = "1.0.0",
+        max_concurrency: Optional[int] = None
     ):
         """
         Initialize a workflow definition.
@@ -119,6 +150,7 @@ class WorkflowDefinition:
             steps: List of workflow steps
             timeout: Optional timeout in seconds
             version: Workflow definition version
+            max_concurrency: Maximum steps executing at once (engine default if None)
         """
         self.id = id
         self.name = name
@@ -126,6 +158,7 @@ class WorkflowDefinition:
         self.steps = steps
         self.timeout = timeout or 300  # Default timeout: 5 minutes
         self.version = version
+        self.max_concurrency = max_concurrency
     
     def get_input_keys(self) -> List[str]:
         """
@@ -155,6 +188,58 @@ class WorkflowDefinition:
         
         return list(output_keys)
     
+    def get_dependencies(self) -> Dict[str, Set[str]]:
+        """
+        Build the step dependency graph from input and output keys.
+        
+        A step depends on every earlier step that produces one of its
+        input keys.
+        
+        Returns:
+            Mapping from step ID to the IDs of the steps it depends on
+        """
+        dependencies: Dict[str, Set[str]] = {}
+        for i, step in enumerate(self.steps):
+            inputs = set(step.input_keys)
+            dependencies[step.id] = {
+                earlier.id for earlier in self.steps[:i]
+                if inputs & set(earlier.output_keys)
+            }
+        
+        return dependencies
+    
+    def get_workflow_type(self) -> str:
+        """Get the workflow type identifier used by the workflow registry."""
+        return self.id
+    
+    def get_description(self) -> str:
+        """Get the workflow description."""
+        return self.description
+    
+    async def get_initial_steps(self, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Get the engine activities for the workflow.
+        
+        All steps are returned at once; the engine orders them by their
+        input and output keys.
+        
+        Args:
+            context: Initial workflow context
+            
+        Returns:
+            List of activity dictionaries
+        """
+        return [step.to_activity() for step in self.steps]
+    
+    async def determine_next_steps(self, context: Dict[str, Any], completed_steps: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Determine the next steps; all steps are scheduled up front.
+        
+        Returns:
+            Empty list
+        """
+        return []
+    
     def validate(self) -> bool:
         """
         Validate the workflow definition.
@@ -202,7 +287,8 @@ class WorkflowDefinition:
             "description": self.description,
             "steps": [step.to_dict() for step in self.steps],
             "timeout": self.timeout,
-            "version": self.version
+            "version": self.version,
+            "max_concurrency": self.max_concurrency
         }
     
     @classmethod
@@ -224,5 +310,6 @@ class WorkflowDefinition:
             description=data["description"],
             steps=steps,
             timeout=data.get("timeout"),
-            version=data.get("version", "1.0.0")
+            version=data.get("version", "1.0.0"),
+            max_concurrency=data.get("max_concurrency")
         )
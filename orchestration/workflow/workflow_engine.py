@@ -10,9 +10,9 @@ import json
 from typing import Dict, Any, List, Optional, Set, Tuple, Callable
 import logging
 import datetime
-import copy
 import traceback
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from ..message_bus.message_formats import (
     Message, MessageType, MessagePriority, create_message, create_error_response
@@ -25,6 +25,12 @@ from ..agents.registry import get_agent_registry
 from ..agents.load_balancer import get_load_balancer
 from .workflow_registry import get_workflow_registry, WorkflowDefinition
 from .workflow_context import WorkflowContext
+from .checkpoint_store import (
+    ChangeTrackingDict, CheckpointStore, create_checkpoint_store, decode_value, encode_value,
+    replay_checkpoints
+)
+from .deadline_scheduler import DeadlineScheduler
+from .result_cache import WorkflowResultCache, get_workflow_result_cache
 
 # Configure logging to match server format
 logging.basicConfig(
@@ -60,6 +66,38 @@ class ActivityStatus:
     TIMED_OUT = "timed_out"
 
 
+# Queue and agent ID on which the engine receives agent responses
+ENGINE_QUEUE = "workflow.engine"
+ENGINE_AGENT_ID = "workflow_engine"
+
+# Message types that answer an activity request
+RESPONSE_MESSAGE_TYPES = {
+    MessageType.COMPUTATION_RESULT,
+    MessageType.VISUALIZATION_RESULT,
+    MessageType.OCR_RESULT,
+    MessageType.SEARCH_RESULT,
+    MessageType.QUERY_RESPONSE,
+    MessageType.ERROR
+}
+
+# Workflow events after which a workflow is checkpointed
+CHECKPOINT_EVENTS = {
+    "workflow_started",
+    "workflow_paused",
+    "workflow_resumed",
+    "workflow_completed",
+    "workflow_failed",
+    "workflow_canceled"
+}
+
+# Workflow events after which a workflow is finished
+TERMINAL_EVENTS = {
+    "workflow_completed",
+    "workflow_failed",
+    "workflow_canceled"
+}
+
+
 class WorkflowExecution:
     """
     Represents a single execution of a workflow.
@@ -89,6 +127,7 @@ class WorkflowExecution:
         self.status = WorkflowExecutionStatus.CREATED
         self.activities: List[Dict[str, Any]] = []
         self.current_activity_index = -1
+        self._context = ChangeTrackingDict()
         self.context = initial_context or {}
         self.metadata = metadata or {}
         self.created_at = datetime.datetime.now().isoformat()
@@ -97,8 +136,54 @@ class WorkflowExecution:
         self.error = None
         self.checkpoint_history: List[Dict[str, Any]] = []
         self.checkpoint_interval_seconds = 30  # Save state every 30 seconds
+        self.full_checkpoint_interval = 10  # Every tenth checkpoint records the full state
+        self.max_checkpoint_history = 10
+        self.checkpoint_sequence = -1
         self.last_checkpoint_time = time.time()
         
+        # Encodings as of the last checkpoint, and activities changed since
+        self._context_encodings: Dict[str, str] = {}
+        self._activity_encodings: Dict[str, str] = {}
+        self._changed_activities: Set[int] = set()
+        
+        # Encoded state before the oldest checkpoint in checkpoint_history
+        self._checkpoint_base: Optional[Dict[str, Any]] = None
+        
+    @property
+    def context(self) -> ChangeTrackingDict:
+        """
+        Workflow context.
+        
+        Writes to the context are tracked for checkpoints. A value modified
+        in place must be marked with mark_context_changed or assigned again.
+        """
+        return self._context
+        
+    @context.setter
+    def context(self, context: Dict[str, Any]):
+        removed = self._context.removed | (set(self._context) - set(context))
+        self._context = ChangeTrackingDict(context)
+        self._context.removed = removed - set(self._context)
+        
+    def mark_context_changed(self, key: str):
+        """
+        Record that a context value was modified in place.
+        
+        Args:
+            key: Context key
+        """
+        self._context.mark_changed(key)
+        
+    def mark_activity_changed(self, activity_index: int):
+        """
+        Record that an activity was modified in place.
+        
+        Args:
+            activity_index: Index of the activity
+        """
+        if 0 <= activity_index < len(self.activities):
+            self._changed_activities.add(activity_index)
+        
     def update_status(self, status: str):
         """
         Update the status of the workflow execution.
@@ -139,6 +224,7 @@ class WorkflowExecution:
             
         # Add the activity
         self.activities.append(activity)
+        self._changed_activities.add(len(self.activities) - 1)
         self.updated_at = datetime.datetime.now().isoformat()
         
     def set_error(self, error_message: str, error_code: str = "WORKFLOW_ERROR", details: Dict[str, Any] = None):
@@ -159,30 +245,82 @@ class WorkflowExecution:
         
         self.update_status(WorkflowExecutionStatus.FAILED)
         
-    def checkpoint(self):
+    def checkpoint(self) -> Dict[str, Any]:
         """
         Create a checkpoint of the current workflow state.
         
-        This method saves the current state of the workflow to the checkpoint history,
-        enabling recovery in case of failures.
+        The checkpoint records only the context values and activities that
+        were written since the previous one; every full_checkpoint_interval
+        checkpoints the full state is recorded instead. Unchanged values are
+        neither copied nor encoded again.
+        
+        Returns:
+            Checkpoint record, suitable for a CheckpointStore
+            
+        Raises:
+            TypeError: If a changed value cannot be encoded
         """
-        # Create a deep copy of the current state
-        state = {
+        # Encode before updating any state, so a value that cannot be
+        # encoded leaves the previous checkpoint intact
+        context = {}
+        for key in self._context.changed:
+            encoded = encode_value(self._context[key])
+            if self._context_encodings.get(key) != encoded:
+                context[key] = encoded
+        activities = {}
+        for index in self._changed_activities:
+            encoded = encode_value(self.activities[index])
+            if self._activity_encodings.get(str(index)) != encoded:
+                activities[str(index)] = encoded
+                
+        removed = [key for key in self._context.removed if key in self._context_encodings]
+        for key in removed:
+            del self._context_encodings[key]
+        self._context_encodings.update(context)
+        self._activity_encodings.update(activities)
+        self._context.changed.clear()
+        self._context.removed.clear()
+        self._changed_activities.clear()
+        
+        self.checkpoint_sequence += 1
+        full = self.checkpoint_sequence % self.full_checkpoint_interval == 0
+        if full:
+            context = dict(self._context_encodings)
+            activities = dict(self._activity_encodings)
+            removed = []
+            
+        record = {
             "workflow_id": self.workflow_id,
-            "status": self.status,
-            "current_activity_index": self.current_activity_index,
-            "context": copy.deepcopy(self.context),
-            "timestamp": datetime.datetime.now().isoformat()
+            "workflow_type": self.workflow_type,
+            "sequence": self.checkpoint_sequence,
+            "full": full,
+            "timestamp": datetime.datetime.now().isoformat(),
+            "state": encode_value({
+                "status": self.status,
+                "current_activity_index": self.current_activity_index,
+                "metadata": self.metadata,
+                "created_at": self.created_at,
+                "updated_at": self.updated_at,
+                "completed_at": self.completed_at,
+                "error": self.error
+            }),
+            "context": context,
+            "removed": removed,
+            "activities": activities,
+            "activity_count": len(self.activities)
         }
         
         # Add to checkpoint history
-        self.checkpoint_history.append(state)
+        self.checkpoint_history.append(record)
         self.last_checkpoint_time = time.time()
         
-        # Keep only the last 10 checkpoints to save memory
-        if len(self.checkpoint_history) > 10:
-            self.checkpoint_history = self.checkpoint_history[-10:]
+        # Fold checkpoints beyond the history limit into the base state
+        if len(self.checkpoint_history) > self.max_checkpoint_history:
+            oldest = self.checkpoint_history.pop(0)
+            self._checkpoint_base = replay_checkpoints([oldest], self._checkpoint_base)
             
+        return record
+        
     def restore_checkpoint(self, checkpoint_index: int = -1) -> bool:
         """
         Restore the workflow state from a checkpoint.
@@ -200,17 +338,44 @@ class WorkflowExecution:
         if checkpoint_index < -len(self.checkpoint_history) or checkpoint_index >= len(self.checkpoint_history):
             return False
             
-        # Get the checkpoint
-        checkpoint = self.checkpoint_history[checkpoint_index]
+        # Replay checkpoints up to the requested one
+        position = checkpoint_index % len(self.checkpoint_history)
+        state = replay_checkpoints(self.checkpoint_history[:position + 1], self._checkpoint_base)
         
         # Restore state
-        self.status = checkpoint["status"]
-        self.current_activity_index = checkpoint["current_activity_index"]
-        self.context = copy.deepcopy(checkpoint["context"])
+        fields = self._restore_encoded_state(state)
+        self.status = fields["status"]
+        self.current_activity_index = fields["current_activity_index"]
         self.updated_at = datetime.datetime.now().isoformat()
         
         return True
         
+    def _restore_encoded_state(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Restore the context and activities from an encoded state.
+        
+        Args:
+            state: Encoded state from replay_checkpoints
+            
+        Returns:
+            Decoded state fields
+        """
+        self._context = ChangeTrackingDict(
+            (key, decode_value(encoded)) for key, encoded in state["context"].items()
+        )
+        self._context.changed.clear()
+        self._context_encodings = dict(state["context"])
+        
+        self.activities = [
+            decode_value(state["activities"][str(index)]) for index in range(state["activity_count"])
+        ]
+        self._activity_encodings = {
+            str(index): state["activities"][str(index)] for index in range(state["activity_count"])
+        }
+        self._changed_activities = set()
+            
+        return decode_value(state["state"])
+        
     def set_activity_status(self, activity_index: int, status: str, result: Dict[str, Any] = None, error: Dict[str, Any] = None):
         """
         Update the status of an activity.
@@ -235,6 +400,8 @@ class WorkflowExecution:
         if error is not None:
             activity["error"] = error
             
+        self._changed_activities.add(activity_index)
+            
         # Update workflow timestamp
         self.updated_at = datetime.datetime.now().isoformat()
         
@@ -297,6 +464,37 @@ class WorkflowExecution:
         workflow.error = data.get("error")
         
         return workflow
+        
+    @classmethod
+    def from_checkpoints(cls, records: List[Dict[str, Any]]) -> Optional['WorkflowExecution']:
+        """
+        Rebuild a workflow execution from its stored checkpoints.
+        
+        Args:
+            records: Checkpoint records in sequence order, starting with a full one
+            
+        Returns:
+            WorkflowExecution as of the last record, or None if there are no records
+        """
+        state = replay_checkpoints(records)
+        if state is None:
+            return None
+            
+        workflow = cls(workflow_type=state["workflow_type"], workflow_id=state["workflow_id"])
+        fields = workflow._restore_encoded_state(state)
+        
+        workflow.status = fields["status"]
+        workflow.current_activity_index = fields["current_activity_index"]
+        workflow.metadata = fields.get("metadata") or {}
+        workflow.created_at = fields.get("created_at", workflow.created_at)
+        workflow.updated_at = fields.get("updated_at", workflow.updated_at)
+        workflow.completed_at = fields.get("completed_at")
+        workflow.error = fields.get("error")
+        
+        # Later checkpoints continue the stored sequence
+        workflow.checkpoint_sequence = state["sequence"]
+        
+        return workflow
 
 
 class ActivityExecutionContext:
@@ -380,7 +578,7 @@ class ActivityExecutionContext:
             # Send the message to the agent
             message = create_message(
                 message_type=message_type,
-                sender="workflow_engine",
+                sender=ENGINE_AGENT_ID,
                 recipient=agent_id,
                 body=body,
                 flow_id=self.workflow_execution.workflow_id,
@@ -519,8 +717,20 @@ class WorkflowEngine:
     their state, and handling errors and recovery.
     """
     
-    def __init__(self):
-        """Initialize the workflow engine."""
+    def __init__(
+        self,
+        checkpoint_store: Optional[CheckpointStore] = None,
+        result_cache: Optional[WorkflowResultCache] = None,
+        lock_shards: int = 64
+    ):
+        """
+        Initialize the workflow engine.
+        
+        Args:
+            checkpoint_store: Store for workflow checkpoints; see create_checkpoint_store
+            result_cache: Cache of workflow results; only configured workflow types are cached
+            lock_shards: Number of locks workflow state changes are spread across
+        """
         self.workflow_registry = get_workflow_registry()
         self.message_bus = get_message_bus()
         self.agent_registry = get_agent_registry()
@@ -542,11 +752,32 @@ class WorkflowEngine:
         # Default activity timeout (seconds)
         self.default_activity_timeout = 60.0
         
+        # Seconds finished workflows are kept before they are evicted
+        self.completed_workflow_ttl = 24 * 3600.0
+        
+        # Response timeouts and finished-workflow eviction, each on a single timer
+        self.response_deadlines = DeadlineScheduler("response timeout")
+        self.workflow_expirations = DeadlineScheduler("workflow eviction")
+        
+        # Default maximum activities of one workflow executing at once
+        self.max_concurrent_activities = 4
+        
+        # Durable checkpoints, used to resume workflows after a restart
+        self.checkpoint_store = checkpoint_store or create_checkpoint_store()
+        
+        # Durable store I/O runs on one thread, off the event loop and in order
+        self._checkpoint_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="checkpoint-writer")
+        
+        # Outputs of earlier workflows, reused for identical requests
+        self.result_cache = result_cache or get_workflow_result_cache()
+        
         # Initialize metrics
         self._setup_metrics()
         
-        self.workflows = {}
-        self._lock = asyncio.Lock()
+        # Operations on one workflow serialize on a lock chosen by its ID,
+        # so unrelated workflows do not contend for a single lock
+        self._workflow_locks = [asyncio.Lock() for _ in range(max(1, lock_shards))]
+        self._started = False
         
         # Will store the event loop once we're in an async context
         self.loop = None
@@ -555,52 +786,32 @@ class WorkflowEngine:
         
     async def start(self):
         """Start the workflow engine."""
+        if self._started:
+            return
+        self._started = True
         logger.info("Starting workflow engine")
         
         # Connect to the message bus if not already connected
         if not self.message_bus.connection:
             await self.message_bus.connect()
             
-        # Setup listener for response messages
-        await self.message_bus.add_message_listener(
-            MessageType.COMPUTATION_RESULT,
-            self._handle_response
-        )
-        
-        await self.message_bus.add_message_listener(
-            MessageType.VISUALIZATION_RESULT,
-            self._handle_response
-        )
-        
-        await self.message_bus.add_message_listener(
-            MessageType.OCR_RESULT,
-            self._handle_response
-        )
-        
-        await self.message_bus.add_message_listener(
-            MessageType.SEARCH_RESULT,
-            self._handle_response
-        )
+        # Agents reply to the sender of a request, so consume the engine's own queue
+        await self.message_bus.declare_queue(ENGINE_QUEUE, durable=True)
+        await self.message_bus.bind_queue(ENGINE_QUEUE, f"agent.{ENGINE_AGENT_ID}")
+        await self.message_bus.setup_consumer(ENGINE_QUEUE, self._handle_message)
         
-        await self.message_bus.add_message_listener(
-            MessageType.QUERY_RESPONSE,
-            self._handle_response
-        )
-        
-        await self.message_bus.add_message_listener(
-            MessageType.ERROR,
-            self._handle_response
-        )
+        # Pick up workflows interrupted by a restart
+        await self.recover_workflows()
         
         # Start background tasks
         self._checkpoint_task = asyncio.create_task(self._checkpoint_workflows_periodically())
-        self._cleanup_task = asyncio.create_task(self._cleanup_workflows_periodically())
         
         logger.info("Workflow engine started")
         
     async def stop(self):
         """Stop the workflow engine."""
         logger.info("Stopping workflow engine")
+        self._started = False
         
         # Cancel background tasks
         if hasattr(self, '_checkpoint_task'):
@@ -610,19 +821,16 @@ class WorkflowEngine:
             except asyncio.CancelledError:
                 pass
                 
-        if hasattr(self, '_cleanup_task'):
-            self._cleanup_task.cancel()
-            try:
-                await self._cleanup_task
-            except asyncio.CancelledError:
-                pass
-                
-        # Cancel all active workflow executions
-        for workflow_id, workflow in list(self.active_workflows.items()):
-            await self.cancel_workflow(workflow_id)
+        # Cancel all active workflow executions, unless they can be resumed on restart
+        if not self.checkpoint_store.durable:
+            for workflow_id, workflow in list(self.active_workflows.items()):
+                await self.cancel_workflow(workflow_id)
             
-        # Clear futures
-        for future in self.response_futures.values():
+        # Clear futures and pending deadlines
+        self.response_deadlines.close()
+        self.workflow_expirations.close()
+        
+        for future in list(self.response_futures.values()):
             if not future.done():
                 future.cancel()
                 
@@ -640,6 +848,7 @@ class WorkflowEngine:
         registry.counter("workflow.executions.total", "Total number of workflow executions")
         registry.counter("workflow.executions.completed", "Number of completed workflows")
         registry.counter("workflow.executions.failed", "Number of failed workflows")
+        registry.counter("workflow.executions.cached", "Number of workflows completed from the result cache")
         registry.gauge("workflow.executions.active", "Number of active workflows")
         
         # Activity metrics
@@ -701,13 +910,22 @@ class WorkflowEngine:
         # Register the workflow
         self.active_workflows[workflow.workflow_id] = workflow
         
-        # Start the workflow execution in a task to avoid blocking
-        self.loop.create_task(self._execute_workflow(workflow))
-        
         # Record metrics
         self.metrics.counter("workflow.executions.total").increment()
         self.metrics.gauge("workflow.executions.active").set(len(self.active_workflows))
         
+        # Complete at once if an identical workflow's result is cached
+        cache_key = self.result_cache.make_key(workflow_type, workflow.context)
+        if cache_key is not None:
+            workflow.metadata["result_cache_key"] = cache_key
+            cached_outputs = self.result_cache.lookup(cache_key)
+            if cached_outputs is not None:
+                await self._complete_from_cache(workflow, cached_outputs)
+                return workflow.workflow_id, workflow if wait_for_completion else None
+        
+        # Start the workflow execution in a task to avoid blocking
+        self.loop.create_task(self._execute_workflow(workflow))
+        
         if wait_for_completion:
             # Wait for workflow completion
             completion_future = self.loop.create_future()
@@ -726,6 +944,29 @@ class WorkflowEngine:
                 
         return workflow.workflow_id, None
         
+    async def _complete_from_cache(self, workflow: WorkflowExecution, outputs: Dict[str, Any]):
+        """
+        Complete a workflow with the cached outputs of an identical one.
+        
+        Args:
+            workflow: Workflow execution
+            outputs: Cached final context
+        """
+        # The request's own inputs take precedence over the cached ones
+        workflow.context = {**outputs, **workflow.context}
+        workflow.metadata["cache_hit"] = True
+        
+        workflow.update_status(WorkflowExecutionStatus.RUNNING)
+        await self._emit_workflow_event(workflow.workflow_id, "workflow_started", workflow)
+        
+        workflow.update_status(WorkflowExecutionStatus.COMPLETED)
+        await self._emit_workflow_event(workflow.workflow_id, "workflow_completed", workflow)
+        
+        # Record completion metrics
+        self.metrics.counter("workflow.executions.completed").increment()
+        self.metrics.counter("workflow.executions.cached").increment()
+        self.metrics.histogram("workflow.execution.duration").observe(0)
+        
     async def _execute_workflow(self, workflow: WorkflowExecution):
         """
         Execute a workflow.
@@ -752,7 +993,7 @@ class WorkflowEngine:
         # Get the workflow definition
         workflow_def = self.workflow_registry.get_workflow(workflow.workflow_type)
         if not workflow_def:
-            workflow.set_error(f"Workflow type not found: {workflow.workflow_type}")
+            await self._fail_workflow(workflow, f"Workflow type not found: {workflow.workflow_type}")
             return
             
         # Create a trace span for the workflow
@@ -790,195 +1031,300 @@ class WorkflowEngine:
                 logger.error(f"Error executing workflow {workflow.workflow_id}: {str(e)}")
                 traceback.print_exc()
                 
-                # Set workflow error
-                workflow.set_error(
-                    error_message=f"Error executing workflow: {str(e)}",
+                await self._fail_workflow(
+                    workflow,
+                    f"Error executing workflow: {str(e)}",
                     error_code="WORKFLOW_ERROR",
                     details={"exception": traceback.format_exc()}
                 )
                 
-                # Emit workflow failed event
-                await self._emit_workflow_event(workflow.workflow_id, "workflow_failed", workflow)
-                
-                # Complete the future if one exists
-                if workflow.workflow_id in self.completion_futures:
-                    future = self.completion_futures[workflow.workflow_id]
-                    if not future.done():
-                        future.set_result(workflow)
-                        
-                # Record failure metrics
-                self.metrics.counter("workflow.executions.failed").increment()
+    @staticmethod
+    def _activity_inputs(activity: Dict[str, Any]) -> Optional[Set[str]]:
+        """Context keys an activity reads, or None if it does not declare them."""
+        if "input_keys" in activity:
+            return set(activity["input_keys"])
+        if "context_keys" in activity:
+            return set(activity["context_keys"])
+        return None
+        
+    @staticmethod
+    def _is_resolved(activity: Dict[str, Any]) -> bool:
+        """Whether an activity no longer blocks the ones after it."""
+        return activity.get("status") == ActivityStatus.COMPLETED or activity.get("fallback_used", False)
+        
+    @staticmethod
+    def _used_recovery(workflow: WorkflowExecution) -> bool:
+        """Whether a workflow completed only by recovering from a failure."""
+        return "recovery" in workflow.context or any(
+            activity.get("fallback_used", False) for activity in workflow.activities
+        )
+        
+    def _ready_activities(self, workflow: WorkflowExecution, running: Set[int]) -> List[int]:
+        """
+        Find activities whose dependencies are resolved.
+        
+        An activity depends on an earlier unresolved activity if it reads a
+        key the earlier one writes. Activities that do not declare their
+        output keys may write anything, so everything after them waits, and
+        activities that do not declare inputs wait for everything before
+        them; undeclared workflows therefore still run one step at a time.
+        
+        Args:
+            workflow: Workflow execution
+            running: Indices of activities currently executing
+            
+        Returns:
+            Indices of activities that can start now, in order
+        """
+        ready = []
+        unresolved: List[Dict[str, Any]] = []
+        for index, activity in enumerate(workflow.activities):
+            if self._is_resolved(activity):
+                continue
                 
+            inputs = self._activity_inputs(activity)
+            blocked = any(
+                inputs is None
+                or "output_keys" not in earlier
+                or inputs & set(earlier["output_keys"])
+                for earlier in unresolved
+            )
+            if not blocked and index not in running:
+                ready.append(index)
+            unresolved.append(activity)
+            
+        return ready
+        
+    def _max_concurrency(self, workflow: WorkflowExecution, workflow_def: WorkflowDefinition) -> int:
+        """Maximum activities of one workflow executing at once."""
+        limit = workflow.metadata.get("max_concurrency") or getattr(workflow_def, "max_concurrency", None)
+        return max(1, limit or self.max_concurrent_activities)
+        
     async def _continue_workflow(self, workflow: WorkflowExecution, workflow_def: WorkflowDefinition):
         """
         Continue executing a workflow.
         
+        Every activity whose inputs are available is dispatched at once, up
+        to the workflow's concurrency limit, and results merge into the
+        context as each one completes.
+        
         Args:
             workflow: Workflow execution to continue
             workflow_def: Workflow definition
         """
-        # Check if the workflow is already completed
-        if workflow.status in [
+        terminal_statuses = [
             WorkflowExecutionStatus.COMPLETED,
             WorkflowExecutionStatus.FAILED,
             WorkflowExecutionStatus.CANCELED,
             WorkflowExecutionStatus.TIMED_OUT
-        ]:
+        ]
+        max_concurrency = self._max_concurrency(workflow, workflow_def)
+        running: Dict[asyncio.Task, int] = {}
+        
+        try:
+            while True:
+                # Stop dispatching once the workflow is finished or paused
+                stopped = workflow.status in terminal_statuses or workflow.status == WorkflowExecutionStatus.PAUSED
+                
+                if not stopped:
+                    for activity_index in self._ready_activities(workflow, set(running.values())):
+                        if len(running) >= max_concurrency:
+                            break
+                        task = asyncio.ensure_future(self._execute_activity(workflow, activity_index))
+                        running[task] = activity_index
+                        workflow.current_activity_index = max(workflow.current_activity_index, activity_index)
+                        
+                if not running:
+                    break
+                    
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    activity_index = running.pop(task)
+                    success, result = task.result()
+                    if not success:
+                        await self._handle_activity_failure(workflow, activity_index, result)
+                        
+                # A failure that ended the workflow abandons the running siblings
+                if workflow.status in terminal_statuses:
+                    break
+                        
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+                
+        if workflow.status in terminal_statuses or workflow.status == WorkflowExecutionStatus.PAUSED:
             return
             
-        # Check if we need to execute more activities
-        if workflow.current_activity_index < len(workflow.activities) - 1:
-            # Move to the next activity
-            workflow.current_activity_index += 1
-            activity_index = workflow.current_activity_index
+        # All current activities are resolved, get next steps
+        await self._get_next_steps(workflow, workflow_def)
+        
+    async def _execute_activity(self, workflow: WorkflowExecution, activity_index: int) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Execute one activity and record its metrics and events.
+        
+        Args:
+            workflow: Workflow execution
+            activity_index: Index of the activity
             
-            # Execute the current activity
-            if activity_index < len(workflow.activities):
-                activity = workflow.activities[activity_index]
-                
-                # Check if the activity is already completed
-                if activity.get("status") == ActivityStatus.COMPLETED:
-                    # Skip this activity and continue
-                    await self._continue_workflow(workflow, workflow_def)
-                    return
-                    
-                # Execute the activity
-                activity_context = ActivityExecutionContext(
-                    workflow_execution=workflow,
-                    activity_index=activity_index,
-                    activity=activity,
-                    engine=self
-                )
+        Returns:
+            Tuple of (success, result)
+        """
+        activity = workflow.activities[activity_index]
+        activity_context = ActivityExecutionContext(
+            workflow_execution=workflow,
+            activity_index=activity_index,
+            activity=activity,
+            engine=self
+        )
+        
+        # Record activity metrics
+        self.metrics.counter("workflow.activities.total").increment()
+        
+        # Execute the activity with timeout
+        start_time = time.time()
+        activity_id = activity.get("id", "unknown")
+        
+        with self.tracer.span(
+            f"workflow_activity.{activity.get('name', 'unknown')}",
+            trace_id=workflow.workflow_id,
+            metadata={"activity_id": activity_id}
+        ):
+            success, result = await activity_context.execute()
+            
+        # Calculate activity duration
+        duration_ms = (time.time() - start_time) * 1000
+        self.metrics.histogram("workflow.activities.duration").observe(duration_ms)
+        
+        # Update metrics based on success
+        if success:
+            self.metrics.counter("workflow.activities.completed").increment()
+        else:
+            self.metrics.counter("workflow.activities.failed").increment()
+            
+        # Emit activity completed event
+        await self._emit_workflow_event(
+            workflow.workflow_id,
+            "activity_completed" if success else "activity_failed",
+            {
+                "workflow": workflow,
+                "activity_index": activity_index,
+                "activity": activity,
+                "success": success,
+                "result": result
+            }
+        )
+        
+        # Checkpoint the activity's changes
+        self._checkpoint(workflow)
+            
+        return success, result
+        
+    async def _handle_activity_failure(self, workflow: WorkflowExecution, activity_index: int, result: Dict[str, Any]):
+        """
+        Retry a failed activity, fall back past it, or fail the workflow.
+        
+        Args:
+            workflow: Workflow execution
+            activity_index: Index of the failed activity
+            result: Result returned by the activity
+        """
+        activity = workflow.activities[activity_index]
+        activity_id = activity.get("id", "unknown")
+        
+        # Check if this activity has recovery options
+        recovery_options = activity.get("recovery_options", {})
+        
+        if recovery_options:
+            # Check if retries are available
+            max_retries = recovery_options.get("max_retries", 0)
+            current_attempts = activity.get("attempts", 0) + 1
+            activity["attempts"] = current_attempts
+            workflow.mark_activity_changed(activity_index)
+            
+            if current_attempts <= max_retries:
+                # Retry the activity
+                logger.info(f"Retrying activity {activity_id} (attempt {current_attempts}/{max_retries})")
                 
-                # Record activity metrics
-                self.metrics.counter("workflow.activities.total").increment()
+                # Reset activity status so it is dispatched again
+                workflow.set_activity_status(activity_index, ActivityStatus.PENDING)
+                return
                 
-                # Execute the activity with timeout
-                start_time = time.time()
-                activity_id = activity.get("id", "unknown")
+            # Check for fallback
+            fallback = recovery_options.get("fallback")
+            
+            if fallback:
+                logger.info(f"Using fallback {fallback} for failed activity {activity_id}")
                 
-                with self.tracer.span(
-                    f"workflow_activity.{activity.get('name', 'unknown')}",
-                    trace_id=workflow.workflow_id,
-                    metadata={"activity_id": activity_id}
-                ):
-                    success, result = await activity_context.execute()
+                # Record fallback in context
+                if "recovery" not in workflow.context:
+                    workflow.context["recovery"] = {
+                        "fallbacks": {},
+                        "errors": []
+                    }
                     
-                # Calculate activity duration
-                duration_ms = (time.time() - start_time) * 1000
-                self.metrics.histogram("workflow.activities.duration").observe(duration_ms)
+                workflow.context["recovery"]["fallbacks"] = {
+                    **workflow.context["recovery"].get("fallbacks", {}),
+                    activity.get("name", "unknown"): fallback
+                }
                 
-                # Update metrics based on success
-                if success:
-                    self.metrics.counter("workflow.activities.completed").increment()
-                else:
-                    self.metrics.counter("workflow.activities.failed").increment()
-                    
-                # Emit activity completed event
-                await self._emit_workflow_event(
-                    workflow.workflow_id,
-                    "activity_completed" if success else "activity_failed",
+                workflow.context["recovery"]["errors"] = [
+                    *workflow.context["recovery"].get("errors", []),
                     {
-                        "workflow": workflow,
-                        "activity_index": activity_index,
-                        "activity": activity,
-                        "success": success,
-                        "result": result
+                        "activity": activity.get("name", "unknown"),
+                        "error": result.get("error", {"message": "Unknown error"}),
+                        "fallback": fallback,
+                        "timestamp": datetime.datetime.now().isoformat()
                     }
-                )
+                ]
+                workflow.mark_context_changed("recovery")
                 
-                # Check if we should create a checkpoint
-                if workflow.should_checkpoint():
-                    workflow.checkpoint()
-                    
-                # Check for activity failure
-                if not success:
-                    # Check if this activity has recovery options
-                    recovery_options = activity.get("recovery_options", {})
-                    
-                    if recovery_options:
-                        # Check if retries are available
-                        max_retries = recovery_options.get("max_retries", 0)
-                        current_attempts = activity.get("attempts", 0) + 1
-                        activity["attempts"] = current_attempts
-                        
-                        if current_attempts <= max_retries:
-                            # Retry the activity
-                            logger.info(f"Retrying activity {activity_id} (attempt {current_attempts}/{max_retries})")
-                            
-                            # Reset activity status
-                            workflow.set_activity_status(activity_index, ActivityStatus.PENDING)
-                            
-                            # Stay on the same activity index for retry
-                            workflow.current_activity_index -= 1
-                            
-                            # Continue workflow (will retry this activity)
-                            await self._continue_workflow(workflow, workflow_def)
-                            return
-                            
-                        # Check for fallback
-                        fallback = recovery_options.get("fallback")
-                        
-                        if fallback:
-                            logger.info(f"Using fallback {fallback} for failed activity {activity_id}")
-                            
-                            # Record fallback in context
-                            if "recovery" not in workflow.context:
-                                workflow.context["recovery"] = {
-                                    "fallbacks": {},
-                                    "errors": []
-                                }
-                                
-                            workflow.context["recovery"]["fallbacks"] = {
-                                **workflow.context["recovery"].get("fallbacks", {}),
-                                activity.get("name", "unknown"): fallback
-                            }
-                            
-                            workflow.context["recovery"]["errors"] = [
-                                *workflow.context["recovery"].get("errors", []),
-                                {
-                                    "activity": activity.get("name", "unknown"),
-                                    "error": result.get("error", {"message": "Unknown error"}),
-                                    "fallback": fallback,
-                                    "timestamp": datetime.datetime.now().isoformat()
-                                }
-                            ]
-                            
-                            # Continue workflow (will get new steps)
-                            await self._get_next_steps(workflow, workflow_def)
-                            return
-                            
-                    # No recovery options or all exhausted
-                    logger.error(f"Activity {activity_id} failed with no recovery options")
-                    
-                    # Set workflow as failed
-                    workflow.set_error(
-                        error_message=f"Activity failed: {result.get('error', {}).get('message', 'Unknown error')}",
-                        error_code="ACTIVITY_FAILED",
-                        details=result.get("error")
-                    )
-                    
-                    # Emit workflow failed event
-                    await self._emit_workflow_event(workflow.workflow_id, "workflow_failed", workflow)
-                    
-                    # Complete the future if one exists
-                    if workflow.workflow_id in self.completion_futures:
-                        future = self.completion_futures[workflow.workflow_id]
-                        if not future.done():
-                            future.set_result(workflow)
-                            
-                    # Record failure metrics
-                    self.metrics.counter("workflow.executions.failed").increment()
-                    
-                    return
-                    
-                # Continue workflow execution
-                await self._continue_workflow(workflow, workflow_def)
+                # Activities waiting on this one may proceed
+                activity["fallback_used"] = True
+                workflow.mark_activity_changed(activity_index)
+                return
                 
-        else:
-            # All current activities are completed, get next steps
-            await self._get_next_steps(workflow, workflow_def)
+        # No recovery options or all exhausted
+        logger.error(f"Activity {activity_id} failed with no recovery options")
+        
+        await self._fail_workflow(
+            workflow,
+            f"Activity failed: {result.get('error', {}).get('message', 'Unknown error')}",
+            error_code="ACTIVITY_FAILED",
+            details=result.get("error")
+        )
             
+    async def _fail_workflow(
+        self,
+        workflow: WorkflowExecution,
+        error_message: str,
+        error_code: str = "WORKFLOW_ERROR",
+        details: Dict[str, Any] = None
+    ):
+        """
+        Fail a workflow, notify its waiters and schedule its eviction.
+        
+        Args:
+            workflow: Workflow execution
+            error_message: Error message
+            error_code: Error code
+            details: Additional error details
+        """
+        workflow.set_error(error_message=error_message, error_code=error_code, details=details)
+        
+        # Emit workflow failed event
+        await self._emit_workflow_event(workflow.workflow_id, "workflow_failed", workflow)
+        
+        # Complete the future if one exists
+        if workflow.workflow_id in self.completion_futures:
+            future = self.completion_futures[workflow.workflow_id]
+            if not future.done():
+                future.set_result(workflow)
+                
+        # Record failure metrics
+        self.metrics.counter("workflow.executions.failed").increment()
+        
     async def _get_next_steps(self, workflow: WorkflowExecution, workflow_def: WorkflowDefinition):
         """
         Get the next steps for a workflow.
@@ -1000,11 +1346,28 @@ class WorkflowEngine:
                     }
                     completed_steps.append(step)
                     
-            next_steps = await workflow_def.determine_next_steps(workflow.context, completed_steps)
-            
+            # Hold the workflow's lock so it cannot be paused or canceled mid-transition
+            async with self._workflow_lock(workflow.workflow_id):
+                next_steps = await workflow_def.determine_next_steps(workflow.context, completed_steps)
+                
+                if workflow.status != WorkflowExecutionStatus.RUNNING:
+                    # Paused or canceled while the next steps were determined
+                    return
+                    
+                if not next_steps:
+                    # No more steps, workflow is complete
+                    workflow.update_status(WorkflowExecutionStatus.COMPLETED)
+                else:
+                    # Add the new steps as activities
+                    for step in next_steps:
+                        workflow.add_activity(step)
+                        
             if not next_steps:
-                # No more steps, workflow is complete
-                workflow.update_status(WorkflowExecutionStatus.COMPLETED)
+                # Remember the outputs for identical requests, unless a
+                # recovered failure degraded them
+                cache_key = workflow.metadata.get("result_cache_key")
+                if cache_key and not self._used_recovery(workflow):
+                    self.result_cache.store(cache_key, workflow.workflow_type, workflow.context)
                 
                 # Emit workflow completed event
                 await self._emit_workflow_event(workflow.workflow_id, "workflow_completed", workflow)
@@ -1021,10 +1384,6 @@ class WorkflowEngine:
                 
                 return
                 
-            # Add the new steps as activities
-            for step in next_steps:
-                workflow.add_activity(step)
-                
             # Continue workflow execution
             await self._continue_workflow(workflow, workflow_def)
             
@@ -1032,24 +1391,26 @@ class WorkflowEngine:
             logger.error(f"Error determining next steps for workflow {workflow.workflow_id}: {str(e)}")
             traceback.print_exc()
             
-            # Set workflow error
-            workflow.set_error(
-                error_message=f"Error determining next steps: {str(e)}",
+            await self._fail_workflow(
+                workflow,
+                f"Error determining next steps: {str(e)}",
                 error_code="NEXT_STEPS_ERROR",
                 details={"exception": traceback.format_exc()}
             )
             
-            # Emit workflow failed event
-            await self._emit_workflow_event(workflow.workflow_id, "workflow_failed", workflow)
-            
-            # Complete the future if one exists
-            if workflow.workflow_id in self.completion_futures:
-                future = self.completion_futures[workflow.workflow_id]
-                if not future.done():
-                    future.set_result(workflow)
-                    
-            # Record failure metrics
-            self.metrics.counter("workflow.executions.failed").increment()
+    def _workflow_lock(self, workflow_id: str) -> asyncio.Lock:
+        """Get the lock serializing state changes of a workflow."""
+        return self._workflow_locks[hash(workflow_id) % len(self._workflow_locks)]
+        
+    async def _handle_message(self, message: Message):
+        """
+        Handle a message delivered to the engine's queue.
+        
+        Args:
+            message: Incoming message
+        """
+        if message.header.message_type in RESPONSE_MESSAGE_TYPES:
+            await self._handle_response(message)
             
     async def _handle_response(self, message: Message):
         """
@@ -1073,8 +1434,8 @@ class WorkflowEngine:
                 if not future.done():
                     future.set_result(message)
                     
-                # Remove the future
-                del self.response_futures[correlation_id]
+                # Remove the future and its timeout
+                self._release_response_future(correlation_id, future)
                 
         else:
             # Not a workflow-related message, ignore
@@ -1090,27 +1451,28 @@ class WorkflowEngine:
         """
         self.response_futures[correlation_id] = future
         
-        # Set up a timeout for the future
-        asyncio.create_task(self._timeout_future(correlation_id, future, self.default_activity_timeout))
+        # Time out the future unless a response arrives first
+        self.response_deadlines.schedule(correlation_id, self.default_activity_timeout, self._expire_response)
+        future.add_done_callback(lambda _: self._release_response_future(correlation_id, future))
         
-    async def _timeout_future(self, correlation_id: str, future: asyncio.Future, timeout: float):
+    def _release_response_future(self, correlation_id: str, future: asyncio.Future):
+        """Forget a resolved response future and its deadline."""
+        if self.response_futures.get(correlation_id) is future:
+            del self.response_futures[correlation_id]
+            self.response_deadlines.cancel(correlation_id)
+            
+    def _expire_response(self, correlation_id: str):
         """
-        Time out a future after a specified duration.
+        Time out the response future for a correlation ID.
         
         Args:
             correlation_id: Correlation ID for the message
-            future: Future to time out
-            timeout: Timeout in seconds
         """
-        try:
-            await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
-        except asyncio.TimeoutError:
-            # Future timed out
-            if correlation_id in self.response_futures and not future.done():
-                logger.warning(f"Response timed out for correlation ID {correlation_id}")
-                future.set_exception(asyncio.TimeoutError(f"Response timed out for {correlation_id}"))
-                del self.response_futures[correlation_id]
-                
+        future = self.response_futures.pop(correlation_id, None)
+        if future is not None and not future.done():
+            logger.warning(f"Response timed out for correlation ID {correlation_id}")
+            future.set_exception(asyncio.TimeoutError(f"Response timed out for {correlation_id}"))
+            
     async def get_workflow(self, workflow_id: str) -> Optional[WorkflowExecution]:
         """
         Get a workflow execution by ID.
@@ -1133,15 +1495,13 @@ class WorkflowEngine:
         Returns:
             True if paused successfully, False otherwise
         """
-        workflow = self.active_workflows.get(workflow_id)
-        if not workflow or workflow.status not in [WorkflowExecutionStatus.RUNNING, WorkflowExecutionStatus.WAITING]:
-            return False
-            
-        # Update status
-        workflow.update_status(WorkflowExecutionStatus.PAUSED)
-        
-        # Create a checkpoint
-        workflow.checkpoint()
+        async with self._workflow_lock(workflow_id):
+            workflow = self.active_workflows.get(workflow_id)
+            if not workflow or workflow.status not in [WorkflowExecutionStatus.RUNNING, WorkflowExecutionStatus.WAITING]:
+                return False
+                
+            # Update status
+            workflow.update_status(WorkflowExecutionStatus.PAUSED)
         
         # Emit workflow paused event
         await self._emit_workflow_event(workflow_id, "workflow_paused", workflow)
@@ -1162,12 +1522,13 @@ class WorkflowEngine:
         if self.loop is None:
             self.loop = asyncio.get_running_loop()
             
-        workflow = self.active_workflows.get(workflow_id)
-        if not workflow or workflow.status != WorkflowExecutionStatus.PAUSED:
-            return False
-            
-        # Update status
-        workflow.update_status(WorkflowExecutionStatus.RUNNING)
+        async with self._workflow_lock(workflow_id):
+            workflow = self.active_workflows.get(workflow_id)
+            if not workflow or workflow.status != WorkflowExecutionStatus.PAUSED:
+                return False
+                
+            # Update status
+            workflow.update_status(WorkflowExecutionStatus.RUNNING)
         
         # Emit workflow resumed event
         await self._emit_workflow_event(workflow_id, "workflow_resumed", workflow)
@@ -1175,7 +1536,7 @@ class WorkflowEngine:
         # Get the workflow definition
         workflow_def = self.workflow_registry.get_workflow(workflow.workflow_type)
         if not workflow_def:
-            workflow.set_error(f"Workflow type not found: {workflow.workflow_type}")
+            await self._fail_workflow(workflow, f"Workflow type not found: {workflow.workflow_type}")
             return False
             
         # Continue workflow execution
@@ -1193,20 +1554,18 @@ class WorkflowEngine:
         Returns:
             True if canceled successfully, False otherwise
         """
-        workflow = self.active_workflows.get(workflow_id)
-        if not workflow or workflow.status in [
-            WorkflowExecutionStatus.COMPLETED,
-            WorkflowExecutionStatus.FAILED,
-            WorkflowExecutionStatus.CANCELED,
-            WorkflowExecutionStatus.TIMED_OUT
-        ]:
-            return False
-            
-        # Update status
-        workflow.update_status(WorkflowExecutionStatus.CANCELED)
-        
-        # Create a checkpoint
-        workflow.checkpoint()
+        async with self._workflow_lock(workflow_id):
+            workflow = self.active_workflows.get(workflow_id)
+            if not workflow or workflow.status in [
+                WorkflowExecutionStatus.COMPLETED,
+                WorkflowExecutionStatus.FAILED,
+                WorkflowExecutionStatus.CANCELED,
+                WorkflowExecutionStatus.TIMED_OUT
+            ]:
+                return False
+                
+            # Update status
+            workflow.update_status(WorkflowExecutionStatus.CANCELED)
         
         # Emit workflow canceled event
         await self._emit_workflow_event(workflow_id, "workflow_canceled", workflow)
@@ -1223,60 +1582,84 @@ class WorkflowEngine:
         """Periodically checkpoint all active workflows."""
         while True:
             try:
-                # Create checkpoints for active workflows
-                for workflow_id, workflow in self.active_workflows.items():
-                    if workflow.status in [WorkflowExecutionStatus.RUNNING, WorkflowExecutionStatus.WAITING, WorkflowExecutionStatus.PAUSED]:
-                        if workflow.should_checkpoint():
-                            workflow.checkpoint()
-                            
+                self._sweep_workflows()
             except Exception as e:
                 logger.error(f"Error in workflow checkpoint task: {str(e)}")
                 
             # Wait before next checkpoint cycle
             await asyncio.sleep(30)  # Check every 30 seconds
             
-    async def _cleanup_workflows_periodically(self):
-        """Periodically clean up completed workflows."""
-        while True:
-            try:
-                # Find workflows to clean up
-                now = datetime.datetime.now()
-                workflows_to_remove = []
-                
-                for workflow_id, workflow in self.active_workflows.items():
-                    if workflow.status in [
-                        WorkflowExecutionStatus.COMPLETED,
-                        WorkflowExecutionStatus.FAILED,
-                        WorkflowExecutionStatus.CANCELED,
-                        WorkflowExecutionStatus.TIMED_OUT
-                    ]:
-                        if workflow.completed_at:
-                            # Calculate age in hours
-                            completed_time = datetime.datetime.fromisoformat(workflow.completed_at)
-                            age_hours = (now - completed_time).total_seconds() / 3600
-                            
-                            # Clean up workflows older than 24 hours
-                            if age_hours > 24:
-                                workflows_to_remove.append(workflow_id)
-                                
-                # Remove old workflows
-                for workflow_id in workflows_to_remove:
-                    logger.info(f"Cleaning up completed workflow {workflow_id}")
-                    del self.active_workflows[workflow_id]
-                    
-                    # Clean up futures
-                    if workflow_id in self.completion_futures:
-                        del self.completion_futures[workflow_id]
-                        
-                # Update active workflows gauge
-                self.metrics.gauge("workflow.executions.active").set(len(self.active_workflows))
-                
-            except Exception as e:
-                logger.error(f"Error in workflow cleanup task: {str(e)}")
+    def _sweep_workflows(self):
+        """Checkpoint running workflows that are due, and schedule finished ones for eviction."""
+        for workflow_id, workflow in list(self.active_workflows.items()):
+            if workflow.status in [WorkflowExecutionStatus.RUNNING, WorkflowExecutionStatus.WAITING, WorkflowExecutionStatus.PAUSED]:
+                if workflow.should_checkpoint():
+                    self._checkpoint(workflow)
+            elif workflow.completed_at and workflow_id not in self.workflow_expirations:
+                # Finished without a lifecycle event, e.g. timed out
+                self._checkpoint(workflow)
+                self._schedule_eviction(workflow)
                 
-            # Wait before next cleanup cycle
-            await asyncio.sleep(3600)  # Clean up once per hour
+    def _schedule_eviction(self, workflow: WorkflowExecution):
+        """
+        Schedule a finished workflow for eviction once its TTL has passed.
+        
+        Args:
+            workflow: Finished workflow execution
+        """
+        delay = self.completed_workflow_ttl
+        if workflow.completed_at:
+            completed_time = datetime.datetime.fromisoformat(workflow.completed_at)
+            delay -= (datetime.datetime.now() - completed_time).total_seconds()
+            
+        self.workflow_expirations.schedule(workflow.workflow_id, delay, self._evict_workflow)
+        
+    def _evict_workflow(self, workflow_id: str):
+        """
+        Remove a finished workflow and its checkpoints.
+        
+        Args:
+            workflow_id: Workflow ID
+        """
+        workflow = self.active_workflows.get(workflow_id)
+        if not workflow or workflow.status not in [
+            WorkflowExecutionStatus.COMPLETED,
+            WorkflowExecutionStatus.FAILED,
+            WorkflowExecutionStatus.CANCELED,
+            WorkflowExecutionStatus.TIMED_OUT
+        ]:
+            return
             
+        logger.info(f"Cleaning up completed workflow {workflow_id}")
+        del self.active_workflows[workflow_id]
+        self.completion_futures.pop(workflow_id, None)
+        
+        self._write_checkpoints(self.checkpoint_store.delete, workflow_id)
+            
+        # Update active workflows gauge
+        self.metrics.gauge("workflow.executions.active").set(len(self.active_workflows))
+        
+    def evict_finished_workflows(self, max_age_seconds: float) -> List[str]:
+        """
+        Evict finished workflows older than an age, ahead of their TTL.
+        
+        Args:
+            max_age_seconds: Minimum seconds since the workflow finished
+            
+        Returns:
+            IDs of the evicted workflows
+        """
+        now = datetime.datetime.now()
+        expired = [
+            workflow_id for workflow_id, workflow in self.active_workflows.items()
+            if workflow.completed_at and workflow_id in self.workflow_expirations
+            and (now - datetime.datetime.fromisoformat(workflow.completed_at)).total_seconds() > max_age_seconds
+        ]
+        for workflow_id in expired:
+            self.workflow_expirations.cancel(workflow_id)
+            self._evict_workflow(workflow_id)
+        return expired
+        
     def subscribe_to_workflow_events(self, workflow_id: str, callback: Callable):
         """
         Subscribe to events for a specific workflow.
@@ -1309,11 +1692,20 @@ class WorkflowEngine:
         """
         Emit an event for a workflow.
         
+        Workflow lifecycle events checkpoint the workflow first, so the
+        store always knows whether a workflow still needs to run, and
+        finished workflows are scheduled for eviction.
+        
         Args:
             workflow_id: Workflow ID
             event_type: Type of event
             data: Event data
         """
+        if event_type in CHECKPOINT_EVENTS and workflow_id in self.active_workflows:
+            self._checkpoint(self.active_workflows[workflow_id])
+            if event_type in TERMINAL_EVENTS:
+                self._schedule_eviction(self.active_workflows[workflow_id])
+            
         # Check if there are any subscribers
         if workflow_id in self.event_subscribers:
             # Create event data
@@ -1331,6 +1723,100 @@ class WorkflowEngine:
                 except Exception as e:
                     logger.error(f"Error in workflow event subscriber: {str(e)}")
                     
+    def _checkpoint(self, workflow: WorkflowExecution):
+        """
+        Checkpoint a workflow and persist the checkpoint.
+        
+        Args:
+            workflow: Workflow execution
+        """
+        try:
+            record = workflow.checkpoint()
+        except Exception as e:
+            logger.error(f"Error checkpointing workflow {workflow.workflow_id}: {str(e)}")
+            return
+            
+        self._write_checkpoints(self.checkpoint_store.save, record)
+        
+    def _write_checkpoints(self, operation: Callable[[Any], None], argument: Any):
+        """
+        Run a checkpoint store operation, on the writer thread if the store is durable.
+        
+        Args:
+            operation: Store method to call
+            argument: Argument to the method
+        """
+        def write():
+            try:
+                operation(argument)
+            except Exception as e:
+                logger.error(f"Error in checkpoint store {operation.__name__}: {str(e)}")
+                
+        if not self.checkpoint_store.durable:
+            write()
+            return
+            
+        try:
+            self._checkpoint_writer.submit(write)
+        except RuntimeError:
+            # The writer has shut down
+            write()
+            
+    async def flush_checkpoints(self):
+        """Wait until checkpoints written so far have reached the store."""
+        await asyncio.wrap_future(self._checkpoint_writer.submit(lambda: None))
+            
+    async def recover_workflows(self) -> List[str]:
+        """
+        Load checkpointed workflows and resume the ones that were running.
+        
+        Activities that were in flight when the process stopped are run
+        again. Paused workflows are loaded but stay paused, and finished
+        ones are loaded so they can still be queried.
+        
+        Returns:
+            IDs of the resumed workflows
+        """
+        if self.loop is None:
+            self.loop = asyncio.get_running_loop()
+            
+        resumed = []
+        for workflow_id in self.checkpoint_store.list_workflows():
+            if workflow_id in self.active_workflows:
+                continue
+                
+            try:
+                workflow = WorkflowExecution.from_checkpoints(self.checkpoint_store.load(workflow_id))
+            except Exception as e:
+                logger.error(f"Error loading checkpoints of workflow {workflow_id}: {str(e)}")
+                continue
+            if workflow is None:
+                continue
+                
+            self.active_workflows[workflow_id] = workflow
+            if workflow.status in [
+                WorkflowExecutionStatus.COMPLETED,
+                WorkflowExecutionStatus.FAILED,
+                WorkflowExecutionStatus.CANCELED,
+                WorkflowExecutionStatus.TIMED_OUT
+            ]:
+                self._schedule_eviction(workflow)
+                continue
+            if workflow.status == WorkflowExecutionStatus.PAUSED:
+                continue
+                
+            # Responses to in-flight activities went to the previous process
+            for index, activity in enumerate(workflow.activities):
+                if activity.get("status") == ActivityStatus.RUNNING:
+                    workflow.set_activity_status(index, ActivityStatus.PENDING)
+                    
+            logger.info(f"Resuming workflow {workflow_id} from checkpoint {workflow.checkpoint_sequence}")
+            self.loop.create_task(self._execute_workflow(workflow))
+            resumed.append(workflow_id)
+            
+        self.metrics.gauge("workflow.executions.active").set(len(self.active_workflows))
+        return resumed
+        
     def restore_workflow_from_checkpoint(self, workflow_id: str, checkpoint_index: int = -1) -> bool:
         """
         Restore a workflow from a checkpoint.
@@ -1358,12 +1844,14 @@ class WorkflowEngine:
         Returns:
             True if retry started successfully, False otherwise
         """
-        workflow = self.active_workflows.get(workflow_id)
-        if not workflow or workflow.status != WorkflowExecutionStatus.FAILED:
-            return False
-            
-        # Reset status
-        workflow.update_status(WorkflowExecutionStatus.RUNNING)
+        async with self._workflow_lock(workflow_id):
+            workflow = self.active_workflows.get(workflow_id)
+            if not workflow or workflow.status != WorkflowExecutionStatus.FAILED:
+                return False
+                
+            # Reset status
+            workflow.update_status(WorkflowExecutionStatus.RUNNING)
+            self.workflow_expirations.cancel(workflow_id)
         
         # Find last completed activity
         last_completed_index = -1
@@ -1377,7 +1865,7 @@ class WorkflowEngine:
         # Get the workflow definition
         workflow_def = self.workflow_registry.get_workflow(workflow.workflow_type)
         if not workflow_def:
-            workflow.set_error(f"Workflow type not found: {workflow.workflow_type}")
+            await self._fail_workflow(workflow, f"Workflow type not found: {workflow.workflow_type}")
             return False
             
         # Continue workflow execution
@@ -1388,6 +1876,9 @@ class WorkflowEngine:
     async def shutdown(self):
         """Shutdown the workflow engine."""
         await self.stop()
+        await self.flush_checkpoints()
+        self._checkpoint_writer.shutdown()
+        self.checkpoint_store.close()
 
 
 # Create singleton instance